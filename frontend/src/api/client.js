@@ -9,99 +9,89 @@ export async function clearChat(sessionId = 'default') {
   return response.json()
 }
 
-export function createChatStream(message, sessionId = 'default', onEvent) {
-  const controller = new AbortController()
-
-  fetch(`${API_BASE}/chat`, {
-    method: 'POST',
-    headers: { 'Content-Type': 'application/json' },
-    body: JSON.stringify({ message, session_id: sessionId }),
-    signal: controller.signal,
-  })
-    .then(async (response) => {
-      const reader = response.body.getReader()
-      const decoder = new TextDecoder()
-      let buffer = ''
-
-      while (true) {
-        const { done, value } = await reader.read()
-        if (done) break
-
-        buffer += decoder.decode(value, { stream: true })
-        const lines = buffer.split('\n')
-        buffer = lines.pop() || ''
-
-        for (const line of lines) {
-          if (line.startsWith('event: ')) {
-            const eventType = line.slice(7)
-            onEvent({ type: 'eventType', value: eventType })
-          } else if (line.startsWith('data: ')) {
-            try {
-              const data = JSON.parse(line.slice(6))
-              onEvent({ type: 'data', value: data })
-            } catch (e) {
-              console.error('Failed to parse SSE data:', e)
-            }
-          }
-        }
-      }
+// Incremental Server-Sent Events parser. Each chunk is scanned once: only the
+// unfinished event at the end of the buffer is kept for the next chunk.
+export function createSSEParser(onEvent) {
+  let buffer = ''
+  // Where to resume looking for the blank line that ends an event
+  let scanFrom = 0
 
-      onEvent({ type: 'done' })
-    })
-    .catch((error) => {
-      if (error.name !== 'AbortError') {
-        onEvent({ type: 'error', value: error.message })
+  const dispatch = (block) => {
+    let type = 'message'
+    const data = []
+    for (const line of block.split('\n')) {
+      if (line.startsWith('event:')) {
+        type = line.slice(6).trim()
+      } else if (line.startsWith('data:')) {
+        data.push(line.slice(line.startsWith('data: ') ? 6 : 5))
       }
-    })
+    }
+    if (data.length === 0) return
+    try {
+      onEvent(type, JSON.parse(data.join('\n')))
+    } catch (e) {
+      console.error('Failed to parse SSE data:', e)
+    }
+  }
 
-  return () => controller.abort()
+  return (chunk) => {
+    buffer += chunk
+    let start = 0
+    let end = buffer.indexOf('\n\n', Math.max(scanFrom - 1, 0))
+    while (end !== -1) {
+      dispatch(buffer.slice(start, end))
+      start = end + 2
+      end = buffer.indexOf('\n\n', start)
+    }
+    if (start > 0) buffer = buffer.slice(start)
+    scanFrom = buffer.length
+  }
 }
 
-export function createResearchStream(type, params, sessionId = 'default', onEvent) {
+// POST a JSON body and deliver the SSE response as onEvent(type, data) calls.
+// onClose runs when the stream ends and onError with a message on failure.
+// Returns a function that cancels the request.
+export function streamEvents(path, body, { onEvent, onError, onClose }) {
   const controller = new AbortController()
-  const endpoint = type === 'company' ? 'company' : 'prospect'
 
-  fetch(`${API_BASE}/research/${endpoint}`, {
+  fetch(`${API_BASE}${path}`, {
     method: 'POST',
     headers: { 'Content-Type': 'application/json' },
-    body: JSON.stringify({ ...params, session_id: sessionId }),
+    body: JSON.stringify(body),
     signal: controller.signal,
   })
     .then(async (response) => {
+      if (!response.ok) {
+        // e.g. 429 when this session already has too many queued requests
+        const error = await response.json().catch(() => ({}))
+        throw new Error(error.error || response.statusText)
+      }
       const reader = response.body.getReader()
       const decoder = new TextDecoder()
-      let buffer = ''
+      const parse = createSSEParser(onEvent)
 
       while (true) {
         const { done, value } = await reader.read()
         if (done) break
-
-        buffer += decoder.decode(value, { stream: true })
-        const lines = buffer.split('\n')
-        buffer = lines.pop() || ''
-
-        for (const line of lines) {
-          if (line.startsWith('event: ')) {
-            const eventType = line.slice(7)
-            onEvent({ type: 'eventType', value: eventType })
-          } else if (line.startsWith('data: ')) {
-            try {
-              const data = JSON.parse(line.slice(6))
-              onEvent({ type: 'data', value: data })
-            } catch (e) {
-              console.error('Failed to parse SSE data:', e)
-            }
-          }
-        }
+        parse(decoder.decode(value, { stream: true }))
       }
 
-      onEvent({ type: 'done' })
+      onClose?.()
     })
     .catch((error) => {
       if (error.name !== 'AbortError') {
-        onEvent({ type: 'error', value: error.message })
+        onError?.(error.message)
       }
     })
 
   return () => controller.abort()
 }
+
+export function createChatStream(message, sessionId = 'default', handlers) {
+  return streamEvents('/chat', { message, session_id: sessionId }, handlers)
+}
+
+export function createResearchStream(type, params, sessionId = 'default', handlers) {
+  const endpoint = type === 'company' ? 'company' : 'prospect'
+  return streamEvents(`/research/${endpoint}`, { ...params, session_id: sessionId }, handlers)
+}
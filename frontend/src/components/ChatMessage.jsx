@@ -1,6 +1,8 @@
+import { memo } from 'react'
 import ReactMarkdown from 'react-markdown'
+import StreamingMarkdown from './StreamingMarkdown'
 
-export default function ChatMessage({ message, isUser }) {
+function ChatMessage({ message, isUser, streaming = false }) {
   return (
     <div className={`flex ${isUser ? 'justify-end' : 'justify-start'} mb-4`}>
       <div
@@ -14,10 +16,17 @@ export default function ChatMessage({ message, isUser }) {
           <p className="whitespace-pre-wrap">{message}</p>
         ) : (
           <div className="prose prose-sm prose-slate max-w-none">
-            <ReactMarkdown>{message}</ReactMarkdown>
+            {streaming ? (
+              <StreamingMarkdown text={message} />
+            ) : (
+              <ReactMarkdown>{message}</ReactMarkdown>
+            )}
           </div>
         )}
       </div>
     </div>
   )
 }
+
+// Earlier messages are not re-rendered while a reply streams in
+export default memo(ChatMessage)
@@ -1,4 +1,4 @@
-export default function LoadingIndicator({ status, toolName }) {
+export default function LoadingIndicator({ status, toolName, queuePosition }) {
   return (
     <div className="flex justify-start mb-4">
       <div className="bg-white border border-slate-200 rounded-2xl px-4 py-3">
@@ -15,6 +15,7 @@ export default function LoadingIndicator({ status, toolName }) {
 
           {/* Status text */}
           <span className="text-sm text-slate-600">
+            {status === 'queued' && `Waiting for the previous request (#${queuePosition} in line)...`}
             {status === 'thinking' && 'Thinking...'}
             {status === 'tool' && (
               <span className="flex items-center gap-2">
@@ -0,0 +1,13 @@
+import { memo, useMemo } from 'react'
+import ReactMarkdown from 'react-markdown'
+import { splitBlocks } from '../lib/markdownBlocks'
+
+// Finished blocks keep the same source, so only the growing one is re-parsed
+const MarkdownBlock = memo(function MarkdownBlock({ source }) {
+  return <ReactMarkdown>{source}</ReactMarkdown>
+})
+
+export default function StreamingMarkdown({ text }) {
+  const blocks = useMemo(() => splitBlocks(text), [text])
+  return blocks.map((block, index) => <MarkdownBlock key={index} source={block} />)
+}
@@ -1,13 +1,18 @@
 import { useState, useCallback, useRef } from 'react'
 import { createChatStream, clearChat } from '../api/client'
+import { useStreamingText } from './useStreamingText'
 
 export function useChat(sessionId = 'default') {
   const [messages, setMessages] = useState([])
   const [isLoading, setIsLoading] = useState(false)
   const [loadingStatus, setLoadingStatus] = useState(null)
   const [toolName, setToolName] = useState(null)
+  const [queuePosition, setQueuePosition] = useState(null)
   const [error, setError] = useState(null)
   const abortRef = useRef(null)
+  // The assistant reply as it streams in, committed once per frame
+  const draft = useStreamingText()
+  const { append: appendDraft, reset: resetDraft } = draft
 
   const sendMessage = useCallback((message) => {
     // Add user message
@@ -15,42 +20,61 @@ export function useChat(sessionId = 'default') {
     setIsLoading(true)
     setLoadingStatus('thinking')
     setError(null)
+    resetDraft()
 
     let assistantMessage = ''
 
-    abortRef.current = createChatStream(message, sessionId, (event) => {
-      if (event.type === 'data') {
-        const data = event.value
+    const finish = () => {
+      setIsLoading(false)
+      setLoadingStatus(null)
+      setToolName(null)
+    }
 
-        if (data.status === 'processing') {
-          setLoadingStatus('thinking')
-        } else if (data.name) {
-          // Tool event
-          setLoadingStatus('tool')
-          setToolName(data.name)
-        } else if (data.text) {
-          // Content event
-          assistantMessage = data.text
-        } else if (data.status === 'complete') {
-          // Done event
-          setMessages((prev) => [
-            ...prev,
-            { role: 'assistant', content: assistantMessage },
-          ])
-          setIsLoading(false)
-          setLoadingStatus(null)
-          setToolName(null)
+    abortRef.current = createChatStream(message, sessionId, {
+      onEvent: (type, data) => {
+        switch (type) {
+          case 'queued':
+            // Another request for this session is still running
+            setLoadingStatus('queued')
+            setQueuePosition(data.position)
+            break
+          case 'thinking':
+            setLoadingStatus('thinking')
+            break
+          case 'content_delta':
+            setLoadingStatus('streaming')
+            appendDraft(data.text)
+            break
+          case 'tool':
+            // Text before a tool call is not part of the final reply
+            resetDraft()
+            setLoadingStatus('tool')
+            setToolName(data.name)
+            break
+          case 'content':
+            assistantMessage = data.text
+            break
+          case 'done':
+            if (data.status === 'complete') {
+              setMessages((prev) => [
+                ...prev,
+                { role: 'assistant', content: assistantMessage },
+              ])
+            }
+            resetDraft()
+            finish()
+            break
+          default:
+            break
         }
-      } else if (event.type === 'error') {
-        setError(event.value)
-        setIsLoading(false)
-        setLoadingStatus(null)
-      } else if (event.type === 'done') {
-        setIsLoading(false)
-        setLoadingStatus(null)
-      }
+      },
+      onError: (reason) => {
+        setError(reason)
+        finish()
+      },
+      onClose: finish,
     })
-  }, [sessionId])
+  }, [sessionId, appendDraft, resetDraft])
 
   const clear = useCallback(async () => {
     if (abortRef.current) {
@@ -59,21 +83,25 @@ export function useChat(sessionId = 'default') {
     await clearChat(sessionId)
     setMessages([])
     setError(null)
-  }, [sessionId])
+    resetDraft()
+  }, [sessionId, resetDraft])
 
   const cancel = useCallback(() => {
     if (abortRef.current) {
       abortRef.current()
       setIsLoading(false)
       setLoadingStatus(null)
+      resetDraft()
     }
-  }, [])
+  }, [resetDraft])
 
   return {
     messages,
+    streamingText: draft.text,
     isLoading,
     loadingStatus,
     toolName,
+    queuePosition,
     error,
     sendMessage,
     clear,
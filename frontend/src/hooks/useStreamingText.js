@@ -0,0 +1,36 @@
+import { useState, useCallback, useRef, useEffect } from 'react'
+
+// Text that grows by streamed deltas. Deltas are collected in a ref and
+// committed to state at most once per animation frame, however fast they come.
+export function useStreamingText() {
+  const [text, setText] = useState('')
+  const bufferRef = useRef('')
+  const frameRef = useRef(null)
+
+  const cancelFrame = useCallback(() => {
+    if (frameRef.current !== null) {
+      cancelAnimationFrame(frameRef.current)
+      frameRef.current = null
+    }
+  }, [])
+
+  const append = useCallback((delta) => {
+    bufferRef.current += delta
+    if (frameRef.current === null) {
+      frameRef.current = requestAnimationFrame(() => {
+        frameRef.current = null
+        setText(bufferRef.current)
+      })
+    }
+  }, [])
+
+  const reset = useCallback((value = '') => {
+    cancelFrame()
+    bufferRef.current = value
+    setText(value)
+  }, [cancelFrame])
+
+  useEffect(() => cancelFrame, [cancelFrame])
+
+  return { text, append, reset }
+}
@@ -0,0 +1,41 @@
+const FENCE = /^ {0,3}(`{3,}|~{3,})/
+
+// Split markdown into its top-level blocks at blank lines outside fenced code,
+// so a streaming message re-renders only its last, still growing block. A
+// blank line followed by an indented line (e.g. a list item's next paragraph)
+// does not end a block, and no block ends before the next line has arrived.
+export function splitBlocks(text) {
+  const blocks = []
+  let start = 0
+  let fence = null
+  let blankSeen = false
+  let lineStart = 0
+
+  while (lineStart < text.length) {
+    const newline = text.indexOf('\n', lineStart)
+    const lineEnd = newline === -1 ? text.length : newline
+    const line = text.slice(lineStart, lineEnd)
+    const marker = line.match(FENCE)
+
+    if (fence) {
+      if (marker && marker[1][0] === fence[0] && marker[1].length >= fence.length) {
+        fence = null
+      }
+    } else if (line.trim() === '') {
+      blankSeen = lineStart > start
+    } else {
+      if (blankSeen && !/^\s/.test(line)) {
+        blocks.push(text.slice(start, lineStart))
+        start = lineStart
+      }
+      blankSeen = false
+      if (marker) fence = marker[1]
+    }
+    lineStart = lineEnd + 1
+  }
+
+  if (start < text.length || blocks.length === 0) {
+    blocks.push(text.slice(start))
+  }
+  return blocks
+}
@@ -5,7 +5,10 @@ import ChatInput from '../components/ChatInput'
 import LoadingIndicator from '../components/LoadingIndicator'
 
 export default function ChatPage() {
-  const { messages, isLoading, loadingStatus, toolName, error, sendMessage, clear } = useChat()
+  const {
+    messages, streamingText, isLoading, loadingStatus, toolName, queuePosition, error,
+    sendMessage, clear,
+  } = useChat()
   const messagesEndRef = useRef(null)
 
   // Auto-scroll to bottom on new messages
@@ -13,6 +16,13 @@ export default function ChatPage() {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' })
   }, [messages, isLoading])
 
+  // Follow a streaming reply without restarting a smooth scroll every frame
+  useEffect(() => {
+    if (streamingText) {
+      messagesEndRef.current?.scrollIntoView({ block: 'end' })
+    }
+  }, [streamingText])
+
   return (
     <div className="flex flex-col h-full">
       {/* Header */}
@@ -73,8 +83,15 @@ export default function ChatPage() {
                 isUser={message.role === 'user'}
               />
             ))}
-            {isLoading && (
-              <LoadingIndicator status={loadingStatus} toolName={toolName} />
+            {streamingText && (
+              <ChatMessage message={streamingText} isUser={false} streaming />
+            )}
+            {isLoading && !streamingText && (
+              <LoadingIndicator
+                status={loadingStatus}
+                toolName={toolName}
+                queuePosition={queuePosition}
+              />
             )}
             {error && (
               <div className="bg-red-50 border border-red-200 text-red-700 px-4 py-3 rounded-lg mb-4">
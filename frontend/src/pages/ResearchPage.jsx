@@ -1,6 +1,8 @@
 import { useState, useCallback } from 'react'
 import ReactMarkdown from 'react-markdown'
 import { createResearchStream } from '../api/client'
+import StreamingMarkdown from '../components/StreamingMarkdown'
+import { useStreamingText } from '../hooks/useStreamingText'
 
 export default function ResearchPage() {
   const [researchType, setResearchType] = useState('company')
@@ -11,6 +13,8 @@ export default function ResearchPage() {
   const [toolName, setToolName] = useState(null)
   const [result, setResult] = useState(null)
   const [error, setError] = useState(null)
+  // The report as it streams in, until the final result arrives
+  const { text: draft, append: appendDraft, reset: resetDraft } = useStreamingText()
 
   const handleSubmit = useCallback((e) => {
     e.preventDefault()
@@ -23,31 +27,46 @@ export default function ResearchPage() {
       ? { company: companyName }
       : { prospect: prospectName, company: companyName || undefined }
 
-    createResearchStream(researchType, params, 'research', (event) => {
-      if (event.type === 'data') {
-        const data = event.value
+    resetDraft()
 
-        if (data.status === 'researching') {
-          setLoadingStatus('thinking')
-        } else if (data.name) {
-          setLoadingStatus('tool')
-          setToolName(data.name)
-        } else if (data.text) {
-          setResult(data.text)
-        } else if (data.status === 'complete') {
-          setIsLoading(false)
-          setLoadingStatus(null)
+    const finish = () => {
+      setIsLoading(false)
+      setLoadingStatus(null)
+    }
+
+    createResearchStream(researchType, params, 'research', {
+      onEvent: (type, data) => {
+        switch (type) {
+          case 'thinking':
+            setLoadingStatus('thinking')
+            break
+          case 'content_delta':
+            appendDraft(data.text)
+            break
+          case 'tool':
+            // Text before a tool call is not part of the report
+            resetDraft()
+            setLoadingStatus('tool')
+            setToolName(data.name)
+            break
+          case 'content':
+            resetDraft()
+            setResult(data.text)
+            break
+          case 'done':
+            finish()
+            break
+          default:
+            break
         }
-      } else if (event.type === 'error') {
-        setError(event.value)
-        setIsLoading(false)
-        setLoadingStatus(null)
-      } else if (event.type === 'done') {
-        setIsLoading(false)
-        setLoadingStatus(null)
-      }
+      },
+      onError: (reason) => {
+        setError(reason)
+        finish()
+      },
+      onClose: finish,
     })
-  }, [researchType, companyName, prospectName])
+  }, [researchType, companyName, prospectName, appendDraft, resetDraft])
 
   return (
     <div className="flex flex-col h-full">
@@ -162,6 +181,16 @@ export default function ResearchPage() {
             </div>
           )}
 
+          {/* Report so far */}
+          {!result && draft && (
+            <div className="bg-white rounded-xl border border-slate-200 p-6">
+              <h3 className="text-lg font-semibold text-slate-900 mb-4">Research Results</h3>
+              <div className="prose prose-slate max-w-none">
+                <StreamingMarkdown text={draft} />
+              </div>
+            </div>
+          )}
+
           {/* Results */}
           {result && (
             <div className="bg-white rounded-xl border border-slate-200 p-6">
@@ -0,0 +1,282 @@
+"""Stored company research and lookalike-account search.
+
+Every company research report is appended to a JSONL store keyed by the
+company's canonical entity ID, and indexed as it arrives in a TF-IDF index of
+sparse vectors. "Find accounts like this one" is then a local nearest-neighbour
+query over the postings of the account's terms instead of fresh web searches.
+"""
+
+import json
+import math
+import re
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from .entities import get_entity_index
+from .text import tokenize
+
+# "Key Facts" lines of the company-research report format
+ATTRIBUTE_PATTERN = re.compile(
+    r"^\s*[-*]?\s*\**(industry|headquarters|employees|founded)\**\s*:\s*\**(.+?)\**\s*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+# Structured attributes count this many times more than a word in the report
+ATTRIBUTE_WEIGHT = 3.0
+SIZE_BUCKETS = [
+    (10, "1-10"),
+    (50, "11-50"),
+    (200, "51-200"),
+    (1000, "201-1000"),
+    (5000, "1001-5000"),
+    (10000, "5001-10000"),
+]
+
+
+def extract_attributes(report: str) -> dict[str, str]:
+    """Pull key facts such as industry and headquarters out of a research report."""
+    attributes = {}
+    for key, value in ATTRIBUTE_PATTERN.findall(report):
+        value = value.strip()
+        if value and not value.startswith("["):
+            attributes.setdefault(key.lower(), value)
+    return attributes
+
+
+def _size_bucket(employees: str) -> Optional[str]:
+    match = re.search(r"\d[\d,]*", employees)
+    if not match:
+        return None
+    count = int(match.group().replace(",", ""))
+    for limit, bucket in SIZE_BUCKETS:
+        if count <= limit:
+            return bucket
+    return "10000+"
+
+
+def account_terms(report: str, attributes: dict[str, str]) -> Counter:
+    """Weighted term counts for an account: report words plus attribute terms."""
+    terms: Counter = Counter(tokenize(report))
+    for key, value in attributes.items():
+        if key == "employees":
+            bucket = _size_bucket(value)
+            if bucket:
+                terms[f"size={bucket}"] += ATTRIBUTE_WEIGHT
+            continue
+        for token in tokenize(value):
+            terms[f"{key}={token}"] += ATTRIBUTE_WEIGHT
+    return terms
+
+
+class ResearchRecord(BaseModel):
+    """A stored company research report."""
+
+    id: str
+    company: str
+    report: str
+    attributes: dict[str, str] = Field(default_factory=dict)
+    created_at: float = Field(default_factory=time.time)
+
+
+class Lookalike(BaseModel):
+    """A similar account and its cosine similarity to the query."""
+
+    id: str
+    company: str
+    score: float
+    attributes: dict[str, str] = Field(default_factory=dict)
+
+
+class LookalikeIndex:
+    """Incrementally built TF-IDF index over sparse account vectors.
+
+    Adding an account only touches the postings of its own terms. Document
+    norms depend on IDF, so they are recomputed lazily on the first query
+    after the corpus changes.
+    """
+
+    def __init__(self) -> None:
+        self._terms: dict[str, dict[str, float]] = {}
+        self._postings: dict[str, dict[str, float]] = {}
+        self._norms: dict[str, float] = {}
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._terms
+
+    def add(self, doc_id: str, terms: Counter) -> None:
+        """Add or replace an account's term counts."""
+        self.remove(doc_id)
+        # Sublinear term frequency so long reports do not dominate
+        weights = {t: 1.0 + math.log(c) for t, c in terms.items() if c > 0}
+        self._terms[doc_id] = weights
+        for term, weight in weights.items():
+            self._postings.setdefault(term, {})[doc_id] = weight
+        self._dirty = True
+
+    def remove(self, doc_id: str) -> None:
+        """Remove an account from the index."""
+        weights = self._terms.pop(doc_id, None)
+        if weights is None:
+            return
+        for term in weights:
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+        self._norms.pop(doc_id, None)
+        self._dirty = True
+
+    def _idf(self, term: str) -> float:
+        return math.log((1 + len(self._terms)) / (1 + len(self._postings.get(term, ())))) + 1.0
+
+    def _refresh_norms(self) -> None:
+        if not self._dirty:
+            return
+        idf = {term: self._idf(term) for term in self._postings}
+        self._norms = {
+            doc_id: math.sqrt(sum((w * idf[t]) ** 2 for t, w in weights.items())) or 1.0
+            for doc_id, weights in self._terms.items()
+        }
+        self._dirty = False
+
+    def query(
+        self,
+        terms: Counter,
+        top_k: int = 5,
+        exclude: Optional[str] = None,
+    ) -> list[tuple[str, float]]:
+        """Return up to ``top_k`` (doc ID, cosine similarity) pairs, most similar first."""
+        self._refresh_norms()
+        query = {t: (1.0 + math.log(c)) * self._idf(t) for t, c in terms.items() if c > 0}
+        query_norm = math.sqrt(sum(w * w for w in query.values())) or 1.0
+
+        # Only accounts sharing at least one term with the query are scored
+        scores: dict[str, float] = {}
+        for term, query_weight in query.items():
+            idf = self._idf(term)
+            for doc_id, weight in self._postings.get(term, {}).items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + query_weight * weight * idf
+        scores.pop(exclude, None)
+
+        ranked = sorted(
+            (
+                (doc_id, score / (query_norm * self._norms[doc_id]))
+                for doc_id, score in scores.items()
+            ),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+        return ranked[:top_k]
+
+
+class ResearchStore:
+    """Append-only JSONL store of company research with a lookalike index.
+
+    Args:
+        path: JSONL file; the latest record per company wins on load
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.index = LookalikeIndex()
+        self._records: dict[str, ResearchRecord] = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            self._load()
+
+    def _load(self) -> None:
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    self._index(ResearchRecord(**json.loads(line)))
+
+    def _index(self, record: ResearchRecord) -> None:
+        self._records[record.id] = record
+        self.index.add(record.id, account_terms(record.report, record.attributes))
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def add(
+        self,
+        company: str,
+        report: str,
+        attributes: Optional[dict[str, str]] = None,
+    ) -> ResearchRecord:
+        """Store a company research report and index it for lookalike search."""
+        record = ResearchRecord(
+            id=get_entity_index().company_id(company),
+            company=company,
+            report=report,
+            attributes={**extract_attributes(report), **(attributes or {})},
+        )
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(record.model_dump_json() + "\n")
+            self._index(record)
+        return record
+
+    def get(self, company: str) -> Optional[ResearchRecord]:
+        """Get the latest stored research for a company name, URL or domain."""
+        return self._records.get(get_entity_index().company_id(company))
+
+    def find_lookalikes(
+        self,
+        company: Optional[str] = None,
+        description: Optional[str] = None,
+        top_k: int = 5,
+    ) -> list[Lookalike]:
+        """Find the stored accounts most similar to a company or a description.
+
+        Args:
+            company: A researched company to find lookalikes of
+            description: Free-text account profile, used when ``company`` has
+                no stored research (or in addition to it)
+            top_k: Number of accounts to return
+
+        Raises:
+            KeyError: If neither stored research nor a description is available
+        """
+        record = self.get(company) if company else None
+        if record is None and not description:
+            raise KeyError(f"No stored research for {company!r}")
+
+        terms: Counter = Counter()
+        if record:
+            terms += account_terms(record.report, record.attributes)
+        if description:
+            terms += account_terms(description, extract_attributes(description))
+
+        with self._lock:
+            hits = self.index.query(terms, top_k, exclude=record.id if record else None)
+            return [
+                Lookalike(
+                    id=doc_id,
+                    company=self._records[doc_id].company,
+                    score=round(score, 4),
+                    attributes=self._records[doc_id].attributes,
+                )
+                for doc_id, score in hits
+            ]
+
+
+_stores: dict[Path, ResearchStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_research_store(data_dir: Path) -> ResearchStore:
+    """Get the process-wide research store for a data directory."""
+    path = (Path(data_dir) / "research.jsonl").resolve()
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = ResearchStore(path)
+        return _stores[path]
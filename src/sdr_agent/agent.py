@@ -1,16 +1,36 @@
 """SDR Agent orchestrator - connects Claude with Skills and integrations."""
 
+import contextvars
+import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Optional
 
+from pydantic import BaseModel, Field
 from rich.console import Console
 from rich.markdown import Markdown
 from rich.panel import Panel
 
+from .accounts import get_research_store
+from .compose import ComposeResult, Recipient, compose_batch
 from .config import Settings
+from .dispatch import Priority, request_context
+from .entities import get_entity_index
+from .history import ConversationHistory, HistoryPage
 from .integrations.email import EmailClient
-from .llm.claude import ClaudeClient, ClaudeResponse
+from .llm.batch import BatchBackend, BatchJob
+from .llm.cache import get_response_cache
+from .llm.claude import ClaudeClient, ClaudeResponse, ToolCall
+from .llm.routing import ModelRouter
+from .results import ToolResultStore
+from .scheduler import anthropic_retry_after, get_scheduler, tavily_retry_after
+from .scoring import load_scoring_model
+from .search.prefetch import prefetch_company_research
+from .sessions import SessionBackend, SessionConflict, SessionState, SessionSync
+from .singleflight import SingleFlight
 from .skills.executor import SkillExecutor
 from .skills.loader import SkillLoader
+from .skills.router import SkillRouter
+from .tools import Tool, ToolPolicy, ToolRegistry
 
 SYSTEM_PROMPT_TEMPLATE = """\
 You are an AI Sales Development Representative (SDR) agent. Your role is to help with:
@@ -25,16 +45,17 @@ You are an AI Sales Development Representative (SDR) agent. Your role is to help
 ## Available Skills
 
 You have access to specialized skills that provide detailed instructions for
-specific tasks. When you need guidance on a complex task, use the `read_skill`
-tool to load the relevant skill instructions.
+specific tasks. When you need guidance on a specific point, use the
+`search_skill_docs` tool to pull only the relevant sections; use `read_skill`
+when you need a skill's complete instructions. If a message already contains a
+`<skill_instructions>` block, follow it directly instead of calling `read_skill`
+for that skill.
 
 {available_skills}
 
 ## Tools Available
 
-- **web_search**: Search the web for information about companies, people, or topics
-- **send_email**: Send an email to a prospect
-- **read_skill**: Load detailed instructions from a skill
+{available_tools}
 
 ## Guidelines
 
@@ -49,6 +70,80 @@ to gather information. When composing emails, reference the email-composer skill
 for best practices.
 """
 
+COMPANY_RESEARCH_PROMPT = """\
+Research the company "{company}" thoroughly.
+
+Please find and summarize:
+1. Company overview (what they do, industry, size)
+2. Recent news and developments
+3. Key products or services
+4. Technology stack (if detectable)
+5. Key decision makers (C-suite, VP-level)
+6. Any recent funding or financial news
+
+Provide a comprehensive research report that would help an SDR prepare for outreach."""
+
+PROSPECT_RESEARCH_PROMPT = """\
+Research the prospect "{prospect}"{company_context} thoroughly.
+
+Please find and summarize:
+1. Current role and responsibilities
+2. Professional background and experience
+3. Education and certifications
+4. Recent public activity (posts, articles, speaking)
+5. Professional interests and focus areas
+6. Any personal details that could help personalize outreach
+
+Provide a comprehensive prospect profile that would help craft a personalized outreach message."""
+
+PREFETCH_PREAMBLE = """\
+The web searches below were run in advance for each topic in this report. Use
+them as your primary sources and only call web_search to fill specific gaps.
+
+"""
+
+# A user message that starts with inlined skill instructions (see skill_preamble)
+PRELOADED_SKILL = re.compile(r'<skill_instructions name="([^"]+)">')
+
+
+def skill_preamble(name: str, instructions: str) -> str:
+    """Wrap a skill's instructions for inlining at the start of a user message.
+
+    ``PRELOADED_SKILL`` recognizes the result when a conversation is reloaded.
+    """
+    return f'<skill_instructions name="{name}">\n{instructions}\n</skill_instructions>\n\n'
+
+
+# Concurrent research of the same target in this process runs only once. Blocking
+# callers share a report and streaming callers an event stream; the two are kept
+# apart because a streamed run's flight has events but no result
+research_flights = SingleFlight()
+research_streams = SingleFlight()
+
+
+def research_key(company: Optional[str] = None, prospect: Optional[str] = None) -> str:
+    """Canonical entity ID of a research target, used as its single-flight key."""
+    entities = get_entity_index()
+    if prospect:
+        return entities.person_id(prospect, company)
+    return entities.company_id(company or "")
+
+
+def research_summary(company: Optional[str] = None, prospect: Optional[str] = None) -> str:
+    """Short stand-in for the research prompt when recording a shared result."""
+    if prospect:
+        company_context = f" at {company}" if company else ""
+        return f'Research the prospect "{prospect}"{company_context}.'
+    return f'Research the company "{company}".'
+
+
+class RoutingStats(BaseModel):
+    """Counters for local skill routing."""
+
+    routed_requests: int = 0
+    saved_round_trips: int = 0
+    skills: dict[str, int] = Field(default_factory=dict)
+
 
 class SDRAgent:
     """Main SDR Agent that orchestrates all components."""
@@ -60,18 +155,88 @@ class SDRAgent:
         # Initialize components
         self.skill_loader = SkillLoader(settings.skills_dir)
         self.skill_loader.discover_skills()
-
+        self.skill_router = SkillRouter(self.skill_loader)
+        self.routing_stats = RoutingStats()
+        self._preloaded_skills: set[str] = set()
+        self.session: Optional[SessionSync] = None
+        self.history = ConversationHistory()
+
+        self.research_store = (
+            get_research_store(settings.data_dir) if settings.research_store else None
+        )
+        # Shared by this agent's conversations and its tool executor
+        self.result_store = (
+            ToolResultStore(settings.tool_result_cache_size, settings.tool_result_dir)
+            if settings.tool_result_inline_tokens > 0
+            else None
+        )
+        # Every tool the model is offered: built-ins, skill tools and send_email
+        self.tools = ToolRegistry(max_parallel=settings.tool_max_parallel)
         self.skill_executor = SkillExecutor(
             skill_loader=self.skill_loader,
             tavily_api_key=settings.tavily_api_key,
+            script_workers=settings.script_workers,
+            script_timeout=settings.script_timeout,
+            script_memory_limit_mb=settings.script_memory_limit_mb,
+            search_token_budget=settings.search_token_budget,
+            scoring_model=(
+                load_scoring_model(settings.scoring_model_path)
+                if settings.scoring_model_path
+                else None
+            ),
+            leads_dir=settings.data_dir,
+            research_store=self.research_store,
+            result_store=self.result_store,
+            search_scheduler=get_scheduler(
+                "tavily",
+                requests_per_minute=settings.tavily_requests_per_minute,
+                max_in_flight=settings.tavily_max_in_flight,
+                reserved_interactive=settings.interactive_reserved_slots,
+                max_retries=settings.api_max_retries,
+                retry_after=tavily_retry_after,
+            ),
+            tools=self.tools,
+            tool_timeout=settings.tool_timeout,
+            tool_cache_ttl=settings.tool_cache_ttl,
         )
-
-        self.claude = ClaudeClient(
-            api_key=settings.anthropic_api_key,
-            model=settings.claude_model,
-            max_tokens=settings.max_tokens,
+        self.tools.register(
+            Tool(
+                name="send_email",
+                description=(
+                    "Send an email to a prospect. "
+                    "Use this after composing a personalized email."
+                ),
+                summary="Send an email to a prospect",
+                input_schema={
+                    "type": "object",
+                    "properties": {
+                        "to_email": {
+                            "type": "string",
+                            "description": "Recipient email address",
+                        },
+                        "to_name": {
+                            "type": "string",
+                            "description": "Recipient name",
+                        },
+                        "subject": {
+                            "type": "string",
+                            "description": "Email subject line",
+                        },
+                        "body": {
+                            "type": "string",
+                            "description": "Email body content",
+                        },
+                    },
+                    "required": ["to_email", "subject", "body"],
+                },
+                handler=self._handle_send_email,
+                # Never retried, cached or sent from a task; one SMTP session at a time
+                policy=ToolPolicy(idempotent=False, max_concurrency=1),
+            )
         )
 
+        self.claude = self.new_claude_client()
+
         self.email_client: Optional[EmailClient] = None
         if settings.email_configured:
             self.email_client = EmailClient(
@@ -83,31 +248,228 @@ class SDRAgent:
                 from_name=settings.smtp_from_name,
             )
 
+    def new_claude_client(self) -> ClaudeClient:
+        """Create a Claude client with an empty conversation and the shared rate limits."""
+        settings = self.settings
+        return ClaudeClient(
+            api_key=settings.anthropic_api_key,
+            model=settings.claude_model,
+            max_tokens=settings.max_tokens,
+            scheduler=get_scheduler(
+                "anthropic",
+                requests_per_minute=settings.anthropic_requests_per_minute,
+                tokens_per_minute=settings.anthropic_tokens_per_minute,
+                max_in_flight=settings.anthropic_max_in_flight,
+                reserved_interactive=settings.interactive_reserved_slots,
+                max_retries=settings.api_max_retries,
+                retry_after=anthropic_retry_after,
+            ),
+            result_store=self.result_store,
+            result_inline_tokens=settings.tool_result_inline_tokens,
+            tools=self.tools,
+            response_cache=(
+                get_response_cache(
+                    settings.response_cache_size,
+                    settings.response_cache_ttl,
+                    settings.response_cache_dir,
+                )
+                if settings.response_cache
+                else None
+            ),
+            router=ModelRouter(
+                fast_model=settings.fast_model,
+                fast_max_tokens=settings.fast_model_max_tokens,
+                followup_max_tokens=settings.fast_model_followup_max_tokens,
+                route_first_turn=settings.route_first_turn,
+            ),
+        )
+
     def _build_system_prompt(self) -> str:
         """Build the system prompt with available skills."""
         available_skills = self.skill_loader.generate_available_skills_xml()
-        return SYSTEM_PROMPT_TEMPLATE.format(available_skills=available_skills)
+        return SYSTEM_PROMPT_TEMPLATE.format(
+            available_skills=available_skills, available_tools=self.tools.prompt_lines()
+        )
+
+    def route_message(
+        self,
+        user_message: str,
+        skill: Optional[str] = None,
+    ) -> tuple[str, Optional[str]]:
+        """Inline the instructions of the skill a message needs into the message.
+
+        The skill is either given explicitly (for known flows such as company
+        research) or classified locally by the router. Skills already inlined
+        earlier in the conversation are not repeated.
+
+        Returns:
+            Tuple of (message to send, name of the preloaded skill or None)
+        """
+        if not self.settings.skill_preloading:
+            return user_message, None
+
+        name = skill or self.skill_router.route(user_message)
+        if not name or name in self._preloaded_skills:
+            return user_message, None
+
+        instructions = self.skill_loader.load_skill_instructions(name)
+        if not instructions:
+            return user_message, None
+
+        self._preloaded_skills.add(name)
+        self.routing_stats.routed_requests += 1
+        self.routing_stats.saved_round_trips += 1
+        self.routing_stats.skills[name] = self.routing_stats.skills.get(name, 0) + 1
+
+        return skill_preamble(name, instructions) + user_message, name
+
+    def execute_tool(self, name: str, tool_input: dict[str, Any]) -> str:
+        """Execute a single tool call on behalf of the model."""
+        skill_name = tool_input.get("skill_name")
+        if name == "read_skill" and skill_name in self._preloaded_skills:
+            # The model re-read a skill we already inlined, so no round trip was saved
+            self.routing_stats.saved_round_trips -= 1
+            return f"The {skill_name} instructions are already included in this conversation."
+
+        return self.tools.execute(name, tool_input)
+
+    def run_tools(self, tool_calls: list[ToolCall]) -> list[dict[str, str]]:
+        """Execute one turn's tool calls, running the independent ones in parallel.
+
+        Returns:
+            Tool results in call order, for ``continue_with_tool_results``
+        """
+        results = self.tools.run(tool_calls, self.execute_tool)
+        return [
+            {"tool_use_id": call.id, "content": result}
+            for call, result in zip(tool_calls, results)
+        ]
+
+    def clear_conversation(self) -> None:
+        """Clear the conversation history and any preloaded skills."""
+        self.claude.clear_conversation()
+        self._preloaded_skills.clear()
+        if self.session:
+            self.session.clear()
+
+    def fork(self, session_id: Optional[str] = None) -> "SDRAgent":
+        """Start a new conversation that continues from this one.
+
+        The child shares this conversation's messages as an immutable prefix
+        and appends only its own. Its requests mark the end of the prefix for
+        prompt caching, so forks of the same base pay for the prefix once.
+
+        Args:
+            session_id: The child's session; required when this agent's
+                conversation is kept in a session backend
+
+        Raises:
+            ValueError: If a shared session is forked without a session ID
+        """
+        if self.session and not session_id:
+            raise ValueError("Forking a shared session needs a session ID for the fork")
+        self.sync_session()
+
+        child = SDRAgent(self.settings)
+        # Digests in the prefix refer to results held in this agent's store
+        if self.result_store is not None:
+            child.result_store = child.claude.result_store = self.result_store
+            child.skill_executor.result_store = self.result_store
+        child.claude.load_fork(self.claude)
+        child._preloaded_skills = set(self._preloaded_skills)
+
+        if self.session and session_id:
+            backend = self.session.backend
+            state = backend.fork(self.session.session_id, session_id)
+            child.session = SessionSync(backend, session_id)
+            if state.length == len(child.claude.messages):
+                child.session.state = state
+            else:
+                child.sync_session()
+        return child
+
+    def attach_session(self, backend: SessionBackend, session_id: str) -> None:
+        """Keep this agent's conversation in a session backend shared with other workers."""
+        self.session = SessionSync(backend, session_id)
+        self.sync_session()
+
+    def sync_session(self) -> None:
+        """Load messages other workers added to the session since this agent last saw it."""
+        if not self.session:
+            return
+        known = len(self.claude.messages)
+        log = self.session.pull(self.claude.messages)
+        if log is not None:
+            self.claude.load_messages(log)
+            self.claude.cache_prefix = self.session.state.prefix
+            self._preloaded_skills.clear()
+            known = 0
+        # Skills inlined by another worker need not be inlined again
+        for message in self.claude.messages[known:]:
+            content = message["content"]
+            if message["role"] == "user" and isinstance(content, str):
+                match = PRELOADED_SKILL.match(content)
+                if match:
+                    self._preloaded_skills.add(match.group(1))
+
+    def save_session(self) -> None:
+        """Append the messages added by this turn to the session backend.
+
+        If another worker wrote to the session meanwhile, this turn's
+        messages are dropped and the session is reloaded.
+        """
+        if not self.session:
+            return
+        try:
+            # The log keeps tool results in full, whatever this worker has digested
+            self.session.push(self.claude.full_messages())
+        except SessionConflict:
+            self.console.print(
+                f"[yellow]Session {self.session.session_id} changed in another worker; "
+                "reloading it[/yellow]"
+            )
+            self.sync_session()
+
+    def history_state(self) -> SessionState:
+        """Version of the conversation's log; unchanged means no new messages."""
+        if self.session:
+            return self.session.backend.state(self.session.session_id)
+        return SessionState(epoch=self.claude.epoch, length=len(self.claude.messages))
+
+    def history_page(
+        self,
+        after: Optional[str] = None,
+        limit: int = 100,
+        state: Optional[SessionState] = None,
+    ) -> HistoryPage:
+        """A page of the conversation's displayable messages after the message ID ``after``.
+
+        Only messages added since the previous call are read and flattened.
+
+        Raises:
+            ValueError: If ``after`` is not a message ID
+        """
+        state = state or self.history_state()
+        if self.session:
+            # Read a shared session from the store: a turn may be running in this agent
+            backend, session_id = self.session.backend, self.session.session_id
+
+            def load(start: int) -> list[dict[str, Any]]:
+                return backend.load(session_id, start)[1]
+        else:
+            messages = self.claude.messages
+
+            def load(start: int) -> list[dict[str, Any]]:
+                return messages[start:state.length]
+
+        self.history.refresh(state.epoch, state.length, load)
+        return self.history.page(after, limit)
 
     def _handle_tool_calls(self, response: ClaudeResponse) -> list[dict[str, str]]:
         """Handle tool calls from the model response."""
-        results = []
-
         for tool_call in response.tool_calls:
             self.console.print(f"[dim]Executing tool: {tool_call.name}[/dim]")
-
-            if tool_call.name == "send_email":
-                result = self._handle_send_email(tool_call.input)
-            else:
-                result = self.skill_executor.execute_tool(tool_call.name, tool_call.input)
-
-            results.append(
-                {
-                    "tool_use_id": tool_call.id,
-                    "content": result,
-                }
-            )
-
-        return results
+        return self.run_tools(response.tool_calls)
 
     def _handle_send_email(self, tool_input: dict[str, Any]) -> str:
         """Handle the send_email tool call."""
@@ -128,20 +490,147 @@ class SDRAgent:
 
         return message
 
-    def chat(self, user_message: str) -> str:
-        """Process a user message and return the response."""
+    def chat(
+        self,
+        user_message: str,
+        skill: Optional[str] = None,
+        model: Optional[str] = None,
+    ) -> str:
+        """Process a user message and return the response.
+
+        Args:
+            user_message: The user's message
+            skill: Skill to preload instead of routing on the message
+            model: Model for every call in this turn, overriding the routing rules
+        """
         system_prompt = self._build_system_prompt()
+        message, _ = self.route_message(user_message, skill)
 
         # Get initial response
-        response = self.claude.chat(user_message, system_prompt)
+        response = self.claude.chat(message, system_prompt, model=model)
 
         # Handle tool calls in a loop
         while response.tool_calls:
             tool_results = self._handle_tool_calls(response)
-            response = self.claude.continue_with_tool_results(tool_results, system_prompt)
+            response = self.claude.continue_with_tool_results(
+                tool_results, system_prompt, model=model
+            )
 
         return response.content
 
+    def run_task(self, message: str, skill: Optional[str] = None) -> str:
+        """Run one self-contained task in a fresh conversation.
+
+        Unlike ``chat``, nothing from this agent's conversation is sent and
+        nothing is added to it: the task sees only ``message`` (plus the
+        named skill's instructions), which keeps pipeline stages small and
+        lets them run concurrently. Tools with side effects, such as
+        send_email, are never run from a task.
+        """
+        message, _ = self.task_prompt(message, skill)
+        claude = self.new_claude_client()
+        system_prompt = self._build_system_prompt()
+        response = claude.chat(message, system_prompt)
+        while response.tool_calls:
+            tool_results = self.run_task_tools(response.tool_calls)
+            response = claude.continue_with_tool_results(tool_results, system_prompt)
+
+        return response.content
+
+    def task_prompt(self, message: str, skill: Optional[str] = None) -> tuple[str, Optional[str]]:
+        """Inline a skill's instructions into the first message of a fresh conversation.
+
+        Returns:
+            Tuple of (message to send, name of the inlined skill or None)
+        """
+        if not skill:
+            return message, None
+        instructions = self.skill_loader.load_skill_instructions(skill)
+        if not instructions:
+            return message, None
+        return skill_preamble(skill, instructions) + message, skill
+
+    def run_task_tools(self, tool_calls: list[ToolCall]) -> list[dict[str, str]]:
+        """Execute one turn's tool calls for a self-contained task (see ``run_tools``)."""
+        results = self.tools.run(tool_calls, self._execute_task_tool)
+        return [
+            {"tool_use_id": call.id, "content": result}
+            for call, result in zip(tool_calls, results)
+        ]
+
+    def _execute_task_tool(self, name: str, tool_input: dict[str, Any]) -> str:
+        """Execute a tool for a self-contained task, which never runs side-effecting tools."""
+        tool = self.tools.get(name)
+        if tool is not None and not tool.policy.idempotent:
+            return (
+                f"Error: {name} is not available in a task. "
+                "Describe the action in your answer instead."
+            )
+        return self.tools.execute(name, tool_input)
+
+    def research_companies(
+        self,
+        companies: list[str],
+        backend: Optional[BatchBackend] = None,
+    ) -> list[BatchJob]:
+        """Research many companies as Message Batches jobs instead of one call each.
+
+        Every company is its own conversation; tool rounds are re-batched
+        until all reports are written. Reports are stored for lookalike search.
+
+        Args:
+            companies: Companies to research
+            backend: Batch backend (default: Message Batches API)
+
+        Returns:
+            One job per company, in order, with ``content`` or ``error`` set
+        """
+        instructions = self.skill_loader.load_skill_instructions("company-research")
+        preamble = skill_preamble("company-research", instructions) if instructions else ""
+
+        with request_context(Priority.BATCH, tenant="bulk-research"):
+            # Prefetch searches run at batch priority, several companies at a time
+            workers = max(1, min(self.settings.prefetch_companies, len(companies)))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                prompts = [
+                    pool.submit(contextvars.copy_context().run, self.build_research_prompt, company)
+                    for company in companies
+                ]
+                jobs = [
+                    BatchJob(id=company, prompt=preamble + prompt.result())
+                    for company, prompt in zip(companies, prompts)
+                ]
+
+            self.claude.run_batch(
+                jobs,
+                self._build_system_prompt(),
+                self._execute_task_tool,
+                backend=backend,
+                poll_interval=self.settings.batch_poll_interval,
+                max_rounds=self.settings.batch_max_rounds,
+            )
+
+        for job in jobs:
+            if job.content and not job.error:
+                self.store_research(job.id, None, job.content)
+        return jobs
+
+    def compose_emails(self, recipients: list[Recipient], context: str = "") -> ComposeResult:
+        """Draft an outreach email per recipient with a few batched model calls.
+
+        Args:
+            recipients: Recipients with their research digests
+            context: Context shared by every recipient (e.g. a company brief)
+        """
+        return compose_batch(
+            self.new_claude_client(),
+            recipients,
+            instructions=self.skill_loader.load_skill_instructions("email-composer") or "",
+            context=context,
+            chunk_size=self.settings.compose_chunk_size,
+            max_retries=self.settings.compose_max_retries,
+        )
+
     def interactive_chat(self) -> None:
         """Run an interactive chat session."""
         self.console.print(
@@ -149,7 +638,8 @@ class SDRAgent:
                 "[bold green]SDR Agent[/bold green]\n"
                 "AI-powered Sales Development Representative\n\n"
                 "Type your message and press Enter. Type 'quit' or 'exit' to end.\n"
-                "Type 'clear' to start a new conversation.",
+                "Type 'clear' to start a new conversation, 'fork' to branch it\n"
+                "and 'back' to return to the conversation a fork started from.",
                 title="Welcome",
             )
         )
@@ -162,6 +652,9 @@ class SDRAgent:
         else:
             self.console.print("[yellow]No skills loaded. Check your skills directory.[/yellow]\n")
 
+        # Conversations that forks were started from, innermost last
+        parents: list[tuple[ClaudeClient, set[str]]] = []
+
         while True:
             try:
                 user_input = self.console.input("[bold blue]You:[/bold blue] ").strip()
@@ -174,14 +667,41 @@ class SDRAgent:
                     break
 
                 if user_input.lower() == "clear":
-                    self.claude.clear_conversation()
+                    self.clear_conversation()
                     self.console.print("[dim]Conversation cleared.[/dim]\n")
                     continue
 
+                if user_input.lower() == "fork":
+                    parents.append((self.claude, set(self._preloaded_skills)))
+                    child = self.new_claude_client()
+                    child.load_fork(self.claude)
+                    self.claude = child
+                    self.console.print(
+                        f"[dim]Forked the conversation ({child.cache_prefix} shared messages). "
+                        "Type 'back' to return to it.[/dim]\n"
+                    )
+                    continue
+
+                if user_input.lower() == "back":
+                    if not parents:
+                        self.console.print("[yellow]This conversation is not a fork.[/yellow]\n")
+                    else:
+                        self.claude, self._preloaded_skills = parents.pop()
+                        self.console.print("[dim]Back to the parent conversation.[/dim]\n")
+                    continue
+
                 # Get response
+                saved_before = self.routing_stats.saved_round_trips
                 with self.console.status("[bold green]Thinking...[/bold green]"):
                     response = self.chat(user_input)
 
+                if self.routing_stats.saved_round_trips > saved_before:
+                    self.console.print(
+                        "[dim]Preloaded skill instructions "
+                        f"(round trips saved this session: {self.routing_stats.saved_round_trips})"
+                        "[/dim]"
+                    )
+
                 # Display response
                 self.console.print()
                 self.console.print("[bold green]Agent:[/bold green]")
@@ -193,35 +713,72 @@ class SDRAgent:
             except Exception as e:
                 self.console.print(f"[red]Error: {e}[/red]")
 
-    def research_company(self, company_name: str) -> str:
-        """Research a company and return a summary."""
-        prompt = f"""Research the company "{company_name}" thoroughly.
+    def build_research_prompt(
+        self,
+        company: Optional[str] = None,
+        prospect: Optional[str] = None,
+    ) -> str:
+        """Build the opening prompt for a company or prospect research request.
+
+        For company research the canonical queries are prefetched in parallel
+        and their compacted results are included, so the model can usually
+        write the report without further search turns.
+        """
+        if prospect:
+            company_context = f" at {company}" if company else ""
+            return PROSPECT_RESEARCH_PROMPT.format(
+                prospect=prospect, company_context=company_context
+            )
 
-Please find and summarize:
-1. Company overview (what they do, industry, size)
-2. Recent news and developments
-3. Key products or services
-4. Technology stack (if detectable)
-5. Key decision makers (C-suite, VP-level)
-6. Any recent funding or financial news
+        prompt = COMPANY_RESEARCH_PROMPT.format(company=company)
+        if not self.settings.research_prefetch:
+            return prompt
 
-Provide a comprehensive research report that would help an SDR prepare for outreach."""
+        prefetched = prefetch_company_research(
+            self.skill_executor.web_search,
+            company,
+            token_budget=self.settings.prefetch_token_budget,
+        )
+        if not prefetched:
+            return prompt
+        return f"{PREFETCH_PREAMBLE}{prefetched}\n\n{prompt}"
+
+    def store_research(
+        self,
+        company: Optional[str],
+        prospect: Optional[str],
+        report: str,
+    ) -> None:
+        """Keep a company research report for lookalike-account search."""
+        if self.research_store is None or prospect or not company or not report.strip():
+            return
+        self.research_store.add(company, report)
+
+    def _research(self, company: Optional[str], prospect: Optional[str]) -> str:
+        """Run research, sharing the result with concurrent identical requests.
+
+        The report is written in a self-contained task and recorded in this
+        conversation as a short exchange.
+        """
+
+        def run() -> str:
+            # A fresh conversation, so the shared report does not depend on (or
+            # reveal) the history of the session that happened to start it
+            prompt = self.build_research_prompt(company=company, prospect=prospect)
+            skill = "prospect-research" if prospect else "company-research"
+            report = self.run_task(prompt, skill=skill)
+            self.store_research(company, prospect, report)
+            return report
+
+        result, _ = research_flights.do(research_key(company, prospect), run)
+        # Keep this conversation coherent for follow-up questions
+        self.claude.record_exchange(research_summary(company, prospect), result)
+        return result
 
-        return self.chat(prompt)
+    def research_company(self, company_name: str) -> str:
+        """Research a company and return a summary."""
+        return self._research(company_name, None)
 
     def research_prospect(self, prospect_name: str, company: Optional[str] = None) -> str:
         """Research a prospect and return a summary."""
-        company_context = f" at {company}" if company else ""
-        prompt = f"""Research the prospect "{prospect_name}"{company_context} thoroughly.
-
-Please find and summarize:
-1. Current role and responsibilities
-2. Professional background and experience
-3. Education and certifications
-4. Recent public activity (posts, articles, speaking)
-5. Professional interests and focus areas
-6. Any personal details that could help personalize outreach
-
-Provide a comprehensive prospect profile that would help craft a personalized outreach message."""
-
-        return self.chat(prompt)
+        return self._research(company, prospect_name)
@@ -0,0 +1,224 @@
+"""Batch composition of personalized outreach emails.
+
+Instead of one conversational turn per recipient, recipients are packed into
+a few structured-output requests. The email-composer instructions are sent
+once per request as a cached system prompt, and the model returns every
+draft through a forced tool call. Each draft is validated on its own, and
+only the recipients whose drafts failed are retried.
+"""
+
+import contextvars
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Optional
+
+from pydantic import BaseModel, Field, ValidationError, field_validator
+
+from .text import truncate_to_tokens
+
+if TYPE_CHECKING:
+    from .llm.claude import ClaudeClient
+
+PLACEHOLDER = re.compile(r"\[[A-Z][^\]]{0,40}\]|\{\{.*?\}\}")
+
+COMPOSE_TOOL_NAME = "submit_emails"
+COMPOSE_TOOL_SCHEMA: dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "emails": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "string", "description": "The recipient's id"},
+                    "subject": {"type": "string", "description": "Subject line (3-7 words)"},
+                    "body": {"type": "string", "description": "Email body (50-125 words)"},
+                },
+                "required": ["id", "subject", "body"],
+            },
+        },
+    },
+    "required": ["emails"],
+}
+
+COMPOSE_SYSTEM_PROMPT = """\
+You write personalized cold outreach emails for a Sales Development
+Representative. Follow these guidelines:
+
+{instructions}
+
+Always return the emails through the {tool} tool, one per recipient, using
+each recipient's id. Never leave placeholders such as [Name] in an email."""
+
+COMPOSE_PROMPT = """\
+Write one personalized cold outreach email for each recipient below.
+{context}
+{recipients}"""
+
+
+class Recipient(BaseModel):
+    """Someone to write to and what we know about them."""
+
+    name: str
+    email: Optional[str] = None
+    company: Optional[str] = None
+    title: Optional[str] = None
+    notes: str = Field("", description="Research digest used to personalize the email")
+
+
+class EmailDraft(BaseModel):
+    """An outreach email draft for one prospect."""
+
+    prospect: str
+    subject: str
+    body: str
+    to_email: Optional[str] = None
+
+
+class ComposedEmail(BaseModel):
+    """One item of the model's structured output, validated on its own."""
+
+    id: str
+    subject: str
+    body: str
+
+    @field_validator("subject")
+    @classmethod
+    def check_subject(cls, value: str) -> str:
+        value = value.strip()
+        if not value or len(value.split()) > 12:
+            raise ValueError("subject must be 1-12 words")
+        return value
+
+    @field_validator("body")
+    @classmethod
+    def check_body(cls, value: str) -> str:
+        value = value.strip()
+        words = len(value.split())
+        if words < 20 or words > 250:
+            raise ValueError(f"body must be 20-250 words, got {words}")
+        if PLACEHOLDER.search(value):
+            raise ValueError("body contains an unfilled placeholder")
+        return value
+
+
+class ComposeResult(BaseModel):
+    """Drafts in recipient order, plus the recipients that could not be drafted."""
+
+    drafts: list[EmailDraft] = Field(default_factory=list)
+    # By position in the recipient list: names and emails need not be unique
+    failures: dict[int, str] = Field(default_factory=dict)
+    requests: int = 0
+
+
+def _recipient_block(item_id: str, recipient: Recipient, notes_tokens: int, error: str) -> str:
+    attributes = " ".join(
+        f'{key}="{value}"'
+        for key, value in (
+            ("id", item_id),
+            ("name", recipient.name),
+            ("title", recipient.title),
+            ("company", recipient.company),
+        )
+        if value
+    )
+    notes = truncate_to_tokens(recipient.notes, notes_tokens) if recipient.notes else ""
+    retry = f"\nYour previous draft was rejected: {error}. Fix this." if error else ""
+    return f"<recipient {attributes}>\n{notes}{retry}\n</recipient>"
+
+
+def compose_batch(
+    claude: "ClaudeClient",
+    recipients: list[Recipient],
+    instructions: str = "",
+    context: str = "",
+    chunk_size: int = 8,
+    max_retries: int = 2,
+    max_workers: int = 4,
+    notes_tokens: int = 300,
+) -> ComposeResult:
+    """Draft one email per recipient in a few structured-output requests.
+
+    Args:
+        claude: Client used for the requests (its conversation is not touched)
+        recipients: Recipients with their research digests
+        instructions: Email-writing guidelines (e.g. the email-composer skill)
+        context: Context shared by every recipient, sent once per request
+            (e.g. a company brief or the sender's offer)
+        chunk_size: Recipients per request
+        max_retries: Extra rounds for recipients whose drafts failed validation
+        max_workers: Chunks requested concurrently
+        notes_tokens: Token budget for each recipient's notes
+
+    Returns:
+        ComposeResult with drafts in recipient order
+    """
+    system_prompt = COMPOSE_SYSTEM_PROMPT.format(
+        instructions=instructions or "Keep emails short, specific and human.",
+        tool=COMPOSE_TOOL_NAME,
+    )
+    shared_context = f"\n<context>\n{context}\n</context>\n" if context else ""
+
+    drafts: dict[str, ComposedEmail] = {}
+    errors: dict[str, str] = {str(i): "" for i in range(len(recipients))}
+    result = ComposeResult()
+
+    def request(ids: list[str]) -> dict[str, Any]:
+        blocks = "\n\n".join(
+            _recipient_block(i, recipients[int(i)], notes_tokens, errors[i]) for i in ids
+        )
+        prompt = COMPOSE_PROMPT.format(context=shared_context, recipients=blocks)
+        return claude.generate_structured(
+            prompt,
+            system_prompt,
+            COMPOSE_TOOL_NAME,
+            COMPOSE_TOOL_SCHEMA,
+            description="Submit the drafted emails",
+        )
+
+    for _ in range(max_retries + 1):
+        pending = [i for i in errors if i not in drafts]
+        if not pending:
+            break
+        chunks = [pending[k:k + chunk_size] for k in range(0, len(pending), chunk_size)]
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = [
+                (chunk, pool.submit(contextvars.copy_context().run, request, chunk))
+                for chunk in chunks
+            ]
+            for chunk, future in futures:
+                result.requests += 1
+                try:
+                    output = future.result()
+                except Exception as e:
+                    for i in chunk:
+                        errors[i] = f"request failed: {e}"
+                    continue
+
+                returned = set()
+                for item in output.get("emails") or []:
+                    item_id = str(item.get("id", "")) if isinstance(item, dict) else ""
+                    if item_id not in chunk:
+                        continue
+                    returned.add(item_id)
+                    try:
+                        drafts[item_id] = ComposedEmail(**item)
+                    except ValidationError as e:
+                        errors[item_id] = "; ".join(err["msg"] for err in e.errors())
+                for i in set(chunk) - returned:
+                    errors[i] = "no email was returned for this recipient"
+
+    for i, recipient in enumerate(recipients):
+        draft = drafts.get(str(i))
+        if draft:
+            result.drafts.append(
+                EmailDraft(
+                    prospect=recipient.name,
+                    subject=draft.subject,
+                    body=draft.body,
+                    to_email=recipient.email,
+                )
+            )
+        else:
+            result.failures[i] = errors[str(i)]
+    return result
@@ -6,6 +6,8 @@ from typing import Optional
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from .turns import QueuePolicy
+
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
@@ -33,10 +35,163 @@ class Settings(BaseSettings):
     # Agent Configuration
     skills_dir: Path = Field(Path("./skills"), description="Directory containing skills")
     log_level: str = Field("INFO", description="Logging level")
+    skill_preloading: bool = Field(
+        True, description="Inline routed skill instructions to skip the read_skill round trip"
+    )
+    script_workers: int = Field(
+        2, description="Warm Python workers for skill scripts (0 runs each in a subprocess)"
+    )
+    script_timeout: float = Field(60.0, description="Skill script time limit in seconds")
+    script_memory_limit_mb: Optional[int] = Field(
+        512, description="Skill script address-space limit in MB"
+    )
+    tool_timeout: Optional[float] = Field(
+        120.0, description="Seconds before a slow tool call is reported to the model as timed out"
+    )
+    tool_cache_ttl: float = Field(
+        600.0, description="Seconds identical web searches and skill doc lookups are reused"
+    )
+    tool_max_parallel: int = Field(
+        4, description="Independent tool calls of one model turn executed at once"
+    )
+
+    scoring_model_path: Optional[Path] = Field(
+        None, description="YAML or JSON lead scoring model (default: lead-qualifier tables)"
+    )
+
+    # Conversation state shared by every web worker process (unset keeps it in memory)
+    session_backend: Optional[str] = Field(
+        None,
+        description='Session store shared by workers, kept across restarts: "sqlite" or "journal"',
+    )
+    session_db_path: Optional[Path] = Field(
+        None, description="SQLite session database (default: <data_dir>/sessions.db)"
+    )
+    session_journal_dir: Optional[Path] = Field(
+        None, description="Session journal directory (default: <data_dir>/journal)"
+    )
+    session_journal_compress: bool = Field(
+        False, description="zstd-compress session journal records (needs zstandard)"
+    )
+    session_journal_snapshot_every: int = Field(
+        512, description="Compact a session journal after this many messages (0: only on demand)"
+    )
+
+    # Web sessions run one turn at a time; later requests wait in a bounded queue
+    session_queue_size: int = Field(4, description="Requests allowed to wait per web session")
+    session_queue_policy: QueuePolicy = Field(
+        QueuePolicy.QUEUE,
+        description="Handling of requests for a busy session: queue, coalesce or reject",
+    )
+
+    # Prospecting pipeline
+    pipeline_workers: int = Field(4, description="Pipeline stages run concurrently")
+    pipeline_context_tokens: int = Field(
+        1200, description="Approximate token budget of each research digest passed between stages"
+    )
+
+    # Batch email composition
+    compose_chunk_size: int = Field(8, description="Recipients per batch compose request")
+    compose_max_retries: int = Field(
+        2, description="Retry rounds for recipients whose drafts failed validation"
+    )
+
+    # Message Batches for bulk, non-interactive work
+    batch_poll_interval: float = Field(30.0, description="Seconds between batch status checks")
+    batch_max_rounds: int = Field(8, description="Maximum model rounds per batched job")
+
+    # Local storage
+    data_dir: Path = Field(Path("./data"), description="Directory for stored research")
+    research_store: bool = Field(
+        True, description="Store company research reports for lookalike-account search"
+    )
+
+    # Large tool results are kept out of the conversation once the model has read them
+    tool_result_inline_tokens: int = Field(
+        300,
+        description=(
+            "Tool results above this size are replaced in the history by a digest "
+            "and a fetch_result handle (0 keeps them in full)"
+        ),
+    )
+    tool_result_cache_size: int = Field(256, description="Tool results kept in memory")
+    tool_result_dir: Optional[Path] = Field(
+        None, description="Also store tool results as files here (default: memory only)"
+    )
+
+    # Search Configuration
+    search_token_budget: int = Field(
+        1500, description="Approximate token budget for each web search result"
+    )
+    research_prefetch: bool = Field(
+        True, description="Prefetch the standard company research queries in parallel"
+    )
+    prefetch_token_budget: int = Field(
+        600, description="Approximate token budget for each prefetched research query"
+    )
+    prefetch_companies: int = Field(
+        4, description="Companies whose research queries are prefetched at once in bulk research"
+    )
 
     # Claude Model Configuration
     claude_model: str = Field("claude-sonnet-4-20250514", description="Claude model to use")
     max_tokens: int = Field(4096, description="Maximum tokens in response")
+    fast_model: Optional[str] = Field(
+        None,
+        description="Cheaper model for tool-orchestration turns (unset disables routing)",
+    )
+    fast_model_max_tokens: int = Field(
+        1024, description="Maximum tokens in a fast-model response"
+    )
+    fast_model_followup_max_tokens: int = Field(
+        256,
+        description=(
+            "Maximum tokens in a fast-model response after tool results; longer replies "
+            "are answers re-run on the primary model"
+        ),
+    )
+    route_first_turn: bool = Field(
+        False, description="Also try a request's opening turn on the fast model"
+    )
+
+    # Opt-in cache of responses to exact-repeat requests (replays, re-runs, retries)
+    response_cache: bool = Field(False, description="Serve exact-repeat requests from a cache")
+    response_cache_size: int = Field(512, description="Responses kept in memory")
+    response_cache_ttl: float = Field(
+        86400.0, description="Seconds a cached response stays valid (0 = never expires)"
+    )
+    response_cache_dir: Optional[Path] = Field(
+        None, description="Directory for the disk tier of the cache (default: memory only)"
+    )
+
+    # Rate limits shared by every session and batch worker in the process
+    anthropic_requests_per_minute: int = Field(
+        50, description="Messages API requests per minute (0 = unlimited)"
+    )
+    anthropic_tokens_per_minute: int = Field(
+        80000, description="Messages API tokens per minute (0 = unlimited)"
+    )
+    anthropic_max_in_flight: int = Field(8, description="Concurrent Messages API calls")
+    interactive_reserved_slots: int = Field(
+        1, description="In-flight API slots that batch and background work may not use"
+    )
+    tavily_requests_per_minute: int = Field(
+        100, description="Tavily searches per minute (0 = unlimited)"
+    )
+    tavily_max_in_flight: int = Field(6, description="Concurrent Tavily searches")
+    api_max_retries: int = Field(5, description="Retries for rate-limited or overloaded calls")
+
+    @property
+    def session_store_path(self) -> Path:
+        """Where the configured session backend keeps its data."""
+        if self.session_backend == "journal":
+            return self.session_journal_dir or self.data_dir / "journal"
+        return self.session_db_path or self.data_dir / "sessions.db"
+
+    @property
+    def chat_models(self) -> set[str]:
+        """Models a chat request may select for its turn."""
+        return {model for model in (self.claude_model, self.fast_model) if model}
 
     @property
     def email_configured(self) -> bool:
@@ -0,0 +1,171 @@
+"""Priority- and fairness-aware dispatch of API calls across sessions and jobs.
+
+Callers tag their work with a priority class and a tenant (usually the web
+session or batch job) through ``request_context``. When API capacity is
+contended, waiting calls are granted in priority order; within a class,
+tenants are served by start-time fair queuing so one busy session cannot
+starve the others. Some capacity is held back for interactive calls so a
+human's next request never queues behind a wall of long-running batch calls.
+"""
+
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import Enum
+from typing import Any, Iterator, Optional
+
+
+class Priority(str, Enum):
+    """Priority classes, from most to least urgent."""
+
+    INTERACTIVE = "interactive"
+    BATCH = "batch"
+    BACKGROUND = "background"
+
+
+PRIORITY_ORDER = {Priority.INTERACTIVE: 0, Priority.BATCH: 1, Priority.BACKGROUND: 2}
+
+_context: ContextVar[tuple[Priority, str]] = ContextVar(
+    "sdr_request_context", default=(Priority.INTERACTIVE, "default")
+)
+
+
+@contextmanager
+def request_context(priority: Priority = Priority.INTERACTIVE, tenant: str = "default"):
+    """Tag API calls made in this block with a priority class and tenant."""
+    token = _context.set((Priority(priority), tenant))
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def current_request_context() -> tuple[Priority, str]:
+    """The (priority, tenant) of the calling code."""
+    return _context.get()
+
+
+class _Waiter:
+    __slots__ = ("priority", "tenant", "start", "seq", "event", "enqueued")
+
+    def __init__(self, priority: Priority, tenant: str, start: float, seq: int):
+        self.priority = priority
+        self.tenant = tenant
+        self.start = start
+        self.seq = seq
+        self.event = threading.Event()
+        self.enqueued = time.monotonic()
+
+
+class FairDispatcher:
+    """Grant a fixed number of concurrent slots by priority, then fair share.
+
+    Args:
+        capacity: Maximum concurrently granted slots
+        reserved_interactive: Slots only interactive calls may use
+        weights: Optional per-tenant weights (default 1.0); a tenant with
+            weight 2 receives twice the share of a contended class
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        reserved_interactive: int = 1,
+        weights: Optional[dict[str, float]] = None,
+    ):
+        self.capacity = capacity
+        self.reserved_interactive = min(reserved_interactive, max(capacity - 1, 0))
+        self.weights = weights or {}
+
+        self._lock = threading.Lock()
+        self._waiting: list[_Waiter] = []
+        self._in_flight = 0
+        self._virtual_time = 0.0
+        self._finish: dict[str, float] = {}
+        self._seq = itertools.count()
+        self._waits: dict[Priority, deque] = {p: deque(maxlen=1000) for p in Priority}
+        self._granted: dict[Priority, int] = {p: 0 for p in Priority}
+
+    def _eligible(self, waiter: _Waiter) -> bool:
+        if waiter.priority == Priority.INTERACTIVE:
+            return self._in_flight < self.capacity
+        return self._in_flight < self.capacity - self.reserved_interactive
+
+    def _dispatch(self) -> None:
+        # Called with the lock held
+        while self._waiting:
+            eligible = [w for w in self._waiting if self._eligible(w)]
+            if not eligible:
+                return
+            best = min(eligible, key=lambda w: (PRIORITY_ORDER[w.priority], w.start, w.seq))
+            self._waiting.remove(best)
+            self._in_flight += 1
+            self._virtual_time = max(self._virtual_time, best.start)
+            self._granted[best.priority] += 1
+            self._waits[best.priority].append(time.monotonic() - best.enqueued)
+            best.event.set()
+
+        # Forget tenants that are no longer ahead of the virtual clock
+        if len(self._finish) > 1000:
+            self._finish = {t: f for t, f in self._finish.items() if f > self._virtual_time}
+
+    def acquire(
+        self,
+        priority: Optional[Priority] = None,
+        tenant: Optional[str] = None,
+        cost: float = 1.0,
+    ) -> None:
+        """Block until a slot is granted. Defaults come from ``request_context``."""
+        context_priority, context_tenant = current_request_context()
+        priority = Priority(priority or context_priority)
+        tenant = tenant or context_tenant
+
+        with self._lock:
+            start = max(self._virtual_time, self._finish.get(tenant, 0.0))
+            self._finish[tenant] = start + cost / self.weights.get(tenant, 1.0)
+            waiter = _Waiter(priority, tenant, start, next(self._seq))
+            self._waiting.append(waiter)
+            self._dispatch()
+        waiter.event.wait()
+
+    def release(self) -> None:
+        """Return a slot and hand it to the next eligible waiter."""
+        with self._lock:
+            self._in_flight -= 1
+            self._dispatch()
+
+    @contextmanager
+    def slot(
+        self,
+        priority: Optional[Priority] = None,
+        tenant: Optional[str] = None,
+    ) -> Iterator[None]:
+        """Hold a slot for the duration of the block."""
+        self.acquire(priority, tenant)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict[str, Any]:
+        """Queue depth and wait-time statistics per priority class."""
+        with self._lock:
+            classes = {}
+            for priority in Priority:
+                waits = sorted(self._waits[priority])
+                classes[priority.value] = {
+                    "queue_depth": sum(1 for w in self._waiting if w.priority == priority),
+                    "granted": self._granted[priority],
+                    "wait_avg_seconds": sum(waits) / len(waits) if waits else 0.0,
+                    "wait_p95_seconds": waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+                    "wait_max_seconds": waits[-1] if waits else 0.0,
+                }
+            return {
+                "capacity": self.capacity,
+                "in_flight": self._in_flight,
+                "queue_depth": len(self._waiting),
+                "classes": classes,
+            }
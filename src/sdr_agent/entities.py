@@ -0,0 +1,176 @@
+"""Company and prospect identity normalization for cache and dedup keys.
+
+"Acme", "Acme Inc.", "acme.com" and "ACME Corporation" all name the same
+account. ``normalize_company`` reduces each of them to the same key, and
+``EntityIndex`` maps every alias it has seen to one canonical ID so research,
+caches and single-flight dedup agree on what counts as the same target.
+"""
+
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlsplit
+
+from pydantic import BaseModel, Field
+
+LEGAL_SUFFIXES = frozenset(
+    "inc incorporated corp corporation co company llc l l c ltd limited plc gmbh "
+    "ag sa sas sarl bv nv oy ab as asa pty pvt srl spa kk lp llp pllc pc".split()
+)
+SECOND_LEVEL_DOMAINS = frozenset("co com org net ac gov edu ne or".split())
+HONORIFICS = frozenset("mr mrs ms miss mx dr prof sir".split())
+NAME_SUFFIXES = frozenset("jr sr ii iii iv phd md mba cpa esq".split())
+
+DOMAIN_PATTERN = re.compile(
+    r"^(?:[a-z][a-z0-9+.-]*://)?"  # optional scheme
+    r"(?:[^@/\s]+@)?"  # optional email local part
+    r"(?:[a-z0-9-]+\.)+[a-z]{2,}"  # host
+    r"(?:/\S*)?$"  # optional path
+)
+NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def domain_label(value: str) -> Optional[str]:
+    """Return the organization label of a URL, email or bare domain, else None.
+
+    ``https://www.acme.com/about`` -> ``acme``; ``jane@acme.co.uk`` -> ``acme``.
+    """
+    value = value.strip().lower()
+    if not DOMAIN_PATTERN.match(value):
+        return None
+    if "://" not in value:
+        value = "//" + value
+    host = urlsplit(value).hostname or ""
+    labels = [label for label in host.split(".") if label]
+    if len(labels) < 2:
+        return None
+    labels.pop()  # top-level domain
+    if len(labels) >= 2 and labels[-1] in SECOND_LEVEL_DOMAINS:
+        labels.pop()
+    return labels[-1]
+
+
+def normalize_company(name: str) -> str:
+    """Normalize a company name, URL or domain to a comparison key."""
+    label = domain_label(name)
+    if label:
+        return label
+
+    words = NON_WORD.sub(" ", name.lower().replace("&", " and ")).split()
+    if words and words[0] == "the":
+        words = words[1:]
+    while len(words) > 1 and words[-1] in LEGAL_SUFFIXES:
+        words.pop()
+    return " ".join(words) or " ".join(name.lower().split())
+
+
+def normalize_person(name: str) -> str:
+    """Normalize a person's name ("Smith, Dr. John Jr." -> "john smith")."""
+    if "," in name:
+        last, _, first = name.partition(",")
+        if first.strip() and first.strip().split()[0].rstrip(".").lower() not in NAME_SUFFIXES:
+            name = f"{first} {last}"
+    words = NON_WORD.sub(" ", name.lower()).split()
+    words = [w for w in words if w not in HONORIFICS and w not in NAME_SUFFIXES]
+    return " ".join(words)
+
+
+class Entity(BaseModel):
+    """A canonical company or person with every alias seen for it."""
+
+    id: str
+    kind: str
+    name: str
+    aliases: list[str] = Field(default_factory=list)
+
+
+class EntityIndex:
+    """Hash-map alias index from normalized names to canonical entity IDs.
+
+    Args:
+        path: Optional JSON file the index is loaded from and saved to
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else None
+        self._entities: dict[str, Entity] = {}
+        self._aliases: dict[str, str] = {}
+        self._lock = threading.Lock()
+        if self.path and self.path.exists():
+            self.load()
+
+    def _register(self, kind: str, key: str, name: str) -> str:
+        alias = f"{kind}:{key}"
+        entity_id = self._aliases.get(alias)
+        if entity_id is None:
+            entity_id = alias
+            self._aliases[alias] = entity_id
+            self._entities[entity_id] = Entity(id=entity_id, kind=kind, name=name.strip())
+        entity = self._entities[entity_id]
+        if name.strip() and name.strip() not in entity.aliases:
+            entity.aliases.append(name.strip())
+        return entity_id
+
+    def company_id(self, name: str) -> str:
+        """Resolve a company name, URL or domain to its canonical ID."""
+        with self._lock:
+            return self._register("company", normalize_company(name), name)
+
+    def person_id(self, name: str, company: Optional[str] = None) -> str:
+        """Resolve a person, scoped to their company when known."""
+        key = normalize_person(name)
+        if company:
+            key = f"{key}@{self.company_id(company)}"
+        with self._lock:
+            return self._register("person", key, name)
+
+    def add_alias(self, alias: str, canonical: str) -> str:
+        """Make a company alias resolve to the same entity as ``canonical``.
+
+        Useful for names that do not normalize together, such as a brand and
+        its legal entity ("Google" and "Alphabet").
+        """
+        entity_id = self.company_id(canonical)
+        with self._lock:
+            self._aliases[f"company:{normalize_company(alias)}"] = entity_id
+            if alias not in self._entities[entity_id].aliases:
+                self._entities[entity_id].aliases.append(alias)
+        return entity_id
+
+    def get(self, entity_id: str) -> Optional[Entity]:
+        """Get an entity by canonical ID."""
+        return self._entities.get(entity_id)
+
+    def load(self) -> None:
+        """Load entities and aliases from ``path``."""
+        data = json.loads(self.path.read_text())
+        with self._lock:
+            self._entities = {e["id"]: Entity(**e) for e in data.get("entities", [])}
+            self._aliases = dict(data.get("aliases", {}))
+
+    def save(self) -> None:
+        """Write entities and aliases to ``path``."""
+        if not self.path:
+            return
+        with self._lock:
+            data = {
+                "entities": [e.model_dump() for e in self._entities.values()],
+                "aliases": self._aliases,
+            }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(data, indent=2))
+
+
+_index: Optional[EntityIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_entity_index() -> EntityIndex:
+    """Get the process-wide entity index."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = EntityIndex()
+        return _index
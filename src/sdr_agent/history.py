@@ -0,0 +1,141 @@
+"""Paginated, incrementally built views of a conversation for display.
+
+The model's message log mixes text with tool calls and tool results; the
+web UI shows only the text. ``ConversationHistory`` flattens each message
+once, as it is appended, and serves pages of the result by cursor.
+
+Message IDs are ``"<epoch>.<index>"``: the conversation's epoch (changed
+when it is cleared) and the message's position in the log. The log is
+append-only within an epoch, so an ID always names the same message and a
+client that passes its last ID as ``after`` gets only newer messages.
+"""
+
+import bisect
+import threading
+from typing import Any, Callable, Optional
+
+from pydantic import BaseModel, Field
+
+
+class HistoryMessage(BaseModel):
+    """A displayable message."""
+
+    id: str
+    role: str
+    content: str
+
+
+class HistoryPage(BaseModel):
+    """One page of a conversation's displayable messages."""
+
+    messages: list[HistoryMessage] = Field(default_factory=list)
+    next_cursor: Optional[str] = Field(
+        None, description="Pass as `after` to get the next page or poll for new messages"
+    )
+    has_more: bool = False
+    reset: bool = Field(
+        False, description="The cursor is from a cleared conversation; discard earlier messages"
+    )
+
+
+def message_id(epoch: int, index: int) -> str:
+    """Stable ID of the message at ``index`` in epoch ``epoch``."""
+    return f"{epoch}.{index}"
+
+
+def parse_message_id(value: str) -> tuple[int, int]:
+    """Split a message ID into its epoch and index.
+
+    Raises:
+        ValueError: If the value is not a message ID
+    """
+    epoch, _, index = value.partition(".")
+    if not epoch.isdigit() or not index.isdigit():
+        raise ValueError(f"Invalid message ID: {value}")
+    return int(epoch), int(index)
+
+
+def message_text(message: dict[str, Any]) -> Optional[str]:
+    """The displayable text of a message, or None if it has none (e.g. tool results)."""
+    content = message.get("content", "")
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        text_parts = [
+            block.get("text", "")
+            for block in content
+            if isinstance(block, dict) and block.get("type") == "text"
+        ]
+        if text_parts:
+            return "".join(text_parts)
+    return None
+
+
+class ConversationHistory:
+    """Displayable messages of one conversation, extended as its log grows."""
+
+    def __init__(self) -> None:
+        self._epoch: Optional[int] = None
+        self._length = 0
+        self._messages: list[HistoryMessage] = []
+        self._indexes: list[int] = []
+        self._lock = threading.Lock()
+
+    def refresh(
+        self,
+        epoch: int,
+        length: int,
+        load: Callable[[int], list[dict[str, Any]]],
+    ) -> None:
+        """Catch up with a log at ``epoch`` and ``length``.
+
+        Args:
+            epoch: The log's current epoch
+            length: The log's current number of messages
+            load: Returns the log's messages from a start index on; only
+                called for messages not seen yet
+        """
+        with self._lock:
+            if epoch != self._epoch or length < self._length:
+                self._epoch, self._length = epoch, 0
+                self._messages, self._indexes = [], []
+            if length <= self._length:
+                return
+            for index, message in enumerate(load(self._length), start=self._length):
+                text = message_text(message)
+                if text is not None:
+                    self._messages.append(
+                        HistoryMessage(
+                            id=message_id(epoch, index),
+                            role=message.get("role", ""),
+                            content=text,
+                        )
+                    )
+                    self._indexes.append(index)
+                self._length = index + 1
+
+    def page(self, after: Optional[str] = None, limit: int = 100) -> HistoryPage:
+        """Up to ``limit`` messages following the message ID ``after``.
+
+        Raises:
+            ValueError: If ``after`` is not a message ID
+        """
+        start, reset = 0, False
+        with self._lock:
+            if after:
+                epoch, index = parse_message_id(after)
+                # A cursor past the end comes from a conversation this process never had
+                if epoch == self._epoch and index < self._length:
+                    start = bisect.bisect_right(self._indexes, index)
+                else:
+                    reset = True
+            messages = self._messages[start:start + limit]
+            has_more = start + limit < len(self._messages)
+
+        if messages:
+            next_cursor = messages[-1].id
+        else:
+            next_cursor = None if reset else after
+        return HistoryPage(
+            messages=messages, next_cursor=next_cursor, has_more=has_more, reset=reset
+        )
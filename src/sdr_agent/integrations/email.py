@@ -5,6 +5,8 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from typing import Optional
 
+from ..metrics import EMAILS
+
 
 class EmailClient:
     """SMTP email client for sending outreach emails."""
@@ -45,6 +47,18 @@ class EmailClient:
         Returns:
             Tuple of (success: bool, message: str)
         """
+        sent, message = self._send(to_email, subject, body, to_name, html_body)
+        EMAILS.inc(outcome="sent" if sent else "failed")
+        return sent, message
+
+    def _send(
+        self,
+        to_email: str,
+        subject: str,
+        body: str,
+        to_name: Optional[str],
+        html_body: Optional[str],
+    ) -> tuple[bool, str]:
         try:
             # Create message
             msg = MIMEMultipart("alternative")
@@ -0,0 +1,475 @@
+"""Append-only conversation journals: durable sessions with O(1) writes per turn.
+
+Each session is one file of length-prefixed records. A turn appends one
+record per new message, so saving never rewrites earlier messages::
+
+    magic | record | record | ...
+    record = uint32 length | uint8 kind | uint32 crc32 | payload
+
+Payloads are JSON, zstd-compressed when that makes them smaller (needs the
+``zstandard`` package). Record kinds:
+
+- ``HEADER``: the session ID and a generation ID unique to the file, first
+  in every file
+- ``MESSAGE``: one conversation message
+- ``CLEAR``: the conversation was cleared; starts a new epoch
+- ``SNAPSHOT``: the whole conversation at that point (written by forks and
+  compaction); replay starts from the last snapshot or clear
+
+A crash can only leave a torn record at the end of the file; readers stop
+at the first record whose length or checksum does not match, and the next
+write truncates it. Reads go through ``JournalReader``, which maps the file
+and only decodes the records it is asked for.
+
+``JournalSessionBackend`` keeps an index of record offsets per session, so
+a worker catching up reads only the records appended since it last looked.
+Compaction rewrites a journal as a single snapshot; it runs automatically
+every ``snapshot_every`` messages and for every journal with
+``sdr-agent compact-sessions``.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import uuid
+import zlib
+from contextlib import contextmanager
+from enum import IntEnum
+from pathlib import Path
+from typing import Any, Iterator, NamedTuple, Optional
+
+from pydantic import BaseModel
+
+from .sessions import SessionConflict, SessionState
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+try:
+    import zstandard
+except ImportError:  # optional: journals are written uncompressed without it
+    zstandard = None
+
+MAGIC = b"SDRJRNL1"
+RECORD_HEADER = struct.Struct("<IBI")
+COMPRESSED = 0x80
+# Payloads below this size are never worth compressing
+COMPRESS_MIN_BYTES = 256
+
+
+class RecordKind(IntEnum):
+    """Type of a journal record."""
+
+    HEADER = 1
+    MESSAGE = 2
+    CLEAR = 3
+    SNAPSHOT = 4
+
+
+class JournalRecord(NamedTuple):
+    """Location of one record in a journal."""
+
+    offset: int
+    kind: RecordKind
+    compressed: bool
+    start: int
+    end: int
+
+
+class CompactionResult(BaseModel):
+    """Size of one journal before and after compaction."""
+
+    session_id: str
+    messages: int
+    bytes_before: int
+    bytes_after: int
+
+
+def encode_record(kind: RecordKind, data: bytes, compress: bool = False) -> bytes:
+    """A record for a payload, compressed if that makes it smaller."""
+    flags = 0
+    if compress and len(data) >= COMPRESS_MIN_BYTES:
+        packed = zstandard.ZstdCompressor(level=3).compress(data)
+        if len(packed) < len(data):
+            data, flags = packed, COMPRESSED
+    return RECORD_HEADER.pack(len(data), kind | flags, zlib.crc32(data)) + data
+
+
+def encode_header(session_id: str) -> tuple[bytes, str]:
+    """A new journal's header record and the generation ID written in it."""
+    generation = uuid.uuid4().hex
+    header = json.dumps({"session_id": session_id, "generation": generation}).encode()
+    return encode_record(RecordKind.HEADER, header), generation
+
+
+def encode_snapshot(epoch: int, prefix: int, messages: list[dict[str, Any]]) -> bytes:
+    # The metadata line can be read without parsing the messages
+    meta = json.dumps({"epoch": epoch, "prefix": prefix, "count": len(messages)})
+    return f"{meta}\n{json.dumps(messages)}".encode()
+
+
+class JournalReader:
+    """Memory-mapped, read-only view of a journal file.
+
+    Args:
+        path: Journal file
+    """
+
+    def __init__(self, path: Path):
+        self._file = open(path, "rb")
+        stat = os.fstat(self._file.fileno())
+        self.inode = (stat.st_dev, stat.st_ino)
+        self.size = stat.st_size
+        self._map = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+        )
+        self._view = memoryview(self._map) if self._map is not None else memoryview(b"")
+
+    def __enter__(self) -> "JournalReader":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._view.release()
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def valid(self) -> bool:
+        """Whether the file starts like a journal."""
+        return bytes(self._view[: len(MAGIC)]) == MAGIC
+
+    def records(self, offset: int = len(MAGIC)) -> Iterator[JournalRecord]:
+        """Records from ``offset`` to the end of the last complete, intact record."""
+        header_size = RECORD_HEADER.size
+        while offset + header_size <= self.size:
+            length, kind, crc = RECORD_HEADER.unpack_from(self._view, offset)
+            start, end = offset + header_size, offset + header_size + length
+            if end > self.size or zlib.crc32(self._view[start:end]) != crc:
+                return
+            try:
+                record_kind = RecordKind(kind & ~COMPRESSED)
+            except ValueError:
+                return
+            yield JournalRecord(offset, record_kind, bool(kind & COMPRESSED), start, end)
+            offset = end
+
+    def generation(self) -> str:
+        """ID of this version of the journal, which changes whenever the file is rewritten.
+
+        Taken from the header; journals written without one fall back to
+        the file's device and inode.
+        """
+        header = next(self.records(), None)
+        if header is not None and header.kind == RecordKind.HEADER:
+            generation = self.json(header).get("generation")
+            if generation:
+                return generation
+        return "inode:{}:{}".format(*self.inode)
+
+    def payload(self, record: JournalRecord) -> bytes:
+        """A record's payload, decompressed.
+
+        Raises:
+            RuntimeError: If the record is compressed and zstandard is not installed
+        """
+        data = self._view[record.start:record.end]
+        if not record.compressed:
+            return bytes(data)
+        if zstandard is None:
+            raise RuntimeError("This journal is zstd-compressed; install zstandard to read it")
+        return zstandard.ZstdDecompressor().decompress(data)
+
+    def json(self, record: JournalRecord) -> Any:
+        return json.loads(self.payload(record))
+
+    def snapshot_meta(self, record: JournalRecord) -> dict[str, int]:
+        meta, _, _ = self.payload(record).partition(b"\n")
+        return json.loads(meta)
+
+    def snapshot_messages(self, record: JournalRecord) -> list[dict[str, Any]]:
+        _, _, messages = self.payload(record).partition(b"\n")
+        return json.loads(messages)
+
+
+class _Index:
+    """Where one session's current messages are in its journal."""
+
+    def __init__(self) -> None:
+        self.generation: Optional[str] = None
+        self.offset = 0  # end of the last intact record
+        self.epoch = 0
+        self.prefix = 0
+        # Per message: (record offset, position in a snapshot record or -1)
+        self.entries: list[tuple[int, int]] = []
+        self.since_snapshot = 0
+
+    @property
+    def state(self) -> SessionState:
+        return SessionState(epoch=self.epoch, length=len(self.entries), prefix=self.prefix)
+
+    def reset(self, epoch: int, prefix: int = 0) -> None:
+        self.epoch, self.prefix = epoch, prefix
+        self.entries = []
+        self.since_snapshot = 0
+
+    def apply(self, reader: JournalReader, record: JournalRecord) -> None:
+        if record.kind == RecordKind.MESSAGE:
+            self.entries.append((record.offset, -1))
+            self.since_snapshot += 1
+        elif record.kind == RecordKind.CLEAR:
+            self.reset(reader.json(record)["epoch"])
+        elif record.kind == RecordKind.SNAPSHOT:
+            meta = reader.snapshot_meta(record)
+            self.reset(meta["epoch"], meta["prefix"])
+            self.entries = [(record.offset, i) for i in range(meta["count"])]
+        self.offset = record.end
+
+
+class JournalSessionBackend:
+    """Session backend that keeps each session in an append-only journal file.
+
+    Safe across worker processes on one host: writers take a lock on the
+    directory, and readers only ever see complete records.
+
+    Args:
+        directory: Where the journals are kept (created if missing)
+        compress: zstd-compress records (needs the zstandard package)
+        snapshot_every: Compact a journal after this many appended
+            messages (0 never compacts automatically)
+        fsync: Flush each write to disk before returning, surviving power
+            loss rather than only process crashes
+
+    Raises:
+        ValueError: If compression is requested without zstandard installed
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        compress: bool = False,
+        snapshot_every: int = 512,
+        fsync: bool = False,
+    ):
+        if compress and zstandard is None:
+            raise ValueError("Compressed session journals need the zstandard package")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.compress = compress
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self._indexes: dict[str, _Index] = {}
+        self._lock = threading.RLock()
+
+    def path(self, session_id: str) -> Path:
+        """The journal file of a session."""
+        name = hashlib.sha256(session_id.encode()).hexdigest()[:32]
+        return self.directory / f"{name}.journal"
+
+    @contextmanager
+    def _exclusive(self) -> Iterator[None]:
+        with self._lock, open(self.directory / ".lock", "a+b") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    @contextmanager
+    def _reading(self, session_id: str) -> Iterator[tuple[_Index, Optional[JournalReader]]]:
+        """A session's index, brought up to date, and a reader of the same file version.
+
+        Only records appended since the index was last updated are read. The
+        reader keeps the indexed file open even if compaction replaces it.
+        """
+        with self._lock:
+            index = self._indexes.setdefault(session_id, _Index())
+            path = self.path(session_id)
+            if not path.exists() or path.stat().st_size < len(MAGIC):
+                index.__init__()
+                yield index, None
+                return
+            with JournalReader(path) as reader:
+                if not reader.valid():
+                    raise ValueError(f"Not a session journal: {path}")
+                generation = reader.generation()
+                if generation != index.generation or reader.size < index.offset:
+                    # New or rewritten (compacted) file: index it from the start
+                    index.__init__()
+                    index.generation = generation
+                    index.offset = len(MAGIC)
+                for record in reader.records(index.offset):
+                    index.apply(reader, record)
+                yield index, reader
+
+    def _messages(
+        self,
+        reader: Optional[JournalReader],
+        index: _Index,
+        start: int,
+    ) -> list[dict[str, Any]]:
+        entries = index.entries[start:]
+        if reader is None or not entries:
+            return []
+        messages = []
+        snapshots: dict[int, list[dict[str, Any]]] = {}
+        for offset, position in entries:
+            if position < 0:
+                messages.append(reader.json(next(reader.records(offset))))
+                continue
+            if offset not in snapshots:
+                snapshots[offset] = reader.snapshot_messages(next(reader.records(offset)))
+            messages.append(snapshots[offset][position])
+        return messages
+
+    def _append_records(
+        self,
+        session_id: str,
+        index: _Index,
+        records: list[tuple[RecordKind, bytes]],
+    ) -> list[int]:
+        """Write records after the index's last intact record (dropping any torn tail).
+
+        Returns:
+            The offset of each record written
+        """
+        path = self.path(session_id)
+        new_file = index.generation is None
+        offsets = []
+        with open(path, "wb" if new_file else "r+b") as f:
+            if new_file:
+                header, index.generation = encode_header(session_id)
+                f.write(MAGIC + header)
+                index.offset = f.tell()
+            else:
+                f.seek(index.offset)
+                f.truncate()
+            offset = index.offset
+            for kind, data in records:
+                record = encode_record(kind, data, self.compress)
+                f.write(record)
+                offsets.append(offset)
+                offset += len(record)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        index.offset = offset
+        return offsets
+
+    def _rewrite(
+        self,
+        session_id: str,
+        index: _Index,
+        messages: list[dict[str, Any]],
+    ) -> None:
+        """Replace a session's journal with a single snapshot of ``messages``."""
+        path = self.path(session_id)
+        temp = path.with_suffix(".tmp")
+        header, generation = encode_header(session_id)
+        snapshot = encode_record(
+            RecordKind.SNAPSHOT,
+            encode_snapshot(index.epoch, index.prefix, messages),
+            self.compress,
+        )
+        with open(temp, "wb") as f:
+            f.write(MAGIC + header)
+            offset = f.tell()
+            f.write(snapshot)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(temp, path)
+        index.generation, index.offset = generation, offset + len(snapshot)
+        index.entries = [(offset, i) for i in range(len(messages))]
+        index.since_snapshot = 0
+
+    def state(self, session_id: str) -> SessionState:
+        with self._reading(session_id) as (index, _):
+            return index.state
+
+    def load(self, session_id: str, start: int = 0) -> tuple[SessionState, list[dict[str, Any]]]:
+        with self._reading(session_id) as (index, reader):
+            return index.state, self._messages(reader, index, start)
+
+    def append(
+        self,
+        session_id: str,
+        messages: list[dict[str, Any]],
+        expected: SessionState,
+    ) -> SessionState:
+        with self._exclusive(), self._reading(session_id) as (index, reader):
+            if index.state != expected:
+                raise SessionConflict(f"Session {session_id} changed since it was loaded")
+            offsets = self._append_records(
+                session_id,
+                index,
+                [(RecordKind.MESSAGE, json.dumps(message).encode()) for message in messages],
+            )
+            index.entries.extend((offset, -1) for offset in offsets)
+            index.since_snapshot += len(offsets)
+            state = index.state
+        if self.snapshot_every and index.since_snapshot >= self.snapshot_every:
+            self.compact(session_id)
+        return state
+
+    def clear(self, session_id: str) -> SessionState:
+        with self._exclusive(), self._reading(session_id) as (index, _):
+            epoch = index.epoch + 1
+            self._append_records(
+                session_id, index, [(RecordKind.CLEAR, json.dumps({"epoch": epoch}).encode())]
+            )
+            index.reset(epoch)
+            return index.state
+
+    def fork(self, parent_id: str, session_id: str) -> SessionState:
+        """Start a new epoch of ``session_id`` from a copy of the parent's messages.
+
+        Journals do not refer to each other, so the prefix is written into
+        the fork's journal once, as a snapshot record.
+        """
+        if parent_id == session_id:
+            raise ValueError("A session cannot be forked from itself")
+        with self._exclusive():
+            messages = self.load(parent_id)[1]
+            with self._reading(session_id) as (index, _):
+                epoch = index.epoch + 1
+                snapshot = encode_snapshot(epoch, len(messages), messages)
+                offset = self._append_records(
+                    session_id, index, [(RecordKind.SNAPSHOT, snapshot)]
+                )[0]
+                index.reset(epoch, len(messages))
+                index.entries = [(offset, i) for i in range(len(messages))]
+                return index.state
+
+    def compact(self, session_id: str) -> CompactionResult:
+        """Rewrite a session's journal as one snapshot of its current messages."""
+        path = self.path(session_id)
+        with self._exclusive(), self._reading(session_id) as (index, reader):
+            before = reader.size if reader else 0
+            if reader is not None:
+                self._rewrite(session_id, index, self._messages(reader, index, 0))
+            return CompactionResult(
+                session_id=session_id,
+                messages=len(index.entries),
+                bytes_before=before,
+                bytes_after=path.stat().st_size if reader else 0,
+            )
+
+    def session_ids(self) -> list[str]:
+        """Sessions with a journal in the directory."""
+        session_ids = []
+        for path in sorted(self.directory.glob("*.journal")):
+            with JournalReader(path) as reader:
+                header = next(reader.records(), None) if reader.valid() else None
+                if header is not None and header.kind == RecordKind.HEADER:
+                    session_ids.append(reader.json(header)["session_id"])
+        return session_ids
+
+    def compact_all(self) -> list[CompactionResult]:
+        """Compact every journal in the directory."""
+        return [self.compact(session_id) for session_id in self.session_ids()]
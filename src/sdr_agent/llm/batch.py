@@ -0,0 +1,308 @@
+"""Message Batches execution for non-interactive bulk workloads.
+
+Independent jobs (e.g. researching 200 companies) are submitted together as
+one batch instead of one synchronous ``messages.create`` call each. Jobs that
+answer with tool calls have their tools executed locally and are re-batched
+with the results in the next round, until every job has a final answer.
+
+``AnthropicBatchBackend`` uses the Message Batches API; ``LocalBatchBackend``
+runs the same requests through any ``messages.create``-style callable, which
+makes it a stand-in for tests and for environments without batch access.
+"""
+
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Optional, Protocol
+
+import anthropic
+from pydantic import BaseModel, Field
+
+from ..tools import ToolRegistry
+
+if TYPE_CHECKING:
+    from .claude import ClaudeClient
+
+
+class BatchResult(BaseModel):
+    """Outcome of one request in a batch."""
+
+    custom_id: str
+    message: Any = None
+    error: Optional[str] = None
+    cached: bool = False
+
+
+class BatchBackend(Protocol):
+    """Submits batches of Messages API requests and collects their results."""
+
+    def submit(self, requests: list[dict[str, Any]]) -> str:
+        """Submit ``{"custom_id", "params"}`` requests and return a batch ID."""
+        ...
+
+    def is_done(self, batch_id: str) -> bool:
+        """Whether every request in the batch has finished."""
+        ...
+
+    def results(self, batch_id: str) -> list[BatchResult]:
+        """Results of a finished batch."""
+        ...
+
+
+class AnthropicBatchBackend:
+    """Message Batches API backend."""
+
+    def __init__(self, client: anthropic.Anthropic):
+        self.client = client
+
+    def submit(self, requests: list[dict[str, Any]]) -> str:
+        return self.client.messages.batches.create(requests=requests).id
+
+    def is_done(self, batch_id: str) -> bool:
+        batch = self.client.messages.batches.retrieve(batch_id)
+        return batch.processing_status == "ended"
+
+    def results(self, batch_id: str) -> list[BatchResult]:
+        results = []
+        for entry in self.client.messages.batches.results(batch_id):
+            if entry.result.type == "succeeded":
+                results.append(BatchResult(custom_id=entry.custom_id, message=entry.result.message))
+            elif entry.result.type == "errored":
+                error = entry.result.error.error
+                results.append(
+                    BatchResult(custom_id=entry.custom_id, error=f"{error.type}: {error.message}")
+                )
+            else:
+                results.append(BatchResult(custom_id=entry.custom_id, error=entry.result.type))
+        return results
+
+
+class LocalBatchBackend:
+    """Runs each batched request through a ``messages.create``-style callable.
+
+    Args:
+        create: Called with each request's params; returns a Message
+        max_workers: Requests run concurrently while a batch is submitted
+    """
+
+    def __init__(self, create: Callable[..., Any], max_workers: int = 4):
+        self.create = create
+        self.max_workers = max_workers
+        self._batches: dict[str, list[BatchResult]] = {}
+
+    def _run(self, request: dict[str, Any]) -> BatchResult:
+        try:
+            message = self.create(**request["params"])
+        except Exception as e:
+            return BatchResult(custom_id=request["custom_id"], error=str(e))
+        return BatchResult(custom_id=request["custom_id"], message=message)
+
+    def submit(self, requests: list[dict[str, Any]]) -> str:
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            results = list(
+                pool.map(lambda r: contextvars.copy_context().run(self._run, r), requests)
+            )
+        batch_id = f"local_batch_{len(self._batches) + 1}"
+        self._batches[batch_id] = results
+        return batch_id
+
+    def is_done(self, batch_id: str) -> bool:
+        return True
+
+    def results(self, batch_id: str) -> list[BatchResult]:
+        return self._batches.pop(batch_id)
+
+
+class BatchJob(BaseModel):
+    """One independent conversation run through the batch backend."""
+
+    id: str
+    prompt: str
+    messages: list[dict[str, Any]] = Field(default_factory=list)
+    content: str = ""
+    error: Optional[str] = None
+    rounds: int = 0
+    done: bool = False
+    escalate: bool = False
+
+
+class BatchRunner:
+    """Drive many independent tool-using conversations through batches.
+
+    Args:
+        claude: Client providing the model, tools and response parsing
+        backend: Batch backend to submit rounds to
+        execute_tool: Runs a tool call locally and returns its result
+        poll_interval: Seconds between batch status checks
+        max_rounds: Maximum model rounds per job (tool loops included)
+        max_errors: Failed requests tolerated per job before giving up
+        tool_workers: Tool calls executed concurrently between rounds
+    """
+
+    def __init__(
+        self,
+        claude: "ClaudeClient",
+        backend: BatchBackend,
+        execute_tool: Callable[[str, dict[str, Any]], str],
+        poll_interval: float = 30.0,
+        max_rounds: int = 8,
+        max_errors: int = 2,
+        tool_workers: int = 8,
+    ):
+        self.claude = claude
+        self.backend = backend
+        self.execute_tool = execute_tool
+        self.poll_interval = poll_interval
+        self.max_rounds = max_rounds
+        self.max_errors = max_errors
+        self.tool_workers = tool_workers
+        self.batches_submitted = 0
+
+    def _submit(self, requests: list[dict[str, Any]]) -> str:
+        # Batch creation is one API call, throttled and retried like any other
+        if self.claude.scheduler:
+            return self.claude.scheduler.call(lambda: self.backend.submit(requests))
+        return self.backend.submit(requests)
+
+    def _wait(self, batch_id: str) -> list[BatchResult]:
+        while not self.backend.is_done(batch_id):
+            time.sleep(self.poll_interval)
+        return self.backend.results(batch_id)
+
+    def _model_for(self, job: BatchJob) -> tuple[str, int]:
+        """Model and output cap for a job's next round, following the routing rules."""
+        router = self.claude.router
+        after_tool_results = len(job.messages) > 1
+        if router and not job.escalate and router.use_fast(after_tool_results):
+            return router.fast_model, router.max_tokens_for(after_tool_results)
+        return self.claude.model, self.claude.max_tokens
+
+    def _apply(
+        self,
+        job: BatchJob,
+        result: BatchResult,
+        errors: dict[str, int],
+        model: str,
+    ) -> list[Any]:
+        """Record a result on its job; return the tool calls to run before the next round."""
+        if result.error:
+            errors[job.id] = errors.get(job.id, 0) + 1
+            if errors[job.id] > self.max_errors:
+                job.error = result.error
+                job.done = True
+            return []
+
+        job.rounds += 1
+        # Cached results cost nothing
+        usage = None if result.cached else getattr(result.message, "usage", None)
+        input_tokens = getattr(usage, "input_tokens", 0)
+        output_tokens = getattr(usage, "output_tokens", 0)
+        if not result.cached:
+            self.claude.usage.record(model, input_tokens, output_tokens)
+
+        router = self.claude.router
+        if router and model == router.fast_model and model != self.claude.model:
+            if router.needs_escalation(result.message):
+                # Ready to write the answer: redo this round on the primary model
+                self.claude.usage.record_escalation(input_tokens, output_tokens)
+                job.escalate = True
+                return []
+        job.escalate = False
+
+        parsed = self.claude._parse_response(result.message)
+        job.messages.append({"role": "assistant", "content": parsed.raw_content})
+        if not parsed.tool_calls:
+            job.content = parsed.content
+            job.done = True
+            return []
+        if job.rounds >= self.max_rounds:
+            job.content = parsed.content
+            job.error = f"Stopped after {self.max_rounds} rounds"
+            job.done = True
+            return []
+        return parsed.tool_calls
+
+    def _run_tools(self, job: BatchJob, tool_calls: list[Any]) -> None:
+        # Without a registry there are no policies: the calls run one by one
+        tools = self.claude.tools if self.claude.tools is not None else ToolRegistry()
+        contents = tools.run(tool_calls, self.execute_tool)
+        tool_results = [
+            {"type": "tool_result", "tool_use_id": call.id, "content": content}
+            for call, content in zip(tool_calls, contents)
+        ]
+        job.messages.append({"role": "user", "content": tool_results})
+
+    def run(self, jobs: list[BatchJob], system_prompt: str) -> list[BatchJob]:
+        """Run every job to completion, one batch per round of model calls."""
+        for job in jobs:
+            if not job.messages:
+                job.messages = [{"role": "user", "content": job.prompt}]
+        by_custom_id = {f"job-{i}": job for i, job in enumerate(jobs)}
+        errors: dict[str, int] = {}
+        tools = self.claude._build_tools()
+
+        while True:
+            active = {cid: job for cid, job in by_custom_id.items() if not job.done}
+            if not active:
+                return jobs
+
+            models = {cid: self._model_for(job) for cid, job in active.items()}
+            requests = [
+                {
+                    "custom_id": cid,
+                    "params": {
+                        "model": models[cid][0],
+                        "max_tokens": models[cid][1],
+                        "system": system_prompt,
+                        "messages": job.messages,
+                        "tools": tools,
+                    },
+                }
+                for cid, job in active.items()
+            ]
+            # Exact repeats of earlier requests (e.g. a re-run) are not submitted
+            cache = self.claude.response_cache
+            results: list[BatchResult] = []
+            if cache is not None:
+                uncached = []
+                for request in requests:
+                    cached = cache.get(request["params"])
+                    if cached is None:
+                        uncached.append(request)
+                    else:
+                        results.append(
+                            BatchResult(custom_id=request["custom_id"], message=cached, cached=True)
+                        )
+                requests = uncached
+            try:
+                if requests:
+                    batch_id = self._submit(requests)
+                    self.batches_submitted += 1
+                    submitted = self._wait(batch_id)
+                    if cache is not None:
+                        params = {r["custom_id"]: r["params"] for r in requests}
+                        for result in submitted:
+                            if result.message is not None and result.custom_id in params:
+                                cache.put(params[result.custom_id], result.message)
+                    results += submitted
+            except Exception as e:
+                for job in active.values():
+                    job.error = f"Batch failed: {e}"
+                    job.done = True
+                return jobs
+
+            tool_calls: dict[str, list[Any]] = {}
+            for result in results:
+                if result.custom_id in active:
+                    cid = result.custom_id
+                    tool_calls[cid] = self._apply(active[cid], result, errors, models[cid][0])
+            for cid in set(active) - set(tool_calls):
+                missing = BatchResult(custom_id=cid, error="missing from batch")
+                tool_calls[cid] = self._apply(active[cid], missing, errors, models[cid][0])
+
+            # Tools of every job in the round run concurrently before re-batching
+            with ThreadPoolExecutor(max_workers=self.tool_workers) as pool:
+                for cid, calls in tool_calls.items():
+                    if calls:
+                        context = contextvars.copy_context()
+                        pool.submit(context.run, self._run_tools, active[cid], calls)
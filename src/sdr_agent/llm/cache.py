@@ -0,0 +1,186 @@
+"""Content-addressed cache of Messages API responses for exact-repeat requests.
+
+Scripted flows (nightly batch re-runs, retried jobs, demo replays) often send
+byte-identical requests. A response is keyed on a canonical hash of everything
+that determines it (model, output cap, system prompt, tools, tool choice and
+messages) and served from an in-memory LRU, then from an optional disk tier.
+The cache is opt-in; code inside ``bypass_response_cache()`` always reaches
+the API and refreshes the stored response.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Optional
+
+from anthropic.types import Message
+
+# Request fields that determine the response
+KEY_FIELDS = ("model", "max_tokens", "system", "tools", "tool_choice", "messages")
+
+_bypass: ContextVar[bool] = ContextVar("sdr_response_cache_bypass", default=False)
+
+
+@contextmanager
+def bypass_response_cache():
+    """Skip cache lookups for requests made in this block (responses are still stored)."""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def _jsonable(value: Any) -> Any:
+    # SDK content blocks may appear in the history alongside plain dicts
+    if hasattr(value, "model_dump"):
+        return value.model_dump(exclude_none=True)
+    if hasattr(value, "__dict__"):
+        return vars(value)
+    return str(value)
+
+
+def cache_key(params: dict[str, Any]) -> str:
+    """Canonical hash of the request fields that determine a response."""
+    canonical = json.dumps(
+        {field: params.get(field) for field in KEY_FIELDS},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=_jsonable,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Two-tier (memory LRU, optional disk) response cache with a TTL.
+
+    Args:
+        max_entries: Responses kept in memory
+        ttl: Seconds a response stays valid (0 = never expires)
+        directory: Optional directory for the disk tier
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl: float = 86400.0,
+        directory: Optional[Path] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.directory = Path(directory) if directory else None
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl > 0 and time.time() - created_at > self.ttl
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _remember(self, key: str, created_at: float, response: Any) -> None:
+        self._entries[key] = (created_at, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _read_disk(self, key: str) -> Optional[tuple[float, Any]]:
+        path = self._path(key)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            entry = (data["created_at"], Message.model_validate(data["response"]))
+        except (OSError, ValueError, KeyError):
+            return None
+        if self._expired(entry[0]):
+            path.unlink(missing_ok=True)
+            return None
+        return entry
+
+    def get(self, params: dict[str, Any]) -> Optional[Any]:
+        """Return the cached response for a request, or None."""
+        if _bypass.get():
+            with self._lock:
+                self.bypassed += 1
+            return None
+
+        key = cache_key(params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and not self._expired(entry[0]):
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return entry[1]
+            if entry:
+                del self._entries[key]
+
+        entry = self._read_disk(key) if self.directory else None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self._remember(key, *entry)
+            self.disk_hits += 1
+            return entry[1]
+
+    def put(self, params: dict[str, Any], response: Any) -> None:
+        """Store a response for a request."""
+        key = cache_key(params)
+        created_at = time.time()
+        with self._lock:
+            self._remember(key, created_at, response)
+        if self.directory and hasattr(response, "model_dump"):
+            path = self._path(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            payload = {"created_at": created_at, "response": response.model_dump(mode="json")}
+            # Write then rename so a concurrent reader never sees a partial file
+            tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp.write_text(json.dumps(payload), encoding="utf-8")
+            tmp.replace(path)
+
+    def stats(self) -> dict[str, Any]:
+        """Hit and miss counts with the hit ratio over looked-up requests."""
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "hit_ratio": hits / lookups if lookups else 0.0,
+            }
+
+
+_caches: dict[Optional[Path], ResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_response_cache(
+    max_entries: int = 512,
+    ttl: float = 86400.0,
+    directory: Optional[Path] = None,
+) -> ResponseCache:
+    """Get the process-wide response cache for a disk directory (or memory only)."""
+    key = Path(directory).resolve() if directory else None
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = ResponseCache(max_entries, ttl, key)
+        return _caches[key]
+
+
+def all_response_cache_stats() -> dict[str, dict[str, Any]]:
+    """Stats of every response cache in the process, by disk directory."""
+    with _caches_lock:
+        caches = dict(_caches)
+    return {str(key or "memory"): cache.stats() for key, cache in caches.items()}
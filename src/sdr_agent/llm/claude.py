@@ -1,10 +1,23 @@
 """Claude API integration for SDR Agent."""
 
-from typing import Any
+import json
+import time
+from typing import TYPE_CHECKING, Any, Callable, Optional
 
 import anthropic
 from pydantic import BaseModel
 
+from ..metrics import LLM_LATENCY, LLM_REQUESTS, LLM_TOKENS
+from ..scheduler import RequestScheduler
+from ..text import estimate_tokens
+from .routing import ModelRouter, get_model_usage
+
+if TYPE_CHECKING:
+    from ..results import ToolResultStore
+    from ..tools import ToolRegistry
+    from .batch import BatchBackend, BatchJob
+    from .cache import ResponseCache
+
 
 class ToolCall(BaseModel):
     """A tool call from the model."""
@@ -23,6 +36,11 @@ class ClaudeResponse(BaseModel):
     raw_content: list[Any] = []
 
 
+def _block_get(block: Any, key: str) -> Any:
+    """Read a content block field from an SDK object or a plain dict."""
+    return block.get(key) if isinstance(block, dict) else getattr(block, key, None)
+
+
 class ClaudeClient:
     """Client for interacting with Claude API."""
 
@@ -31,84 +49,217 @@ class ClaudeClient:
         api_key: str,
         model: str = "claude-sonnet-4-20250514",
         max_tokens: int = 4096,
+        scheduler: Optional[RequestScheduler] = None,
+        router: Optional[ModelRouter] = None,
+        result_store: Optional["ToolResultStore"] = None,
+        result_inline_tokens: int = 300,
+        response_cache: Optional["ResponseCache"] = None,
+        tools: Optional["ToolRegistry"] = None,
     ):
-        self.client = anthropic.Anthropic(api_key=api_key)
+        # With a scheduler, retries are handled there against the shared limits
+        if scheduler:
+            self.client = anthropic.Anthropic(api_key=api_key, max_retries=0)
+        else:
+            self.client = anthropic.Anthropic(api_key=api_key)
         self.model = model
         self.max_tokens = max_tokens
+        self.scheduler = scheduler
+        self.router = router
+        self.usage = get_model_usage()
+        # Tool results above result_inline_tokens are moved to the store once read
+        self.result_store = result_store
+        self.result_inline_tokens = result_inline_tokens
+        # Index of the tool result message the model is reading, digested next
+        self._unread_results: Optional[int] = None
+        # Messages replaced by digests, by index, in full (see full_messages)
+        self._digested: dict[int, dict[str, Any]] = {}
+        self.response_cache = response_cache
+        self.tools = tools
         self.messages: list[dict[str, Any]] = []
+        # Bumped whenever the history is replaced rather than appended to
+        self.epoch = 0
+        # Leading messages shared with the conversation this one was forked from
+        self.cache_prefix = 0
 
     def _build_tools(self) -> list[dict[str, Any]]:
-        """Build tool definitions for the agent."""
-        return [
-            {
-                "name": "web_search",
-                "description": (
-                    "Search the web for information about a company, person, or topic. "
-                    "Use this to research prospects and companies."
-                ),
-                "input_schema": {
-                    "type": "object",
-                    "properties": {
-                        "query": {
-                            "type": "string",
-                            "description": "The search query",
-                        },
-                        "max_results": {
-                            "type": "integer",
-                            "description": "Maximum number of results (default: 5)",
-                            "default": 5,
-                        },
-                    },
-                    "required": ["query"],
-                },
-            },
-            {
-                "name": "send_email",
-                "description": (
-                    "Send an email to a prospect. "
-                    "Use this after composing a personalized email."
-                ),
-                "input_schema": {
-                    "type": "object",
-                    "properties": {
-                        "to_email": {
-                            "type": "string",
-                            "description": "Recipient email address",
-                        },
-                        "to_name": {
-                            "type": "string",
-                            "description": "Recipient name",
-                        },
-                        "subject": {
-                            "type": "string",
-                            "description": "Email subject line",
-                        },
-                        "body": {
-                            "type": "string",
-                            "description": "Email body content",
-                        },
-                    },
-                    "required": ["to_email", "subject", "body"],
-                },
-            },
-            {
-                "name": "read_skill",
-                "description": (
-                    "Load the full instructions from an agent skill. "
-                    "Use this when you need detailed guidance on a specific task."
-                ),
-                "input_schema": {
-                    "type": "object",
-                    "properties": {
-                        "skill_name": {
-                            "type": "string",
-                            "description": "Name of the skill to load",
-                        },
-                    },
-                    "required": ["skill_name"],
-                },
-            },
-        ]
+        """Build tool definitions for the agent from its tool registry."""
+        if self.tools is None:
+            return []
+        return self.tools.definitions()
+
+    def _stash_tool_results(self) -> None:
+        """Replace large tool results the model has just read with stored digests.
+
+        Called before each new message is appended. Only the latest tool
+        result message is digested, once; older messages are never touched
+        again, so the cached prompt prefix before it stays valid. The message
+        is replaced rather than edited in place, and ``full_messages`` still
+        returns it in full.
+        """
+        index, self._unread_results = self._unread_results, None
+        if index is None or self.result_store is None or self.result_inline_tokens <= 0:
+            return
+        message = self.messages[index]
+        tool_names = {
+            _block_get(block, "id"): _block_get(block, "name")
+            for block in self.messages[index - 1]["content"]
+            if _block_get(block, "type") == "tool_use"
+        }
+        content = []
+        digested = False
+        for block in message["content"]:
+            if (
+                isinstance(block["content"], str)
+                and estimate_tokens(block["content"]) > self.result_inline_tokens
+            ):
+                name = tool_names.get(block["tool_use_id"], "tool")
+                block = {**block, "content": self.result_store.digest(block["content"], name)}
+                digested = True
+            content.append(block)
+        if digested:
+            self._digested[index] = message
+            self.messages[index] = {**message, "content": content}
+
+    def full_messages(self) -> list[dict[str, Any]]:
+        """The conversation with every tool result in full, e.g. for a session log.
+
+        Persisted logs therefore hold full results; a conversation loaded from
+        one is sent as it is, without digesting its older results.
+        """
+        if not self._digested:
+            return self.messages
+        return [self._digested.get(i, message) for i, message in enumerate(self.messages)]
+
+    def _create_message(self, on_text: Optional[Callable[[str], None]] = None, **kwargs: Any):
+        """Call the Messages API, through the shared scheduler when configured.
+
+        With a response cache, an exact repeat of an earlier request is
+        answered from the cache without touching the scheduler or the API.
+        With ``on_text``, the response is streamed and its text is passed to
+        ``on_text`` as it arrives (a cached response's text all at once).
+        """
+        cache = self.response_cache
+        if cache is not None:
+            cached = cache.get(kwargs)
+            if cached is not None:
+                LLM_REQUESTS.inc(model=kwargs["model"], outcome="cached")
+                if on_text is not None:
+                    text = "".join(b.text for b in cached.content if b.type == "text")
+                    if text:
+                        on_text(text)
+                return cached
+
+        # Text already handed to on_text cannot be taken back, so a stream that
+        # fails part-way is not retried
+        streamed = False
+
+        def create():
+            nonlocal streamed
+            model = kwargs["model"]
+            start = time.monotonic()
+            try:
+                if on_text is None:
+                    response = self.client.messages.create(**kwargs)
+                else:
+                    with self.client.messages.stream(**kwargs) as stream:
+                        for text in stream.text_stream:
+                            streamed = True
+                            on_text(text)
+                        response = stream.get_final_message()
+            except Exception:
+                LLM_REQUESTS.inc(model=model, outcome="error")
+                raise
+            latency = time.monotonic() - start
+            usage = getattr(response, "usage", None)
+            input_tokens = getattr(usage, "input_tokens", 0)
+            output_tokens = getattr(usage, "output_tokens", 0)
+            self.usage.record(model, input_tokens, output_tokens, latency)
+            LLM_REQUESTS.inc(model=model, outcome="success")
+            LLM_LATENCY.observe(latency, model=model)
+            LLM_TOKENS.inc(input_tokens, model=model, direction="input")
+            LLM_TOKENS.inc(output_tokens, model=model, direction="output")
+            if cache is not None:
+                cache.put(kwargs, response)
+            return response
+
+        if not self.scheduler:
+            return create()
+
+        estimated = estimate_tokens(
+            json.dumps([kwargs.get("system"), kwargs["messages"], kwargs.get("tools")])
+        )
+        return self.scheduler.call(
+            create,
+            estimated_tokens=estimated,
+            actual_tokens=lambda r: r.usage.input_tokens + r.usage.output_tokens,
+            can_retry=lambda: not streamed,
+        )
+
+    def _request_messages(self) -> list[dict[str, Any]]:
+        """The conversation as sent, with a cache breakpoint at the end of a forked prefix.
+
+        Every fork of the same base then sends an identical prefix up to the
+        breakpoint, so all but the first read it from the prompt cache.
+        """
+        if not 0 < self.cache_prefix <= len(self.messages):
+            return self.messages
+        end = self.messages[self.cache_prefix - 1]
+        content = end["content"]
+        if isinstance(content, str):
+            content = [{"type": "text", "text": content}]
+        if not content:
+            return self.messages
+        # Copies: the prefix's messages are shared with the parent and other forks
+        content = [*content[:-1], {**content[-1], "cache_control": {"type": "ephemeral"}}]
+        messages = list(self.messages)
+        messages[self.cache_prefix - 1] = {**end, "content": content}
+        return messages
+
+    def _complete(
+        self,
+        system_prompt: str,
+        tools_enabled: bool,
+        after_tool_results: bool,
+        model: Optional[str] = None,
+        on_text: Optional[Callable[[str], None]] = None,
+    ):
+        """Run one turn on the current messages, choosing the model for it.
+
+        An explicit ``model`` always wins. Otherwise the router may try the
+        fast model first; if it answers instead of calling a tool, the turn is
+        re-run on the primary model. Only the final model's text is streamed
+        to ``on_text``, since a fast-model answer may be discarded.
+        """
+        kwargs: dict[str, Any] = {"system": system_prompt, "messages": self._request_messages()}
+        tools = self._build_tools() if tools_enabled else []
+        if tools:
+            kwargs["tools"] = tools
+
+        if model:
+            return self._create_message(
+                model=model, max_tokens=self.max_tokens, on_text=on_text, **kwargs
+            )
+
+        router = self.router
+        if router and router.use_fast(after_tool_results, tools_enabled):
+            start = time.monotonic()
+            response = self._create_message(
+                model=router.fast_model,
+                max_tokens=router.max_tokens_for(after_tool_results),
+                **kwargs,
+            )
+            if not router.needs_escalation(response):
+                return response
+            usage = getattr(response, "usage", None)
+            self.usage.record_escalation(
+                getattr(usage, "input_tokens", 0),
+                getattr(usage, "output_tokens", 0),
+                time.monotonic() - start,
+            )
+
+        return self._create_message(
+            model=self.model, max_tokens=self.max_tokens, on_text=on_text, **kwargs
+        )
 
     def _parse_response(self, response) -> ClaudeResponse:
         """Parse API response into ClaudeResponse."""
@@ -147,22 +298,23 @@ class ClaudeClient:
         user_message: str,
         system_prompt: str,
         tools_enabled: bool = True,
+        model: Optional[str] = None,
+        on_text: Optional[Callable[[str], None]] = None,
     ) -> ClaudeResponse:
-        """Send a message and get a response."""
+        """Send a message and get a response.
+
+        Args:
+            user_message: Message to send
+            system_prompt: System prompt
+            tools_enabled: Offer the agent tools
+            model: Model for this turn, overriding the routing rules
+            on_text: Called with each piece of the response text as it streams in
+        """
         # Add user message
+        self._stash_tool_results()
         self.messages.append({"role": "user", "content": user_message})
 
-        kwargs: dict[str, Any] = {
-            "model": self.model,
-            "max_tokens": self.max_tokens,
-            "system": system_prompt,
-            "messages": self.messages,
-        }
-
-        if tools_enabled:
-            kwargs["tools"] = self._build_tools()
-
-        response = self.client.messages.create(**kwargs)
+        response = self._complete(system_prompt, tools_enabled, False, model, on_text)
         parsed = self._parse_response(response)
 
         # Store assistant response with full content (including tool_use blocks)
@@ -174,8 +326,14 @@ class ClaudeClient:
         self,
         tool_results: list[dict[str, str]],
         system_prompt: str,
+        model: Optional[str] = None,
+        on_text: Optional[Callable[[str], None]] = None,
     ) -> ClaudeResponse:
-        """Continue the conversation after tool execution."""
+        """Continue the conversation after tool execution.
+
+        This is a tool-orchestration turn, so with routing configured it is
+        tried on the fast model first. ``on_text`` is as for ``chat``.
+        """
         # Format tool results for Claude
         tool_result_content = []
         for result in tool_results:
@@ -187,16 +345,12 @@ class ClaudeClient:
                 }
             )
 
-        # Add tool results as user message
+        # Add tool results as user message; the previous ones are now digests
+        self._stash_tool_results()
         self.messages.append({"role": "user", "content": tool_result_content})
+        self._unread_results = len(self.messages) - 1
 
-        response = self.client.messages.create(
-            model=self.model,
-            max_tokens=self.max_tokens,
-            system=system_prompt,
-            messages=self.messages,
-            tools=self._build_tools(),
-        )
+        response = self._complete(system_prompt, True, True, model, on_text)
 
         parsed = self._parse_response(response)
 
@@ -205,6 +359,101 @@ class ClaudeClient:
 
         return parsed
 
+    def generate_structured(
+        self,
+        prompt: str,
+        system_prompt: str,
+        tool_name: str,
+        input_schema: dict[str, Any],
+        description: str = "",
+    ) -> dict[str, Any]:
+        """Get one structured output by forcing a call to a single tool.
+
+        Stateless: the conversation history is neither sent nor updated. The
+        system prompt is marked for prompt caching since callers typically
+        reuse it across many requests.
+        """
+        response = self._create_message(
+            model=self.model,
+            max_tokens=self.max_tokens,
+            system=[
+                {"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}
+            ],
+            messages=[{"role": "user", "content": prompt}],
+            tools=[{"name": tool_name, "description": description, "input_schema": input_schema}],
+            tool_choice={"type": "tool", "name": tool_name},
+        )
+        for block in response.content:
+            if block.type == "tool_use" and block.name == tool_name:
+                return block.input
+        return {}
+
+    def run_batch(
+        self,
+        jobs: list["BatchJob"],
+        system_prompt: str,
+        execute_tool: Callable[[str, dict[str, Any]], str],
+        backend: Optional["BatchBackend"] = None,
+        poll_interval: float = 30.0,
+        max_rounds: int = 8,
+    ) -> list["BatchJob"]:
+        """Run independent jobs through the Message Batches API.
+
+        Each job is its own conversation; the client's own history is not
+        used. Tool calls are executed with ``execute_tool`` and the jobs that
+        need another turn are re-batched until all have a final answer.
+
+        Args:
+            jobs: Jobs to run
+            system_prompt: System prompt shared by every job
+            execute_tool: Runs a tool call and returns its result
+            backend: Batch backend (default: Message Batches API)
+            poll_interval: Seconds between batch status checks
+            max_rounds: Maximum model rounds per job
+        """
+        from .batch import AnthropicBatchBackend, BatchRunner
+
+        runner = BatchRunner(
+            self,
+            backend or AnthropicBatchBackend(self.client),
+            execute_tool,
+            poll_interval=poll_interval,
+            max_rounds=max_rounds,
+        )
+        return runner.run(jobs, system_prompt)
+
+    def record_exchange(self, user_message: str, assistant_text: str) -> None:
+        """Append a completed exchange produced elsewhere (e.g. a shared research run)."""
+        self._stash_tool_results()
+        self.messages.append({"role": "user", "content": user_message})
+        self.messages.append(
+            {"role": "assistant", "content": [{"type": "text", "text": assistant_text}]}
+        )
+
+    def load_messages(self, messages: list[dict[str, Any]]) -> None:
+        """Replace the conversation history (e.g. with one loaded from a session store)."""
+        self.messages = messages
+        self.epoch += 1
+        self.cache_prefix = 0
+        self._unread_results = None
+        self._digested = {}
+
+    def load_fork(self, parent: "ClaudeClient") -> None:
+        """Continue from another client's conversation without copying its messages.
+
+        The parent's messages become this conversation's prefix: both lists
+        refer to the same message objects, which are not modified afterwards.
+        """
+        # Digest read results now so the prefix is final
+        parent._stash_tool_results()
+        self.load_messages(list(parent.messages))
+        self._digested = dict(parent._digested)
+        self.cache_prefix = len(self.messages)
+
     def clear_conversation(self) -> None:
         """Clear the conversation history."""
         self.messages = []
+        self.epoch += 1
+        self.cache_prefix = 0
+        self._unread_results = None
+        self._digested = {}
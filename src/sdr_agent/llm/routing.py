@@ -0,0 +1,138 @@
+"""Model routing for tool-orchestration turns and per-model usage stats.
+
+Most turns in a research loop only decide which tool to call next. With a
+fast model configured, those turns go to it with a small ``max_tokens``; as
+soon as it stops calling tools (it is ready to write the answer), the turn is
+re-run on the primary model so the final synthesis keeps full quality.
+
+That re-run means the fast model's attempt at the answer is paid for and
+thrown away. Turns after tool results are therefore capped tighter still
+(``followup_max_tokens``): a tool call fits easily, while an answer hits the
+cap and escalates early. The discarded calls are reported in
+``ModelUsage.stats()`` under ``"escalated"``.
+"""
+
+import threading
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+
+class ModelRouter(BaseModel):
+    """Rules deciding which model serves a turn.
+
+    Attributes:
+        fast_model: Model for tool-orchestration turns (None disables routing)
+        fast_max_tokens: Output cap for fast-model turns
+        followup_max_tokens: Output cap for fast-model turns after tool
+            results, where a long reply is an answer that will be re-run
+            (None uses ``fast_max_tokens``)
+        route_first_turn: Also send a request's opening turn to the fast
+            model (good for research flows that always start with a search;
+            wasteful for messages usually answered directly)
+    """
+
+    fast_model: Optional[str] = None
+    fast_max_tokens: int = 1024
+    followup_max_tokens: Optional[int] = None
+    route_first_turn: bool = False
+
+    def use_fast(self, after_tool_results: bool, tools_enabled: bool = True) -> bool:
+        """Whether a turn should be tried on the fast model first."""
+        if not self.fast_model or not tools_enabled:
+            return False
+        return after_tool_results or self.route_first_turn
+
+    def max_tokens_for(self, after_tool_results: bool) -> int:
+        """Output cap for a fast-model turn."""
+        if after_tool_results and self.followup_max_tokens is not None:
+            return min(self.followup_max_tokens, self.fast_max_tokens)
+        return self.fast_max_tokens
+
+    @staticmethod
+    def needs_escalation(response: Any) -> bool:
+        """A fast-model turn that did not end in a complete tool call goes to the primary."""
+        if response.stop_reason == "max_tokens":
+            return True
+        return not any(block.type == "tool_use" for block in response.content)
+
+
+class ModelUsage:
+    """Thread-safe per-model call, token and latency counters."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._models: dict[str, dict[str, float]] = {}
+        self.escalations = 0
+        self._escalated = {"input_tokens": 0, "output_tokens": 0, "latency_seconds": 0.0}
+
+    def record(
+        self,
+        model: str,
+        input_tokens: int,
+        output_tokens: int,
+        latency: Optional[float] = None,
+    ) -> None:
+        """Count one call. Batched calls have no per-call latency and pass None."""
+        with self._lock:
+            stats = self._models.setdefault(
+                model,
+                {
+                    "calls": 0,
+                    "input_tokens": 0,
+                    "output_tokens": 0,
+                    "timed_calls": 0,
+                    "latency_seconds": 0.0,
+                },
+            )
+            stats["calls"] += 1
+            stats["input_tokens"] += input_tokens
+            stats["output_tokens"] += output_tokens
+            if latency is not None:
+                stats["timed_calls"] += 1
+                stats["latency_seconds"] += latency
+
+    def record_escalation(
+        self,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        latency: Optional[float] = None,
+    ) -> None:
+        """Count a fast-model call whose answer was discarded and re-run on the primary.
+
+        Its tokens are also in the fast model's totals; these are the wasted share.
+        """
+        with self._lock:
+            self.escalations += 1
+            self._escalated["input_tokens"] += input_tokens
+            self._escalated["output_tokens"] += output_tokens
+            if latency is not None:
+                self._escalated["latency_seconds"] += latency
+
+    def stats(self) -> dict[str, Any]:
+        """Per-model totals with average latency, plus escalations and their cost."""
+        with self._lock:
+            models = {
+                model: {
+                    **stats,
+                    "avg_latency_seconds": (
+                        stats["latency_seconds"] / stats["timed_calls"]
+                        if stats["timed_calls"]
+                        else 0.0
+                    ),
+                }
+                for model, stats in self._models.items()
+            }
+            return {
+                "models": models,
+                "escalations": self.escalations,
+                "escalated": dict(self._escalated),
+            }
+
+
+_usage = ModelUsage()
+
+
+def get_model_usage() -> ModelUsage:
+    """Process-wide model usage counters."""
+    return _usage
@@ -9,6 +9,7 @@ from rich.panel import Panel
 
 from .agent import SDRAgent
 from .config import Settings, get_settings
+from .llm.cache import bypass_response_cache
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -17,6 +18,11 @@ def create_parser() -> argparse.ArgumentParser:
         prog="sdr-agent",
         description="AI-powered Sales Development Representative agent",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always call the API, refreshing any cached responses (see RESPONSE_CACHE)",
+    )
 
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
 
@@ -28,9 +34,71 @@ def create_parser() -> argparse.ArgumentParser:
     research_parser.add_argument("--company", "-c", help="Company name to research")
     research_parser.add_argument("--prospect", "-p", help="Prospect name to research")
 
+    # Bulk research command
+    bulk_parser = subparsers.add_parser(
+        "bulk-research", help="Research many companies through the Message Batches API"
+    )
+    bulk_parser.add_argument("companies", nargs="*", help="Company names")
+    bulk_parser.add_argument("--file", "-f", help="File with one company per line")
+    bulk_parser.add_argument(
+        "--output-dir", "-o", help="Write each report to <output-dir>/<company>.md"
+    )
+    bulk_parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="Send the batched requests as regular calls instead of a batch job",
+    )
+
+    # Pipeline command
+    pipeline_parser = subparsers.add_parser(
+        "pipeline", help="Research, qualify and draft emails for prospects at a company"
+    )
+    pipeline_parser.add_argument("--company", "-c", required=True, help="Company name")
+    pipeline_parser.add_argument(
+        "--prospect",
+        "-p",
+        action="append",
+        required=True,
+        help="Prospect name (repeat for each prospect)",
+    )
+    pipeline_parser.add_argument("--workers", "-w", type=int, help="Concurrent stages")
+
+    # Compose command
+    compose_parser = subparsers.add_parser(
+        "compose", help="Draft outreach emails for a CSV of recipients in batched calls"
+    )
+    compose_parser.add_argument(
+        "csv_path", help="CSV with name, email, company, title and notes columns"
+    )
+    compose_parser.add_argument(
+        "--context", help="Context shared by every email (e.g. your offer)", default=""
+    )
+    compose_parser.add_argument("--output", "-o", help="Write the drafts to this JSON file")
+
     # Skills command
     subparsers.add_parser("skills", help="List available skills")
 
+    # Score command
+    score_parser = subparsers.add_parser("score", help="Score and tier a CSV of leads")
+    score_parser.add_argument("csv_path", help="CSV file of leads with a header row")
+    score_parser.add_argument(
+        "--model", "-m", help="YAML or JSON scoring model (default: lead-qualifier tables)"
+    )
+    score_parser.add_argument(
+        "--limit", "-n", type=int, default=20, help="Number of top leads to show"
+    )
+    score_parser.add_argument(
+        "--output", "-o", help="Write every lead with its score, tier and rank to this CSV"
+    )
+
+    # Compact session journals command
+    compact_parser = subparsers.add_parser(
+        "compact-sessions", help="Rewrite each session journal as a single snapshot"
+    )
+    compact_parser.add_argument(
+        "--dir", "-d", help="Journal directory (default: SESSION_JOURNAL_DIR or data/journal)"
+    )
+
     # Version command
     subparsers.add_parser("version", help="Show version")
 
@@ -80,6 +148,153 @@ def cmd_research(
         return 1
 
 
+def cmd_bulk_research(
+    settings: Settings,
+    console: Console,
+    companies: list[str],
+    file: str | None = None,
+    output_dir: str | None = None,
+    sync: bool = False,
+) -> int:
+    """Research many companies as batch jobs."""
+    import re
+    from pathlib import Path
+
+    from .llm.batch import LocalBatchBackend
+
+    if file:
+        companies = companies + [
+            line.strip() for line in Path(file).read_text().splitlines() if line.strip()
+        ]
+    if not companies:
+        console.print("[red]Error: Please list companies or pass --file[/red]")
+        return 1
+
+    try:
+        agent = SDRAgent(settings)
+        backend = LocalBatchBackend(agent.claude._create_message) if sync else None
+        with console.status(f"[bold green]Researching {len(companies)} companies...[/bold green]"):
+            jobs = agent.research_companies(companies, backend=backend)
+    except Exception as e:
+        console.print(f"[red]Error: {e}[/red]")
+        return 1
+
+    if output_dir:
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+    for job in jobs:
+        if job.error:
+            console.print(f"[red]{job.id}: {job.error}[/red]")
+            continue
+        console.print(f"[green]{job.id}[/green] [dim]({job.rounds} rounds)[/dim]")
+        if output_dir:
+            name = re.sub(r"[^A-Za-z0-9_-]+", "_", job.id).strip("_") or "company"
+            (Path(output_dir) / f"{name}.md").write_text(job.content)
+        else:
+            console.print(Markdown(job.content))
+            console.print()
+
+    return 1 if any(job.error for job in jobs) else 0
+
+
+def cmd_pipeline(
+    settings: Settings,
+    console: Console,
+    company: str,
+    prospects: list[str],
+    workers: int | None = None,
+) -> int:
+    """Run the prospecting pipeline and print its structured results."""
+    from .pipeline import StageStatus, run_prospecting_pipeline
+
+    styles = {
+        StageStatus.SUCCEEDED: "green",
+        StageStatus.FAILED: "red",
+        StageStatus.SKIPPED: "yellow",
+    }
+
+    def on_stage(stage) -> None:
+        detail = f" - {stage.error}" if stage.error else ""
+        console.print(
+            f"[{styles[stage.status]}]{stage.status.value}[/{styles[stage.status]}] "
+            f"{stage.name} [dim]({stage.duration:.1f}s){detail}[/dim]"
+        )
+
+    try:
+        agent = SDRAgent(settings)
+        with console.status("[bold green]Running pipeline...[/bold green]"):
+            result = run_prospecting_pipeline(
+                agent, company, prospects, max_workers=workers, on_stage=on_stage
+            )
+    except Exception as e:
+        console.print(f"[red]Error: {e}[/red]")
+        return 1
+
+    console.print()
+    for qualification in result.qualifications:
+        console.print(
+            f"[bold]{qualification.prospect}[/bold]: {qualification.tier or 'Not scored'} "
+            f"({qualification.score}) [dim]{qualification.rationale}[/dim]"
+        )
+    for draft in result.emails:
+        console.print()
+        console.print(Panel(f"[bold]{draft.subject}[/bold]\n\n{draft.body}", title=draft.prospect))
+    for prospect, error in result.email_failures.items():
+        console.print(f"[red]No draft for {prospect}: {error}[/red]")
+
+    failed = [s for s in result.stages if s.status != StageStatus.SUCCEEDED]
+    return 1 if failed or result.email_failures else 0
+
+
+def cmd_compose(
+    settings: Settings,
+    console: Console,
+    csv_path: str,
+    context: str = "",
+    output: str | None = None,
+) -> int:
+    """Draft an email per CSV recipient with a few structured-output calls."""
+    import json
+
+    from .compose import Recipient
+    from .scoring import read_leads_csv
+
+    known = set(Recipient.model_fields)
+    try:
+        rows = read_leads_csv(csv_path)
+        recipients = []
+        for row in rows:
+            # Columns other than the known fields are added to the notes
+            extra = "\n".join(f"{k}: {v}" for k, v in row.items() if k not in known and v)
+            fields = {k: v for k, v in row.items() if k in known and v}
+            fields["notes"] = "\n".join(filter(None, [fields.get("notes", ""), extra]))
+            recipients.append(Recipient(**fields))
+
+        agent = SDRAgent(settings)
+        with console.status(f"[bold green]Drafting {len(recipients)} emails...[/bold green]"):
+            result = agent.compose_emails(recipients, context=context)
+    except Exception as e:
+        console.print(f"[red]Error: {e}[/red]")
+        return 1
+
+    for draft in result.drafts:
+        title = f"{draft.prospect} <{draft.to_email}>" if draft.to_email else draft.prospect
+        console.print(Panel(f"[bold]{draft.subject}[/bold]\n\n{draft.body}", title=title))
+    for i, error in result.failures.items():
+        recipient = recipients[i]
+        name = f"{recipient.name} <{recipient.email}>" if recipient.email else recipient.name
+        console.print(f"[red]No draft for {name}: {error}[/red]")
+    console.print(
+        f"[dim]{len(result.drafts)} drafts from {result.requests} requests[/dim]"
+    )
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump([draft.model_dump() for draft in result.drafts], f, indent=2)
+        console.print(f"[dim]Wrote drafts to {output}[/dim]")
+
+    return 1 if result.failures else 0
+
+
 def cmd_skills(console: Console, skills_dir: str = "./skills") -> int:
     """List available skills."""
     from pathlib import Path
@@ -106,6 +321,99 @@ def cmd_skills(console: Console, skills_dir: str = "./skills") -> int:
     return 0
 
 
+def cmd_score(
+    console: Console,
+    csv_path: str,
+    model_path: str | None = None,
+    limit: int = 20,
+    output: str | None = None,
+) -> int:
+    """Score, tier and rank a CSV of leads without calling the LLM."""
+    import csv
+
+    from rich.table import Table
+
+    from .scoring import load_scoring_model, read_leads_csv, score_leads
+
+    try:
+        leads = read_leads_csv(csv_path)
+        model = load_scoring_model(model_path) if model_path else None
+        results = score_leads(leads, model)
+    except Exception as e:
+        console.print(f"[red]Error: {e}[/red]")
+        return 1
+
+    if not leads:
+        console.print("[yellow]No leads found.[/yellow]")
+        return 0
+
+    counts = ", ".join(f"{tier}: {count}" for tier, count in results.tier_counts().items())
+    console.print(f"[bold]Scored {len(results)} leads[/bold] ({counts})")
+    console.print(f"[dim]{int(results.borderline.sum())} borderline leads flagged for review[/dim]")
+    console.print()
+
+    table = Table()
+    for column in ("Rank", "Lead", "Company", "Score", "Tier", "Borderline"):
+        table.add_column(column)
+    for lead in results.top(limit):
+        table.add_row(
+            str(lead.rank),
+            str(lead.lead.get("name") or lead.lead.get("email") or f"row {lead.index + 1}"),
+            str(lead.lead.get("company") or ""),
+            f"{lead.score:g}",
+            lead.tier,
+            "yes" if lead.borderline else "",
+        )
+    console.print(table)
+
+    if output:
+        fieldnames = list(leads[0].keys()) + ["rank", "score", "tier", "borderline"]
+        with open(output, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
+            writer.writeheader()
+            for lead in results.top():
+                writer.writerow(
+                    {
+                        **lead.lead,
+                        "rank": lead.rank,
+                        "score": f"{lead.score:g}",
+                        "tier": lead.tier,
+                        "borderline": lead.borderline,
+                    }
+                )
+        console.print(f"[dim]Wrote {len(results)} scored leads to {output}[/dim]")
+
+    return 0
+
+
+def cmd_compact_sessions(settings: Settings, console: Console, directory: str | None) -> int:
+    """Compact every session journal, dropping cleared conversations and record overhead."""
+    from pathlib import Path
+
+    from .journal import JournalSessionBackend
+
+    path = Path(directory) if directory else settings.session_journal_dir
+    try:
+        backend = JournalSessionBackend(
+            path or settings.data_dir / "journal",
+            compress=settings.session_journal_compress,
+        )
+        results = backend.compact_all()
+    except Exception as e:
+        console.print(f"[red]Error: {e}[/red]")
+        return 1
+
+    for result in results:
+        console.print(
+            f"{result.session_id}: {result.messages} messages, "
+            f"{result.bytes_before:,} -> {result.bytes_after:,} bytes"
+        )
+    before = sum(r.bytes_before for r in results)
+    after = sum(r.bytes_after for r in results)
+    console.print(f"[dim]Compacted {len(results)} journals: {before:,} -> {after:,} bytes[/dim]")
+    return 0
+
+
 def cmd_version(console: Console) -> int:
     """Show version."""
     from . import __version__
@@ -127,9 +435,11 @@ def main() -> int:
     if args.command == "version":
         return cmd_version(console)
 
-    # Skills command doesn't need API keys
+    # Skills and score commands don't need API keys
     if args.command == "skills":
         return cmd_skills(console)
+    if args.command == "score":
+        return cmd_score(console, args.csv_path, args.model, args.limit, args.output)
 
     # Load settings for commands that need API keys
     try:
@@ -140,10 +450,33 @@ def main() -> int:
         console.print("[dim]See .env.example for required variables.[/dim]")
         return 1
 
+    if args.no_cache:
+        with bypass_response_cache():
+            return run_command(args, settings, console, parser)
+    return run_command(args, settings, console, parser)
+
+
+def run_command(
+    args: argparse.Namespace,
+    settings: Settings,
+    console: Console,
+    parser: argparse.ArgumentParser,
+) -> int:
+    """Run a command that needs settings."""
     if args.command == "chat":
         return cmd_chat(settings, console)
     elif args.command == "research":
         return cmd_research(settings, console, args.company, args.prospect)
+    elif args.command == "bulk-research":
+        return cmd_bulk_research(
+            settings, console, args.companies, args.file, args.output_dir, args.sync
+        )
+    elif args.command == "compose":
+        return cmd_compose(settings, console, args.csv_path, args.context, args.output)
+    elif args.command == "pipeline":
+        return cmd_pipeline(settings, console, args.company, args.prospect, args.workers)
+    elif args.command == "compact-sessions":
+        return cmd_compact_sessions(settings, console, args.dir)
     else:
         parser.print_help()
         return 0
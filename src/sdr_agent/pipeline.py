@@ -0,0 +1,345 @@
+"""Multi-stage prospecting pipeline with concurrent independent stages.
+
+``Pipeline`` is a small DAG runner: a stage starts as soon as every stage it
+depends on has succeeded, so independent stages (e.g. each prospect's
+research once the company is known) run in parallel. Stages receive their
+dependencies' outputs as structured values rather than a shared conversation.
+
+``run_prospecting_pipeline`` wires the SDR workflow on top of it:
+company research, prospect research per prospect, qualification, then email
+drafts for every qualified prospect in one batched compose. Every stage runs in
+a fresh conversation with only a digest of the results it needs.
+"""
+
+import contextvars
+import json
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from enum import Enum
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional
+
+from pydantic import BaseModel, Field
+
+from .compose import ComposeResult, EmailDraft, Recipient
+from .dispatch import Priority, request_context
+from .text import truncate_to_tokens
+
+if TYPE_CHECKING:
+    from .agent import SDRAgent
+
+
+class StageStatus(str, Enum):
+    """Outcome of a pipeline stage."""
+
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+
+
+class StageResult(BaseModel):
+    """Result of one stage."""
+
+    name: str
+    status: StageStatus
+    output: Any = None
+    error: Optional[str] = None
+    duration: float = 0.0
+
+
+class Stage(BaseModel):
+    """A named unit of work and the stages whose outputs it needs."""
+
+    name: str
+    fn: Callable[[dict[str, Any]], Any]
+    depends_on: list[str] = Field(default_factory=list)
+
+
+class Pipeline:
+    """Run stages concurrently in dependency order.
+
+    Args:
+        max_workers: Maximum stages running at once
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self.stages: dict[str, Stage] = {}
+
+    def add(
+        self,
+        name: str,
+        fn: Callable[[dict[str, Any]], Any],
+        depends_on: Iterable[str] = (),
+    ) -> "Pipeline":
+        """Add a stage. ``fn`` receives a dict of dependency name to output.
+
+        Dependencies must already be added, which also rules out cycles.
+
+        Raises:
+            ValueError: If the name is taken or a dependency is unknown
+        """
+        depends_on = list(depends_on)
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        unknown = [d for d in depends_on if d not in self.stages]
+        if unknown:
+            raise ValueError(f"Stage {name} depends on unknown stages: {', '.join(unknown)}")
+        self.stages[name] = Stage(name=name, fn=fn, depends_on=depends_on)
+        return self
+
+    def _run_stage(self, stage: Stage, inputs: dict[str, Any]) -> StageResult:
+        start = time.monotonic()
+        try:
+            output = stage.fn(inputs)
+        except Exception as e:
+            return StageResult(
+                name=stage.name,
+                status=StageStatus.FAILED,
+                error=str(e),
+                duration=time.monotonic() - start,
+            )
+        return StageResult(
+            name=stage.name,
+            status=StageStatus.SUCCEEDED,
+            output=output,
+            duration=time.monotonic() - start,
+        )
+
+    def run(
+        self,
+        on_stage: Optional[Callable[[StageResult], None]] = None,
+    ) -> dict[str, StageResult]:
+        """Run every stage and return results by stage name, in definition order.
+
+        A failed stage does not stop the pipeline; only the stages depending
+        on it (directly or transitively) are skipped.
+        """
+        results: dict[str, StageResult] = {}
+        pending = dict(self.stages)
+        running: dict[Future, str] = {}
+
+        def finish(result: StageResult) -> None:
+            results[result.name] = result
+            if on_stage:
+                on_stage(result)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    deps = [results.get(d) for d in stage.depends_on]
+                    if any(r and r.status != StageStatus.SUCCEEDED for r in deps):
+                        del pending[name]
+                        failed = [d for d in stage.depends_on if d in results]
+                        finish(
+                            StageResult(
+                                name=name,
+                                status=StageStatus.SKIPPED,
+                                error=f"Skipped: {', '.join(failed)} did not succeed",
+                            )
+                        )
+                    elif all(deps):
+                        del pending[name]
+                        inputs = {d: results[d].output for d in stage.depends_on}
+                        # Each stage keeps the caller's priority and tenant
+                        context = contextvars.copy_context()
+                        future = pool.submit(context.run, self._run_stage, stage, inputs)
+                        running[future] = name
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del running[future]
+                    finish(future.result())
+
+        return {name: results[name] for name in self.stages}
+
+
+class ResearchBrief(BaseModel):
+    """Research output for a company or prospect."""
+
+    target: str
+    report: str
+
+
+class Qualification(BaseModel):
+    """Qualification verdict for one prospect."""
+
+    prospect: str
+    score: int = 0
+    tier: str = ""
+    rationale: str = ""
+
+
+class ProspectingResult(BaseModel):
+    """Structured output of a prospecting pipeline run."""
+
+    company: Optional[ResearchBrief] = None
+    prospects: list[ResearchBrief] = Field(default_factory=list)
+    qualifications: list[Qualification] = Field(default_factory=list)
+    emails: list[EmailDraft] = Field(default_factory=list)
+    email_failures: dict[str, str] = Field(default_factory=dict)
+    stages: list[StageResult] = Field(default_factory=list)
+
+
+PROSPECT_STAGE_PROMPT = """\
+<company_brief company="{company}">
+{company_brief}
+</company_brief>
+
+{research_prompt}"""
+
+QUALIFY_STAGE_PROMPT = """\
+Qualify these prospects at {company} using the lead-qualifier scoring model.
+
+<company_brief company="{company}">
+{company_brief}
+</company_brief>
+
+{prospect_briefs}
+
+Respond with only a JSON array, one object per prospect, in a ```json block:
+[{{"prospect": "<name>", "score": <0-100>, "tier": "<Hot|Warm|Qualified|Marketing|Unqualified>",
+"rationale": "<one or two sentences>"}}]"""
+
+JSON_BLOCK = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+
+
+def parse_qualifications(text: str, prospects: list[str]) -> list[Qualification]:
+    """Parse the qualify stage's JSON; fall back to the raw text as rationale."""
+    match = JSON_BLOCK.search(text)
+    try:
+        items = json.loads(match.group(1) if match else text)
+        qualifications = [Qualification(**item) for item in items]
+    except (ValueError, TypeError):
+        return [Qualification(prospect=p, rationale=text.strip()) for p in prospects]
+
+    # Match names case-insensitively, but report them as the caller spelled them
+    by_name = {q.prospect.lower(): q for q in qualifications}
+    return [
+        by_name[p.lower()].model_copy(update={"prospect": p})
+        if p.lower() in by_name
+        else Qualification(prospect=p)
+        for p in prospects
+    ]
+
+
+def run_prospecting_pipeline(
+    agent: "SDRAgent",
+    company: str,
+    prospects: list[str],
+    max_workers: Optional[int] = None,
+    context_tokens: Optional[int] = None,
+    on_stage: Optional[Callable[[StageResult], None]] = None,
+) -> ProspectingResult:
+    """Research a company and its prospects, qualify them and draft emails.
+
+    Stages: ``company`` -> ``prospect:<name>`` (parallel) -> ``qualify`` ->
+    ``emails`` (one batched compose for every qualified prospect). API calls
+    run at batch priority so interactive sessions are served first.
+
+    Args:
+        agent: Agent providing tools, skills and API clients
+        company: Company to prospect
+        prospects: Prospect names at the company
+        max_workers: Concurrent stages (default: ``pipeline_workers`` setting)
+        context_tokens: Token budget for each research digest passed to a
+            later stage (default: ``pipeline_context_tokens`` setting)
+        on_stage: Called as each stage finishes
+    """
+    from .agent import research_flights, research_key
+
+    # One stage per prospect; names that differ only in case are the same prospect
+    unique: dict[str, str] = {}
+    for prospect in prospects:
+        unique.setdefault(prospect.lower(), prospect)
+    prospects = list(unique.values())
+
+    settings = agent.settings
+    max_workers = max_workers or settings.pipeline_workers
+    budget = context_tokens or settings.pipeline_context_tokens
+
+    def digest(brief: ResearchBrief) -> str:
+        return truncate_to_tokens(brief.report, budget)
+
+    def research_company(_: dict[str, Any]) -> ResearchBrief:
+        def run() -> str:
+            prompt = agent.build_research_prompt(company=company)
+            report = agent.run_task(prompt, skill="company-research")
+            agent.store_research(company, None, report)
+            return report
+
+        report, _ = research_flights.do(research_key(company), run)
+        return ResearchBrief(target=company, report=report)
+
+    def research_prospect(prospect: str) -> Callable[[dict[str, Any]], ResearchBrief]:
+        def run(inputs: dict[str, Any]) -> ResearchBrief:
+            prompt = PROSPECT_STAGE_PROMPT.format(
+                company=company,
+                company_brief=digest(inputs["company"]),
+                research_prompt=agent.build_research_prompt(company=company, prospect=prospect),
+            )
+            report = agent.run_task(prompt, skill="prospect-research")
+            return ResearchBrief(target=prospect, report=report)
+
+        return run
+
+    def qualify(inputs: dict[str, Any]) -> list[Qualification]:
+        briefs = "\n\n".join(
+            f'<prospect_brief prospect="{p}">\n{digest(inputs[f"prospect:{p}"])}\n'
+            "</prospect_brief>"
+            for p in prospects
+        )
+        prompt = QUALIFY_STAGE_PROMPT.format(
+            company=company,
+            company_brief=digest(inputs["company"]),
+            prospect_briefs=briefs,
+        )
+        return parse_qualifications(agent.run_task(prompt, skill="lead-qualifier"), prospects)
+
+    # Recipients of the compose stage, which its failures refer to by position
+    recipients: list[Recipient] = []
+
+    def compose(inputs: dict[str, Any]) -> ComposeResult:
+        qualifications = {q.prospect: q for q in inputs["qualify"]}
+        for prospect in prospects:
+            qualification = qualifications[prospect]
+            if qualification.tier.lower() == "unqualified":
+                continue
+            notes = (
+                f"{digest(inputs[f'prospect:{prospect}'])}\n\n"
+                f"Qualification: {qualification.tier or 'Not scored'} "
+                f"({qualification.score}/100). {qualification.rationale}"
+            )
+            recipients.append(Recipient(name=prospect, company=company, notes=notes))
+        if not recipients:
+            return ComposeResult()
+
+        brief = digest(inputs["company"])
+        context = f'<company_brief company="{company}">\n{brief}\n</company_brief>'
+        return agent.compose_emails(recipients, context=context)
+
+    pipeline = Pipeline(max_workers=max_workers)
+    pipeline.add("company", research_company)
+    for prospect in prospects:
+        pipeline.add(f"prospect:{prospect}", research_prospect(prospect), ["company"])
+    pipeline.add("qualify", qualify, ["company"] + [f"prospect:{p}" for p in prospects])
+    pipeline.add("emails", compose, ["company", "qualify"] + [f"prospect:{p}" for p in prospects])
+
+    with request_context(Priority.BATCH, tenant=f"pipeline:{research_key(company)}"):
+        stages = pipeline.run(on_stage=on_stage)
+
+    def output(name: str) -> Any:
+        stage = stages.get(name)
+        return stage.output if stage and stage.status == StageStatus.SUCCEEDED else None
+
+    composed = output("emails") or ComposeResult()
+    return ProspectingResult(
+        company=output("company"),
+        prospects=[b for p in prospects if (b := output(f"prospect:{p}"))],
+        qualifications=output("qualify") or [],
+        emails=composed.drafts,
+        email_failures={recipients[i].name: error for i, error in composed.failures.items()},
+        stages=list(stages.values()),
+    )
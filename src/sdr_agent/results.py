@@ -0,0 +1,148 @@
+"""Out-of-conversation storage for large tool results.
+
+A tool result is sent to the model in full only in the round it is returned.
+Once the model has responded to it, its copy in the conversation history is
+replaced by a short digest with a handle, so later calls do not resend it.
+The full payload stays in a ``ToolResultStore`` (an in-memory LRU, optionally
+backed by files) and the model can pull sections back with ``fetch_result``.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from pydantic import BaseModel
+
+from .skills.index import split_sections
+from .text import estimate_tokens, truncate_to_tokens
+
+HANDLE_PATTERN = re.compile(r"^res_[0-9a-f]{12}$")
+# A numbered entry of compacted web search results: title line, then its URL
+SEARCH_ENTRY = re.compile(r"^\d+\.\s+(.+)\n\s+URL:", re.MULTILINE)
+
+
+class ResultSection(BaseModel):
+    """A titled part of a stored tool result."""
+
+    title: str
+    content: str
+
+
+def result_sections(content: str) -> list[ResultSection]:
+    """Split a tool result into sections: search results per source, documents per heading."""
+    entries = list(SEARCH_ENTRY.finditer(content))
+    if not entries:
+        return [
+            ResultSection(title=s.heading, content=s.content)
+            for s in split_sections(content, skill="", source="")
+        ]
+
+    sections = []
+    head = content[: entries[0].start()].strip()
+    if head:
+        sections.append(ResultSection(title="Summary", content=head))
+    ends = [e.start() for e in entries[1:]] + [len(content)]
+    for entry, end in zip(entries, ends):
+        sections.append(
+            ResultSection(title=entry.group(1).strip(), content=content[entry.start():end].strip())
+        )
+    return sections
+
+
+def find_section(sections: list[ResultSection], section: str) -> Optional[ResultSection]:
+    """Find a section by 1-based number or by (part of) its title."""
+    section = section.strip()
+    if section.isdigit():
+        index = int(section) - 1
+        return sections[index] if 0 <= index < len(sections) else None
+    needle = section.lower()
+    return next((s for s in sections if needle in s.title.lower()), None)
+
+
+class ToolResultStore:
+    """Content-addressed store of full tool results.
+
+    Args:
+        max_entries: Results kept in memory; the least recently used are evicted
+        directory: Optional directory where every result is also written, so
+            handles stay valid after eviction and across restarts
+    """
+
+    def __init__(self, max_entries: int = 256, directory: Optional[Path] = None):
+        self.max_entries = max_entries
+        self.directory = Path(directory) if directory else None
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _path(self, handle: str) -> Path:
+        return self.directory / f"{handle}.txt"
+
+    def _remember(self, handle: str, content: str) -> None:
+        self._entries[handle] = content
+        self._entries.move_to_end(handle)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def put(self, content: str) -> str:
+        """Store a result and return its handle (identical results share one)."""
+        handle = "res_" + hashlib.sha256(content.encode("utf-8")).hexdigest()[:12]
+        with self._lock:
+            self._remember(handle, content)
+            if self.directory:
+                path = self._path(handle)
+                if not path.exists():
+                    self.directory.mkdir(parents=True, exist_ok=True)
+                    path.write_text(content, encoding="utf-8")
+        return handle
+
+    def get(self, handle: str) -> Optional[str]:
+        """Get a stored result, or None if the handle is unknown or was evicted."""
+        if not HANDLE_PATTERN.match(handle):
+            return None
+        with self._lock:
+            content = self._entries.get(handle)
+            if content is not None:
+                self._entries.move_to_end(handle)
+                return content
+            if self.directory and self._path(handle).exists():
+                content = self._path(handle).read_text(encoding="utf-8")
+                self._remember(handle, content)
+                return content
+        return None
+
+    def digest(self, content: str, tool_name: str, preview_tokens: int = 120) -> str:
+        """Store a result and return the short stand-in kept in the conversation."""
+        handle = self.put(content)
+        sections = result_sections(content)
+        lines = [
+            f"[{tool_name} result stored as {handle} (~{estimate_tokens(content)} tokens). "
+            f'Call fetch_result(handle="{handle}", section=...) if you need more detail.]',
+            truncate_to_tokens(content, preview_tokens),
+        ]
+        if len(sections) > 1:
+            lines.append("Sections:")
+            lines.extend(f"{i}. {s.title}" for i, s in enumerate(sections[:12], start=1))
+            if len(sections) > 12:
+                lines.append(f"... and {len(sections) - 12} more")
+        return "\n".join(lines)
+
+    def fetch(self, handle: str, section: Optional[str] = None, max_tokens: int = 1500) -> str:
+        """Return a stored result, or one of its sections, for the fetch_result tool."""
+        content = self.get(handle)
+        if content is None:
+            return f"Error: unknown or expired result handle {handle!r}"
+        if not section:
+            return truncate_to_tokens(content, max_tokens)
+
+        sections = result_sections(content)
+        match = find_section(sections, section)
+        if match is None:
+            titles = "; ".join(f"{i}. {s.title}" for i, s in enumerate(sections, start=1))
+            return f"Error: no section matching {section!r}. Sections: {titles}"
+        return truncate_to_tokens(match.content, max_tokens)
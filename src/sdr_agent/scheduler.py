@@ -0,0 +1,239 @@
+"""Rate-limit-aware request scheduling with retries for external APIs.
+
+Every call to the Anthropic Messages API and to Tavily goes through a
+``RequestScheduler`` shared by the whole process, so concurrent sessions and
+batch workers draw from one set of token buckets and one in-flight cap instead
+of each discovering the provider's limits on its own.
+"""
+
+import random
+import threading
+import time
+from typing import Any, Callable, Optional, TypeVar
+
+import anthropic
+from tavily import UsageLimitExceededError
+from tavily.errors import TimeoutError as TavilyTimeoutError
+
+from .dispatch import FairDispatcher
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at a per-minute rate.
+
+    Reservations are never refused: the bucket goes into debt and the caller
+    is told how long to wait, which keeps callers in FIFO order.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else float(per_minute)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take ``amount`` tokens and return the seconds to wait before using them."""
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def adjust(self, amount: float) -> None:
+        """Correct an earlier reservation once the real cost is known."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens - amount)
+
+
+def anthropic_retry_after(error: Exception) -> Optional[float]:
+    """Classify an Anthropic error: None if fatal, else seconds to wait (0 = back off)."""
+    if isinstance(error, (anthropic.APIConnectionError, anthropic.APITimeoutError)):
+        return 0.0
+    if isinstance(error, anthropic.APIStatusError):
+        if error.status_code not in RETRYABLE_STATUS_CODES:
+            return None
+        value = error.response.headers.get("retry-after") if error.response else None
+        try:
+            return float(value) if value else 0.0
+        except ValueError:
+            return 0.0
+    return None
+
+
+def tavily_retry_after(error: Exception) -> Optional[float]:
+    """Classify a Tavily error: None if fatal, else seconds to wait (0 = back off).
+
+    Rate limits (HTTP 429, ``UsageLimitExceededError``), timeouts, network
+    errors and server errors are retried. An exhausted quota
+    (``ForbiddenError``), a bad key, a bad request and any other HTTP error
+    are fatal. The HTTP client's errors are ``OSError`` subclasses; its
+    ``HTTPError`` carries the response.
+    """
+    if isinstance(error, UsageLimitExceededError):
+        # Keyless rate limits say how long to wait
+        return float(getattr(error, "retry_after_seconds", None) or 0.0)
+    if isinstance(error, TavilyTimeoutError):
+        return 0.0
+    if isinstance(error, OSError):
+        response = getattr(error, "response", None)
+        if response is None or response.status_code >= 500:
+            return 0.0
+    return None
+
+
+class RequestScheduler:
+    """Throttle, cap and retry calls to one external API.
+
+    Args:
+        name: Backend name used in stats (e.g. ``"anthropic"``)
+        requests_per_minute: Request bucket rate (0 disables it)
+        tokens_per_minute: Token bucket rate (0 disables it)
+        max_in_flight: Maximum concurrent calls across the process
+        reserved_interactive: In-flight slots held back for interactive calls
+        max_retries: Retries after the first attempt for retryable errors
+        base_delay: First backoff delay in seconds
+        max_delay: Cap on any single backoff delay
+        retry_after: Classifies an error as fatal (None) or retryable
+    """
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_in_flight: int = 8,
+        reserved_interactive: int = 1,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        retry_after: Callable[[Exception], Optional[float]] = lambda e: None,
+    ):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_after = retry_after
+
+        # Slots are granted by priority class and per-tenant fair share
+        self.dispatcher = FairDispatcher(max_in_flight, reserved_interactive)
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self._in_flight = 0
+        self._stats = {"requests": 0, "retries": 0, "failures": 0, "throttled_seconds": 0.0}
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: spreads retries from many callers across the window
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    def _wait_for_capacity(self, estimated_tokens: int) -> None:
+        wait = self.requests.reserve(1) if self.requests else 0.0
+        if self.tokens and estimated_tokens:
+            wait = max(wait, self.tokens.reserve(estimated_tokens))
+        with self._lock:
+            wait = max(wait, self._paused_until - time.monotonic())
+            if wait > 0:
+                self._stats["throttled_seconds"] += wait
+        if wait > 0:
+            time.sleep(wait)
+
+    def call(
+        self,
+        fn: Callable[[], T],
+        estimated_tokens: int = 0,
+        actual_tokens: Optional[Callable[[T], int]] = None,
+        can_retry: Optional[Callable[[], bool]] = None,
+    ) -> T:
+        """Run ``fn`` within the rate limits, retrying retryable errors.
+
+        Args:
+            fn: Zero-argument callable performing the request
+            estimated_tokens: Tokens to reserve before the call
+            actual_tokens: Extracts the real token cost from the result, used
+                to correct the token bucket after the call
+            can_retry: Checked after a retryable error; False when a retry
+                would repeat output the caller has already passed on
+
+        Raises:
+            The last error if it is not retryable or retries are exhausted
+        """
+        attempt = 0
+        while True:
+            with self.dispatcher.slot():
+                self._wait_for_capacity(estimated_tokens)
+                with self._lock:
+                    self._in_flight += 1
+                    self._stats["requests"] += 1
+                try:
+                    result = fn()
+                except Exception as e:
+                    retry_after = self.retry_after(e)
+                    if (
+                        retry_after is None
+                        or attempt >= self.max_retries
+                        or (can_retry is not None and not can_retry())
+                    ):
+                        with self._lock:
+                            self._stats["failures"] += 1
+                        raise
+                else:
+                    if self.tokens and actual_tokens:
+                        self.tokens.adjust(actual_tokens(result) - estimated_tokens)
+                    return result
+                finally:
+                    with self._lock:
+                        self._in_flight -= 1
+
+            if retry_after:
+                # The provider told us when to come back: pause every caller, not just this one
+                delay = retry_after + random.uniform(0, self.base_delay)
+                with self._lock:
+                    self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            else:
+                delay = self._backoff(attempt)
+            with self._lock:
+                self._stats["retries"] += 1
+            time.sleep(delay)
+            attempt += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Snapshot of request, retry, throttling and queueing counters."""
+        with self._lock:
+            stats = {"name": self.name, "in_flight": self._in_flight, **self._stats}
+        stats["dispatch"] = self.dispatcher.stats()
+        return stats
+
+
+_schedulers: dict[str, RequestScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(name: str, **config: Any) -> RequestScheduler:
+    """Get the process-wide scheduler for a backend, creating it on first use.
+
+    Configuration is only applied when the scheduler is created, so every
+    session and batch worker shares the first configuration seen.
+    """
+    with _schedulers_lock:
+        if name not in _schedulers:
+            _schedulers[name] = RequestScheduler(name, **config)
+        return _schedulers[name]
+
+
+def all_scheduler_stats() -> list[dict[str, Any]]:
+    """Stats for every scheduler created in this process."""
+    with _schedulers_lock:
+        schedulers = list(_schedulers.values())
+    return [scheduler.stats() for scheduler in schedulers]
@@ -0,0 +1,307 @@
+"""Deterministic bulk lead scoring for the lead-qualifier framework.
+
+Scores whole lead lists with weighted criteria evaluated column-by-column
+with NumPy, so a 10k-row CSV is ranked in milliseconds. Leads whose score
+falls close to a tier boundary are flagged as borderline; those are the only
+ones worth an LLM conversation.
+
+The default model follows the lead-qualifier skill's scoring tables
+(demographic 0-50 plus behavioral 0-50 points, Hot/Warm/Qualified/Marketing/
+Unqualified tiers). Custom models can be loaded from YAML or JSON.
+"""
+
+import csv
+import json
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+import numpy as np
+import yaml
+from pydantic import BaseModel, Field
+
+TRUTHY = ("1", "true", "yes", "y", "x", "t")
+FALSY = ("", "0", "false", "no", "n", "f", "none", "null")
+
+
+class Criterion(BaseModel):
+    """One weighted scoring rule applied to a lead column.
+
+    A lead earns ``points`` when the column value matches. The match is, in
+    order of precedence: any of ``values`` (case-insensitive exact match),
+    containing any of ``contains`` (case-insensitive substring), within
+    ``min``/``max`` (numeric), or otherwise truthy ("yes", "true", 1, ...).
+    """
+
+    name: str
+    column: str
+    points: float
+    values: Optional[list[str]] = None
+    contains: Optional[list[str]] = None
+    min: Optional[float] = None
+    max: Optional[float] = None
+
+
+class Tier(BaseModel):
+    """A priority tier reached at ``min_score`` points."""
+
+    name: str
+    min_score: float
+    action: str = ""
+
+
+class ScoringModel(BaseModel):
+    """Weighted criteria plus the tiers their total score maps to."""
+
+    criteria: list[Criterion]
+    tiers: list[Tier]
+    borderline_margin: float = Field(
+        default=5.0,
+        description="Scores within this many points of a tier boundary are borderline",
+    )
+
+
+DEFAULT_SCORING_MODEL = ScoringModel(
+    criteria=[
+        # Demographic (0-50)
+        Criterion(
+            name="Title matches buyer persona",
+            column="title",
+            points=15,
+            contains=["chief", "vp", "vice president", "head of", "director", "founder"],
+        ),
+        Criterion(name="Company in target industry", column="target_industry", points=10),
+        Criterion(name="Company size in range", column="size_in_range", points=10),
+        Criterion(name="Geography in target region", column="target_region", points=5),
+        Criterion(name="Tech stack compatible", column="tech_compatible", points=10),
+        # Behavioral (0-50)
+        Criterion(name="Requested demo", column="requested_demo", points=20),
+        Criterion(name="Responded to email", column="responded_email", points=15),
+        Criterion(name="Visited pricing page", column="visited_pricing", points=10),
+        Criterion(name="Downloaded content", column="downloaded_content", points=5),
+        Criterion(name="Attended webinar", column="attended_webinar", points=10),
+        Criterion(name="Multiple website visits", column="website_visits", points=5, min=2),
+        Criterion(name="LinkedIn engagement", column="linkedin_engagement", points=5),
+    ],
+    tiers=[
+        Tier(name="Hot", min_score=80, action="Immediate outreach, escalate to AE"),
+        Tier(name="Warm", min_score=60, action="Prioritized outreach sequence"),
+        Tier(name="Qualified", min_score=40, action="Standard nurture sequence"),
+        Tier(name="Marketing", min_score=20, action="Marketing nurture only"),
+        Tier(name="Unqualified", min_score=0, action="Disqualify or long-term nurture"),
+    ],
+)
+
+
+class ScoredLead(BaseModel):
+    """A lead with its score, tier and rank in the list."""
+
+    rank: int
+    index: int
+    score: float
+    tier: str
+    borderline: bool
+    lead: dict[str, Any]
+
+
+def load_scoring_model(path: Path) -> ScoringModel:
+    """Load a scoring model from a YAML or JSON file."""
+    path = Path(path)
+    text = path.read_text()
+    data = json.loads(text) if path.suffix == ".json" else yaml.safe_load(text)
+    return ScoringModel(**data)
+
+
+def read_leads_csv(path: Path) -> list[dict[str, Any]]:
+    """Read leads from a CSV file with a header row."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+
+def _column(leads: Sequence[dict[str, Any]], name: str) -> np.ndarray:
+    """Lowercased string array of one column ("" where missing)."""
+    values = [lead.get(name) for lead in leads]
+    return np.array(["" if v is None else str(v).strip().lower() for v in values])
+
+
+def _numeric(column: np.ndarray) -> np.ndarray:
+    """Float array of a string column (NaN where not numeric)."""
+    try:
+        return np.where(column == "", "nan", column).astype(float)
+    except ValueError:
+        pass
+    out = np.full(column.shape, np.nan)
+    for i, value in enumerate(column):
+        try:
+            out[i] = float(value)
+        except ValueError:
+            pass
+    return out
+
+
+def _matches(criterion: Criterion, column: np.ndarray) -> np.ndarray:
+    """Boolean mask of the rows that satisfy ``criterion``."""
+    if criterion.values is not None:
+        return np.isin(column, [v.lower() for v in criterion.values])
+    if criterion.contains is not None:
+        mask = np.zeros(column.shape, dtype=bool)
+        for needle in criterion.contains:
+            mask |= np.char.find(column, needle.lower()) >= 0
+        return mask
+    if criterion.min is not None or criterion.max is not None:
+        numbers = _numeric(column)
+        with np.errstate(invalid="ignore"):
+            mask = ~np.isnan(numbers)
+            if criterion.min is not None:
+                mask &= numbers >= criterion.min
+            if criterion.max is not None:
+                mask &= numbers <= criterion.max
+        return mask
+    mask = np.isin(column, TRUTHY)
+    # Only values that are neither obviously true nor false need numeric parsing
+    other = ~mask & ~np.isin(column, FALSY)
+    if other.any():
+        with np.errstate(invalid="ignore"):
+            mask[other] = _numeric(column[other]) > 0
+    return mask
+
+
+def score_matrix(
+    leads: Sequence[dict[str, Any]],
+    model: ScoringModel = DEFAULT_SCORING_MODEL,
+) -> np.ndarray:
+    """Points earned per lead (rows) and criterion (columns)."""
+    matrix = np.zeros((len(leads), len(model.criteria)))
+    if not leads:
+        return matrix
+    columns: dict[str, np.ndarray] = {}
+    for j, criterion in enumerate(model.criteria):
+        if criterion.column not in columns:
+            columns[criterion.column] = _column(leads, criterion.column)
+        matrix[:, j] = _matches(criterion, columns[criterion.column]) * criterion.points
+    return matrix
+
+
+class LeadScores:
+    """Scores, tiers and ranking for a whole lead list.
+
+    Results stay as arrays; ``ScoredLead`` objects are only built for the
+    leads actually requested, so ranking 10k leads does not create 10k models.
+    """
+
+    def __init__(
+        self,
+        leads: Sequence[dict[str, Any]],
+        scores: np.ndarray,
+        tiers: np.ndarray,
+        borderline: np.ndarray,
+    ):
+        self.leads = leads
+        self.scores = scores
+        self.tiers = tiers
+        self.borderline = borderline
+        # Best first; ties keep input order
+        self.order = np.argsort(-scores, kind="stable")
+
+    def __len__(self) -> int:
+        return len(self.leads)
+
+    def _lead(self, rank: int) -> ScoredLead:
+        i = int(self.order[rank - 1])
+        return ScoredLead(
+            rank=rank,
+            index=i,
+            score=float(self.scores[i]),
+            tier=str(self.tiers[i]),
+            borderline=bool(self.borderline[i]),
+            lead=self.leads[i],
+        )
+
+    def top(self, limit: Optional[int] = None) -> list[ScoredLead]:
+        """The highest-scoring leads (all of them if ``limit`` is None)."""
+        count = len(self) if limit is None else min(limit, len(self))
+        return [self._lead(rank) for rank in range(1, count + 1)]
+
+    def borderline_leads(self, limit: Optional[int] = None) -> list[ScoredLead]:
+        """Leads near a tier boundary, best first: the ones worth an LLM review."""
+        ranks = np.flatnonzero(self.borderline[self.order]) + 1
+        return [self._lead(int(rank)) for rank in ranks[:limit]]
+
+    def tier_counts(self) -> dict[str, int]:
+        """Number of leads per tier, in descending tier order."""
+        names, first, counts = np.unique(
+            self.tiers[self.order], return_index=True, return_counts=True
+        )
+        return {str(names[k]): int(counts[k]) for k in np.argsort(first)}
+
+
+def score_leads(
+    leads: Sequence[dict[str, Any]],
+    model: Optional[ScoringModel] = None,
+) -> LeadScores:
+    """Score, tier and rank a list of leads.
+
+    Args:
+        leads: Lead attributes, one dict per lead (e.g. CSV rows)
+        model: Scoring model (defaults to the lead-qualifier scoring tables)
+
+    Returns:
+        LeadScores for the whole list
+    """
+    model = model or DEFAULT_SCORING_MODEL
+    scores = score_matrix(leads, model).sum(axis=1)
+
+    tiers = sorted(model.tiers, key=lambda t: t.min_score, reverse=True)
+    thresholds = np.array([t.min_score for t in tiers])
+    names = np.array([t.name for t in tiers] + ["Unscored"])
+    # First (highest) tier whose threshold the score reaches, else "Unscored"
+    reached = scores[:, None] >= thresholds[None, :]
+    tier_index = np.where(reached.any(axis=1), reached.argmax(axis=1), len(tiers))
+
+    # Distance to the nearest boundary other than the floor of the lowest tier
+    boundaries = thresholds[thresholds > thresholds.min()] if len(thresholds) else thresholds
+    if len(boundaries):
+        distance = np.abs(scores[:, None] - boundaries[None, :]).min(axis=1)
+        borderline = distance < model.borderline_margin
+    else:
+        borderline = np.zeros(len(scores), dtype=bool)
+
+    return LeadScores(leads, scores, names[tier_index], borderline)
+
+
+def _lead_label(scored: ScoredLead) -> str:
+    lead = scored.lead
+    name = lead.get("name") or " ".join(
+        str(lead.get(k) or "") for k in ("first_name", "last_name")
+    ).strip()
+    company = lead.get("company")
+    if name and company:
+        return f"{name} ({company})"
+    return str(name or company or f"row {scored.index + 1}")
+
+
+def format_lead_scores(results: LeadScores, limit: int = 20) -> str:
+    """Summarize scored leads for the model: tier counts, top leads, borderline leads."""
+    if not len(results):
+        return "No leads to score."
+
+    counts = results.tier_counts()
+    lines = [
+        f"Scored {len(results)} leads.",
+        "Tiers: " + ", ".join(f"{tier} {count}" for tier, count in counts.items()),
+        "",
+        f"Top {min(limit, len(results))}:",
+    ]
+    for lead in results.top(limit):
+        flag = " [borderline]" if lead.borderline else ""
+        lines.append(f"{lead.rank}. {_lead_label(lead)} - {lead.score:g} ({lead.tier}){flag}")
+
+    borderline = results.borderline_leads(limit)
+    if borderline:
+        total = int(results.borderline.sum())
+        lines += ["", f"Borderline leads needing review ({total}):"]
+        for lead in borderline:
+            lines.append(
+                f"- {_lead_label(lead)}: {lead.score:g} ({lead.tier}) "
+                f"{json.dumps(lead.lead, default=str)}"
+            )
+    return "\n".join(lines)
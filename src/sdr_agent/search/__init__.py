@@ -0,0 +1,5 @@
+"""Web search post-processing and research helpers."""
+
+from .compaction import compact_search_results
+
+__all__ = ["compact_search_results"]
@@ -0,0 +1,183 @@
+"""Relevance-ranked, deduplicated compaction of web search results.
+
+Raw search results carry navigation boilerplate, syndicated copies of the same
+article and long passages that are mostly irrelevant to the query. This module
+reduces a Tavily-style response to the sentences that best answer the query,
+packed into a fixed token budget.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Any, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from ..text import estimate_tokens, tokenize
+
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9])|\n+")
+WORD_PATTERN = re.compile(r"\w+")
+BOILERPLATE_PATTERN = re.compile(
+    r"cookie|subscribe|sign up|sign in|log in|newsletter|all rights reserved|"
+    r"privacy policy|terms of (use|service)|enable javascript|skip to (main )?content|"
+    r"click here|advertisement",
+    re.IGNORECASE,
+)
+TRACKING_PARAMS = re.compile(r"^(utm_|ref$|ref_|fbclid$|gclid$|mc_)")
+
+MIN_SENTENCE_CHARS = 25
+MAX_SENTENCE_CHARS = 600
+NEAR_DUPLICATE_THRESHOLD = 0.8
+
+
+def normalize_url(url: str) -> str:
+    """Normalize a URL so trivially different links to the same page compare equal."""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower().removeprefix("www.")
+    path = parts.path.rstrip("/")
+    query = urlencode(
+        sorted((k, v) for k, v in parse_qsl(parts.query) if not TRACKING_PARAMS.match(k))
+    )
+    return f"{host}{path}?{query}" if query else f"{host}{path}"
+
+
+def _shingles(text: str, size: int = 3) -> set[tuple[str, ...]]:
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < size:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+
+def _jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _is_near_duplicate(shingles: set, others: list[set]) -> bool:
+    return any(_jaccard(shingles, other) >= NEAR_DUPLICATE_THRESHOLD for other in others)
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split text into sentences, dropping fragments and boilerplate."""
+    sentences = []
+    for raw in SENTENCE_SPLIT.split(text):
+        sentence = " ".join(raw.split())
+        if len(sentence) < MIN_SENTENCE_CHARS or BOILERPLATE_PATTERN.search(sentence):
+            continue
+        if len(sentence) > MAX_SENTENCE_CHARS:
+            sentence = sentence[:MAX_SENTENCE_CHARS].rsplit(" ", 1)[0] + "..."
+        sentences.append(sentence)
+    return sentences
+
+
+def _dedupe_results(results: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Drop results with a duplicate URL or near-duplicate content."""
+    kept: list[dict[str, Any]] = []
+    seen_urls: set[str] = set()
+    kept_shingles: list[set] = []
+
+    for result in results:
+        url = result.get("url") or ""
+        key = normalize_url(url) if url else None
+        if key and key in seen_urls:
+            continue
+
+        shingles = _shingles(result.get("content") or "")
+        if _is_near_duplicate(shingles, kept_shingles):
+            continue
+
+        if key:
+            seen_urls.add(key)
+        kept_shingles.append(shingles)
+        kept.append(result)
+
+    return kept
+
+
+def compact_search_results(
+    query: str,
+    response: dict[str, Any],
+    token_budget: int = 1500,
+    max_sentences_per_result: Optional[int] = 6,
+) -> str:
+    """Compact a search response into the most query-relevant text within a budget.
+
+    Results with duplicate URLs or near-duplicate content are dropped, each
+    remaining result is split into sentences, near-duplicate sentences across
+    results are removed, and sentences are ranked by BM25-style overlap with
+    the query (with a small bonus for higher-ranked results and earlier
+    sentences). The best sentences are packed greedily into ``token_budget``
+    and printed grouped by source in their original order.
+
+    Args:
+        query: The search query the results answer
+        response: Search response with optional ``answer`` and ``results``
+        token_budget: Approximate maximum tokens in the returned text
+        max_sentences_per_result: Cap on sentences kept from any one source
+
+    Returns:
+        Formatted text in the same layout as the raw search output
+    """
+    header: list[str] = []
+    if response.get("answer"):
+        header.append(f"Summary: {response['answer']}\n")
+    header.append("Search Results:")
+    budget = token_budget - estimate_tokens("\n".join(header))
+
+    results = _dedupe_results(response.get("results", []))
+
+    # Collect candidate sentences, dropping near-duplicates across sources
+    candidates: list[tuple[int, int, str, Counter]] = []
+    kept_shingles: list[set] = []
+    for r_index, result in enumerate(results):
+        for s_index, sentence in enumerate(split_sentences(result.get("content") or "")):
+            shingles = _shingles(sentence)
+            if _is_near_duplicate(shingles, kept_shingles):
+                continue
+            kept_shingles.append(shingles)
+            candidates.append((r_index, s_index, sentence, Counter(tokenize(sentence))))
+
+    # BM25-style relevance of each sentence to the query
+    query_terms = set(tokenize(query))
+    n = len(candidates)
+    doc_freqs = Counter(term for *_, terms in candidates for term in query_terms & terms.keys())
+    avg_length = sum(sum(t.values()) for *_, t in candidates) / n if n else 0.0
+
+    scored = []
+    for r_index, s_index, sentence, terms in candidates:
+        length = sum(terms.values())
+        norm = 1.2 * (0.25 + 0.75 * length / avg_length) if avg_length else 1.0
+        score = 0.0
+        for term in query_terms:
+            tf = terms.get(term, 0)
+            if tf:
+                idf = math.log(1 + (n - doc_freqs[term] + 0.5) / (doc_freqs[term] + 0.5))
+                score += idf * tf * 2.2 / (tf + norm)
+        score += 0.3 / (1 + r_index) + 0.2 / (1 + s_index)
+        scored.append((score, r_index, s_index, sentence))
+    scored.sort(key=lambda item: item[0], reverse=True)
+
+    # Greedily pack the best sentences; the first sentence of a source also pays for its header
+    selected: dict[int, list[tuple[int, str]]] = {}
+    for _, r_index, s_index, sentence in scored:
+        chosen = selected.get(r_index, [])
+        if max_sentences_per_result and len(chosen) >= max_sentences_per_result:
+            continue
+        cost = estimate_tokens(sentence) + 1
+        if not chosen:
+            result = results[r_index]
+            cost += estimate_tokens(f"{result.get('title', '')} {result.get('url', '')}") + 8
+        if cost > budget:
+            continue
+        budget -= cost
+        selected.setdefault(r_index, []).append((s_index, sentence))
+
+    lines = list(header)
+    for number, r_index in enumerate(sorted(selected), 1):
+        result = results[r_index]
+        sentences = " ".join(sentence for _, sentence in sorted(selected[r_index]))
+        lines.append(f"\n{number}. {result.get('title', 'No title')}")
+        lines.append(f"   URL: {result.get('url', 'N/A')}")
+        lines.append(f"   {sentences}")
+
+    return "\n".join(lines)
@@ -0,0 +1,66 @@
+"""Speculative parallel prefetch of the canonical company research queries."""
+
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+# The six topics every company research report covers, in report order
+COMPANY_RESEARCH_QUERIES: dict[str, str] = {
+    "Company overview": "{company} company overview what they do industry size",
+    "Recent news": "{company} latest news announcements",
+    "Products and services": "{company} products services pricing customers",
+    "Technology stack": "{company} technology stack engineering tools",
+    "Decision makers": "{company} leadership team CEO CTO VP executives",
+    "Funding and financials": "{company} funding round investors revenue",
+}
+
+
+def prefetch_company_research(
+    search: Callable[..., str],
+    company: str,
+    max_results: int = 5,
+    token_budget: int = 600,
+) -> str:
+    """Run the canonical company research queries in parallel.
+
+    Args:
+        search: Search function taking ``query``, ``max_results`` and
+            ``token_budget`` and returning formatted results
+        company: Company name to research
+        max_results: Results requested per query
+        token_budget: Token budget for each query's compacted results
+
+    Returns:
+        A ``<prefetched_research>`` block for the opening prompt, or an empty
+        string if every search failed (e.g. no search backend configured)
+    """
+    queries = {
+        topic: template.format(company=company)
+        for topic, template in COMPANY_RESEARCH_QUERIES.items()
+    }
+
+    def run(query: str) -> str:
+        try:
+            return search(query=query, max_results=max_results, token_budget=token_budget)
+        except Exception as e:
+            return f"Search error: {str(e)}"
+
+    # Each search runs in a copy of the caller's context so it keeps its priority and tenant
+    with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+        futures = {
+            topic: pool.submit(contextvars.copy_context().run, run, query)
+            for topic, query in queries.items()
+        }
+        results = {topic: future.result() for topic, future in futures.items()}
+
+    sections = []
+    for topic, result in results.items():
+        if result.startswith(("Error", "Search error")):
+            continue
+        sections.append(f"### {topic}\nQuery: {queries[topic]}\n\n{result}")
+
+    if not sections:
+        return ""
+
+    body = "\n\n".join(sections)
+    return f'<prefetched_research company="{company}">\n{body}\n</prefetched_research>'
@@ -0,0 +1,415 @@
+"""Pluggable storage for conversation state shared across worker processes.
+
+A web session's conversation normally lives in one process's memory, so a
+request routed to another gunicorn worker (or node) would see an empty
+session. A ``SessionBackend`` keeps each session's messages outside the
+process as an append-only log: a turn loads only the messages it has not
+seen yet and saves only the ones it added.
+
+Each session has an ``epoch`` that changes when its log is cleared, and a
+``length``. A worker compares both with what it last saw to decide whether
+to load the new tail or reload from scratch. Appends carry the state they
+expect, so two workers cannot interleave the same session's messages.
+
+A session can be forked: the child starts with its parent's current
+messages as an immutable prefix, which the backend shares rather than
+copies, and then appends only its own messages.
+
+Implementations: ``MemorySessionBackend`` (single process, the default),
+``SQLiteSessionBackend`` (local file, safe across processes on one host) and
+``JournalSessionBackend`` in ``journal`` (append-only file per session). A
+shared store (e.g. Redis lists or a SQL table) only needs the five methods
+of ``SessionBackend``.
+"""
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Optional, Protocol
+
+from pydantic import BaseModel, Field
+
+# Session IDs under which logs that forks still refer to are kept after a clear
+ARCHIVE_PREFIX = "archived:"
+
+
+class SessionState(BaseModel):
+    """Version of a session's message log."""
+
+    epoch: int = 0
+    length: int = 0
+    prefix: int = Field(0, description="Leading messages shared with the session forked from")
+
+
+class SessionConflict(Exception):
+    """The session changed since it was loaded (another worker wrote to it)."""
+
+
+class SessionBackend(Protocol):
+    """Append-only message logs keyed by session ID."""
+
+    def state(self, session_id: str) -> SessionState:
+        """Current epoch and length of a session's log."""
+        ...
+
+    def load(self, session_id: str, start: int = 0) -> tuple[SessionState, list[dict[str, Any]]]:
+        """The session's state and its messages from index ``start`` on."""
+        ...
+
+    def append(
+        self,
+        session_id: str,
+        messages: list[dict[str, Any]],
+        expected: SessionState,
+    ) -> SessionState:
+        """Append messages to a log still at ``expected``.
+
+        Raises:
+            SessionConflict: If the log is no longer at ``expected``
+        """
+        ...
+
+    def clear(self, session_id: str) -> SessionState:
+        """Empty a session's log and start a new epoch."""
+        ...
+
+    def fork(self, parent_id: str, session_id: str) -> SessionState:
+        """Start a new epoch of ``session_id`` that continues from the parent's log.
+
+        Raises:
+            ValueError: If a session would be forked from itself
+        """
+        ...
+
+
+class MemorySessionBackend:
+    """Process-local backend; the behaviour of a single-worker server."""
+
+    def __init__(self) -> None:
+        self._logs: dict[str, tuple[SessionState, list[dict[str, Any]]]] = {}
+        self._lock = threading.Lock()
+
+    def state(self, session_id: str) -> SessionState:
+        with self._lock:
+            return self._logs.get(session_id, (SessionState(), []))[0]
+
+    def load(self, session_id: str, start: int = 0) -> tuple[SessionState, list[dict[str, Any]]]:
+        with self._lock:
+            state, messages = self._logs.get(session_id, (SessionState(), []))
+            return state, [json.loads(json.dumps(m)) for m in messages[start:]]
+
+    def append(
+        self,
+        session_id: str,
+        messages: list[dict[str, Any]],
+        expected: SessionState,
+    ) -> SessionState:
+        with self._lock:
+            state, log = self._logs.get(session_id, (SessionState(), []))
+            if state != expected:
+                raise SessionConflict(f"Session {session_id} changed since it was loaded")
+            # Stored as copies, like any external store would
+            log = log + [json.loads(json.dumps(m)) for m in messages]
+            state = SessionState(epoch=state.epoch, length=len(log), prefix=state.prefix)
+            self._logs[session_id] = (state, log)
+            return state
+
+    def clear(self, session_id: str) -> SessionState:
+        with self._lock:
+            state = self._logs.get(session_id, (SessionState(), []))[0]
+            state = SessionState(epoch=state.epoch + 1, length=0)
+            self._logs[session_id] = (state, [])
+            return state
+
+    def fork(self, parent_id: str, session_id: str) -> SessionState:
+        if parent_id == session_id:
+            raise ValueError("A session cannot be forked from itself")
+        with self._lock:
+            log = self._logs.get(parent_id, (SessionState(), []))[1]
+            state = self._logs.get(session_id, (SessionState(), []))[0]
+            state = SessionState(epoch=state.epoch + 1, length=len(log), prefix=len(log))
+            # Stored messages are never mutated (appends build a new list), so
+            # the child refers to the parent's message objects
+            self._logs[session_id] = (state, list(log))
+            return state
+
+
+class SQLiteSessionBackend:
+    """SQLite backend, shared by every worker process on the host.
+
+    A forked session stores a reference to its parent (``base_id``,
+    ``base_length``) instead of copying the prefix. Clearing a session that
+    has forks moves its old log aside under an archive ID, so the forks keep
+    their prefix; archives are dropped once no fork refers to them.
+
+    Args:
+        path: Database file (created if missing)
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as db:
+            db.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS sessions (
+                    session_id TEXT PRIMARY KEY,
+                    epoch INTEGER NOT NULL,
+                    length INTEGER NOT NULL,
+                    base_id TEXT,
+                    base_length INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS sessions_base ON sessions (base_id);
+                CREATE TABLE IF NOT EXISTS messages (
+                    session_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (session_id, seq)
+                );
+                """
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread; WAL lets readers run while a worker writes
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def _row(self, db: sqlite3.Connection, session_id: str) -> tuple[int, int, Optional[str], int]:
+        row = db.execute(
+            "SELECT epoch, length, base_id, base_length FROM sessions WHERE session_id = ?",
+            (session_id,),
+        ).fetchone()
+        return row or (0, 0, None, 0)
+
+    def _state(self, db: sqlite3.Connection, session_id: str) -> SessionState:
+        epoch, length, _, base_length = self._row(db, session_id)
+        return SessionState(epoch=epoch, length=length, prefix=base_length)
+
+    def _messages(
+        self,
+        db: sqlite3.Connection,
+        session_id: str,
+        start: int,
+        end: Optional[int] = None,
+    ) -> list[dict[str, Any]]:
+        _, length, base_id, base_length = self._row(db, session_id)
+        end = length if end is None else end
+        messages = []
+        if base_id and start < base_length:
+            messages = self._messages(db, base_id, start, min(base_length, end))
+        rows = db.execute(
+            "SELECT data FROM messages WHERE session_id = ? AND seq >= ? AND seq < ? ORDER BY seq",
+            (session_id, max(start, base_length), end),
+        ).fetchall()
+        return messages + [json.loads(row[0]) for row in rows]
+
+    def _reset(self, db: sqlite3.Connection, session_id: str) -> tuple[int, Optional[str]]:
+        """Drop a session's log ahead of a new epoch; returns the old epoch and base."""
+        epoch, length, base_id, base_length = self._row(db, session_id)
+        if db.execute("SELECT 1 FROM sessions WHERE base_id = ?", (session_id,)).fetchone():
+            # Forks still read this log as their prefix: keep it under an archive ID
+            archive_id = f"{ARCHIVE_PREFIX}{session_id}:{epoch}"
+            db.execute(
+                "INSERT INTO sessions (session_id, epoch, length, base_id, base_length) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (archive_id, epoch, length, base_id, base_length),
+            )
+            db.execute(
+                "UPDATE messages SET session_id = ? WHERE session_id = ?", (archive_id, session_id)
+            )
+            db.execute(
+                "UPDATE sessions SET base_id = ? WHERE base_id = ?", (archive_id, session_id)
+            )
+            return epoch, None
+        db.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+        return epoch, base_id
+
+    def _release(self, db: sqlite3.Connection, base_id: Optional[str]) -> None:
+        """Delete an archived log, and its own base in turn, once nothing refers to it."""
+        while base_id and base_id.startswith(ARCHIVE_PREFIX):
+            if db.execute("SELECT 1 FROM sessions WHERE base_id = ?", (base_id,)).fetchone():
+                return
+            next_base = self._row(db, base_id)[2]
+            db.execute("DELETE FROM messages WHERE session_id = ?", (base_id,))
+            db.execute("DELETE FROM sessions WHERE session_id = ?", (base_id,))
+            base_id = next_base
+
+    def _write(
+        self,
+        db: sqlite3.Connection,
+        session_id: str,
+        state: SessionState,
+        base_id: Optional[str],
+    ) -> None:
+        db.execute(
+            "INSERT OR REPLACE INTO sessions (session_id, epoch, length, base_id, base_length) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (session_id, state.epoch, state.length, base_id, state.prefix),
+        )
+
+    def state(self, session_id: str) -> SessionState:
+        return self._state(self._connect(), session_id)
+
+    def load(self, session_id: str, start: int = 0) -> tuple[SessionState, list[dict[str, Any]]]:
+        db = self._connect()
+        db.execute("BEGIN")
+        try:
+            state = self._state(db, session_id)
+            messages = self._messages(db, session_id, start)
+        finally:
+            db.execute("COMMIT")
+        return state, messages
+
+    def append(
+        self,
+        session_id: str,
+        messages: list[dict[str, Any]],
+        expected: SessionState,
+    ) -> SessionState:
+        db = self._connect()
+        # IMMEDIATE takes the write lock up front, so the check and insert are atomic
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            state = self._state(db, session_id)
+            if state != expected:
+                raise SessionConflict(f"Session {session_id} changed since it was loaded")
+            db.executemany(
+                "INSERT INTO messages (session_id, seq, data) VALUES (?, ?, ?)",
+                [
+                    (session_id, state.length + i, json.dumps(message))
+                    for i, message in enumerate(messages)
+                ],
+            )
+            state = SessionState(
+                epoch=state.epoch, length=state.length + len(messages), prefix=state.prefix
+            )
+            self._write(db, session_id, state, self._row(db, session_id)[2])
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+        return state
+
+    def clear(self, session_id: str) -> SessionState:
+        db = self._connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            epoch, old_base = self._reset(db, session_id)
+            state = SessionState(epoch=epoch + 1, length=0)
+            self._write(db, session_id, state, None)
+            self._release(db, old_base)
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+        return state
+
+    def fork(self, parent_id: str, session_id: str) -> SessionState:
+        if parent_id == session_id:
+            raise ValueError("A session cannot be forked from itself")
+        db = self._connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            length = self._row(db, parent_id)[1]
+            epoch, old_base = self._reset(db, session_id)
+            state = SessionState(epoch=epoch + 1, length=length, prefix=length)
+            self._write(db, session_id, state, parent_id)
+            self._release(db, old_base)
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+        return state
+
+
+class SessionSync:
+    """Keeps one in-process conversation in step with its session's log.
+
+    Args:
+        backend: Where the session's messages are stored
+        session_id: The session
+    """
+
+    def __init__(self, backend: SessionBackend, session_id: str):
+        self.backend = backend
+        self.session_id = session_id
+        self.state = SessionState()
+
+    def pull(self, messages: list[dict[str, Any]]) -> Optional[list[dict[str, Any]]]:
+        """Bring ``messages`` up to date with the log.
+
+        New messages written by other workers are appended in place. If the
+        log was cleared or replaced, the full log is returned instead and
+        the caller should replace its conversation with it.
+        """
+        current = self.backend.state(self.session_id)
+        if current == self.state and len(messages) == current.length:
+            return None
+        if current.epoch == self.state.epoch and len(messages) == self.state.length:
+            self.state, new = self.backend.load(self.session_id, start=self.state.length)
+            messages.extend(new)
+            return None
+        self.state, log = self.backend.load(self.session_id)
+        return log
+
+    def push(self, messages: list[dict[str, Any]]) -> None:
+        """Save the messages added since the last pull or push.
+
+        Raises:
+            SessionConflict: If another worker wrote to the session meanwhile
+        """
+        new = messages[self.state.length:]
+        if new:
+            self.state = self.backend.append(self.session_id, new, self.state)
+
+    def clear(self) -> None:
+        """Clear the session's log for every worker."""
+        self.state = self.backend.clear(self.session_id)
+
+
+_backends: dict[tuple[str, Optional[Path]], SessionBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def get_session_backend(
+    kind: str = "memory",
+    path: Optional[Path] = None,
+    compress: bool = False,
+    snapshot_every: int = 512,
+) -> SessionBackend:
+    """Get the process-wide session backend of a kind ("memory", "sqlite" or "journal").
+
+    Args:
+        kind: Backend kind
+        path: SQLite database file, or journal directory
+        compress: zstd-compress journal records
+        snapshot_every: Messages appended to a journal between compactions
+
+    Raises:
+        ValueError: If the kind is unknown or a file backend has no path
+    """
+    key = (kind, Path(path).resolve() if path else None)
+    with _backends_lock:
+        if key not in _backends:
+            if kind == "memory":
+                _backends[key] = MemorySessionBackend()
+            elif kind == "sqlite":
+                if not path:
+                    raise ValueError("The sqlite session backend needs a database path")
+                _backends[key] = SQLiteSessionBackend(path)
+            elif kind == "journal":
+                if not path:
+                    raise ValueError("The journal session backend needs a directory")
+                from .journal import JournalSessionBackend
+
+                _backends[key] = JournalSessionBackend(path, compress, snapshot_every)
+            else:
+                raise ValueError(f"Unknown session backend: {kind}")
+        return _backends[key]
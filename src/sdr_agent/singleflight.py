@@ -0,0 +1,143 @@
+"""Single-flight deduplication of concurrent identical work.
+
+When several callers ask for the same thing at once (e.g. two reps researching
+the same company), only the first caller's work runs; the others attach to it
+and receive the same result or the same stream of events. Once a flight
+finishes it is forgotten, so later requests start fresh.
+"""
+
+import contextvars
+import threading
+from typing import Callable, Generic, Hashable, Iterable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Flight(Generic[T]):
+    """One in-progress unit of work and everything it has produced so far."""
+
+    def __init__(self) -> None:
+        self.events: list[T] = []
+        self.result: Optional[T] = None
+        self.error: Optional[BaseException] = None
+        self.done = False
+        self.subscribers = 1
+        self._cond = threading.Condition()
+
+    def publish(self, event: T) -> None:
+        with self._cond:
+            self.events.append(event)
+            self._cond.notify_all()
+
+    def finish(self, result: Optional[T] = None, error: Optional[BaseException] = None) -> None:
+        with self._cond:
+            self.result = result
+            self.error = error
+            self.done = True
+            self._cond.notify_all()
+
+    def wait(self) -> T:
+        """Block until the flight finishes and return its result."""
+        with self._cond:
+            while not self.done:
+                self._cond.wait()
+        if self.error:
+            raise self.error
+        return self.result
+
+    def replay(self) -> Iterator[T]:
+        """Yield every event from the start, then new ones as they are published."""
+        index = 0
+        while True:
+            with self._cond:
+                while index >= len(self.events) and not self.done:
+                    self._cond.wait()
+                if index >= len(self.events):
+                    break
+                event = self.events[index]
+            index += 1
+            yield event
+        if self.error:
+            raise self.error
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution."""
+
+    def __init__(self) -> None:
+        self._flights: dict[Hashable, Flight] = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key: Hashable) -> tuple[Flight, bool]:
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight:
+                flight.subscribers += 1
+                return flight, False
+            flight = self._flights[key] = Flight()
+            return flight, True
+
+    def _land(self, key: Hashable, flight: Flight) -> None:
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def in_flight(self) -> int:
+        """Number of distinct keys currently running."""
+        with self._lock:
+            return len(self._flights)
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> tuple[T, bool]:
+        """Run ``fn`` unless an identical call is already running.
+
+        Returns:
+            Tuple of (result, shared) where ``shared`` is True if this caller
+            attached to another caller's execution
+        """
+        flight, leader = self._join(key)
+        if not leader:
+            return flight.wait(), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            flight.finish(error=e)
+            raise
+        else:
+            flight.finish(result=result)
+            return result, False
+        finally:
+            self._land(key, flight)
+
+    def stream(
+        self,
+        key: Hashable,
+        factory: Callable[[], Iterable[T]],
+    ) -> tuple[Iterator[T], bool]:
+        """Share one event stream between concurrent callers.
+
+        The leader's ``factory`` is consumed in a background thread (in a copy
+        of the leader's context), so the run completes for every subscriber
+        even if the caller that started it disconnects.
+
+        Returns:
+            Tuple of (event iterator, shared)
+        """
+        flight, leader = self._join(key)
+        if leader:
+            context = contextvars.copy_context()
+
+            def produce() -> None:
+                try:
+                    for event in factory():
+                        flight.publish(event)
+                except BaseException as e:
+                    flight.finish(error=e)
+                else:
+                    flight.finish()
+                finally:
+                    self._land(key, flight)
+
+            threading.Thread(target=context.run, args=(produce,), daemon=True).start()
+
+        return flight.replay(), not leader
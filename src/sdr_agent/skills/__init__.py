@@ -1,6 +1,7 @@
 """Agent Skills modules."""
 
 from .executor import SkillExecutor
+from .index import SkillDocIndex
 from .loader import Skill, SkillLoader
 
-__all__ = ["SkillLoader", "Skill", "SkillExecutor"]
+__all__ = ["SkillLoader", "Skill", "SkillExecutor", "SkillDocIndex"]
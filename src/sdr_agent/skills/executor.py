@@ -1,12 +1,26 @@
 """Skill executor for running skill scripts and handling tool calls."""
 
+import asyncio
+import json
 import subprocess
 import sys
-from typing import Any, Optional
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Optional
 
 from tavily import TavilyClient
 
-from .loader import Skill, SkillLoader
+from ..accounts import ResearchStore
+from ..metrics import SEARCH_LATENCY
+from ..scheduler import RequestScheduler
+from ..scoring import ScoringModel, format_lead_scores, read_leads_csv, score_leads
+from ..search.compaction import compact_search_results
+from ..tools import Tool, ToolPolicy, ToolRegistry
+from .index import SkillDocIndex
+from .loader import Skill, SkillLoader, SkillTool
+from .workers import ScriptWorkerPool, get_script_pool
+
+if TYPE_CHECKING:
+    from ..results import ToolResultStore
 
 
 class SkillExecutor:
@@ -16,54 +30,308 @@ class SkillExecutor:
         self,
         skill_loader: SkillLoader,
         tavily_api_key: Optional[str] = None,
+        script_workers: int = 2,
+        script_timeout: float = 60.0,
+        script_memory_limit_mb: Optional[int] = 512,
+        search_token_budget: int = 1500,
+        search_scheduler: Optional[RequestScheduler] = None,
+        scoring_model: Optional[ScoringModel] = None,
+        leads_dir: Optional[Path] = None,
+        research_store: Optional[ResearchStore] = None,
+        result_store: Optional["ToolResultStore"] = None,
+        tools: Optional[ToolRegistry] = None,
+        tool_timeout: Optional[float] = 120.0,
+        tool_cache_ttl: float = 600.0,
     ):
         self.skill_loader = skill_loader
         self.tavily_client = TavilyClient(api_key=tavily_api_key) if tavily_api_key else None
+        self.doc_index = SkillDocIndex(skill_loader)
+        self.script_workers = script_workers
+        self.script_timeout = script_timeout
+        self.script_memory_limit_mb = script_memory_limit_mb
+        self.search_token_budget = search_token_budget
+        self.search_scheduler = search_scheduler
+        self.scoring_model = scoring_model
+        self.leads_dir = leads_dir
+        self.research_store = research_store
+        self.result_store = result_store
+        self.tool_timeout = tool_timeout
+        self.tool_cache_ttl = tool_cache_ttl
+        self.tools = tools if tools is not None else ToolRegistry()
+        self.register_tools()
+
+    @property
+    def script_pool(self) -> Optional[ScriptWorkerPool]:
+        """Shared warm worker pool for Python scripts, or None if disabled."""
+        if self.script_workers <= 0:
+            return None
+        return get_script_pool(
+            self.script_workers, self.script_timeout, self.script_memory_limit_mb
+        )
+
+    def register_tools(self) -> None:
+        """Register the built-in tools and the tools declared by skills."""
+        slow = ToolPolicy(timeout=self.tool_timeout)
+        cached = ToolPolicy(timeout=self.tool_timeout, cache_ttl=self.tool_cache_ttl)
+        self.tools.register(
+            Tool(
+                name="web_search",
+                description=(
+                    "Search the web for information about a company, person, or topic. "
+                    "Use this to research prospects and companies."
+                ),
+                summary="Search the web for information about companies, people, or topics",
+                input_schema={
+                    "type": "object",
+                    "properties": {
+                        "query": {
+                            "type": "string",
+                            "description": "The search query",
+                        },
+                        "max_results": {
+                            "type": "integer",
+                            "description": "Maximum number of results (default: 5)",
+                            "default": 5,
+                        },
+                    },
+                    "required": ["query"],
+                },
+                handler=self._execute_web_search,
+                policy=cached,
+            )
+        )
+        self.tools.register(
+            Tool(
+                name="read_skill",
+                description=(
+                    "Load the full instructions from an agent skill. "
+                    "Use this when you need detailed guidance on a specific task."
+                ),
+                summary="Load detailed instructions from a skill",
+                input_schema={
+                    "type": "object",
+                    "properties": {
+                        "skill_name": {
+                            "type": "string",
+                            "description": "Name of the skill to load",
+                        },
+                    },
+                    "required": ["skill_name"],
+                },
+                handler=self._execute_read_skill,
+            )
+        )
+        self.tools.register(
+            Tool(
+                name="search_skill_docs",
+                description=(
+                    "Search all skill instructions and reference documents and return only "
+                    "the most relevant sections. Prefer this over read_skill when you need "
+                    "guidance on one specific point (e.g. subject lines, funding sources)."
+                ),
+                summary=(
+                    "Retrieve the most relevant sections from skill instructions and references"
+                ),
+                input_schema={
+                    "type": "object",
+                    "properties": {
+                        "query": {
+                            "type": "string",
+                            "description": "What you need guidance on",
+                        },
+                        "top_k": {
+                            "type": "integer",
+                            "description": "Number of sections to return (default: 3)",
+                            "default": 3,
+                        },
+                        "skill_name": {
+                            "type": "string",
+                            "description": "Optionally restrict the search to one skill",
+                        },
+                    },
+                    "required": ["query"],
+                },
+                handler=self._execute_search_skill_docs,
+                policy=ToolPolicy(cache_ttl=self.tool_cache_ttl),
+            )
+        )
+        self.tools.register(
+            Tool(
+                name="find_lookalikes",
+                description=(
+                    "Find previously researched accounts most similar to a company "
+                    "(or to a description of an ideal account), without new web searches."
+                ),
+                summary="Find previously researched accounts similar to a company or profile",
+                input_schema={
+                    "type": "object",
+                    "properties": {
+                        "company": {
+                            "type": "string",
+                            "description": "A company that has already been researched",
+                        },
+                        "description": {
+                            "type": "string",
+                            "description": "Free-text account profile (industry, size, ...)",
+                        },
+                        "top_k": {
+                            "type": "integer",
+                            "description": "Number of accounts to return (default: 5)",
+                            "default": 5,
+                        },
+                    },
+                },
+                handler=self._execute_find_lookalikes,
+                policy=slow,
+            )
+        )
+        self.tools.register(
+            Tool(
+                name="score_leads",
+                description=(
+                    "Score, tier and rank a whole list of leads with the lead-qualifier "
+                    "scoring model (ICP fit and engagement signals). Returns tier counts, "
+                    "the top leads and the borderline leads that deserve a closer look. "
+                    "Use this instead of scoring leads one by one."
+                ),
+                summary=(
+                    "Score and tier a whole lead list (CSV file or JSON rows) with the "
+                    "lead-qualifier scoring model; only discuss the leads it flags as "
+                    "borderline in detail"
+                ),
+                input_schema={
+                    "type": "object",
+                    "properties": {
+                        "csv_path": {
+                            "type": "string",
+                            "description": (
+                                "Path to a CSV file of leads with a header row, "
+                                "inside the data directory"
+                            ),
+                        },
+                        "leads": {
+                            "type": "array",
+                            "items": {"type": "object"},
+                            "description": "Leads as objects of column name to value",
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": "Number of top and borderline leads to list",
+                            "default": 20,
+                        },
+                    },
+                },
+                handler=self._execute_score_leads,
+                # Scoring a large list is CPU-bound
+                policy=ToolPolicy(timeout=self.tool_timeout, max_concurrency=2),
+            )
+        )
+        if self.result_store is not None:
+            self.tools.register(
+                Tool(
+                    name="fetch_result",
+                    description=(
+                        "Fetch the full text of an earlier tool result that was replaced "
+                        "by a digest, or one section of it. Use this only when the digest "
+                        "lacks a detail you need."
+                    ),
+                    summary=(
+                        "Earlier large tool results are shown as a digest with a handle; "
+                        "fetch the full result or one section only when the digest lacks "
+                        "a detail you need"
+                    ),
+                    input_schema={
+                        "type": "object",
+                        "properties": {
+                            "handle": {
+                                "type": "string",
+                                "description": "The result handle (res_...) from the digest",
+                            },
+                            "section": {
+                                "type": "string",
+                                "description": "Section number or title (omit for all of it)",
+                            },
+                        },
+                        "required": ["handle"],
+                    },
+                    handler=self._execute_fetch_result,
+                )
+            )
+
+        for skill in self.skill_loader._skills.values():
+            for spec in skill.metadata.tools:
+                # Built-in tools and earlier skills keep their names
+                if spec.name not in self.tools:
+                    self.tools.register(self._skill_tool(skill, spec))
+
+    def _skill_tool(self, skill: Skill, spec: SkillTool) -> Tool:
+        """A tool that runs one of a skill's scripts with the tool input as its argument."""
+
+        async def handler(tool_input: dict[str, Any]) -> str:
+            success, output = await self.run_skill_script_async(
+                skill, spec.script, [json.dumps(tool_input)], timeout=spec.timeout
+            )
+            return output if success else f"Error: {output}"
+
+        return Tool(
+            name=spec.name,
+            description=spec.description,
+            input_schema=spec.input_schema,
+            handler=handler,
+            # The script runner enforces the timeout and stops the script
+            policy=ToolPolicy(
+                cache_ttl=spec.cache_ttl,
+                idempotent=spec.idempotent,
+                max_concurrency=spec.max_concurrency,
+            ),
+        )
 
     def execute_tool(self, tool_name: str, tool_input: dict[str, Any]) -> str:
         """Execute a tool and return the result."""
-        if tool_name == "web_search":
-            return self._execute_web_search(tool_input)
-        elif tool_name == "read_skill":
-            return self._execute_read_skill(tool_input)
-        else:
-            return f"Unknown tool: {tool_name}"
+        return self.tools.execute(tool_name, tool_input)
 
     def _execute_web_search(self, tool_input: dict[str, Any]) -> str:
         """Execute a web search using Tavily."""
-        query = tool_input.get("query", "")
-        max_results = tool_input.get("max_results", 5)
+        return self.web_search(
+            query=tool_input.get("query", ""),
+            max_results=tool_input.get("max_results", 5),
+        )
 
+    def web_search(
+        self,
+        query: str,
+        max_results: int = 5,
+        token_budget: Optional[int] = None,
+    ) -> str:
+        """Search the web and return results compacted to a token budget."""
         if not self.tavily_client:
             return (
                 "Error: Tavily API key not configured. "
                 "Please set TAVILY_API_KEY in your environment."
             )
 
-        try:
-            response = self.tavily_client.search(
-                query=query,
-                max_results=max_results,
-                include_answer=True,
-            )
-
-            # Format the results
-            results = []
-
-            if response.get("answer"):
-                results.append(f"Summary: {response['answer']}\n")
-
-            results.append("Search Results:")
-            for i, result in enumerate(response.get("results", []), 1):
-                results.append(f"\n{i}. {result.get('title', 'No title')}")
-                results.append(f"   URL: {result.get('url', 'N/A')}")
-                results.append(f"   {result.get('content', 'No content')[:500]}")
-
-            return "\n".join(results)
+        def search() -> dict[str, Any]:
+            with SEARCH_LATENCY.time():
+                return self.tavily_client.search(
+                    query=query,
+                    max_results=max_results,
+                    include_answer=True,
+                )
 
+        try:
+            if self.search_scheduler:
+                response = self.search_scheduler.call(search)
+            else:
+                response = search()
         except Exception as e:
             return f"Search error: {str(e)}"
 
+        return compact_search_results(
+            query,
+            response,
+            token_budget=token_budget or self.search_token_budget,
+        )
+
     def _execute_read_skill(self, tool_input: dict[str, Any]) -> str:
         """Load and return skill instructions."""
         skill_name = tool_input.get("skill_name", "")
@@ -75,19 +343,123 @@ class SkillExecutor:
 
         return f"# {skill.name}\n\n{skill.instructions}"
 
+    def _execute_search_skill_docs(self, tool_input: dict[str, Any]) -> str:
+        """Return the most relevant sections across skill instructions and references."""
+        query = tool_input.get("query", "")
+        top_k = tool_input.get("top_k", 3)
+        skill_name = tool_input.get("skill_name")
+
+        if not query:
+            return "Error: query is required"
+
+        hits = self.doc_index.search(query, top_k=top_k, skill_name=skill_name)
+        if not hits:
+            return f"No skill documentation found for: {query}"
+
+        sections = [f"## {section.title}\n\n{section.content}" for section, _ in hits]
+        return "\n\n---\n\n".join(sections)
+
+    def _execute_score_leads(self, tool_input: dict[str, Any]) -> str:
+        """Score a lead list deterministically and summarize the ranking."""
+        csv_path = tool_input.get("csv_path")
+        leads = tool_input.get("leads")
+        limit = tool_input.get("limit", 20)
+
+        if csv_path:
+            path = self._leads_path(csv_path)
+            if path is None:
+                return "Error: csv_path must be a file in the data directory"
+            try:
+                leads = read_leads_csv(path)
+            except (OSError, UnicodeDecodeError) as e:
+                return f"Error reading leads CSV: {str(e)}"
+        if not leads:
+            return "Error: csv_path or leads is required"
+        if not isinstance(leads, list) or not all(isinstance(lead, dict) for lead in leads):
+            return "Error: leads must be a list of objects of column name to value"
+
+        return format_lead_scores(score_leads(leads, self.scoring_model), limit=limit)
+
+    def _leads_path(self, csv_path: str) -> Optional[Path]:
+        """Resolve a model-supplied CSV path, or None if it is outside ``leads_dir``."""
+        if self.leads_dir is None:
+            return None
+        root = Path(self.leads_dir).resolve()
+        path = (root / csv_path).resolve()
+        return path if path.is_relative_to(root) else None
+
+    def _execute_find_lookalikes(self, tool_input: dict[str, Any]) -> str:
+        """Find previously researched accounts similar to a company or profile."""
+        company = tool_input.get("company")
+        description = tool_input.get("description")
+        top_k = tool_input.get("top_k", 5)
+
+        if not self.research_store:
+            return "Error: research store is disabled"
+        if not company and not description:
+            return "Error: company or description is required"
+
+        try:
+            lookalikes = self.research_store.find_lookalikes(company, description, top_k)
+        except KeyError:
+            return (
+                f"No stored research for {company}. Research the company first "
+                "or pass a description of the account."
+            )
+        if not lookalikes:
+            return "No similar accounts found in stored research."
+
+        lines = [f"Accounts most similar to {company or 'the description'}:"]
+        for rank, account in enumerate(lookalikes, start=1):
+            facts = ", ".join(f"{k}: {v}" for k, v in account.attributes.items())
+            lines.append(
+                f"{rank}. {account.company} (similarity {account.score:.2f})"
+                + (f" - {facts}" if facts else "")
+            )
+        return "\n".join(lines)
+
+    def _execute_fetch_result(self, tool_input: dict[str, Any]) -> str:
+        """Return a stored tool result, or one section of it, by handle."""
+        if self.result_store is None:
+            return "Error: tool result store is disabled"
+        return self.result_store.fetch(
+            tool_input.get("handle", ""),
+            section=tool_input.get("section"),
+            max_tokens=self.search_token_budget,
+        )
+
     def run_skill_script(
         self,
         skill: Skill,
         script_name: str,
         args: list[str] = None,
+        timeout: Optional[float] = None,
+        on_output: Optional[Callable[[str], None]] = None,
     ) -> tuple[bool, str]:
-        """Run a script from a skill's scripts directory."""
+        """Run a script from a skill's scripts directory.
+
+        Python scripts run in the warm worker pool, which streams output to
+        ``on_output`` as it is produced. Other scripts run as a subprocess.
+        """
         script_path = skill.scripts_dir / script_name
 
         if not script_path.exists():
             return False, f"Script not found: {script_name}"
 
         args = args or []
+        timeout = timeout if timeout is not None else self.script_timeout
+
+        pool = self.script_pool
+        if script_path.suffix == ".py" and pool:
+            try:
+                result = pool.run(
+                    script_path, args, cwd=skill.path, timeout=timeout, on_output=on_output
+                )
+            except Exception as e:
+                return False, f"Script execution error: {str(e)}"
+            if result.timed_out:
+                return False, "Script execution timed out"
+            return result.returncode == 0, result.output
 
         try:
             # Determine how to run the script based on extension
@@ -103,7 +475,7 @@ class SkillExecutor:
                 cmd,
                 capture_output=True,
                 text=True,
-                timeout=60,
+                timeout=timeout,
                 cwd=skill.path,
             )
 
@@ -111,6 +483,9 @@ class SkillExecutor:
             if result.stderr:
                 output += f"\nStderr: {result.stderr}"
 
+            if on_output and output:
+                on_output(output)
+
             return result.returncode == 0, output
 
         except subprocess.TimeoutExpired:
@@ -118,6 +493,19 @@ class SkillExecutor:
         except Exception as e:
             return False, f"Script execution error: {str(e)}"
 
+    async def run_skill_script_async(
+        self,
+        skill: Skill,
+        script_name: str,
+        args: list[str] = None,
+        timeout: Optional[float] = None,
+        on_output: Optional[Callable[[str], None]] = None,
+    ) -> tuple[bool, str]:
+        """Async variant of run_skill_script so several runs can overlap."""
+        return await asyncio.to_thread(
+            self.run_skill_script, skill, script_name, args, timeout, on_output
+        )
+
     def get_skill_reference(self, skill_name: str, reference_name: str) -> Optional[str]:
         """Get a reference document from a skill."""
         return self.skill_loader.load_reference(skill_name, reference_name)
@@ -0,0 +1,151 @@
+"""Section-level BM25 index over skill instructions and reference documents."""
+
+import math
+import re
+from collections import Counter
+from typing import Optional
+
+from pydantic import BaseModel
+
+from ..text import tokenize
+from .loader import SkillLoader
+
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+FENCE_PATTERN = re.compile(r"^\s*(```|~~~)")
+
+
+class DocSection(BaseModel):
+    """A single heading-delimited section of a skill document."""
+
+    skill: str
+    source: str
+    heading: str
+    content: str
+
+    @property
+    def title(self) -> str:
+        """Human-readable location of the section."""
+        return f"{self.skill} / {self.source} / {self.heading}"
+
+
+def split_sections(text: str, skill: str, source: str) -> list[DocSection]:
+    """Split markdown into sections at headings, ignoring headings inside code fences.
+
+    Each section's heading is the full path of enclosing headings (e.g.
+    ``Email Structure > Subject Line``) so that short subsections stay
+    searchable by their parent topic.
+    """
+    sections: list[DocSection] = []
+    stack: list[tuple[int, str]] = []
+    lines: list[str] = []
+    heading = "Introduction"
+    in_fence = False
+
+    def flush() -> None:
+        content = "\n".join(lines).strip()
+        if content:
+            sections.append(
+                DocSection(skill=skill, source=source, heading=heading, content=content)
+            )
+
+    for line in text.splitlines():
+        if FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+        match = None if in_fence else HEADING_PATTERN.match(line)
+        if not match:
+            lines.append(line)
+            continue
+
+        flush()
+        level = len(match.group(1))
+        while stack and stack[-1][0] >= level:
+            stack.pop()
+        stack.append((level, match.group(2)))
+        heading = " > ".join(title for _, title in stack)
+        lines = []
+
+    flush()
+    return sections
+
+
+class SkillDocIndex:
+    """In-process BM25 index over the sections of all skills' documents."""
+
+    def __init__(self, skill_loader: SkillLoader, k1: float = 1.5, b: float = 0.75):
+        self.skill_loader = skill_loader
+        self.k1 = k1
+        self.b = b
+        self.sections: list[DocSection] = []
+        self._term_freqs: list[Counter] = []
+        self._doc_lengths: list[int] = []
+        self._doc_freqs: Counter = Counter()
+        self._avg_length = 0.0
+        self._built = False
+
+    def build(self) -> int:
+        """(Re)build the index from the loader's skills. Returns the section count."""
+        self.sections = []
+        for skill in self.skill_loader._skills.values():
+            self.sections.extend(split_sections(skill.instructions, skill.name, "SKILL.md"))
+            if skill.references_dir.is_dir():
+                for ref_path in sorted(skill.references_dir.glob("*.md")):
+                    try:
+                        text = ref_path.read_text()
+                    except Exception:
+                        continue
+                    self.sections.extend(
+                        split_sections(text, skill.name, f"references/{ref_path.name}")
+                    )
+
+        self._term_freqs = []
+        self._doc_lengths = []
+        self._doc_freqs = Counter()
+        for section in self.sections:
+            # Headings are counted twice so a match on the topic outranks a passing mention
+            terms = tokenize(section.heading) * 2 + tokenize(section.content)
+            freqs = Counter(terms)
+            self._term_freqs.append(freqs)
+            self._doc_lengths.append(len(terms))
+            self._doc_freqs.update(freqs.keys())
+
+        total = sum(self._doc_lengths)
+        self._avg_length = total / len(self._doc_lengths) if self._doc_lengths else 0.0
+        self._built = True
+        return len(self.sections)
+
+    def _idf(self, term: str) -> float:
+        n = len(self.sections)
+        df = self._doc_freqs.get(term, 0)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 3,
+        skill_name: Optional[str] = None,
+    ) -> list[tuple[DocSection, float]]:
+        """Return the top-k sections for a query as (section, score) pairs."""
+        if not self._built:
+            self.build()
+
+        terms = set(tokenize(query))
+        if not terms or not self.sections:
+            return []
+
+        idf = {term: self._idf(term) for term in terms}
+        scored = []
+        for i, section in enumerate(self.sections):
+            if skill_name and section.skill != skill_name:
+                continue
+            freqs = self._term_freqs[i]
+            norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[i] / self._avg_length)
+            score = 0.0
+            for term in terms:
+                tf = freqs.get(term, 0)
+                if tf:
+                    score += idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            if score > 0:
+                scored.append((section, score))
+
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:top_k]
@@ -5,7 +5,21 @@ from pathlib import Path
 from typing import Optional
 
 import yaml
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
+
+
+class SkillTool(BaseModel):
+    """A tool a skill provides by running one of its scripts with the tool input as JSON."""
+
+    name: str
+    description: str
+    script: str
+    input_schema: dict = Field(default_factory=lambda: {"type": "object", "properties": {}})
+    timeout: Optional[float] = None
+    cache_ttl: float = 0.0
+    # Scripts may have side effects; skills opt in to caching and parallel calls
+    idempotent: bool = False
+    max_concurrency: Optional[int] = None
 
 
 class SkillMetadata(BaseModel):
@@ -17,6 +31,7 @@ class SkillMetadata(BaseModel):
     compatibility: Optional[str] = None
     metadata: dict = Field(default_factory=dict)
     allowed_tools: Optional[str] = None
+    tools: list[SkillTool] = Field(default_factory=list)
 
 
 class Skill(BaseModel):
@@ -107,6 +122,7 @@ class SkillLoader:
             compatibility=frontmatter.get("compatibility"),
             metadata=frontmatter.get("metadata", {}),
             allowed_tools=frontmatter.get("allowed-tools"),
+            tools=self._parse_tools(frontmatter.get("tools")),
         )
 
         return Skill(
@@ -117,6 +133,18 @@ class SkillLoader:
             metadata=metadata,
         )
 
+    def _parse_tools(self, entries: object) -> list[SkillTool]:
+        """Parse the ``tools`` frontmatter list, skipping malformed entries."""
+        if not isinstance(entries, list):
+            return []
+        tools = []
+        for entry in entries:
+            try:
+                tools.append(SkillTool.model_validate(entry))
+            except ValidationError:
+                continue
+        return tools
+
     def get_skill(self, name: str) -> Optional[Skill]:
         """Get a skill by name."""
         return self._skills.get(name)
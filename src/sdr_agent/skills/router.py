@@ -0,0 +1,81 @@
+"""Local skill routing so common requests skip the read_skill round trip."""
+
+from collections import defaultdict
+from typing import Optional
+
+from ..text import tokenize
+from .loader import SkillLoader
+
+NAME_WEIGHT = 3.0
+TAG_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+
+
+def _stem(term: str) -> str:
+    """Very light plural stemming so "emails" matches "email"."""
+    if len(term) > 3 and term.endswith("s") and not term.endswith("ss"):
+        return term[:-1]
+    return term
+
+
+def _terms(text: str) -> set[str]:
+    return {_stem(t) for t in tokenize(text)}
+
+
+class SkillRouter:
+    """Classify a request against skill names, tags and descriptions.
+
+    Each query term scores the strongest field it matches in a skill (name,
+    then tags, then description), divided by the number of skills sharing the
+    term so generic words like "sales" or "research" do not decide the route.
+    A route is only returned when the best score clears ``threshold`` and beats
+    the runner-up by ``margin``.
+    """
+
+    def __init__(self, skill_loader: SkillLoader, threshold: float = 2.0, margin: float = 1.0):
+        self.skill_loader = skill_loader
+        self.threshold = threshold
+        self.margin = margin
+        self._weights: Optional[dict[str, dict[str, float]]] = None
+
+    def _build(self) -> dict[str, dict[str, float]]:
+        weights: dict[str, dict[str, float]] = {}
+        for skill in self.skill_loader._skills.values():
+            term_weights: dict[str, float] = defaultdict(float)
+            tags = str(skill.metadata.metadata.get("tags", "")).replace(",", " ")
+            for weight, text in (
+                (DESCRIPTION_WEIGHT, skill.description),
+                (TAG_WEIGHT, tags),
+                (NAME_WEIGHT, skill.name.replace("-", " ")),
+            ):
+                for term in _terms(text):
+                    term_weights[term] = max(term_weights[term], weight)
+            weights[skill.name] = dict(term_weights)
+        return weights
+
+    def scores(self, message: str) -> dict[str, float]:
+        """Score every skill against a message."""
+        if self._weights is None:
+            self._weights = self._build()
+
+        query = _terms(message)
+        shared: dict[str, int] = defaultdict(int)
+        for term_weights in self._weights.values():
+            for term in query & term_weights.keys():
+                shared[term] += 1
+
+        return {
+            name: sum(term_weights[t] / shared[t] for t in query & term_weights.keys())
+            for name, term_weights in self._weights.items()
+        }
+
+    def route(self, message: str) -> Optional[str]:
+        """Return the best-matching skill name, or None if nothing is confident."""
+        ranked = sorted(self.scores(message).items(), key=lambda item: item[1], reverse=True)
+        if not ranked:
+            return None
+        name, score = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        if score < self.threshold or score - runner_up < self.margin:
+            return None
+        return name
@@ -0,0 +1,292 @@
+"""Warm worker pool for running Python skill scripts without interpreter startup."""
+
+import asyncio
+import codecs
+import multiprocessing
+import os
+import runpy
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Callable, Optional
+
+from pydantic import BaseModel
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+
+class ScriptResult(BaseModel):
+    """Outcome of a script run in a worker."""
+
+    returncode: int
+    output: str
+    timed_out: bool = False
+    duration: float = 0.0
+
+
+def _forward_output(read_fd: int, conn) -> None:
+    """Relay everything written to the worker's stdout/stderr back to the pool."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    while True:
+        chunk = os.read(read_fd, 4096)
+        if not chunk:
+            break
+        text = decoder.decode(chunk)
+        if text:
+            conn.send(("output", text))
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        conn.send(("output", tail))
+    os.close(read_fd)
+
+
+def _worker_main(conn) -> None:
+    """Entry point of a warm worker: wait for a single job, run it, then exit.
+
+    Workers are one-shot so that no module state, globals or open files leak
+    from one skill's script into another's.
+    """
+    try:
+        job = conn.recv()
+    except EOFError:
+        return
+    if job is None:
+        return
+
+    script_path, args, cwd, memory_limit = job
+
+    # Route fd-level stdout/stderr (including child processes) through a pipe
+    read_fd, write_fd = os.pipe()
+    forwarder = threading.Thread(target=_forward_output, args=(read_fd, conn), daemon=True)
+    forwarder.start()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os.dup2(write_fd, 1)
+    os.dup2(write_fd, 2)
+    os.close(write_fd)
+    sys.stdout.reconfigure(line_buffering=True)
+    sys.stderr.reconfigure(line_buffering=True)
+
+    code = 0
+    try:
+        if memory_limit and resource is not None:
+            resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+        os.chdir(cwd)
+        sys.argv = [script_path, *args]
+        sys.path.insert(0, os.path.dirname(script_path))
+        runpy.run_path(script_path, run_name="__main__")
+    except SystemExit as e:
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except MemoryError:
+        print("Script exceeded its memory limit", file=sys.stderr)
+        code = 1
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os.close(1)
+    os.close(2)
+    forwarder.join()
+    conn.send(("exit", code))
+    conn.close()
+    os._exit(0)
+
+
+class ScriptWorkerPool:
+    """Pool of pre-started Python workers that each run one skill script.
+
+    Idle workers have already paid interpreter startup and imports, so a job
+    only costs a pipe round trip. Each job runs in its own worker process with
+    the skill directory as working directory, an address-space limit and a
+    wall-clock timeout; output is streamed back as it is produced. A fresh
+    worker is started in the background to replace every worker used.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        timeout: float = 60.0,
+        memory_limit_mb: Optional[int] = 512,
+    ):
+        self.size = size
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+
+        # forkserver gives cheap, thread-safe forks; spawn is the portable fallback
+        methods = multiprocessing.get_all_start_methods()
+        method = "forkserver" if "forkserver" in methods else "spawn"
+        self._ctx = multiprocessing.get_context(method)
+        if method == "forkserver":
+            self._ctx.set_forkserver_preload([__name__])
+        self._idle: list[tuple] = []
+        self._starting = 0
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        self._closed = False
+        self._replenish()
+
+    def _spawn(self) -> tuple:
+        parent_conn, child_conn = self._ctx.Pipe()
+        process = self._ctx.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        process.start()
+        child_conn.close()
+        return process, parent_conn
+
+    def _replenish(self) -> None:
+        while True:
+            with self._lock:
+                if self._closed or len(self._idle) + self._starting >= self.size:
+                    return
+                self._starting += 1
+            process, conn = self._spawn()
+            with self._lock:
+                self._starting -= 1
+                if not self._closed:
+                    self._idle.append((process, conn))
+                    continue
+            conn.close()
+            process.join(timeout=1)
+
+    def _checkout(self) -> tuple:
+        with self._lock:
+            while self._idle:
+                process, conn = self._idle.pop()
+                if process.is_alive():
+                    return process, conn
+                conn.close()
+        return self._spawn()
+
+    def run(
+        self,
+        script_path: Path,
+        args: Optional[list[str]] = None,
+        cwd: Optional[Path] = None,
+        timeout: Optional[float] = None,
+        memory_limit_mb: Optional[int] = None,
+        on_output: Optional[Callable[[str], None]] = None,
+    ) -> ScriptResult:
+        """Run a Python script in a warm worker, blocking until it finishes.
+
+        Args:
+            script_path: Path to the ``.py`` script
+            args: Command-line arguments passed as ``sys.argv[1:]``
+            cwd: Working directory (defaults to the script's directory)
+            timeout: Wall-clock limit in seconds (defaults to the pool's)
+            memory_limit_mb: Address-space limit (defaults to the pool's)
+            on_output: Called with each chunk of stdout/stderr as it arrives
+
+        Returns:
+            ScriptResult with the combined output and exit code
+        """
+        if self._closed:
+            raise RuntimeError("Worker pool is closed")
+
+        script_path = Path(script_path).absolute()
+        timeout = timeout if timeout is not None else self.timeout
+        limit_mb = memory_limit_mb if memory_limit_mb is not None else self.memory_limit_mb
+        limit = limit_mb * 1024 * 1024 if limit_mb else None
+
+        with self._slots:
+            start = time.monotonic()
+            process, conn = self._checkout()
+            threading.Thread(target=self._replenish, daemon=True).start()
+
+            conn.send((str(script_path), list(args or []), str(cwd or script_path.parent), limit))
+
+            deadline = start + timeout
+            output: list[str] = []
+            code: Optional[int] = None
+            timed_out = False
+
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    timed_out = True
+                    process.kill()
+                    break
+                if not conn.poll(remaining):
+                    continue
+                try:
+                    kind, payload = conn.recv()
+                except (EOFError, OSError):
+                    # Worker died without reporting, e.g. killed by the OS
+                    break
+                if kind == "output":
+                    output.append(payload)
+                    if on_output:
+                        on_output(payload)
+                else:
+                    code = payload
+                    break
+
+            process.join(timeout=1)
+            conn.close()
+
+        if code is None:
+            code = process.exitcode if process.exitcode not in (None, 0) else 1
+        if timed_out:
+            output.append("\nScript execution timed out")
+
+        return ScriptResult(
+            returncode=code,
+            output="".join(output),
+            timed_out=timed_out,
+            duration=time.monotonic() - start,
+        )
+
+    async def run_async(
+        self,
+        script_path: Path,
+        args: Optional[list[str]] = None,
+        cwd: Optional[Path] = None,
+        timeout: Optional[float] = None,
+        memory_limit_mb: Optional[int] = None,
+        on_output: Optional[Callable[[str], None]] = None,
+    ) -> ScriptResult:
+        """Async variant of run(); concurrent calls overlap up to the pool size."""
+        return await asyncio.to_thread(
+            self.run, script_path, args, cwd, timeout, memory_limit_mb, on_output
+        )
+
+    def close(self) -> None:
+        """Stop all idle workers."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for process, conn in idle:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            conn.close()
+            process.join(timeout=1)
+
+
+_pools: dict[tuple[int, float, Optional[int]], ScriptWorkerPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_script_pool(
+    size: int = 2,
+    timeout: float = 60.0,
+    memory_limit_mb: Optional[int] = 512,
+) -> ScriptWorkerPool:
+    """Get the process-wide worker pool for a configuration, creating it on first use."""
+    key = (size, timeout, memory_limit_mb)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ScriptWorkerPool(size, timeout, memory_limit_mb)
+        return _pools[key]
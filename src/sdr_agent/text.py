@@ -0,0 +1,32 @@
+"""Shared text utilities for local retrieval and ranking."""
+
+import re
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from how in is it of on or that the this to "
+    "what when where which with you your".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase and split text into search terms, dropping stopwords."""
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to roughly ``max_tokens``, preferring a paragraph or line boundary."""
+    limit = max_tokens * 4
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    boundary = max(cut.rfind("\n\n"), cut.rfind("\n"))
+    if boundary > limit // 2:
+        cut = cut[:boundary]
+    return cut.rstrip() + "\n[...]"
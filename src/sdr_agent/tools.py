@@ -0,0 +1,297 @@
+"""Declarative registry of the tools offered to the model.
+
+Each tool declares its schema, its handler and an execution policy in one
+place. The API tool list, the system prompt's tool summary and dispatch all
+come from a ``ToolRegistry``, which applies the policies generically:
+repeat calls of cacheable tools are answered from a TTL cache, slow calls
+time out, concurrent calls of a tool are capped process-wide, and the
+independent calls of one turn run in parallel.
+"""
+
+import asyncio
+import contextvars
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, Protocol, Sequence
+
+from pydantic import BaseModel, Field
+
+from .metrics import TOOL_CALLS, TOOL_LATENCY
+
+# Tools report failures as text for the model rather than raising
+ERROR_PREFIXES = ("Error", "Unknown tool", "Search error")
+
+
+def tool_failed(result: str) -> bool:
+    """Whether a tool result reports a failure."""
+    return result.startswith(ERROR_PREFIXES)
+
+
+class ToolPolicy(BaseModel):
+    """How calls of a tool are executed."""
+
+    max_concurrency: Optional[int] = Field(
+        None, description="Calls of this tool running at once in the process (None: unlimited)"
+    )
+    timeout: Optional[float] = Field(
+        None, description="Seconds before a call is reported to the model as timed out"
+    )
+    cache_ttl: float = Field(
+        0.0, description="Seconds an identical call is answered from the cache (0: not cached)"
+    )
+    idempotent: bool = Field(
+        True,
+        description=(
+            "Repeating a call has no further effect. Other tools run one at a time, "
+            "are never cached and are not offered to self-contained tasks"
+        ),
+    )
+
+
+class Tool(BaseModel):
+    """A tool: its API schema, its handler and its execution policy.
+
+    The handler takes the tool input and returns the result text. It may be
+    a coroutine function, in which case each call runs on its own event loop.
+    """
+
+    name: str
+    description: str
+    input_schema: dict[str, Any]
+    handler: Callable[[dict[str, Any]], Any]
+    summary: str = Field("", description="Line for the system prompt (default: description)")
+    policy: ToolPolicy = Field(default_factory=ToolPolicy)
+
+    def definition(self) -> dict[str, Any]:
+        """Tool definition for the Messages API."""
+        return {
+            "name": self.name,
+            "description": self.description,
+            "input_schema": self.input_schema,
+        }
+
+
+class ToolCallLike(Protocol):
+    """A tool call as parsed from a model response."""
+
+    name: str
+    input: dict[str, Any]
+
+
+_limits: dict[str, threading.BoundedSemaphore] = {}
+_limits_lock = threading.Lock()
+
+
+def _limit(name: str, max_concurrency: int) -> threading.BoundedSemaphore:
+    # Shared by every registry in the process; the first declared limit wins
+    with _limits_lock:
+        if name not in _limits:
+            _limits[name] = threading.BoundedSemaphore(max_concurrency)
+        return _limits[name]
+
+
+def _call_with_timeout(fn: Callable[[], str], timeout: float) -> str:
+    """Run ``fn`` in its own thread and give up waiting after ``timeout`` seconds.
+
+    A call that times out keeps running in the background; only its result
+    is discarded.
+
+    Raises:
+        TimeoutError: If ``fn`` did not return in time
+    """
+    outcome: dict[str, Any] = {}
+    done = threading.Event()
+
+    def target() -> None:
+        try:
+            outcome["result"] = fn()
+        except BaseException as e:
+            outcome["error"] = e
+        finally:
+            done.set()
+
+    context = contextvars.copy_context()
+    threading.Thread(target=context.run, args=(target,), daemon=True).start()
+    if not done.wait(timeout):
+        raise TimeoutError
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+class ToolRegistry:
+    """The tools available to one agent, and the policies they run under.
+
+    Args:
+        max_parallel: Calls of one turn that run at once
+        cache_size: Results kept in the cache for cacheable tools
+    """
+
+    def __init__(self, max_parallel: int = 4, cache_size: int = 256):
+        self.max_parallel = max_parallel
+        self.cache_size = cache_size
+        self._tools: dict[str, Tool] = {}
+        self._cache: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, tool: Tool) -> Tool:
+        """Add a tool.
+
+        Raises:
+            ValueError: If a tool with the same name is already registered
+        """
+        with self._lock:
+            if tool.name in self._tools:
+                raise ValueError(f"Tool {tool.name} is already registered")
+            self._tools[tool.name] = tool
+        return tool
+
+    def get(self, name: str) -> Optional[Tool]:
+        """The tool called ``name``, or None."""
+        return self._tools.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tools
+
+    def __len__(self) -> int:
+        return len(self._tools)
+
+    def names(self) -> list[str]:
+        """Names of the registered tools, in registration order."""
+        return list(self._tools)
+
+    def definitions(self) -> list[dict[str, Any]]:
+        """Tool definitions for the Messages API."""
+        return [tool.definition() for tool in self._tools.values()]
+
+    def prompt_lines(self) -> str:
+        """One Markdown list item per tool, for the system prompt."""
+        return "\n".join(
+            f"- **{tool.name}**: {tool.summary or tool.description}"
+            for tool in self._tools.values()
+        )
+
+    def _cache_key(self, name: str, tool_input: dict[str, Any]) -> str:
+        return f"{name}:{json.dumps(tool_input, sort_keys=True, default=str)}"
+
+    def _cached(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return entry[1]
+
+    def _remember(self, key: str, ttl: float, result: str) -> None:
+        with self._lock:
+            self._cache[key] = (time.monotonic() + ttl, result)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _invoke(self, tool: Tool, tool_input: dict[str, Any]) -> str:
+        limit = tool.policy.max_concurrency
+        semaphore = _limit(tool.name, limit) if limit else None
+        if semaphore:
+            semaphore.acquire()
+        try:
+            result = tool.handler(tool_input)
+            if inspect.isawaitable(result):
+                result = asyncio.run(result)
+            return result
+        finally:
+            if semaphore:
+                semaphore.release()
+
+    def execute(self, name: str, tool_input: dict[str, Any]) -> str:
+        """Execute one tool call under its policy and return the result text.
+
+        Failures, including exceptions and timeouts, are returned as error
+        text for the model.
+        """
+        tool = self._tools.get(name)
+        if tool is None:
+            TOOL_CALLS.inc(tool=name, outcome="error")
+            return f"Unknown tool: {name}"
+
+        policy = tool.policy
+        cacheable = policy.idempotent and policy.cache_ttl > 0
+        key = self._cache_key(name, tool_input) if cacheable else ""
+        if cacheable:
+            cached = self._cached(key)
+            if cached is not None:
+                TOOL_CALLS.inc(tool=name, outcome="cached")
+                return cached
+
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            if policy.timeout:
+                result = _call_with_timeout(lambda: self._invoke(tool, tool_input), policy.timeout)
+            else:
+                result = self._invoke(tool, tool_input)
+            if not tool_failed(result):
+                outcome = "success"
+                if cacheable:
+                    self._remember(key, policy.cache_ttl, result)
+            return result
+        except TimeoutError:
+            outcome = "timeout"
+            return f"Error: {name} timed out after {policy.timeout:g}s"
+        except Exception as e:
+            return f"Error: {name} failed: {e}"
+        finally:
+            TOOL_CALLS.inc(tool=name, outcome=outcome)
+            TOOL_LATENCY.observe(time.perf_counter() - start, tool=name)
+
+    def run(
+        self,
+        calls: Sequence[ToolCallLike],
+        execute: Optional[Callable[[str, dict[str, Any]], str]] = None,
+    ) -> list[str]:
+        """Execute one turn's tool calls and return their results in call order.
+
+        Calls of idempotent tools run in parallel; calls of other tools, and
+        of tools this registry does not know, run one at a time in order.
+
+        Args:
+            calls: The tool calls of one model response
+            execute: Executes a single call (default: ``execute``), e.g. to
+                intercept some calls before they reach the registry
+        """
+        execute = execute or self.execute
+
+        def guarded(call: ToolCallLike) -> str:
+            try:
+                return execute(call.name, call.input)
+            except Exception as e:
+                # Every tool_use needs a tool_result, or the next turn is rejected
+                return f"Error: {call.name} failed: {e}"
+
+        parallel = [
+            i
+            for i, call in enumerate(calls)
+            if call.name in self._tools and self._tools[call.name].policy.idempotent
+        ]
+        if len(parallel) < 2 or self.max_parallel < 2:
+            return [guarded(call) for call in calls]
+
+        results: list[Optional[str]] = [None] * len(calls)
+        with ThreadPoolExecutor(max_workers=min(self.max_parallel, len(parallel))) as pool:
+            futures = {
+                i: pool.submit(contextvars.copy_context().run, guarded, calls[i])
+                for i in parallel
+            }
+            for i, call in enumerate(calls):
+                if i not in futures:
+                    results[i] = guarded(call)
+            for i, future in futures.items():
+                results[i] = future.result()
+        return results
@@ -0,0 +1,192 @@
+"""Per-session serialization of conversation turns.
+
+A session's agent holds one conversation, so two requests for the same
+session (a double-click, two browser tabs) must not run at the same time or
+they interleave tool_use and tool_result messages. ``TurnQueue`` runs one
+turn per session at a time and keeps later ones in a bounded FIFO queue;
+different sessions never wait for each other.
+
+What happens to a request that arrives while its session is busy depends on
+the ``QueuePolicy``: wait in the queue, be merged into the waiting turn, or
+be rejected.
+"""
+
+import itertools
+import threading
+from collections import deque
+from enum import Enum
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class QueuePolicy(str, Enum):
+    """How a request for a busy session is handled."""
+
+    QUEUE = "queue"  # wait in FIFO order
+    COALESCE = "coalesce"  # join the waiting turn; exact duplicates are dropped
+    REJECT = "reject"  # refuse while a turn is running
+
+
+class TurnStatus(str, Enum):
+    """Lifecycle of a turn."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COALESCED = "coalesced"
+    REJECTED = "rejected"
+    FINISHED = "finished"
+
+
+class Turn(BaseModel):
+    """One request to run in a session's conversation."""
+
+    id: int
+    session_id: str
+    messages: list[str] = Field(default_factory=list)
+    status: TurnStatus = TurnStatus.QUEUED
+    joined: Optional[int] = Field(None, description="Turn a coalesced request was merged into")
+    reason: str = ""
+
+    @property
+    def message(self) -> str:
+        """The message to run; coalesced messages are joined in arrival order."""
+        return "\n\n".join(self.messages)
+
+
+class _SessionTurns:
+    def __init__(self, lock: threading.Lock):
+        self.changed = threading.Condition(lock)
+        self.running: Optional[Turn] = None
+        self.waiting: deque[Turn] = deque()
+
+
+class TurnQueue:
+    """One running turn per session, with a bounded FIFO queue behind it.
+
+    Args:
+        max_queued: Turns allowed to wait per session; more are rejected
+        policy: Default policy for requests that find their session busy
+    """
+
+    def __init__(self, max_queued: int = 4, policy: QueuePolicy = QueuePolicy.QUEUE):
+        self.max_queued = max_queued
+        self.policy = QueuePolicy(policy)
+        self._lock = threading.Lock()
+        self._sessions: dict[str, _SessionTurns] = {}
+        self._ids = itertools.count(1)
+
+    def submit(
+        self,
+        session_id: str,
+        message: str,
+        policy: Optional[QueuePolicy] = None,
+        merge: bool = True,
+    ) -> Turn:
+        """Register a request; the returned turn is running, queued, coalesced or rejected.
+
+        Args:
+            session_id: Session whose conversation the turn uses
+            message: The request's message (used for coalescing)
+            policy: Policy if the session is busy (default: the queue's policy)
+            merge: Whether coalescing may append a different message to the
+                waiting turn; without it only exact duplicates are coalesced
+        """
+        policy = QueuePolicy(policy or self.policy)
+        turn = Turn(id=next(self._ids), session_id=session_id, messages=[message])
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is None:
+                state = self._sessions[session_id] = _SessionTurns(self._lock)
+            if state.running is None and not state.waiting:
+                turn.status = TurnStatus.RUNNING
+                state.running = turn
+                return turn
+
+            if policy == QueuePolicy.REJECT:
+                turn.status = TurnStatus.REJECTED
+                turn.reason = "A request for this session is already running"
+                return turn
+
+            if policy == QueuePolicy.COALESCE:
+                last = state.waiting[-1] if state.waiting else state.running
+                if message in last.messages or (merge and last.status == TurnStatus.QUEUED):
+                    if message not in last.messages:
+                        last.messages.append(message)
+                    turn.status = TurnStatus.COALESCED
+                    turn.joined = last.id
+                    return turn
+
+            if len(state.waiting) >= self.max_queued:
+                turn.status = TurnStatus.REJECTED
+                turn.reason = f"Too many queued requests for this session (max {self.max_queued})"
+                return turn
+
+            state.waiting.append(turn)
+            return turn
+
+    def position(self, turn: Turn) -> int:
+        """1-based position of a queued turn (0 once it is no longer queued)."""
+        with self._lock:
+            state = self._sessions.get(turn.session_id)
+            if state is None or turn.status != TurnStatus.QUEUED:
+                return 0
+            for position, waiting in enumerate(state.waiting, start=1):
+                if waiting.id == turn.id:
+                    return position
+            return 0
+
+    def wait(self, turn: Turn, timeout: Optional[float] = None) -> bool:
+        """Wait until the turn may run or its queue position changes; True once running."""
+        with self._lock:
+            state = self._sessions.get(turn.session_id)
+            if state is not None and turn.status == TurnStatus.QUEUED:
+                state.changed.wait(timeout)
+            return turn.status == TurnStatus.RUNNING
+
+    def finish(self, turn: Turn) -> None:
+        """Release a running turn or withdraw a queued one (e.g. the client went away)."""
+        with self._lock:
+            state = self._sessions.get(turn.session_id)
+            if state is None:
+                return
+            if state.running is not None and state.running.id == turn.id:
+                state.running = None
+                if state.waiting:
+                    state.running = state.waiting.popleft()
+                    state.running.status = TurnStatus.RUNNING
+            elif turn in state.waiting:
+                state.waiting.remove(turn)
+            else:
+                return
+            turn.status = TurnStatus.FINISHED
+            state.changed.notify_all()
+            if state.running is None and not state.waiting:
+                del self._sessions[turn.session_id]
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Running and queued turns per busy session."""
+        with self._lock:
+            return {
+                session_id: {
+                    "running": int(state.running is not None),
+                    "queued": len(state.waiting),
+                }
+                for session_id, state in self._sessions.items()
+            }
+
+
+_queue: Optional[TurnQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_turn_queue(
+    max_queued: int = 4,
+    policy: QueuePolicy = QueuePolicy.QUEUE,
+) -> TurnQueue:
+    """Get the process-wide turn queue (settings apply on first use)."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = TurnQueue(max_queued, policy)
+        return _queue
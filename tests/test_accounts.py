@@ -0,0 +1,138 @@
+"""Tests for stored research and lookalike-account search."""
+
+import pytest
+
+from sdr_agent.accounts import (
+    LookalikeIndex,
+    ResearchStore,
+    account_terms,
+    extract_attributes,
+)
+from sdr_agent.config import Settings
+from sdr_agent.skills.executor import SkillExecutor
+from sdr_agent.skills.loader import SkillLoader
+from web.app import create_app
+
+
+def report(company: str, industry: str, employees: str, body: str) -> str:
+    return (
+        f"# Company Research: {company}\n\n"
+        f"## Key Facts\n- Founded: [Year]\n- Employees: {employees}\n"
+        f"- **Industry**: {industry}\n\n## Overview\n{body}\n"
+    )
+
+
+ACCOUNTS = {
+    "Acme Inc.": report(
+        "Acme", "B2B SaaS", "250", "Payroll software for mid-market companies, cloud HR platform."
+    ),
+    "Globex": report(
+        "Globex", "B2B SaaS", "400", "Cloud HR and payroll platform for growing companies."
+    ),
+    "Initech": report(
+        "Initech", "Manufacturing", "5,000", "Industrial printers and factory equipment."
+    ),
+    "Umbrella": report(
+        "Umbrella", "Biotech", "12000", "Pharmaceutical research and vaccine development."
+    ),
+}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResearchStore(tmp_path / "research.jsonl")
+    for company, text in ACCOUNTS.items():
+        store.add(company, text)
+    return store
+
+
+class TestAttributes:
+    """Tests for attribute extraction."""
+
+    def test_extract_key_facts(self):
+        """Test that filled-in key facts are extracted and placeholders skipped."""
+        attributes = extract_attributes(ACCOUNTS["Initech"])
+        assert attributes == {"employees": "5,000", "industry": "Manufacturing"}
+
+    def test_attribute_terms(self):
+        """Test that attributes become weighted, prefixed terms."""
+        terms = account_terms("", {"industry": "B2B SaaS", "employees": "250"})
+        assert terms["industry=saas"] == 3.0
+        assert terms["size=201-1000"] == 3.0
+
+
+class TestLookalikeIndex:
+    """Tests for LookalikeIndex."""
+
+    def test_add_replace_remove(self):
+        """Test that accounts can be re-indexed and removed incrementally."""
+        index = LookalikeIndex()
+        index.add("a", account_terms("payroll software", {}))
+        index.add("b", account_terms("factory equipment", {}))
+        assert index.query(account_terms("payroll", {}))[0][0] == "a"
+
+        index.add("a", account_terms("vaccine research", {}))
+        assert index.query(account_terms("payroll", {})) == []
+
+        index.remove("b")
+        assert len(index) == 1
+        assert "b" not in index
+
+
+class TestResearchStore:
+    """Tests for ResearchStore."""
+
+    def test_find_lookalikes(self, store):
+        """Test that the most similar account ranks first and the query is excluded."""
+        lookalikes = store.find_lookalikes("acme.com", top_k=2)
+        assert lookalikes[0].company == "Globex"
+        assert all(account.id != "company:acme" for account in lookalikes)
+        assert lookalikes[0].score > (lookalikes[1].score if len(lookalikes) > 1 else 0)
+
+    def test_description_query(self, store):
+        """Test searching by a free-text profile."""
+        lookalikes = store.find_lookalikes(description="vaccine and pharmaceutical companies")
+        assert lookalikes[0].company == "Umbrella"
+
+    def test_unknown_company(self, store):
+        """Test that an unresearched company without a description raises KeyError."""
+        with pytest.raises(KeyError):
+            store.find_lookalikes("Hooli")
+
+    def test_reload_latest_wins(self, store):
+        """Test that reloading replays the JSONL store with the latest record per company."""
+        store.add("ACME Corporation", report("Acme", "Biotech", "300", "Vaccine research."))
+        reloaded = ResearchStore(store.path)
+        assert len(reloaded) == 4
+        assert reloaded.get("Acme").attributes["industry"] == "Biotech"
+        assert reloaded.find_lookalikes("Acme", top_k=1)[0].company == "Umbrella"
+
+
+class TestFindLookalikesTool:
+    """Tests for the find_lookalikes tool."""
+
+    def test_tool(self, store, tmp_path):
+        """Test the tool output and its fallbacks."""
+        executor = SkillExecutor(SkillLoader(tmp_path), research_store=store)
+        output = executor.execute_tool("find_lookalikes", {"company": "Acme", "top_k": 1})
+        assert output.splitlines()[1].startswith("1. Globex (similarity")
+        assert "industry: B2B SaaS" in output
+
+        missing = executor.execute_tool("find_lookalikes", {"company": "Hooli"})
+        assert missing.startswith("No stored research for Hooli")
+
+        disabled = SkillExecutor(SkillLoader(tmp_path))
+        assert disabled.execute_tool("find_lookalikes", {"company": "Acme"}).startswith("Error")
+
+
+class TestLookalikesRoute:
+    """Tests for the /api/research/lookalikes endpoint."""
+
+    def test_disabled_store(self, tmp_path):
+        """Test that the endpoint is not served when the research store is off."""
+        app = create_app()
+        app.config["settings"] = Settings(
+            anthropic_api_key="test", data_dir=tmp_path, research_store=False
+        )
+        response = app.test_client().get("/api/research/lookalikes?company=Acme")
+        assert response.status_code == 404
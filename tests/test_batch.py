@@ -0,0 +1,151 @@
+"""Tests for Message Batches execution."""
+
+from types import SimpleNamespace
+
+from sdr_agent.agent import SDRAgent
+from sdr_agent.config import Settings
+from sdr_agent.dispatch import Priority, current_request_context
+from sdr_agent.llm.batch import BatchJob, LocalBatchBackend
+from sdr_agent.llm.claude import ClaudeClient
+
+
+def text(value):
+    return SimpleNamespace(
+        content=[SimpleNamespace(type="text", text=value)], stop_reason="end_turn"
+    )
+
+
+def tool_use(call_id, name, tool_input):
+    block = SimpleNamespace(type="tool_use", id=call_id, name=name, input=tool_input)
+    return SimpleNamespace(content=[block], stop_reason="tool_use")
+
+
+def fake_create(**params):
+    """Searches once per job, then answers with the tool result it received."""
+    messages = params["messages"]
+    prompt = messages[0]["content"]
+    if prompt == "fail":
+        raise RuntimeError("overloaded")
+    if len(messages) == 1:
+        return tool_use(f"call-{prompt}", "web_search", {"query": prompt})
+    return text(f"Report: {messages[-1]['content'][0]['content']}")
+
+
+class CountingBackend(LocalBatchBackend):
+    """Local backend that records every submitted batch."""
+
+    def __init__(self, create):
+        super().__init__(create)
+        self.submitted = []
+
+    def submit(self, requests):
+        self.submitted.append([r["custom_id"] for r in requests])
+        return super().submit(requests)
+
+
+class TestBatchRunner:
+    """Tests for ClaudeClient.run_batch."""
+
+    def test_tool_rounds_are_rebatched(self):
+        """Test that jobs needing tools are re-batched until all are done."""
+        backend = CountingBackend(fake_create)
+        claude = ClaudeClient(api_key="test")
+        jobs = [BatchJob(id=name, prompt=name) for name in ("acme", "globex")]
+
+        claude.run_batch(
+            jobs, "system", lambda name, tool_input: f"results for {tool_input['query']}",
+            backend=backend,
+        )
+
+        assert [job.content for job in jobs] == [
+            "Report: results for acme",
+            "Report: results for globex",
+        ]
+        assert all(job.done and job.rounds == 2 and not job.error for job in jobs)
+        assert backend.submitted == [["job-0", "job-1"], ["job-0", "job-1"]]
+        assert claude.messages == []
+
+    def test_errors_are_retried_then_reported(self):
+        """Test that a failing request is retried in later batches, then given up."""
+        backend = CountingBackend(fake_create)
+        jobs = [BatchJob(id="ok", prompt="ok"), BatchJob(id="bad", prompt="fail")]
+
+        ClaudeClient(api_key="test").run_batch(
+            jobs, "system", lambda name, tool_input: "r", backend=backend
+        )
+
+        assert jobs[0].content == "Report: r"
+        assert jobs[1].error == "overloaded"
+        assert backend.submitted == [["job-0", "job-1"], ["job-0", "job-1"], ["job-1"]]
+
+    def test_max_rounds(self):
+        """Test that endless tool loops stop after max_rounds."""
+
+        def always_tools(**params):
+            return tool_use(f"c{len(params['messages'])}", "web_search", {"query": "q"})
+
+        [job] = ClaudeClient(api_key="test").run_batch(
+            [BatchJob(id="loop", prompt="loop")],
+            "system",
+            lambda name, tool_input: "r",
+            backend=LocalBatchBackend(always_tools),
+            max_rounds=3,
+        )
+        assert job.rounds == 3
+        assert job.error == "Stopped after 3 rounds"
+
+    def test_tool_errors_become_results(self):
+        """Test that a raising tool still answers its tool_use."""
+
+        def broken_tool(name, tool_input):
+            raise ValueError("no network")
+
+        [job] = ClaudeClient(api_key="test").run_batch(
+            [BatchJob(id="acme", prompt="acme")],
+            "system",
+            broken_tool,
+            backend=LocalBatchBackend(fake_create),
+        )
+        assert job.content == "Report: Error: web_search failed: no network"
+
+
+class TestResearchCompanies:
+    """Tests for SDRAgent.research_companies."""
+
+    def test_research_companies(self, tmp_path):
+        """Test bulk research with the local backend, storing reports."""
+        settings = Settings(
+            anthropic_api_key="test",
+            skills_dir=tmp_path,
+            research_prefetch=False,
+            data_dir=tmp_path / "data",
+        )
+        agent = SDRAgent(settings)
+        agent.skill_executor.execute_tool = lambda name, tool_input: "Industry: SaaS"
+
+        def create(**params):
+            if len(params["messages"]) == 1:
+                return tool_use("c1", "send_email", {"to_email": "x@example.com"})
+            return text(params["messages"][-1]["content"][0]["content"])
+
+        jobs = agent.research_companies(["Batch Co"], backend=LocalBatchBackend(create))
+        assert jobs[0].content.startswith("Error: send_email is not available")
+        assert agent.research_store.get("Batch Co") is not None
+
+    def test_prefetch_at_batch_priority(self, tmp_path):
+        """Test that every company's prefetch searches run in the batch request context."""
+        settings = Settings(anthropic_api_key="test", skills_dir=tmp_path, research_store=False)
+        agent = SDRAgent(settings)
+        contexts = []
+
+        def web_search(query, **_):
+            contexts.append(current_request_context())
+            return f"Results for {query}"
+
+        agent.skill_executor.web_search = web_search
+        jobs = agent.research_companies(
+            ["Acme", "Globex"], backend=LocalBatchBackend(lambda **_: text("Report"))
+        )
+        assert [job.content for job in jobs] == ["Report", "Report"]
+        assert len(contexts) == 12
+        assert set(contexts) == {(Priority.BATCH, "bulk-research")}
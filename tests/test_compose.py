@@ -0,0 +1,115 @@
+"""Tests for batch email composition."""
+
+import threading
+
+from sdr_agent.compose import COMPOSE_TOOL_NAME, Recipient, compose_batch
+
+BODY = " ".join(["Saw your team is hiring payroll specialists this quarter."] * 4)
+
+
+class FakeClaude:
+    """Returns canned structured outputs and records each request."""
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.prompts = []
+        self._lock = threading.Lock()
+
+    def generate_structured(self, prompt, system_prompt, tool_name, input_schema, description=""):
+        assert tool_name == COMPOSE_TOOL_NAME
+        with self._lock:
+            self.prompts.append(prompt)
+            attempt = len(self.prompts)
+        return self.respond(prompt, attempt)
+
+
+def ids_in(prompt):
+    return [part.split('"')[0] for part in prompt.split('<recipient id="')[1:]]
+
+
+RECIPIENTS = [
+    Recipient(name=f"Person {i}", email=f"p{i}@example.com", notes=f"Fact about person {i}")
+    for i in range(5)
+]
+
+
+class TestComposeBatch:
+    """Tests for compose_batch."""
+
+    def test_chunked_requests(self):
+        """Test that recipients are packed into chunked structured requests."""
+
+        def respond(prompt, attempt):
+            return {
+                "emails": [
+                    {"id": i, "subject": f"Idea for {i}", "body": BODY} for i in ids_in(prompt)
+                ]
+            }
+
+        claude = FakeClaude(respond)
+        result = compose_batch(claude, RECIPIENTS, context="We sell payroll.", chunk_size=2)
+
+        assert result.requests == 3
+        assert [d.prospect for d in result.drafts] == [r.name for r in RECIPIENTS]
+        assert result.drafts[0].to_email == "p0@example.com"
+        assert result.failures == {}
+        assert all("We sell payroll." in prompt for prompt in claude.prompts)
+
+    def test_retries_only_failed_items(self):
+        """Test that invalid or missing drafts are retried alone, with the error."""
+
+        def respond(prompt, attempt):
+            emails = []
+            for i in ids_in(prompt):
+                if attempt == 1 and i == "1":
+                    emails.append({"id": i, "subject": "Hi", "body": "Hi [First Name], quick q"})
+                elif attempt == 1 and i == "2":
+                    continue
+                else:
+                    emails.append({"id": i, "subject": "Hello", "body": BODY})
+            return {"emails": emails}
+
+        claude = FakeClaude(respond)
+        result = compose_batch(claude, RECIPIENTS[:4], chunk_size=10)
+
+        assert result.requests == 2
+        assert ids_in(claude.prompts[1]) == ["1", "2"]
+        assert "previous draft was rejected" in claude.prompts[1]
+        assert len(result.drafts) == 4
+
+    def test_gives_up_after_retries(self):
+        """Test that persistent failures are reported per recipient."""
+
+        def respond(prompt, attempt):
+            return {"emails": [{"id": i, "subject": "", "body": BODY} for i in ids_in(prompt)]}
+
+        result = compose_batch(FakeClaude(respond), RECIPIENTS[:2], max_retries=1)
+        assert result.requests == 2
+        assert result.drafts == []
+        assert set(result.failures) == {0, 1}
+        assert "subject" in result.failures[0]
+
+    def test_failures_of_namesakes(self):
+        """Test that recipients sharing a name are reported separately."""
+        namesakes = [
+            Recipient(name="Alex Kim", email=f"alex{i}@example.com", notes="Fact")
+            for i in range(2)
+        ]
+
+        def respond(prompt, attempt):
+            return {"emails": []}
+
+        result = compose_batch(FakeClaude(respond), namesakes, max_retries=0)
+        assert set(result.failures) == {0, 1}
+
+    def test_request_errors(self):
+        """Test that an API error fails only that chunk's recipients."""
+
+        def respond(prompt, attempt):
+            if "Person 0" in prompt:
+                raise RuntimeError("overloaded")
+            return {"emails": [{"id": i, "subject": "Hi", "body": BODY} for i in ids_in(prompt)]}
+
+        result = compose_batch(FakeClaude(respond), RECIPIENTS[:2], chunk_size=1, max_retries=0)
+        assert [d.prospect for d in result.drafts] == ["Person 1"]
+        assert result.failures == {0: "request failed: overloaded"}
@@ -0,0 +1,104 @@
+"""Tests for priority and fair-share dispatch."""
+
+import threading
+import time
+
+from sdr_agent.dispatch import FairDispatcher, Priority, current_request_context, request_context
+
+
+def _queue(dispatcher, order, priority, tenant, label):
+    """Start a thread that records ``label`` once it is granted a slot."""
+
+    def run():
+        dispatcher.acquire(priority, tenant)
+        order.append(label)
+        dispatcher.release()
+
+    queued = len(dispatcher._waiting)
+    thread = threading.Thread(target=run)
+    thread.start()
+    # Wait until the waiter is queued so enqueue order is deterministic
+    deadline = time.monotonic() + 1
+    while len(dispatcher._waiting) == queued and time.monotonic() < deadline:
+        time.sleep(0.001)
+    return thread
+
+
+def _drain(dispatcher, threads):
+    dispatcher.release()
+    for thread in threads:
+        thread.join(timeout=2)
+
+
+class TestRequestContext:
+    """Tests for request_context."""
+
+    def test_default(self):
+        """Test that untagged calls are interactive."""
+        assert current_request_context() == (Priority.INTERACTIVE, "default")
+
+    def test_nested(self):
+        """Test that contexts nest and restore."""
+        with request_context(Priority.BATCH, "job-1"):
+            assert current_request_context() == (Priority.BATCH, "job-1")
+        assert current_request_context() == (Priority.INTERACTIVE, "default")
+
+
+class TestFairDispatcher:
+    """Tests for FairDispatcher."""
+
+    def test_priority_order(self):
+        """Test that interactive waiters are served before batch and background."""
+        dispatcher = FairDispatcher(capacity=1, reserved_interactive=0)
+        dispatcher.acquire()
+        order = []
+        threads = [
+            _queue(dispatcher, order, Priority.BACKGROUND, "bg", "background"),
+            _queue(dispatcher, order, Priority.BATCH, "job", "batch"),
+            _queue(dispatcher, order, Priority.INTERACTIVE, "user", "interactive"),
+        ]
+        _drain(dispatcher, threads)
+        assert order == ["interactive", "batch", "background"]
+
+    def test_fair_share_between_tenants(self):
+        """Test that a tenant with a deep queue does not starve another."""
+        dispatcher = FairDispatcher(capacity=1, reserved_interactive=0)
+        dispatcher.acquire()
+        order = []
+        threads = [_queue(dispatcher, order, Priority.BATCH, "a", "a") for _ in range(3)]
+        threads.append(_queue(dispatcher, order, Priority.BATCH, "b", "b"))
+        _drain(dispatcher, threads)
+        assert order.index("b") <= 1
+
+    def test_reserved_interactive_capacity(self):
+        """Test that batch work cannot take the reserved slot."""
+        dispatcher = FairDispatcher(capacity=2, reserved_interactive=1)
+        dispatcher.acquire(Priority.BATCH, "job")
+
+        granted = threading.Event()
+
+        def batch():
+            dispatcher.acquire(Priority.BATCH, "job")
+            granted.set()
+            dispatcher.release()
+
+        thread = threading.Thread(target=batch)
+        thread.start()
+        assert not granted.wait(0.05)
+
+        # An interactive call still gets the reserved slot immediately
+        dispatcher.acquire(Priority.INTERACTIVE, "user")
+        dispatcher.release()
+
+        dispatcher.release()
+        assert granted.wait(1)
+        thread.join()
+
+    def test_stats(self):
+        """Test that queue depth and grants are reported per class."""
+        dispatcher = FairDispatcher(capacity=1)
+        with dispatcher.slot(Priority.INTERACTIVE, "user"):
+            stats = dispatcher.stats()
+        assert stats["in_flight"] == 1
+        assert stats["classes"]["interactive"]["granted"] == 1
+        assert stats["classes"]["batch"]["queue_depth"] == 0
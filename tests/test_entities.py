@@ -0,0 +1,88 @@
+"""Tests for company and prospect identity normalization."""
+
+from sdr_agent.agent import research_key
+from sdr_agent.entities import (
+    EntityIndex,
+    domain_label,
+    normalize_company,
+    normalize_person,
+)
+
+
+class TestNormalizeCompany:
+    """Tests for normalize_company."""
+
+    def test_variants_share_a_key(self):
+        """Test that suffix, case and domain variants normalize together."""
+        variants = [
+            "Acme",
+            "Acme Inc.",
+            "acme.com",
+            "ACME Corporation",
+            "https://www.acme.com/about",
+            "jane@acme.co.uk",
+        ]
+        assert {normalize_company(v) for v in variants} == {"acme"}
+
+    def test_multiword_names(self):
+        """Test that only trailing legal suffixes are removed."""
+        assert normalize_company("The Home Depot, Inc.") == "home depot"
+        assert normalize_company("Johnson & Johnson") == "johnson and johnson"
+        assert normalize_company("Company") == "company"
+
+    def test_domain_label(self):
+        """Test extracting the organization label from domains."""
+        assert domain_label("news.bbc.co.uk") == "bbc"
+        assert domain_label("Acme Inc.") is None
+
+
+class TestNormalizePerson:
+    """Tests for normalize_person."""
+
+    def test_honorifics_and_order(self):
+        """Test that honorifics, suffixes and "Last, First" order are handled."""
+        assert normalize_person("Smith, Dr. John Jr.") == "john smith"
+        assert normalize_person("  John   SMITH ") == "john smith"
+
+
+class TestEntityIndex:
+    """Tests for EntityIndex."""
+
+    def test_company_ids_and_aliases(self):
+        """Test that variants resolve to one entity that records every alias."""
+        index = EntityIndex()
+        entity_id = index.company_id("Acme Inc.")
+        assert index.company_id("acme.com") == entity_id
+        assert index.get(entity_id).aliases == ["Acme Inc.", "acme.com"]
+        assert index.company_id("Globex") != entity_id
+
+    def test_add_alias(self):
+        """Test mapping names that do not normalize together."""
+        index = EntityIndex()
+        assert index.add_alias("Google", "Alphabet Inc.") == index.company_id("alphabet.com")
+        assert index.company_id("google.com") == index.company_id("Alphabet")
+
+    def test_person_scoped_to_company(self):
+        """Test that people are scoped to their company."""
+        index = EntityIndex()
+        assert index.person_id("Jane Doe", "Acme Inc.") == index.person_id("jane doe", "acme.com")
+        assert index.person_id("Jane Doe", "Acme") != index.person_id("Jane Doe", "Globex")
+
+    def test_persistence(self, tmp_path):
+        """Test saving and reloading the index."""
+        path = tmp_path / "entities.json"
+        index = EntityIndex(path)
+        index.add_alias("Google", "Alphabet")
+        index.save()
+
+        reloaded = EntityIndex(path)
+        assert reloaded.company_id("Google LLC") == index.company_id("Alphabet")
+
+
+class TestResearchKey:
+    """Tests for canonical research keys."""
+
+    def test_same_company_same_key(self):
+        """Test that company name variants share one research key."""
+        assert research_key("Acme Inc.") == research_key("acme.com")
+        assert research_key("Acme", "Jane Doe") == research_key("ACME Corp", "Doe, Jane")
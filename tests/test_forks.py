@@ -0,0 +1,197 @@
+"""Tests for copy-on-write conversation forks."""
+
+import pytest
+
+from sdr_agent.config import Settings
+from sdr_agent.journal import JournalSessionBackend
+from sdr_agent.llm.claude import ClaudeClient
+from sdr_agent.sessions import (
+    MemorySessionBackend,
+    SessionState,
+    SQLiteSessionBackend,
+)
+from web.app import create_app
+from web.routes import chat as chat_routes
+
+from .test_sessions import assistant, make_agent, user
+
+
+@pytest.fixture(params=["memory", "sqlite", "journal"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemorySessionBackend()
+    if request.param == "journal":
+        return JournalSessionBackend(tmp_path / "journal")
+    return SQLiteSessionBackend(tmp_path / "sessions.db")
+
+
+def message_rows(backend, session_id):
+    return backend._connect().execute(
+        "SELECT COUNT(*) FROM messages WHERE session_id = ?", (session_id,)
+    ).fetchone()[0]
+
+
+class TestClientFork:
+    """Tests for ClaudeClient.load_fork."""
+
+    def make_parent(self):
+        parent = ClaudeClient(api_key="test")
+        parent.messages = [user("research acme"), assistant("Acme makes anvils.")]
+        return parent
+
+    def test_fork_shares_prefix(self):
+        """Test that a fork refers to the parent's messages and appends its own."""
+        parent = self.make_parent()
+        child = ClaudeClient(api_key="test")
+        child.load_fork(parent)
+        child.messages.append(user("draft an email"))
+
+        assert child.cache_prefix == 2
+        assert all(a is b for a, b in zip(child.messages, parent.messages))
+        assert len(parent.messages) == 2
+
+    def test_cache_breakpoint_at_prefix_end(self):
+        """Test that requests mark the prefix end without touching the shared messages."""
+        parent = self.make_parent()
+        child = ClaudeClient(api_key="test")
+        child.load_fork(parent)
+        child.messages.append(user("draft an email"))
+
+        sent = child._request_messages()
+        assert sent[1]["content"][-1]["cache_control"] == {"type": "ephemeral"}
+        assert sent[2] == user("draft an email")
+        assert "cache_control" not in parent.messages[1]["content"][-1]
+        assert parent._request_messages() is parent.messages
+
+
+class TestBackendFork:
+    """Tests for SessionBackend.fork."""
+
+    def test_fork_continues_from_parent(self, backend):
+        """Test that a fork starts from the parent's log and diverges from it."""
+        parent = backend.append("base", [user("hi"), assistant("hello")], SessionState())
+        state = backend.fork("base", "child")
+        assert state == SessionState(epoch=1, length=2, prefix=2)
+
+        backend.append("child", [user("child turn")], state)
+        backend.append("base", [user("base turn")], parent)
+        assert backend.load("child")[1] == [user("hi"), assistant("hello"), user("child turn")]
+        assert backend.load("child", start=2)[1] == [user("child turn")]
+        assert backend.load("base")[1][-1] == user("base turn")
+
+    def test_clearing_parent_keeps_fork(self, backend):
+        """Test that a fork keeps its prefix after the parent is cleared."""
+        backend.append("base", [user("hi"), assistant("hello")], SessionState())
+        backend.fork("base", "child")
+        backend.clear("base")
+
+        assert backend.load("base")[1] == []
+        assert backend.load("child")[1] == [user("hi"), assistant("hello")]
+
+    def test_fork_of_fork(self, backend):
+        """Test that forks can be forked, reading the prefix through the chain."""
+        backend.append("base", [user("hi")], SessionState())
+        state = backend.fork("base", "child")
+        backend.append("child", [assistant("hello")], state)
+        backend.fork("child", "grandchild")
+        assert backend.load("grandchild")[1] == [user("hi"), assistant("hello")]
+
+    def test_fork_into_itself(self, backend):
+        """Test that a session cannot be forked into itself."""
+        with pytest.raises(ValueError):
+            backend.fork("base", "base")
+
+    def test_sqlite_stores_prefix_once(self, tmp_path):
+        """Test that SQLite forks store only their own messages, and archives are dropped."""
+        backend = SQLiteSessionBackend(tmp_path / "sessions.db")
+        backend.append("base", [user("hi"), assistant("hello")], SessionState())
+        for name in ("a", "b"):
+            state = backend.fork("base", name)
+            backend.append(name, [user(f"from {name}")], state)
+        assert [message_rows(backend, s) for s in ("base", "a", "b")] == [2, 1, 1]
+
+        backend.clear("base")
+        assert message_rows(backend, "archived:base:0") == 2
+        backend.clear("a")
+        backend.clear("b")
+        assert message_rows(backend, "archived:base:0") == 0
+
+
+class TestAgentFork:
+    """Tests for SDRAgent.fork."""
+
+    def test_local_fork(self, tmp_path):
+        """Test that a forked agent continues from the parent without changing it."""
+        parent = make_agent(tmp_path, MemorySessionBackend())
+        parent.session = None
+        parent.chat("research acme")
+
+        child = parent.fork()
+        child.claude.client = parent.claude.client
+        child.chat("draft an email")
+
+        assert len(parent.claude.messages) == 2
+        assert child.claude.messages[:2] == parent.claude.messages
+        assert child.result_store is parent.result_store
+
+    def test_shared_fork_in_another_worker(self, tmp_path):
+        """Test that a fork saved to the session store is served by another worker."""
+        backend = MemorySessionBackend()
+        parent = make_agent(tmp_path, backend, "base")
+        parent.chat("research acme")
+        parent.save_session()
+
+        child = parent.fork("child")
+        child.claude.client = parent.claude.client
+        child.chat("draft an email")
+        child.save_session()
+
+        other = make_agent(tmp_path, backend, "child")
+        assert other.claude.messages == child.claude.messages
+        assert other.claude.cache_prefix == 2
+        assert len(backend.load("base")[1]) == 2
+
+    def test_shared_fork_needs_id(self, tmp_path):
+        """Test that a shared session is not forked without naming the fork."""
+        parent = make_agent(tmp_path, MemorySessionBackend())
+        with pytest.raises(ValueError):
+            parent.fork()
+
+
+class TestForkRoute:
+    """Tests for the /api/chat/fork endpoint."""
+
+    def test_rejects_archived_ids(self, tmp_path):
+        """Test that archived session logs can be neither forked nor overwritten."""
+        app = create_app()
+        app.config["settings"] = Settings(anthropic_api_key="test", skills_dir=tmp_path)
+        client = app.test_client()
+        for body in (
+            {"session_id": "archived:default:1", "fork_id": "copy"},
+            {"session_id": "default", "fork_id": "archived:default:1"},
+            {"session_id": "default", "fork_id": 7},
+        ):
+            response = client.post("/api/chat/fork", json=body)
+            assert response.status_code == 400
+            assert response.get_json()["error"].startswith("Invalid session ID")
+
+    def test_every_route_rejects_archived_ids(self, tmp_path):
+        """Test that no route reads or writes an archived session log."""
+        app = create_app()
+        app.config["settings"] = Settings(anthropic_api_key="test", skills_dir=tmp_path)
+        client = app.test_client()
+        archived = "archived:default:1"
+        responses = [
+            client.post("/api/chat", json={"message": "Hi", "session_id": archived}),
+            client.post("/api/chat/clear", json={"session_id": archived}),
+            client.get("/api/chat/history", query_string={"session_id": archived}),
+            client.post("/api/research/company", json={"company": "Acme", "session_id": archived}),
+            client.post(
+                "/api/research/prospect", json={"prospect": "Jane", "session_id": archived}
+            ),
+            client.post("/api/chat", json={"message": "Hi", "session_id": ""}),
+        ]
+        for response in responses:
+            assert response.status_code == 400
+            assert response.get_json()["error"].startswith("Invalid session ID")
+        assert archived not in chat_routes._agents
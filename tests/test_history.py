@@ -0,0 +1,109 @@
+"""Tests for paginated conversation history."""
+
+import pytest
+
+from sdr_agent.history import ConversationHistory, message_text
+from sdr_agent.sessions import MemorySessionBackend, SessionState
+
+from .test_sessions import assistant, make_agent, user
+
+
+def tool_result(call_id):
+    return {
+        "role": "user",
+        "content": [{"type": "tool_result", "tool_use_id": call_id, "content": "data"}],
+    }
+
+
+class CountingLog:
+    """A message log that records which messages were read."""
+
+    def __init__(self, messages):
+        self.messages = messages
+        self.reads = []
+
+    def load(self, start):
+        self.reads.append(start)
+        return self.messages[start:]
+
+
+class TestConversationHistory:
+    """Tests for ConversationHistory."""
+
+    def test_pages_follow_cursor(self):
+        """Test that pages continue after the cursor and skip messages without text."""
+        log = CountingLog([user("hi"), assistant("hello"), tool_result("c1"), assistant("done")])
+        history = ConversationHistory()
+        history.refresh(0, 4, log.load)
+
+        first = history.page(limit=2)
+        assert [m.content for m in first.messages] == ["hi", "hello"]
+        assert first.has_more
+        second = history.page(after=first.next_cursor, limit=2)
+        assert [(m.id, m.content) for m in second.messages] == [("0.3", "done")]
+        assert not second.has_more
+
+        # Nothing new: the cursor stays put
+        assert history.page(after=second.next_cursor).next_cursor == "0.3"
+
+    def test_refresh_reads_only_new_messages(self):
+        """Test that catching up loads only messages appended since the last refresh."""
+        log = CountingLog([user("hi"), assistant("hello")])
+        history = ConversationHistory()
+        history.refresh(0, 2, log.load)
+        history.refresh(0, 2, log.load)
+        log.messages += [user("more"), assistant("ok")]
+        history.refresh(0, 4, log.load)
+
+        assert log.reads == [0, 2]
+        assert [m.content for m in history.page(after="0.1").messages] == ["more", "ok"]
+
+    def test_new_epoch_resets(self):
+        """Test that a cursor from before a clear asks the client to start over."""
+        history = ConversationHistory()
+        history.refresh(0, 2, CountingLog([user("hi"), assistant("hello")]).load)
+        history.refresh(1, 1, CountingLog([user("fresh")]).load)
+
+        page = history.page(after="0.1")
+        assert page.reset
+        assert [(m.id, m.content) for m in page.messages] == [("1.0", "fresh")]
+
+    def test_invalid_cursor(self):
+        """Test that a malformed cursor is refused."""
+        with pytest.raises(ValueError):
+            ConversationHistory().page(after="latest")
+
+    def test_message_text(self):
+        """Test that text blocks are joined and tool results have no text."""
+        assert message_text(assistant("hello")) == "hello"
+        assert message_text(tool_result("c1")) is None
+
+
+class TestAgentHistory:
+    """Tests for SDRAgent.history_page."""
+
+    def test_local_conversation(self, tmp_path):
+        """Test that an agent's own conversation is paged and versioned."""
+        agent = make_agent(tmp_path, MemorySessionBackend())
+        agent.session = None
+        agent.chat("first")
+        state = agent.history_state()
+
+        page = agent.history_page()
+        assert [m.content for m in page.messages] == ["first", "reply to first"]
+
+        agent.clear_conversation()
+        assert agent.history_state() == SessionState(epoch=state.epoch + 1, length=0)
+        assert agent.history_page(after=page.next_cursor).reset
+
+    def test_shared_session(self, tmp_path):
+        """Test that history comes from the session store, including other workers' turns."""
+        backend = MemorySessionBackend()
+        worker_a = make_agent(tmp_path, backend)
+        worker_b = make_agent(tmp_path, backend)
+        worker_a.chat("first")
+        worker_a.save_session()
+
+        page = worker_b.history_page()
+        assert [m.content for m in page.messages] == ["first", "reply to first"]
+        assert worker_b.history_state() == backend.state("s1")
@@ -0,0 +1,137 @@
+"""Tests for the append-only session journal."""
+
+import pytest
+
+from sdr_agent.journal import MAGIC, JournalReader, JournalSessionBackend, RecordKind
+from sdr_agent.sessions import SessionState
+
+from .test_sessions import assistant, user
+
+
+def kinds(backend, session_id):
+    with JournalReader(backend.path(session_id)) as reader:
+        return [record.kind for record in reader.records()]
+
+
+class TestJournalSessionBackend:
+    """Tests for JournalSessionBackend."""
+
+    def test_one_record_per_message(self, tmp_path):
+        """Test that appends add a record per message without rewriting the file."""
+        backend = JournalSessionBackend(tmp_path)
+        state = backend.append("s1", [user("hi"), assistant("hello")], SessionState())
+        before = backend.path("s1").read_bytes()
+        backend.append("s1", [user("more")], state)
+
+        assert kinds(backend, "s1") == [
+            RecordKind.HEADER,
+            RecordKind.MESSAGE,
+            RecordKind.MESSAGE,
+            RecordKind.MESSAGE,
+        ]
+        assert backend.path("s1").read_bytes().startswith(before)
+
+    def test_survives_restart(self, tmp_path):
+        """Test that a new process rebuilds sessions, including clears, from the journal."""
+        backend = JournalSessionBackend(tmp_path)
+        backend.append("s1", [user("old")], SessionState())
+        state = backend.clear("s1")
+        backend.append("s1", [user("hi"), assistant("hello")], state)
+
+        restarted = JournalSessionBackend(tmp_path)
+        assert restarted.load("s1") == (
+            SessionState(epoch=1, length=2),
+            [user("hi"), assistant("hello")],
+        )
+
+    def test_catch_up_reads_only_new_records(self, tmp_path, monkeypatch):
+        """Test that another worker indexes only the records appended since it last looked."""
+        writer, reader = JournalSessionBackend(tmp_path), JournalSessionBackend(tmp_path)
+        state = writer.append("s1", [user("hi"), assistant("hello")], SessionState())
+        reader.load("s1")
+        writer.append("s1", [user("more")], state)
+
+        scanned = []
+        records = JournalReader.records
+
+        def counting(self, offset=len(MAGIC)):
+            for record in records(self, offset):
+                scanned.append(record)
+                yield record
+
+        monkeypatch.setattr(JournalReader, "records", counting)
+        assert reader.load("s1", start=2)[1] == [user("more")]
+        # The header's generation, one record to index, then the same record read back
+        assert [record.kind for record in scanned] == [
+            RecordKind.HEADER,
+            RecordKind.MESSAGE,
+            RecordKind.MESSAGE,
+        ]
+
+    def test_rewrite_in_place_is_reindexed(self, tmp_path):
+        """Test that a journal replaced under the same inode is not read with a stale index."""
+        backend = JournalSessionBackend(tmp_path / "a")
+        backend.append("s1", [user("hi")], SessionState())
+        assert backend.load("s1")[1] == [user("hi")]
+
+        other = JournalSessionBackend(tmp_path / "b")
+        replacement = [user("a much longer replacement message"), assistant("ok")]
+        other.append("s1", replacement, SessionState())
+        path = backend.path("s1")
+        inode = path.stat().st_ino
+        # Same file, same inode, larger: only the header's generation tells them apart
+        path.write_bytes(other.path("s1").read_bytes())
+        assert path.stat().st_ino == inode
+
+        assert backend.load("s1")[1] == replacement
+
+    def test_torn_tail_is_dropped(self, tmp_path):
+        """Test that a partial record left by a crash is ignored and then overwritten."""
+        backend = JournalSessionBackend(tmp_path)
+        state = backend.append("s1", [user("hi")], SessionState())
+        with open(backend.path("s1"), "ab") as f:
+            f.write(b"\x40\x00\x00\x00\x02partial")
+
+        restarted = JournalSessionBackend(tmp_path)
+        assert restarted.load("s1") == (state, [user("hi")])
+        restarted.append("s1", [assistant("hello")], state)
+        assert JournalSessionBackend(tmp_path).load("s1")[1] == [user("hi"), assistant("hello")]
+
+    def test_compaction(self, tmp_path):
+        """Test that compaction keeps the conversation as one snapshot and drops cleared ones."""
+        backend = JournalSessionBackend(tmp_path)
+        backend.append("s1", [user("old")] * 20, SessionState())
+        state = backend.clear("s1")
+        state = backend.append("s1", [user("hi"), assistant("hello")], state)
+
+        result = backend.compact("s1")
+        assert result.bytes_after < result.bytes_before
+        assert kinds(backend, "s1") == [RecordKind.HEADER, RecordKind.SNAPSHOT]
+        assert backend.load("s1") == (state, [user("hi"), assistant("hello")])
+
+        # Other workers notice the rewritten file and keep appending to it
+        other = JournalSessionBackend(tmp_path)
+        other.append("s1", [user("after")], state)
+        assert backend.load("s1")[1][-1] == user("after")
+        assert [r.session_id for r in backend.compact_all()] == ["s1"]
+
+    def test_periodic_snapshot(self, tmp_path):
+        """Test that a journal is compacted after snapshot_every messages."""
+        backend = JournalSessionBackend(tmp_path, snapshot_every=3)
+        state = backend.append("s1", [user("a"), assistant("b")], SessionState())
+        state = backend.append("s1", [user("c")], state)
+        assert kinds(backend, "s1") == [RecordKind.HEADER, RecordKind.SNAPSHOT]
+        backend.append("s1", [assistant("d")], state)
+        assert backend.load("s1")[1] == [user("a"), assistant("b"), user("c"), assistant("d")]
+
+    def test_compressed_records(self, tmp_path):
+        """Test that large payloads are zstd-compressed and read back."""
+        pytest.importorskip("zstandard")
+        backend = JournalSessionBackend(tmp_path, compress=True)
+        long = user("acme " * 500)
+        backend.append("s1", [long], SessionState())
+        with JournalReader(backend.path("s1")) as reader:
+            message = list(reader.records())[1]
+            assert message.compressed
+            assert message.end - message.start < len("acme " * 500)
+        assert JournalSessionBackend(tmp_path).load("s1")[1] == [long]
@@ -0,0 +1,99 @@
+"""Tests for the Prometheus-style metrics registry."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from sdr_agent.llm.claude import ClaudeClient
+from sdr_agent.llm.routing import ModelUsage
+from sdr_agent.metrics import (
+    LLM_LATENCY,
+    LLM_REQUESTS,
+    LLM_TOKENS,
+    TOOL_CALLS,
+    MetricsRegistry,
+)
+from sdr_agent.skills.executor import SkillExecutor
+from sdr_agent.skills.loader import SkillLoader
+
+
+class TestMetricsRegistry:
+    """Tests for MetricsRegistry and its metric types."""
+
+    def test_counter_and_gauge_render(self):
+        """Test that counters and gauges render with HELP, TYPE and escaped labels."""
+        registry = MetricsRegistry()
+        requests = registry.counter("requests_total", "Requests", ("path",))
+        requests.inc(path="/a")
+        requests.inc(2, path='/b"')
+        registry.gauge("open_streams", "Open streams").inc()
+
+        text = registry.render()
+        assert "# HELP requests_total Requests\n# TYPE requests_total counter" in text
+        assert 'requests_total{path="/a"} 1\n' in text
+        assert 'requests_total{path="/b\\""} 2\n' in text
+        assert "# TYPE open_streams gauge\nopen_streams 1\n" in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test that histogram buckets count every observation at or below their bound."""
+        registry = MetricsRegistry()
+        latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            latency.observe(value)
+
+        text = registry.render()
+        assert 'latency_seconds_bucket{le="0.1"} 2\n' in text
+        assert 'latency_seconds_bucket{le="1"} 3\n' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 4\n' in text
+        assert "latency_seconds_sum 3.65\n" in text
+        assert "latency_seconds_count 4\n" in text
+
+    def test_gauge_function_is_read_at_scrape(self):
+        """Test that callback gauges report the value at render time."""
+        registry = MetricsRegistry()
+        depth = {"high": 1}
+        registry.gauge("queue_depth", "Depth", ("priority",)).set_function(
+            lambda: {(priority,): value for priority, value in depth.items()}
+        )
+        depth["high"] = 3
+        assert 'queue_depth{priority="high"} 3\n' in registry.render()
+
+    def test_registration_is_idempotent(self):
+        """Test that re-registering returns the existing metric, and conflicts are refused."""
+        registry = MetricsRegistry()
+        counter = registry.counter("calls_total", "Calls", ("tool",))
+        assert registry.counter("calls_total", "Calls", ("tool",)) is counter
+        with pytest.raises(ValueError):
+            registry.gauge("calls_total", "Calls")
+        with pytest.raises(ValueError):
+            counter.inc(model="x")
+
+
+class TestInstrumentation:
+    """Tests for the metrics fed by the client and tool executor."""
+
+    def test_llm_calls_are_recorded(self):
+        """Test that a Messages API call records its latency and tokens."""
+        model = "metrics-test-model"
+        claude = ClaudeClient(api_key="test", model=model)
+        claude.usage = ModelUsage()
+        response = SimpleNamespace(
+            content=[SimpleNamespace(type="text", text="hi")],
+            stop_reason="end_turn",
+            usage=SimpleNamespace(input_tokens=100, output_tokens=20),
+        )
+        claude.client = SimpleNamespace(messages=SimpleNamespace(create=lambda **_: response))
+
+        claude.chat("hello", "system", tools_enabled=False)
+
+        assert LLM_REQUESTS.value(model=model, outcome="success") == 1
+        assert LLM_LATENCY.count(model=model) == 1
+        assert LLM_TOKENS.value(model=model, direction="input") == 100
+        assert LLM_TOKENS.value(model=model, direction="output") == 20
+
+    def test_tool_errors_are_counted(self, tmp_path):
+        """Test that tool failures reported as text count as errors."""
+        executor = SkillExecutor(SkillLoader(tmp_path))
+        before = TOOL_CALLS.value(tool="web_search", outcome="error")
+        assert executor.execute_tool("web_search", {"query": "acme"}).startswith("Error")
+        assert TOOL_CALLS.value(tool="web_search", outcome="error") == before + 1
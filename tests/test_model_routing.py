@@ -0,0 +1,201 @@
+"""Tests for fast-model routing of tool-orchestration turns."""
+
+from types import SimpleNamespace
+
+from sdr_agent.config import Settings
+from sdr_agent.llm.batch import BatchJob, LocalBatchBackend
+from sdr_agent.llm.claude import ClaudeClient
+from sdr_agent.llm.routing import ModelRouter, ModelUsage
+from web.app import create_app
+from web.routes import chat as chat_routes
+
+PRIMARY = "primary-model"
+FAST = "fast-model"
+
+
+def text(value):
+    return SimpleNamespace(
+        content=[SimpleNamespace(type="text", text=value)],
+        stop_reason="end_turn",
+        usage=SimpleNamespace(input_tokens=100, output_tokens=50),
+    )
+
+
+def tool_use(call_id, name, tool_input):
+    block = SimpleNamespace(type="tool_use", id=call_id, name=name, input=tool_input)
+    return SimpleNamespace(
+        content=[block],
+        stop_reason="tool_use",
+        usage=SimpleNamespace(input_tokens=100, output_tokens=10),
+    )
+
+
+class FakeMessages:
+    """Calls a search tool twice, then answers; records the model of each call."""
+
+    def __init__(self):
+        self.models = []
+
+    def create(self, **params):
+        self.models.append((params["model"], params["max_tokens"]))
+        tool_rounds = sum(1 for m in params["messages"] if m["role"] == "user") - 1
+        if tool_rounds < 2:
+            return tool_use(f"call-{tool_rounds}", "web_search", {"query": "acme"})
+        return text("Final report")
+
+
+def make_client(fast_model=FAST, route_first_turn=False):
+    claude = ClaudeClient(
+        api_key="test",
+        model=PRIMARY,
+        max_tokens=4096,
+        router=ModelRouter(
+            fast_model=fast_model,
+            fast_max_tokens=512,
+            route_first_turn=route_first_turn,
+        ),
+    )
+    fake = FakeMessages()
+    claude.client = SimpleNamespace(messages=fake)
+    claude.usage = ModelUsage()
+    return claude, fake
+
+
+def run_turn(claude, model=None):
+    response = claude.chat("Research Acme", "system", model=model)
+    while response.tool_calls:
+        results = [{"tool_use_id": c.id, "content": "results"} for c in response.tool_calls]
+        response = claude.continue_with_tool_results(results, "system", model=model)
+    return response
+
+
+class TestModelRouter:
+    """Tests for ModelRouter rules."""
+
+    def test_routing_disabled_without_fast_model(self):
+        """Test that no turn is routed when no fast model is configured."""
+        router = ModelRouter()
+        assert not router.use_fast(after_tool_results=True)
+
+    def test_first_turn_routing_is_opt_in(self):
+        """Test that opening turns stay on the primary model unless enabled."""
+        assert not ModelRouter(fast_model=FAST).use_fast(False)
+        router = ModelRouter(fast_model=FAST, route_first_turn=True)
+        assert router.use_fast(False)
+        assert not router.use_fast(False, tools_enabled=False)
+
+    def test_escalation_rules(self):
+        """Test that text answers and truncated turns need the primary model."""
+        assert ModelRouter.needs_escalation(text("done"))
+        assert not ModelRouter.needs_escalation(tool_use("1", "web_search", {}))
+        truncated = tool_use("1", "web_search", {})
+        truncated.stop_reason = "max_tokens"
+        assert ModelRouter.needs_escalation(truncated)
+
+
+class TestClientRouting:
+    """Tests for model selection in ClaudeClient."""
+
+    def test_tool_turns_use_fast_model_and_answer_escalates(self):
+        """Test that tool turns go to the fast model and the answer to the primary."""
+        claude, fake = make_client()
+
+        response = run_turn(claude)
+
+        assert response.content == "Final report"
+        assert fake.models == [
+            (PRIMARY, 4096),  # opening turn
+            (FAST, 512),  # second search
+            (FAST, 512),  # ready to answer: escalated
+            (PRIMARY, 4096),
+        ]
+        # The discarded fast-model answer is not added to the conversation
+        assert len(claude.messages) == 6
+
+    def test_without_router_every_turn_uses_primary(self):
+        """Test that routing is off when no fast model is configured."""
+        claude, fake = make_client(fast_model=None)
+        run_turn(claude)
+        assert {model for model, _ in fake.models} == {PRIMARY}
+
+    def test_per_turn_override(self):
+        """Test that an explicit model is used for every call of the turn."""
+        claude, fake = make_client()
+        run_turn(claude, model="override-model")
+        assert {model for model, _ in fake.models} == {"override-model"}
+
+    def test_usage_stats(self):
+        """Test that calls, tokens and escalations are reported per model."""
+        claude, _ = make_client()
+        run_turn(claude)
+
+        stats = claude.usage.stats()
+        assert stats["escalations"] == 1
+        assert stats["models"][FAST]["calls"] == 2
+        assert stats["models"][FAST]["output_tokens"] == 60
+        assert stats["models"][PRIMARY]["calls"] == 2
+        assert stats["models"][PRIMARY]["input_tokens"] == 200
+        assert stats["models"][PRIMARY]["avg_latency_seconds"] >= 0
+
+
+    def test_followup_cap(self):
+        """Test that fast turns after tool results use the tighter output cap."""
+        claude, fake = make_client()
+        claude.router.followup_max_tokens = 128
+        run_turn(claude)
+        assert fake.models == [(PRIMARY, 4096), (FAST, 128), (FAST, 128), (PRIMARY, 4096)]
+
+        router = ModelRouter(fast_model=FAST, fast_max_tokens=512, followup_max_tokens=128)
+        assert router.max_tokens_for(after_tool_results=False) == 512
+        assert router.max_tokens_for(after_tool_results=True) == 128
+        assert ModelRouter(fast_model=FAST).max_tokens_for(True) == 1024
+
+    def test_escalation_cost(self):
+        """Test that the discarded fast-model call's tokens and latency are reported."""
+        claude, _ = make_client()
+        run_turn(claude)
+
+        escalated = claude.usage.stats()["escalated"]
+        assert escalated["input_tokens"] == 100
+        assert escalated["output_tokens"] == 50
+        assert escalated["latency_seconds"] >= 0
+
+
+class TestBatchRouting:
+    """Tests for model selection in batch rounds."""
+
+    def test_batch_rounds_route_and_escalate(self):
+        """Test that batched tool rounds use the fast model and answers escalate."""
+        claude, fake = make_client()
+        backend = LocalBatchBackend(fake.create)
+        jobs = [BatchJob(id="acme", prompt="Research Acme")]
+
+        claude.run_batch(jobs, "system", lambda name, tool_input: "results", backend=backend)
+
+        assert jobs[0].content == "Final report"
+        assert [model for model, _ in fake.models] == [PRIMARY, FAST, FAST, PRIMARY]
+        stats = claude.usage.stats()
+        assert stats["escalations"] == 1
+        assert stats["escalated"]["output_tokens"] == 50
+
+
+class TestChatModel:
+    """Tests for selecting a model per chat request."""
+
+    def test_only_configured_models(self, tmp_path):
+        """Test that a chat request naming an unknown model is rejected."""
+        settings = Settings(
+            anthropic_api_key="test", skills_dir=tmp_path, claude_model=PRIMARY, fast_model=FAST
+        )
+        assert settings.chat_models == {PRIMARY, FAST}
+
+        app = create_app()
+        app.config["settings"] = settings
+        response = app.test_client().post(
+            "/api/chat",
+            json={"message": "Hi", "session_id": "model-check", "model": "other-model"},
+        )
+        assert response.status_code == 400
+        assert response.get_json() == {"error": "Unknown model: other-model"}
+        # Rejected before a session (and its agent) is created
+        assert "model-check" not in chat_routes._agents
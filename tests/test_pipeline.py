@@ -0,0 +1,157 @@
+"""Tests for the prospecting pipeline."""
+
+import threading
+
+import pytest
+
+from sdr_agent.agent import SDRAgent
+from sdr_agent.compose import ComposeResult, EmailDraft
+from sdr_agent.config import Settings
+from sdr_agent.dispatch import Priority, current_request_context
+from sdr_agent.pipeline import (
+    Pipeline,
+    StageStatus,
+    parse_qualifications,
+    run_prospecting_pipeline,
+)
+
+
+class TestPipeline:
+    """Tests for the DAG runner."""
+
+    def test_outputs_flow_to_dependents(self):
+        """Test that stages receive their dependencies' outputs."""
+        pipeline = Pipeline()
+        pipeline.add("a", lambda inputs: 2)
+        pipeline.add("b", lambda inputs: inputs["a"] * 3, ["a"])
+        pipeline.add("c", lambda inputs: inputs["a"] + inputs["b"], ["a", "b"])
+
+        results = pipeline.run()
+        assert list(results) == ["a", "b", "c"]
+        assert results["c"].output == 8
+        assert all(r.status == StageStatus.SUCCEEDED for r in results.values())
+
+    def test_independent_stages_run_concurrently(self):
+        """Test that stages without mutual dependencies overlap."""
+        barrier = threading.Barrier(3, timeout=5)
+        pipeline = Pipeline(max_workers=3)
+        pipeline.add("root", lambda inputs: None)
+        for name in ("x", "y", "z"):
+            pipeline.add(name, lambda inputs: barrier.wait(), ["root"])
+
+        results = pipeline.run()
+        assert all(r.status == StageStatus.SUCCEEDED for r in results.values())
+
+    def test_failure_skips_dependents_only(self):
+        """Test that a failure skips dependents transitively but not other stages."""
+
+        def fail(inputs):
+            raise RuntimeError("boom")
+
+        finished = []
+        pipeline = Pipeline()
+        pipeline.add("bad", fail)
+        pipeline.add("child", lambda inputs: 1, ["bad"])
+        pipeline.add("grandchild", lambda inputs: 1, ["child"])
+        pipeline.add("ok", lambda inputs: 1)
+
+        results = pipeline.run(on_stage=lambda r: finished.append(r.name))
+        assert results["bad"].status == StageStatus.FAILED
+        assert results["bad"].error == "boom"
+        assert results["child"].status == StageStatus.SKIPPED
+        assert results["grandchild"].status == StageStatus.SKIPPED
+        assert results["ok"].status == StageStatus.SUCCEEDED
+        assert sorted(finished) == sorted(results)
+
+    def test_invalid_stages(self):
+        """Test that unknown dependencies and duplicate names are rejected."""
+        pipeline = Pipeline().add("a", lambda inputs: 1)
+        with pytest.raises(ValueError):
+            pipeline.add("a", lambda inputs: 1)
+        with pytest.raises(ValueError):
+            pipeline.add("b", lambda inputs: 1, ["missing"])
+
+
+class TestParsing:
+    """Tests for stage output parsing."""
+
+    def test_parse_qualifications(self):
+        """Test parsing JSON qualifications in a fenced block."""
+        text = (
+            'Here you go:\n```json\n[{"prospect": "Jane Doe", "score": 82, "tier": "Hot",'
+            ' "rationale": "Demo requested."}]\n```'
+        )
+        [jane, bob] = parse_qualifications(text, ["Jane Doe", "Bob Roe"])
+        assert (jane.score, jane.tier) == (82, "Hot")
+        assert bob.tier == ""
+
+    def test_parse_qualifications_casing(self):
+        """Test that names are matched case-insensitively and keep the caller's spelling."""
+        text = '[{"prospect": "jane doe", "score": 82, "tier": "Hot"}]'
+        [jane] = parse_qualifications(text, ["Jane Doe"])
+        assert (jane.prospect, jane.tier) == ("Jane Doe", "Hot")
+
+    def test_parse_qualifications_fallback(self):
+        """Test that unparseable output is kept as the rationale."""
+        [jane] = parse_qualifications("Jane looks promising.", ["Jane"])
+        assert jane.rationale == "Jane looks promising."
+
+
+class TestProspectingPipeline:
+    """Tests for run_prospecting_pipeline."""
+
+    def test_stages_and_isolated_context(self, tmp_path):
+        """Test the full pipeline with stubbed model calls."""
+        settings = Settings(
+            anthropic_api_key="test",
+            skills_dir=tmp_path,
+            research_prefetch=False,
+            research_store=False,
+        )
+        agent = SDRAgent(settings)
+        prompts = {}
+        priorities = set()
+
+        def run_task(message, skill=None):
+            priorities.add(current_request_context()[0])
+            if skill == "company-research":
+                return "Pipeline Test Co builds payroll software."
+            if skill == "prospect-research":
+                name = "Jane" if '"Jane"' in message else "Bob"
+                prompts[name] = message
+                return f"{name} runs the payroll team."
+            if skill == "lead-qualifier":
+                prompts["qualify"] = message
+                return (
+                    '```json\n[{"prospect": "jane", "score": 85, "tier": "Hot"},'
+                    ' {"prospect": "Bob", "score": 10, "tier": "Unqualified"}]\n```'
+                )
+            raise AssertionError(f"unexpected task for {skill}")
+
+        def compose_emails(recipients, context=""):
+            prompts["email"] = context + "".join(r.notes for r in recipients)
+            drafts = [
+                EmailDraft(prospect=r.name, subject="Payroll at Pipeline Test Co", body="Hi")
+                for r in recipients
+            ]
+            return ComposeResult(drafts=drafts, requests=1)
+
+        agent.run_task = run_task
+        agent.compose_emails = compose_emails
+        # Duplicates are researched once; the model's casing of names does not matter
+        result = run_prospecting_pipeline(agent, "Pipeline Test Co", ["Jane", "Bob", "JANE"])
+
+        assert result.company.report == "Pipeline Test Co builds payroll software."
+        assert [b.target for b in result.prospects] == ["Jane", "Bob"]
+        assert [q.tier for q in result.qualifications] == ["Hot", "Unqualified"]
+        assert [(d.prospect, d.subject) for d in result.emails] == [
+            ("Jane", "Payroll at Pipeline Test Co")
+        ]
+        assert all(s.status == StageStatus.SUCCEEDED for s in result.stages)
+        assert priorities == {Priority.BATCH}
+
+        # Each stage sees only the digests it needs
+        assert "builds payroll software" in prompts["Jane"]
+        assert "Bob" not in prompts["Jane"]
+        assert "Jane runs" in prompts["qualify"] and "Bob runs" in prompts["qualify"]
+        assert "Jane runs" in prompts["email"] and "Bob" not in prompts["email"]
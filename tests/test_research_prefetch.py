@@ -0,0 +1,85 @@
+"""Tests for speculative research prefetch."""
+
+import threading
+import time
+
+import pytest
+
+from sdr_agent.agent import SDRAgent
+from sdr_agent.config import Settings
+from sdr_agent.search.prefetch import COMPANY_RESEARCH_QUERIES, prefetch_company_research
+
+
+class TestPrefetchCompanyResearch:
+    """Tests for prefetch_company_research."""
+
+    def test_runs_all_queries_in_parallel(self):
+        """Test that every canonical query runs, concurrently."""
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def search(query, max_results, token_budget):
+            with lock:
+                active.append(query)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(query)
+            return f"results for {query}"
+
+        block = prefetch_company_research(search, "Acme")
+        assert block.startswith('<prefetched_research company="Acme">')
+        for topic in COMPANY_RESEARCH_QUERIES:
+            assert f"### {topic}" in block
+        assert max(peak) > 1
+
+    def test_skips_failed_queries(self):
+        """Test that failed searches are left out of the block."""
+
+        def search(query, max_results, token_budget):
+            if "funding" in query:
+                raise RuntimeError("quota")
+            return "ok"
+
+        block = prefetch_company_research(search, "Acme")
+        assert "Funding and financials" not in block
+        assert "Company overview" in block
+
+    def test_empty_when_all_fail(self):
+        """Test that nothing is injected without a working search backend."""
+
+        def search(query, max_results, token_budget):
+            return "Error: Tavily API key not configured."
+
+        assert prefetch_company_research(search, "Acme") == ""
+
+
+@pytest.fixture
+def agent(tmp_path):
+    """An agent with a stubbed search backend (no API calls are made)."""
+    agent = SDRAgent(Settings(anthropic_api_key="test", skills_dir=tmp_path))
+    agent.skill_executor.web_search = lambda query, max_results, token_budget: f"found {query}"
+    return agent
+
+
+class TestBuildResearchPrompt:
+    """Tests for SDRAgent.build_research_prompt."""
+
+    def test_company_prompt_includes_prefetch(self, agent):
+        """Test that company research carries prefetched results."""
+        prompt = agent.build_research_prompt(company="Acme")
+        assert "<prefetched_research" in prompt
+        assert prompt.rstrip().endswith("prepare for outreach.")
+
+    def test_prefetch_disabled(self, agent):
+        """Test that prefetch can be turned off."""
+        agent.settings.research_prefetch = False
+        prompt = agent.build_research_prompt(company="Acme")
+        assert "<prefetched_research" not in prompt
+
+    def test_prospect_prompt(self, agent):
+        """Test that prospect research is not prefetched."""
+        prompt = agent.build_research_prompt(company="Acme", prospect="Jane Doe")
+        assert prompt.startswith('Research the prospect "Jane Doe" at Acme')
+        assert "<prefetched_research" not in prompt
@@ -0,0 +1,154 @@
+"""Tests for the content-addressed response cache."""
+
+import time
+
+from anthropic.types import Message
+
+from sdr_agent.llm.batch import BatchJob, LocalBatchBackend
+from sdr_agent.llm.cache import ResponseCache, bypass_response_cache, cache_key
+from sdr_agent.llm.claude import ClaudeClient
+
+
+def message(text):
+    return Message.model_validate(
+        {
+            "id": "msg_1",
+            "type": "message",
+            "role": "assistant",
+            "model": "test-model",
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": 10, "output_tokens": 5},
+        }
+    )
+
+
+def params(text="Research Acme", model="test-model"):
+    return {
+        "model": model,
+        "max_tokens": 1024,
+        "system": "system",
+        "messages": [{"role": "user", "content": text}],
+    }
+
+
+class CountingMessages:
+    """Answers with a numbered reply and counts API calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        return message(f"reply {self.calls}")
+
+
+def make_client(cache):
+    claude = ClaudeClient(api_key="test", response_cache=cache)
+    api = CountingMessages()
+    claude.client.messages = api
+    return claude, api
+
+
+class TestCacheKey:
+    """Tests for cache_key."""
+
+    def test_key_is_canonical(self):
+        """Test that key order does not matter but content does."""
+        reordered = dict(reversed(list(params().items())))
+        assert cache_key(params()) == cache_key(reordered)
+        assert cache_key(params()) != cache_key(params("Research Globex"))
+        assert cache_key(params()) != cache_key(params(model="other-model"))
+
+
+class TestResponseCache:
+    """Tests for ResponseCache tiers, TTL and bypass."""
+
+    def test_memory_hit(self):
+        """Test that a stored response is returned for an identical request."""
+        cache = ResponseCache()
+        cache.put(params(), message("hello"))
+        assert cache.get(params()).content[0].text == "hello"
+        assert cache.get(params("other")) is None
+        assert cache.stats()["hit_ratio"] == 0.5
+
+    def test_lru_eviction(self):
+        """Test that the least recently used response is evicted from memory."""
+        cache = ResponseCache(max_entries=1)
+        cache.put(params("a"), message("a"))
+        cache.put(params("b"), message("b"))
+        assert cache.get(params("a")) is None
+
+    def test_ttl_expiry(self):
+        """Test that responses expire after the TTL."""
+        cache = ResponseCache(ttl=0.01)
+        cache.put(params(), message("hello"))
+        time.sleep(0.02)
+        assert cache.get(params()) is None
+
+    def test_disk_tier(self, tmp_path):
+        """Test that responses survive in the disk tier across cache instances."""
+        ResponseCache(directory=tmp_path).put(params(), message("hello"))
+
+        cache = ResponseCache(directory=tmp_path)
+        assert cache.get(params()).content[0].text == "hello"
+        assert cache.get(params()).content[0].text == "hello"
+        assert cache.stats()["disk_hits"] == 1
+        assert cache.stats()["memory_hits"] == 1
+
+    def test_bypass(self):
+        """Test that lookups are skipped inside bypass_response_cache."""
+        cache = ResponseCache()
+        cache.put(params(), message("hello"))
+        with bypass_response_cache():
+            assert cache.get(params()) is None
+        assert cache.stats()["bypassed"] == 1
+
+
+class TestClientCaching:
+    """Tests for ClaudeClient with a response cache."""
+
+    def test_repeat_conversation_is_served_from_cache(self):
+        """Test that replaying an identical conversation makes no API calls."""
+        claude, api = make_client(ResponseCache())
+        first = claude.chat("Research Acme", "system")
+        claude.clear_conversation()
+        second = claude.chat("Research Acme", "system")
+
+        assert api.calls == 1
+        assert second.content == first.content
+
+    def test_bypass_refreshes_entry(self):
+        """Test that a bypassed request calls the API and updates the cache."""
+        claude, api = make_client(ResponseCache())
+        claude.chat("Research Acme", "system")
+        claude.clear_conversation()
+        with bypass_response_cache():
+            refreshed = claude.chat("Research Acme", "system")
+        claude.clear_conversation()
+
+        assert refreshed.content == "reply 2"
+        assert claude.chat("Research Acme", "system").content == "reply 2"
+        assert api.calls == 2
+
+    def test_without_cache_every_request_calls_api(self):
+        """Test that caching is off by default."""
+        claude, api = make_client(None)
+        claude.chat("Research Acme", "system")
+        claude.clear_conversation()
+        claude.chat("Research Acme", "system")
+        assert api.calls == 2
+
+    def test_batch_rerun_skips_cached_requests(self):
+        """Test that a re-run batch only submits requests not seen before."""
+        cache = ResponseCache()
+        claude, api = make_client(cache)
+        backend = LocalBatchBackend(api.create)
+
+        claude.run_batch([BatchJob(id="acme", prompt="Acme")], "system", str, backend=backend)
+        jobs = [BatchJob(id=name, prompt=name) for name in ("Acme", "Globex")]
+        claude.run_batch(jobs, "system", str, backend=backend)
+
+        assert api.calls == 2
+        assert [job.content for job in jobs] == ["reply 1", "reply 2"]
@@ -0,0 +1,182 @@
+"""Tests for the rate-limit-aware request scheduler."""
+
+import threading
+import time
+
+import anthropic
+import httpx
+import pytest
+import requests
+from tavily.errors import (
+    BadRequestError,
+    ForbiddenError,
+    InvalidAPIKeyError,
+    UsageLimitExceededError,
+)
+from tavily.errors import TimeoutError as TavilyTimeoutError
+
+from sdr_agent.scheduler import (
+    RequestScheduler,
+    TokenBucket,
+    anthropic_retry_after,
+    tavily_retry_after,
+)
+
+
+def _status_error(cls, status, headers=None):
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    return cls("error", response=response, body=None)
+
+
+class TestTokenBucket:
+    """Tests for TokenBucket."""
+
+    def test_no_wait_within_capacity(self):
+        """Test that reservations within capacity do not wait."""
+        bucket = TokenBucket(per_minute=60)
+        assert bucket.reserve(10) == 0.0
+
+    def test_wait_when_exhausted(self):
+        """Test that exhausting the bucket returns the refill wait."""
+        bucket = TokenBucket(per_minute=60, capacity=1)
+        bucket.reserve(1)
+        assert bucket.reserve(1) == pytest.approx(1.0, abs=0.05)
+
+    def test_adjust_corrects_reservation(self):
+        """Test that refunds make capacity available again."""
+        bucket = TokenBucket(per_minute=60, capacity=10)
+        bucket.reserve(10)
+        bucket.adjust(-10)
+        assert bucket.reserve(5) == 0.0
+
+
+class TestClassifiers:
+    """Tests for the provider error classifiers."""
+
+    def test_anthropic_rate_limit_with_retry_after(self):
+        """Test that 429s honour the retry-after header."""
+        error = _status_error(anthropic.RateLimitError, 429, {"retry-after": "7"})
+        assert anthropic_retry_after(error) == 7.0
+
+    def test_anthropic_overloaded(self):
+        """Test that 529 overloaded errors are retried with backoff."""
+        error = _status_error(anthropic.InternalServerError, 529)
+        assert anthropic_retry_after(error) == 0.0
+
+    def test_anthropic_bad_request_is_fatal(self):
+        """Test that client errors are not retried."""
+        error = _status_error(anthropic.BadRequestError, 400)
+        assert anthropic_retry_after(error) is None
+
+    def test_tavily(self):
+        """Test that Tavily rate limits, timeouts and network errors are retried."""
+        assert tavily_retry_after(UsageLimitExceededError("429 rate limit")) == 0.0
+        assert tavily_retry_after(TavilyTimeoutError(10)) == 0.0
+        assert tavily_retry_after(requests.ConnectionError("reset")) == 0.0
+        assert tavily_retry_after(ConnectionResetError("reset")) == 0.0
+
+    def test_tavily_fatal(self):
+        """Test that exhausted quotas, bad keys and bad requests are not retried."""
+        for error in (
+            ForbiddenError("432 plan limit"),
+            InvalidAPIKeyError("bad key"),
+            BadRequestError("bad query"),
+            ValueError("bad"),
+        ):
+            assert tavily_retry_after(error) is None
+
+    def test_tavily_http_errors(self):
+        """Test that only server errors among other HTTP statuses are retried."""
+
+        def http_error(status):
+            response = requests.Response()
+            response.status_code = status
+            return requests.HTTPError(f"{status}", response=response)
+
+        assert tavily_retry_after(http_error(503)) == 0.0
+        assert tavily_retry_after(http_error(404)) is None
+
+
+class TestRequestScheduler:
+    """Tests for RequestScheduler."""
+
+    def test_retries_until_success(self):
+        """Test that retryable errors are retried."""
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise RuntimeError("busy")
+            return "ok"
+
+        scheduler = RequestScheduler("test", base_delay=0.001, retry_after=lambda e: 0.0)
+        assert scheduler.call(flaky) == "ok"
+        assert scheduler.stats()["retries"] == 2
+
+    def test_gives_up_after_max_retries(self):
+        """Test that the last error is raised once retries are exhausted."""
+        scheduler = RequestScheduler(
+            "test", max_retries=2, base_delay=0.001, retry_after=lambda e: 0.0
+        )
+        with pytest.raises(RuntimeError):
+            scheduler.call(lambda: (_ for _ in ()).throw(RuntimeError("busy")))
+        assert scheduler.stats()["requests"] == 3
+        assert scheduler.stats()["failures"] == 1
+
+    def test_fatal_errors_not_retried(self):
+        """Test that non-retryable errors propagate immediately."""
+        scheduler = RequestScheduler("test")
+        with pytest.raises(ValueError):
+            scheduler.call(lambda: (_ for _ in ()).throw(ValueError("bad")))
+        assert scheduler.stats()["retries"] == 0
+
+    def test_can_retry_vetoes_retries(self):
+        """Test that a retryable error is raised when the caller can no longer retry."""
+        scheduler = RequestScheduler("test", base_delay=0.001, retry_after=lambda e: 0.0)
+        with pytest.raises(RuntimeError):
+            scheduler.call(
+                lambda: (_ for _ in ()).throw(RuntimeError("busy")), can_retry=lambda: False
+            )
+        assert scheduler.stats()["requests"] == 1
+        assert scheduler.stats()["failures"] == 1
+
+    def test_retry_after_pauses_all_callers(self):
+        """Test that a retry-after hint delays the next request."""
+        calls = []
+
+        def limited():
+            calls.append(time.monotonic())
+            if len(calls) == 1:
+                raise RuntimeError("429")
+            return "ok"
+
+        scheduler = RequestScheduler("test", base_delay=0.001, retry_after=lambda e: 0.2)
+        scheduler.call(limited)
+        assert calls[1] - calls[0] >= 0.2
+
+    def test_in_flight_cap(self):
+        """Test that concurrent calls never exceed max_in_flight."""
+        scheduler = RequestScheduler("test", max_in_flight=2)
+        peak = []
+
+        def work():
+            peak.append(scheduler.stats()["in_flight"])
+            time.sleep(0.02)
+
+        threads = [threading.Thread(target=scheduler.call, args=(work,)) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert max(peak) <= 2
+
+    def test_request_rate(self):
+        """Test that the request bucket throttles bursts."""
+        scheduler = RequestScheduler("test", requests_per_minute=600)
+        scheduler.requests = TokenBucket(per_minute=600, capacity=1)
+        start = time.monotonic()
+        for _ in range(3):
+            scheduler.call(lambda: None)
+        assert time.monotonic() - start >= 0.19
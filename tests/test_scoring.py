@@ -0,0 +1,164 @@
+"""Tests for bulk lead scoring."""
+
+from sdr_agent.scoring import (
+    Criterion,
+    ScoringModel,
+    Tier,
+    format_lead_scores,
+    load_scoring_model,
+    read_leads_csv,
+    score_leads,
+    score_matrix,
+)
+from sdr_agent.skills.executor import SkillExecutor
+from sdr_agent.skills.loader import SkillLoader
+
+MODEL = ScoringModel(
+    criteria=[
+        Criterion(name="Persona", column="title", points=40, contains=["vp", "director"]),
+        Criterion(name="Industry", column="industry", points=20, values=["SaaS", "Fintech"]),
+        Criterion(name="Size", column="employees", points=20, min=50, max=1000),
+        Criterion(name="Demo", column="requested_demo", points=20),
+    ],
+    tiers=[
+        Tier(name="Hot", min_score=80),
+        Tier(name="Warm", min_score=50),
+        Tier(name="Cold", min_score=0),
+    ],
+)
+
+LEADS = [
+    {"name": "Ana", "title": "Engineer", "industry": "retail", "employees": "20"},
+    {"name": "Ben", "title": "VP Sales", "industry": "saas", "employees": "200",
+     "requested_demo": "yes"},
+    {"name": "Cal", "title": "Sales Director", "industry": "Fintech", "employees": "n/a",
+     "requested_demo": "0"},
+]
+
+
+class TestScoreMatrix:
+    """Tests for score_matrix."""
+
+    def test_criteria(self):
+        """Test contains, values, range and truthy criteria."""
+        matrix = score_matrix(LEADS, MODEL)
+        assert matrix.tolist() == [
+            [0, 0, 0, 0],
+            [40, 20, 20, 20],
+            [40, 20, 0, 0],
+        ]
+
+    def test_missing_columns_score_zero(self):
+        """Test that leads without a criterion's column earn no points for it."""
+        assert score_matrix([{}], MODEL).sum() == 0
+        assert score_matrix([], MODEL).shape == (0, 4)
+
+
+class TestScoreLeads:
+    """Tests for score_leads."""
+
+    def test_ranking_and_tiers(self):
+        """Test that leads are ranked best first and tiered by threshold."""
+        results = score_leads(LEADS, MODEL)
+        top = results.top()
+        assert [lead.lead["name"] for lead in top] == ["Ben", "Cal", "Ana"]
+        assert [lead.tier for lead in top] == ["Hot", "Warm", "Cold"]
+        assert [lead.rank for lead in top] == [1, 2, 3]
+        assert results.tier_counts() == {"Hot": 1, "Warm": 1, "Cold": 1}
+
+    def test_borderline(self):
+        """Test that scores near a tier boundary are flagged."""
+        model = MODEL.model_copy(update={"borderline_margin": 15})
+        results = score_leads(LEADS, model)
+        assert [lead.lead["name"] for lead in results.borderline_leads()] == ["Cal"]
+
+    def test_default_model(self):
+        """Test the lead-qualifier default model on a strong lead."""
+        lead = {
+            "title": "Chief Revenue Officer",
+            "target_industry": "yes",
+            "size_in_range": "true",
+            "requested_demo": "1",
+            "responded_email": "yes",
+            "visited_pricing": "yes",
+            "website_visits": "4",
+        }
+        [scored] = score_leads([lead]).top()
+        assert scored.score == 85
+        assert scored.tier == "Hot"
+
+    def test_large_list(self):
+        """Test scoring a large list in one pass."""
+        leads = [{"title": "VP", "requested_demo": str(i % 2)} for i in range(10000)]
+        results = score_leads(leads, MODEL)
+        assert len(results) == 10000
+        assert results.tier_counts() == {"Warm": 5000, "Cold": 5000}
+        assert len(results.top(5)) == 5
+
+
+class TestLoading:
+    """Tests for loading models and leads from files."""
+
+    def test_yaml_model_and_csv(self, tmp_path):
+        """Test loading a YAML scoring model and a CSV of leads."""
+        model_path = tmp_path / "model.yaml"
+        model_path.write_text(
+            "criteria:\n"
+            "  - {name: Demo, column: requested_demo, points: 100}\n"
+            "tiers:\n"
+            "  - {name: Hot, min_score: 50}\n"
+            "  - {name: Cold, min_score: 0}\n"
+        )
+        csv_path = tmp_path / "leads.csv"
+        csv_path.write_text("name,requested_demo\nAna,no\nBen,yes\n")
+
+        results = score_leads(read_leads_csv(csv_path), load_scoring_model(model_path))
+        assert [(lead.lead["name"], lead.tier) for lead in results.top()] == [
+            ("Ben", "Hot"),
+            ("Ana", "Cold"),
+        ]
+
+
+class TestScoreLeadsTool:
+    """Tests for the score_leads tool."""
+
+    def test_tool(self, tmp_path):
+        """Test scoring leads passed inline through the executor."""
+        executor = SkillExecutor(SkillLoader(tmp_path), scoring_model=MODEL)
+        output = executor.execute_tool("score_leads", {"leads": LEADS})
+        assert output == format_lead_scores(score_leads(LEADS, MODEL))
+        assert output.startswith("Scored 3 leads.")
+        assert "1. Ben - 100 (Hot)" in output
+
+    def test_tool_requires_leads(self, tmp_path):
+        """Test that the tool reports missing input and unreadable files."""
+        executor = SkillExecutor(SkillLoader(tmp_path), leads_dir=tmp_path)
+        assert executor.execute_tool("score_leads", {}).startswith("Error")
+        missing = executor.execute_tool("score_leads", {"csv_path": str(tmp_path / "none.csv")})
+        assert missing.startswith("Error reading leads CSV")
+
+    def test_csv_path_inside_leads_dir(self, tmp_path):
+        """Test that CSV files are only read from the leads directory."""
+        leads_dir = tmp_path / "data"
+        leads_dir.mkdir()
+        (leads_dir / "leads.csv").write_text("name,requested_demo\nBen,yes\n")
+        (tmp_path / "secret.csv").write_text("name\nSecret\n")
+        executor = SkillExecutor(SkillLoader(tmp_path), leads_dir=leads_dir)
+
+        assert executor.execute_tool("score_leads", {"csv_path": "leads.csv"}).startswith(
+            "Scored 1 leads."
+        )
+        for path in ("../secret.csv", str(tmp_path / "secret.csv")):
+            output = executor.execute_tool("score_leads", {"csv_path": path})
+            assert output == "Error: csv_path must be a file in the data directory"
+
+        unrestricted = SkillExecutor(SkillLoader(tmp_path))
+        output = unrestricted.execute_tool("score_leads", {"csv_path": "leads.csv"})
+        assert output.startswith("Error: csv_path must be")
+
+    def test_rejects_malformed_leads(self, tmp_path):
+        """Test that leads that are not objects are reported instead of raising."""
+        executor = SkillExecutor(SkillLoader(tmp_path))
+        for leads in (["Ben"], [{"name": "Ana"}, 3], "Ben"):
+            output = executor.execute_tool("score_leads", {"leads": leads})
+            assert output == "Error: leads must be a list of objects of column name to value"
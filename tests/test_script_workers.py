@@ -0,0 +1,127 @@
+"""Tests for the warm script worker pool."""
+
+import asyncio
+import time
+
+import pytest
+
+from sdr_agent.skills.executor import SkillExecutor
+from sdr_agent.skills.loader import SkillLoader
+from sdr_agent.skills.workers import ScriptWorkerPool, get_script_pool
+
+
+@pytest.fixture(scope="module")
+def pool():
+    """A small worker pool shared by the tests in this module."""
+    pool = ScriptWorkerPool(size=2, timeout=10)
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def skill_dir(tmp_path):
+    """Create a skill with a scripts directory."""
+    skill_path = tmp_path / "script-skill"
+    scripts = skill_path / "scripts"
+    scripts.mkdir(parents=True)
+    (skill_path / "SKILL.md").write_text("""---
+name: script-skill
+description: A skill with scripts
+---
+
+Instructions.
+""")
+    (scripts / "echo.py").write_text(
+        "import os, sys\n"
+        "print('args', sys.argv[1:])\n"
+        "print('cwd', os.path.basename(os.getcwd()))\n"
+        "print('warning', file=sys.stderr)\n"
+    )
+    (scripts / "fail.py").write_text("import sys\nsys.exit(3)\n")
+    (scripts / "raise.py").write_text("raise ValueError('boom')\n")
+    (scripts / "slow.py").write_text("import time\nprint('started')\ntime.sleep(30)\n")
+    (scripts / "sleep.py").write_text("import time\ntime.sleep(0.5)\n")
+    return tmp_path
+
+
+@pytest.fixture
+def skill(skill_dir):
+    """The loaded script skill."""
+    loader = SkillLoader(skill_dir)
+    loader.discover_skills()
+    return loader.get_skill("script-skill")
+
+
+class TestScriptWorkerPool:
+    """Tests for ScriptWorkerPool."""
+
+    def test_run_captures_output(self, pool, skill):
+        """Test that stdout and stderr are captured and args/cwd applied."""
+        result = pool.run(skill.scripts_dir / "echo.py", ["a", "b"], cwd=skill.path)
+        assert result.returncode == 0
+        assert "args ['a', 'b']" in result.output
+        assert "cwd script-skill" in result.output
+        assert "warning" in result.output
+
+    def test_exit_code(self, pool, skill):
+        """Test that sys.exit codes are reported."""
+        assert pool.run(skill.scripts_dir / "fail.py").returncode == 3
+
+    def test_exception(self, pool, skill):
+        """Test that uncaught exceptions fail with a traceback."""
+        result = pool.run(skill.scripts_dir / "raise.py")
+        assert result.returncode == 1
+        assert "ValueError: boom" in result.output
+
+    def test_timeout_streams_partial_output(self, pool, skill):
+        """Test that output streams before a timeout kills the worker."""
+        chunks = []
+        result = pool.run(skill.scripts_dir / "slow.py", timeout=1, on_output=chunks.append)
+        assert result.timed_out
+        assert "started" in "".join(chunks)
+
+    async def test_run_async_overlaps(self, pool, skill):
+        """Test that async runs execute concurrently."""
+        script = skill.scripts_dir / "sleep.py"
+        pool.run(script)  # make sure workers are warm
+        start = time.monotonic()
+        results = await asyncio.gather(pool.run_async(script), pool.run_async(script))
+        assert all(r.returncode == 0 for r in results)
+        assert time.monotonic() - start < 1.0
+
+
+class TestGetScriptPool:
+    """Tests for get_script_pool."""
+
+    def test_pool_per_configuration(self):
+        """Test that executors with different script settings get their own pools."""
+        assert get_script_pool(1, 5.0, 128) is get_script_pool(1, 5.0, 128)
+        strict = get_script_pool(1, 5.0, 64)
+        assert strict is not get_script_pool(1, 5.0, 128)
+        assert (strict.size, strict.timeout, strict.memory_limit_mb) == (1, 5.0, 64)
+
+
+class TestRunSkillScript:
+    """Tests for SkillExecutor.run_skill_script."""
+
+    def test_python_script_uses_pool(self, skill):
+        """Test running a Python script through the executor."""
+        executor = SkillExecutor(skill_loader=SkillLoader(skill.path.parent))
+        success, output = executor.run_skill_script(skill, "echo.py", ["x"])
+        assert success
+        assert "args ['x']" in output
+
+    def test_missing_script(self, skill):
+        """Test that a missing script is reported."""
+        executor = SkillExecutor(skill_loader=SkillLoader(skill.path.parent))
+        success, output = executor.run_skill_script(skill, "missing.py")
+        assert not success
+        assert output == "Script not found: missing.py"
+
+    def test_subprocess_fallback(self, skill):
+        """Test that disabling the pool falls back to a subprocess."""
+        executor = SkillExecutor(
+            skill_loader=SkillLoader(skill.path.parent), script_workers=0
+        )
+        success, output = executor.run_skill_script(skill, "fail.py")
+        assert not success
@@ -0,0 +1,87 @@
+"""Tests for search result compaction."""
+
+from sdr_agent.search.compaction import (
+    compact_search_results,
+    estimate_tokens,
+    normalize_url,
+    split_sentences,
+)
+
+FUNDING = "Acme Corp raised a $50M Series B led by Sequoia in March 2024."
+PRODUCT = "The company builds rocket engines for small satellites."
+TEAM = "Jane Doe is the CEO of Acme Corp and previously worked at SpaceX."
+
+
+def _response(*results, answer=None):
+    response = {"results": [{"title": t, "url": u, "content": c} for t, u, c in results]}
+    if answer:
+        response["answer"] = answer
+    return response
+
+
+class TestHelpers:
+    """Tests for compaction helpers."""
+
+    def test_normalize_url(self):
+        """Test that scheme, www, trailing slashes and tracking params are ignored."""
+        assert normalize_url("https://www.Acme.com/news/?utm_source=x") == "acme.com/news"
+        assert normalize_url("http://acme.com/news?id=1") == "acme.com/news?id=1"
+
+    def test_split_sentences_drops_boilerplate(self):
+        """Test that cookie banners and short fragments are removed."""
+        text = f"Accept all cookies to continue. Menu. {FUNDING} {PRODUCT}"
+        assert split_sentences(text) == [FUNDING, PRODUCT]
+
+
+class TestCompactSearchResults:
+    """Tests for compact_search_results."""
+
+    def test_keeps_summary_and_layout(self):
+        """Test that the answer and result headers are preserved."""
+        text = compact_search_results(
+            "acme funding",
+            _response(("Funding", "https://acme.com/news", FUNDING), answer="Acme makes rockets."),
+        )
+        assert text.startswith("Summary: Acme makes rockets.")
+        assert "1. Funding" in text
+        assert "URL: https://acme.com/news" in text
+        assert FUNDING in text
+
+    def test_drops_duplicate_urls(self):
+        """Test that the same page reached via different URLs appears once."""
+        text = compact_search_results(
+            "acme",
+            _response(
+                ("First", "https://www.acme.com/news", FUNDING),
+                ("Second", "https://acme.com/news/?utm_campaign=y", TEAM),
+            ),
+        )
+        assert "First" in text
+        assert "Second" not in text
+
+    def test_drops_near_duplicate_content(self):
+        """Test that syndicated copies of the same text are removed."""
+        text = compact_search_results(
+            "acme funding",
+            _response(
+                ("Original", "https://acme.com/a", f"{FUNDING} {PRODUCT}"),
+                ("Syndicated", "https://news.com/b", f"{FUNDING} {PRODUCT}"),
+            ),
+        )
+        assert text.count(FUNDING) == 1
+        assert "Syndicated" not in text
+
+    def test_budget_prefers_relevant_sentences(self):
+        """Test that a tight budget keeps the sentence matching the query."""
+        response = _response(
+            ("Product", "https://acme.com/p", PRODUCT),
+            ("Funding", "https://acme.com/f", FUNDING),
+        )
+        text = compact_search_results("series b funding sequoia", response, token_budget=40)
+        assert FUNDING in text
+        assert PRODUCT not in text
+        assert estimate_tokens(text) <= 40
+
+    def test_empty_results(self):
+        """Test output when there are no results."""
+        assert compact_search_results("acme", {"results": []}) == "Search Results:"
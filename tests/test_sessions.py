@@ -0,0 +1,171 @@
+"""Tests for shared session state backends."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from sdr_agent.agent import SDRAgent
+from sdr_agent.config import Settings
+from sdr_agent.journal import JournalSessionBackend
+from sdr_agent.sessions import (
+    MemorySessionBackend,
+    SessionConflict,
+    SessionState,
+    SessionSync,
+    SQLiteSessionBackend,
+)
+
+
+def user(text):
+    return {"role": "user", "content": text}
+
+
+def assistant(text):
+    return {"role": "assistant", "content": [{"type": "text", "text": text}]}
+
+
+@pytest.fixture(params=["memory", "sqlite", "journal"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemorySessionBackend()
+    if request.param == "journal":
+        return JournalSessionBackend(tmp_path / "journal")
+    return SQLiteSessionBackend(tmp_path / "sessions.db")
+
+
+class TestSessionBackend:
+    """Tests shared by every SessionBackend."""
+
+    def test_append_and_load_tail(self, backend):
+        """Test that appends extend the log and loads can start mid-log."""
+        state = backend.append("s1", [user("hi"), assistant("hello")], SessionState())
+        state = backend.append("s1", [user("more")], state)
+
+        assert state == SessionState(epoch=0, length=3)
+        loaded_state, tail = backend.load("s1", start=2)
+        assert loaded_state == state
+        assert tail == [user("more")]
+        assert backend.state("other") == SessionState()
+
+    def test_stale_append_conflicts(self, backend):
+        """Test that an append from an out-of-date writer is refused."""
+        backend.append("s1", [user("hi")], SessionState())
+        with pytest.raises(SessionConflict):
+            backend.append("s1", [user("stale")], SessionState())
+        assert backend.state("s1").length == 1
+
+    def test_clear_starts_new_epoch(self, backend):
+        """Test that clearing empties the log and changes its epoch."""
+        backend.append("s1", [user("hi")], SessionState())
+        state = backend.clear("s1")
+        assert state == SessionState(epoch=1, length=0)
+        assert backend.load("s1") == (state, [])
+
+    def test_sqlite_is_shared_between_instances(self, tmp_path):
+        """Test that separate connections (as in separate workers) see one log."""
+        first = SQLiteSessionBackend(tmp_path / "sessions.db")
+        second = SQLiteSessionBackend(tmp_path / "sessions.db")
+        first.append("s1", [user("hi")], SessionState())
+        assert second.load("s1")[1] == [user("hi")]
+
+
+class TestSessionSync:
+    """Tests for SessionSync."""
+
+    def test_pull_appends_only_new_messages(self, backend):
+        """Test that a worker loads just the messages written elsewhere."""
+        worker_a, worker_b = SessionSync(backend, "s1"), SessionSync(backend, "s1")
+        messages_a, messages_b = [user("hi"), assistant("hello")], []
+        worker_a.push(messages_a)
+
+        assert worker_b.pull(messages_b) is None
+        assert messages_b == messages_a
+
+        messages_b += [user("next"), assistant("ok")]
+        worker_b.push(messages_b)
+        assert worker_a.pull(messages_a) is None
+        assert messages_a == messages_b
+
+    def test_pull_reloads_after_clear(self, backend):
+        """Test that a cleared session is reloaded rather than extended."""
+        worker_a, worker_b = SessionSync(backend, "s1"), SessionSync(backend, "s1")
+        messages_a = [user("hi")]
+        worker_a.push(messages_a)
+        worker_b.clear()
+        assert worker_a.pull(messages_a) == []
+
+
+def make_agent(tmp_path, backend, session_id="s1"):
+    settings = Settings(
+        anthropic_api_key="test",
+        skills_dir=tmp_path,
+        research_prefetch=False,
+        data_dir=tmp_path / "data",
+    )
+    agent = SDRAgent(settings)
+    agent.attach_session(backend, session_id)
+
+    def create(**params):
+        text = f"reply to {params['messages'][-1]['content']}"
+        return SimpleNamespace(
+            content=[SimpleNamespace(type="text", text=text)],
+            stop_reason="end_turn",
+            usage=SimpleNamespace(input_tokens=10, output_tokens=5),
+        )
+
+    agent.claude.client = SimpleNamespace(messages=SimpleNamespace(create=create))
+    return agent
+
+
+class TestAgentSessions:
+    """Tests for agents in different workers sharing one session."""
+
+    def run_turn(self, agent, message):
+        agent.sync_session()
+        reply = agent.chat(message)
+        agent.save_session()
+        return reply
+
+    def test_turns_continue_across_workers(self, tmp_path):
+        """Test that a turn served by another worker sees the whole conversation."""
+        backend = SQLiteSessionBackend(tmp_path / "sessions.db")
+        worker_a = make_agent(tmp_path, backend)
+        worker_b = make_agent(tmp_path, backend)
+
+        self.run_turn(worker_a, "first")
+        self.run_turn(worker_b, "second")
+
+        assert [m["content"] for m in worker_b.claude.messages if m["role"] == "user"] == [
+            "first",
+            "second",
+        ]
+        worker_a.sync_session()
+        assert worker_a.claude.messages == worker_b.claude.messages
+
+    def test_clear_reaches_every_worker(self, tmp_path):
+        """Test that clearing in one worker empties the conversation in the others."""
+        backend = MemorySessionBackend()
+        worker_a = make_agent(tmp_path, backend)
+        worker_b = make_agent(tmp_path, backend)
+        self.run_turn(worker_a, "first")
+        worker_b.sync_session()
+
+        worker_b.clear_conversation()
+        worker_a.sync_session()
+        assert worker_a.claude.messages == []
+
+    def test_conflicting_turn_is_dropped(self, tmp_path):
+        """Test that a turn racing another worker's turn is discarded on save."""
+        backend = MemorySessionBackend()
+        worker_a = make_agent(tmp_path, backend)
+        worker_b = make_agent(tmp_path, backend)
+
+        worker_a.sync_session()
+        worker_b.sync_session()
+        worker_a.chat("from a")
+        worker_b.chat("from b")
+        worker_a.save_session()
+        worker_b.save_session()
+
+        assert worker_b.claude.messages == worker_a.claude.messages
+        assert backend.state("s1").length == 2
@@ -0,0 +1,187 @@
+"""Tests for single-flight deduplication."""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from sdr_agent.agent import SDRAgent, research_key, research_streams
+from sdr_agent.config import Settings
+from sdr_agent.llm.claude import ClaudeClient
+from sdr_agent.singleflight import SingleFlight
+from web.routes.research import research_stream
+
+from .test_model_routing import text
+
+
+class TestDo:
+    """Tests for SingleFlight.do."""
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Test that concurrent callers with the same key run fn once."""
+        flights = SingleFlight()
+        calls = []
+        results = []
+
+        def work():
+            calls.append(1)
+            time.sleep(0.1)
+            return "report"
+
+        def caller():
+            results.append(flights.do("acme", work))
+
+        threads = [threading.Thread(target=caller) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert sorted(shared for _, shared in results) == [False, True, True, True]
+        assert all(result == "report" for result, _ in results)
+
+    def test_sequential_calls_run_again(self):
+        """Test that finished flights are forgotten."""
+        flights = SingleFlight()
+        flights.do("acme", lambda: 1)
+        assert flights.do("acme", lambda: 2) == (2, False)
+        assert flights.in_flight() == 0
+
+    def test_error_propagates(self):
+        """Test that the leader's error is raised."""
+        flights = SingleFlight()
+        with pytest.raises(ValueError):
+            flights.do("acme", lambda: (_ for _ in ()).throw(ValueError("boom")))
+        assert flights.in_flight() == 0
+
+
+class TestStream:
+    """Tests for SingleFlight.stream."""
+
+    def test_followers_replay_full_stream(self):
+        """Test that a late subscriber receives every event from the start."""
+        flights = SingleFlight()
+        release = threading.Event()
+        runs = []
+
+        def events():
+            runs.append(1)
+            yield "thinking"
+            release.wait(1)
+            yield "content"
+            yield "done"
+
+        leader, leader_shared = flights.stream("acme", events)
+        follower, follower_shared = flights.stream("acme", events)
+        release.set()
+
+        assert not leader_shared
+        assert follower_shared
+        assert list(leader) == ["thinking", "content", "done"]
+        assert list(follower) == ["thinking", "content", "done"]
+        assert len(runs) == 1
+
+    def test_completes_without_leader_consuming(self):
+        """Test that the run finishes even if the leader disconnects."""
+        flights = SingleFlight()
+        done = threading.Event()
+
+        def events():
+            yield "a"
+            done.set()
+
+        flights.stream("acme", events)
+        assert done.wait(1)
+
+    def test_error_after_events(self):
+        """Test that subscribers see events and then the error."""
+        flights = SingleFlight()
+
+        def events():
+            yield "a"
+            raise RuntimeError("failed")
+
+        stream, _ = flights.stream("acme", events)
+        received = []
+        with pytest.raises(RuntimeError):
+            for event in stream:
+                received.append(event)
+        assert received == ["a"]
+
+
+class TestResearchKey:
+    """Tests for research_key."""
+
+    def test_normalizes_case_and_whitespace(self):
+        """Test that trivially different targets share a key."""
+        assert research_key(" Acme  Corp ") == research_key("acme corp")
+
+    def test_prospect_includes_company(self):
+        """Test that prospect keys are scoped to the company."""
+        assert research_key("Acme", "Jane Doe") != research_key("Globex", "Jane Doe")
+
+
+class TestSharedResearch:
+    """Tests for research shared between sessions."""
+
+    @pytest.fixture
+    def agent(self, tmp_path):
+        return SDRAgent(
+            Settings(
+                anthropic_api_key="test",
+                skills_dir=tmp_path,
+                research_prefetch=False,
+                research_store=False,
+            )
+        )
+
+    def test_runs_without_session_history(self, agent):
+        """Test that the report is written without this session's conversation."""
+        sent = []
+
+        def create(**params):
+            sent.append(list(params["messages"]))
+            return text("Acme makes anvils")
+
+        def new_claude_client():
+            claude = ClaudeClient(api_key="test", model="primary-model")
+            claude.client = SimpleNamespace(messages=SimpleNamespace(create=create))
+            return claude
+
+        agent.new_claude_client = new_claude_client
+        agent.claude.record_exchange("My budget is secret", "Noted")
+
+        assert agent.research_company("Acme") == "Acme makes anvils"
+        assert len(sent) == 1 and len(sent[0]) == 1
+        assert "secret" not in str(sent[0])
+        assert agent.claude.messages[-1]["content"][0]["text"] == "Acme makes anvils"
+
+    def test_failure_ends_stream_with_error(self, agent):
+        """Test that a failed run is reported as an error event."""
+
+        def fail(**_):
+            raise RuntimeError("search is down")
+
+        agent.build_research_prompt = fail
+        events = list(research_stream(agent, company="Acme"))
+        assert events[0].startswith("event: thinking")
+        assert events[-1] == 'event: error\ndata: {"error": "search is down"}\n\n'
+
+    def test_blocking_research_does_not_join_a_stream(self, agent):
+        """Test that a blocking caller never attaches to a streamed run, which has no result."""
+        release = threading.Event()
+
+        def events():
+            yield ("thinking", {})
+            release.wait(5)
+
+        stream, _ = research_streams.stream(research_key("Mixed Co"), events)
+        next(stream)
+        agent.run_task = lambda prompt, skill=None: "Mixed Co report"
+        try:
+            assert agent.research_company("Mixed Co") == "Mixed Co report"
+        finally:
+            release.set()
+            list(stream)
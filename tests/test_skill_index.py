@@ -0,0 +1,136 @@
+"""Tests for the skill document index."""
+
+import pytest
+
+from sdr_agent.skills.executor import SkillExecutor
+from sdr_agent.skills.index import SkillDocIndex, split_sections
+from sdr_agent.skills.loader import SkillLoader
+from sdr_agent.text import tokenize
+
+
+@pytest.fixture
+def skills_dir(tmp_path):
+    """Create a skills directory with instructions and a reference file."""
+    email = tmp_path / "email-skill"
+    (email / "references").mkdir(parents=True)
+    (email / "SKILL.md").write_text("""---
+name: email-skill
+description: Write outreach emails
+---
+
+# Email Skill
+
+Intro text.
+
+## Subject Lines
+
+Keep subject lines short, between three and seven words.
+
+## Call to Action
+
+Ask for a 15 minute call.
+
+```markdown
+# Not a heading
+```
+""")
+    (email / "references" / "templates.md").write_text(
+        "# Templates\n\n## Breakup Email\n\nClose the loop politely.\n"
+    )
+
+    research = tmp_path / "research-skill"
+    research.mkdir()
+    (research / "SKILL.md").write_text("""---
+name: research-skill
+description: Research companies
+---
+
+## Funding
+
+Check Crunchbase for funding rounds and investors.
+""")
+    return tmp_path
+
+
+@pytest.fixture
+def loader(skills_dir):
+    """A loader with the sample skills discovered."""
+    loader = SkillLoader(skills_dir)
+    loader.discover_skills()
+    return loader
+
+
+class TestSplitSections:
+    """Tests for markdown section splitting."""
+
+    def test_heading_paths(self):
+        """Test that subsections carry their parent heading."""
+        sections = split_sections("# A\n\nx\n\n## B\n\ny\n\n# C\n\nz", "s", "SKILL.md")
+        assert [s.heading for s in sections] == ["A", "A > B", "C"]
+        assert sections[1].content == "y"
+
+    def test_ignores_headings_in_code_fences(self):
+        """Test that headings inside fenced code stay part of the section."""
+        sections = split_sections("# A\n\n```\n# not heading\n```\n", "s", "SKILL.md")
+        assert len(sections) == 1
+        assert "# not heading" in sections[0].content
+
+    def test_skips_empty_sections(self):
+        """Test that headings with no body do not produce sections."""
+        sections = split_sections("# A\n## B\n\ntext", "s", "SKILL.md")
+        assert [s.heading for s in sections] == ["A > B"]
+
+    def test_tokenize_drops_stopwords(self):
+        """Test tokenization lowercases and removes stopwords."""
+        assert tokenize("How to write THE Subject line") == ["write", "subject", "line"]
+
+
+class TestSkillDocIndex:
+    """Tests for SkillDocIndex."""
+
+    def test_build_indexes_instructions_and_references(self, loader):
+        """Test that references are indexed alongside SKILL.md."""
+        index = SkillDocIndex(loader)
+        index.build()
+        sources = {(s.skill, s.source) for s in index.sections}
+        assert ("email-skill", "references/templates.md") in sources
+        assert ("research-skill", "SKILL.md") in sources
+
+    def test_search_ranks_relevant_section_first(self, loader):
+        """Test that the matching section is the top hit."""
+        index = SkillDocIndex(loader)
+        hits = index.search("subject lines")
+        assert hits[0][0].heading == "Email Skill > Subject Lines"
+
+    def test_search_top_k(self, loader):
+        """Test that results are limited to top_k."""
+        index = SkillDocIndex(loader)
+        assert len(index.search("email call funding subject", top_k=2)) == 2
+
+    def test_search_filter_by_skill(self, loader):
+        """Test restricting results to one skill."""
+        index = SkillDocIndex(loader)
+        hits = index.search("funding", skill_name="email-skill")
+        assert hits == []
+
+    def test_search_no_match(self, loader):
+        """Test that unmatched queries return no results."""
+        index = SkillDocIndex(loader)
+        assert index.search("kubernetes") == []
+
+
+class TestSearchSkillDocsTool:
+    """Tests for the search_skill_docs tool."""
+
+    def test_returns_sections(self, loader):
+        """Test the tool returns only the relevant section text."""
+        executor = SkillExecutor(skill_loader=loader)
+        result = executor.execute_tool("search_skill_docs", {"query": "breakup email"})
+        assert "references/templates.md" in result
+        assert "Close the loop politely." in result
+
+    def test_requires_query(self, loader):
+        """Test that a missing query is an error."""
+        executor = SkillExecutor(skill_loader=loader)
+        result = executor.execute_tool("search_skill_docs", {})
+        assert result.startswith("Error")
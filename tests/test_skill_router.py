@@ -0,0 +1,133 @@
+"""Tests for local skill routing and preloading."""
+
+import pytest
+
+from sdr_agent.agent import PRELOADED_SKILL, SDRAgent, skill_preamble
+from sdr_agent.config import Settings
+from sdr_agent.skills.loader import SkillLoader
+from sdr_agent.skills.router import SkillRouter
+
+
+def _write_skill(root, name, description, tags):
+    skill_path = root / name
+    skill_path.mkdir()
+    (skill_path / "SKILL.md").write_text(f"""---
+name: {name}
+description: {description}
+metadata:
+  tags: {tags}
+---
+
+# {name} instructions
+""")
+
+
+@pytest.fixture
+def skills_dir(tmp_path):
+    """Create a skills directory resembling the bundled skills."""
+    _write_skill(
+        tmp_path,
+        "company-research",
+        "Research companies to understand their business and funding.",
+        "research, company, sales",
+    )
+    _write_skill(
+        tmp_path,
+        "prospect-research",
+        "Research individual prospects to understand their role and background.",
+        "research, prospect, sales",
+    )
+    _write_skill(
+        tmp_path,
+        "email-composer",
+        "Compose personalized sales outreach emails. Use when writing cold emails.",
+        "email, outreach, sales",
+    )
+    return tmp_path
+
+
+@pytest.fixture
+def router(skills_dir):
+    """A router over the sample skills."""
+    loader = SkillLoader(skills_dir)
+    loader.discover_skills()
+    return SkillRouter(loader)
+
+
+@pytest.fixture
+def agent(skills_dir):
+    """An agent over the sample skills (no API calls are made)."""
+    return SDRAgent(Settings(anthropic_api_key="test", skills_dir=skills_dir))
+
+
+class TestSkillRouter:
+    """Tests for SkillRouter."""
+
+    def test_routes_email_request(self, router):
+        """Test that an email request routes to the email skill."""
+        assert router.route("Write a cold email to Jane at Acme") == "email-composer"
+
+    def test_routes_company_research(self, router):
+        """Test that a company research request routes to company research."""
+        assert router.route("Research the company Stripe") == "company-research"
+
+    def test_ambiguous_request_not_routed(self, router):
+        """Test that terms shared by several skills do not decide the route."""
+        assert router.route("research Acme") is None
+
+    def test_unrelated_request_not_routed(self, router):
+        """Test that small talk is not routed."""
+        assert router.route("hello there") is None
+
+
+class TestSkillPreloading:
+    """Tests for SDRAgent.route_message."""
+
+    def test_inlines_instructions(self, agent):
+        """Test that routed instructions are inlined and counted."""
+        message, skill = agent.route_message("Write a cold email to Jane")
+        assert skill == "email-composer"
+        assert '<skill_instructions name="email-composer">' in message
+        assert message.endswith("Write a cold email to Jane")
+        assert agent.routing_stats.saved_round_trips == 1
+
+    def test_task_prompt_uses_same_preamble(self, agent):
+        """Test that tasks inline skills in the form recognized on reload."""
+        message, skill = agent.task_prompt("Look into Acme", "company-research")
+        assert skill == "company-research"
+        instructions = agent.skill_loader.load_skill_instructions(skill)
+        assert message == skill_preamble(skill, instructions) + "Look into Acme"
+        assert PRELOADED_SKILL.match(message).group(1) == "company-research"
+
+    def test_explicit_skill(self, agent):
+        """Test that known flows can name their skill explicitly."""
+        _, skill = agent.route_message("Look into Acme", skill="company-research")
+        assert skill == "company-research"
+
+    def test_not_repeated_in_conversation(self, agent):
+        """Test that a skill is only inlined once per conversation."""
+        agent.route_message("Write a cold email to Jane")
+        message, skill = agent.route_message("Now write an email to Bob")
+        assert skill is None
+        assert message == "Now write an email to Bob"
+
+        agent.clear_conversation()
+        _, skill = agent.route_message("Now write an email to Bob")
+        assert skill == "email-composer"
+
+    def test_redundant_read_skill_not_counted(self, agent):
+        """Test that re-reading a preloaded skill is short-circuited and uncounted."""
+        agent.route_message("Write a cold email to Jane")
+        result = agent.execute_tool("read_skill", {"skill_name": "email-composer"})
+        assert "already included" in result
+        assert agent.routing_stats.saved_round_trips == 0
+
+    def test_disabled(self, skills_dir):
+        """Test that preloading can be turned off."""
+        settings = Settings(
+            anthropic_api_key="test", skills_dir=skills_dir, skill_preloading=False
+        )
+        agent = SDRAgent(settings)
+        message, skill = agent.route_message("Write a cold email to Jane")
+        assert skill is None
+        assert message == "Write a cold email to Jane"
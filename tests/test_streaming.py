@@ -0,0 +1,184 @@
+"""Tests for streaming response text as it is generated."""
+
+from types import SimpleNamespace
+
+import anthropic
+import httpx
+import pytest
+
+from sdr_agent.llm.cache import ResponseCache
+from sdr_agent.llm.claude import ClaudeClient
+from sdr_agent.scheduler import RequestScheduler, anthropic_retry_after
+from web.routes.chat import stream_text
+
+from .test_model_routing import FAST, PRIMARY, make_client, text, tool_use
+
+
+class FakeStream:
+    """A ``messages.stream`` context that yields a response's text in pieces."""
+
+    def __init__(self, message, pieces):
+        self.message = message
+        self.text_stream = iter(pieces)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def get_final_message(self):
+        return self.message
+
+
+class FailingStream(FakeStream):
+    """A stream that drops its connection after yielding ``pieces``."""
+
+    def __init__(self, pieces):
+        super().__init__(None, pieces)
+        request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+        self.error = anthropic.APIConnectionError(request=request)
+        self.text_stream = self._fail(pieces)
+
+    def _fail(self, pieces):
+        yield from pieces
+        raise self.error
+
+
+class FlakyMessages:
+    """Drops the first stream after ``pieces`` of text, then answers in full."""
+
+    def __init__(self, pieces):
+        self.pieces = pieces
+        self.streams = 0
+
+    def stream(self, **params):
+        self.streams += 1
+        if self.streams == 1:
+            return FailingStream(self.pieces)
+        return FakeStream(text("Final report"), ["Final", " report"])
+
+
+class StreamingMessages:
+    """Searches once, then answers; the fast model answers too early."""
+
+    def __init__(self):
+        self.calls = []
+
+    def create(self, **params):
+        self.calls.append(("create", params["model"]))
+        if len(params["messages"]) == 1:
+            return tool_use("call-0", "web_search", {"query": "acme"})
+        return text("Too early")
+
+    def stream(self, **params):
+        self.calls.append(("stream", params["model"]))
+        if len(params["messages"]) == 1:
+            return FakeStream(tool_use("call-0", "web_search", {"query": "acme"}), [])
+        return FakeStream(text("Final report"), ["Final", " report"])
+
+
+def run_turn(claude, deltas):
+    response = claude.chat("Research Acme", "system", on_text=deltas.append)
+    while response.tool_calls:
+        results = [{"tool_use_id": c.id, "content": "results"} for c in response.tool_calls]
+        response = claude.continue_with_tool_results(results, "system", on_text=deltas.append)
+    return response
+
+
+class TestClientStreaming:
+    """Tests for ClaudeClient's on_text callback."""
+
+    def test_text_is_streamed(self):
+        """Test that text arrives in pieces and the final response is unchanged."""
+        claude = ClaudeClient(api_key="test", model=PRIMARY)
+        fake = StreamingMessages()
+        claude.client = SimpleNamespace(messages=fake)
+
+        deltas = []
+        assert run_turn(claude, deltas).content == "Final report"
+        assert deltas == ["Final", " report"]
+        assert claude.messages[-1]["content"] == [{"type": "text", "text": "Final report"}]
+
+    def test_fast_model_is_not_streamed(self):
+        """Test that only the primary model's answer reaches the callback after escalation."""
+        claude, _ = make_client()
+        fake = StreamingMessages()
+        claude.client = SimpleNamespace(messages=fake)
+
+        deltas = []
+        assert run_turn(claude, deltas).content == "Final report"
+        assert deltas == ["Final", " report"]
+        assert ("create", FAST) in fake.calls
+        assert ("stream", FAST) not in fake.calls
+
+    def test_cached_response_is_replayed(self):
+        """Test that a cached answer is passed to the callback in one piece."""
+        claude = ClaudeClient(api_key="test", model=PRIMARY, response_cache=ResponseCache())
+        claude.client = SimpleNamespace(messages=StreamingMessages())
+        run_turn(claude, [])
+
+        claude.clear_conversation()
+        deltas = []
+        run_turn(claude, deltas)
+        assert deltas == ["Final report"]
+
+
+    def test_failure_mid_stream_is_not_retried(self):
+        """Test that a stream failing after sending text raises instead of resending it."""
+        scheduler = RequestScheduler("test", base_delay=0.001, retry_after=anthropic_retry_after)
+        claude = ClaudeClient(api_key="test", model=PRIMARY, scheduler=scheduler)
+        fake = FlakyMessages(["Fin"])
+        claude.client = SimpleNamespace(messages=fake)
+
+        deltas = []
+        with pytest.raises(anthropic.APIConnectionError):
+            claude.chat("Research Acme", "system", on_text=deltas.append)
+        assert deltas == ["Fin"]
+        assert fake.streams == 1
+        assert scheduler.stats()["retries"] == 0
+
+    def test_failure_before_text_is_retried(self):
+        """Test that a stream failing before any text is retried as usual."""
+        scheduler = RequestScheduler("test", base_delay=0.001, retry_after=anthropic_retry_after)
+        claude = ClaudeClient(api_key="test", model=PRIMARY, scheduler=scheduler)
+        fake = FlakyMessages([])
+        claude.client = SimpleNamespace(messages=fake)
+
+        deltas = []
+        response = claude.chat("Research Acme", "system", on_text=deltas.append)
+        assert response.content == "Final report"
+        assert deltas == ["Final", " report"]
+        assert fake.streams == 2
+
+
+class TestStreamText:
+    """Tests for the web routes' stream_text bridge."""
+
+    def test_deltas_then_result(self):
+        """Test that deltas become content_delta events and the call's result is returned."""
+
+        def call(on_text):
+            for piece in ("Acme ", "makes ", "anvils"):
+                on_text(piece)
+            return "response"
+
+        events = stream_text(call)
+        received = []
+        with pytest.raises(StopIteration) as stop:
+            while True:
+                received.append(next(events))
+
+        assert {event_type for event_type, _ in received} == {"content_delta"}
+        assert "".join(data["text"] for _, data in received) == "Acme makes anvils"
+        assert stop.value.value == "response"
+
+    def test_errors_are_raised(self):
+        """Test that an exception in the call is raised in the consuming generator."""
+
+        def call(on_text):
+            on_text("partial")
+            raise RuntimeError("overloaded")
+
+        with pytest.raises(RuntimeError):
+            list(stream_text(call))
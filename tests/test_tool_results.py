@@ -0,0 +1,173 @@
+"""Tests for the tool-result store and digested conversation history."""
+
+import json
+from types import SimpleNamespace
+
+from sdr_agent.llm.claude import ClaudeClient
+from sdr_agent.results import ToolResultStore, result_sections
+from sdr_agent.skills.executor import SkillExecutor
+from sdr_agent.skills.loader import SkillLoader
+from sdr_agent.text import estimate_tokens
+
+SEARCH_RESULT = """Summary: Acme makes payroll software.
+
+Search Results:
+
+1. Acme raises Series B
+   URL: https://news.example.com/acme-series-b
+   Acme raised $40M to expand its payroll platform into Europe.
+
+2. Acme hires a new CFO
+   URL: https://example.com/acme-cfo
+   Jane Doe joins Acme as CFO after a decade at Globex."""
+
+
+def big_result(i):
+    return f"# Result {i}\n\n" + " ".join(f"detail-{i}-{n}" for n in range(400))
+
+
+def client(tmp_path, store=None):
+    executor = SkillExecutor(SkillLoader(tmp_path), result_store=store)
+    return ClaudeClient(api_key="test", result_store=store, tools=executor.tools)
+
+
+class TestToolResultStore:
+    """Tests for ToolResultStore."""
+
+    def test_handles_are_content_addressed(self):
+        """Test that identical results share a handle and can be read back."""
+        store = ToolResultStore()
+        handle = store.put("payload")
+        assert store.put("payload") == handle
+        assert handle.startswith("res_")
+        assert store.get(handle) == "payload"
+        assert store.get("res_000000000000") is None
+
+    def test_lru_eviction(self):
+        """Test that the least recently used results are evicted."""
+        store = ToolResultStore(max_entries=2)
+        first, second = store.put("one"), store.put("two")
+        store.get(first)
+        store.put("three")
+        assert store.get(first) == "one"
+        assert store.get(second) is None
+
+    def test_disk_tier_survives_eviction(self, tmp_path):
+        """Test that results written to disk outlive the memory LRU and the process."""
+        store = ToolResultStore(max_entries=1, directory=tmp_path)
+        handle = store.put("one")
+        store.put("two")
+        assert store.get(handle) == "one"
+        assert ToolResultStore(directory=tmp_path).get(handle) == "one"
+        assert store.get("../secrets") is None
+
+    def test_search_result_sections(self):
+        """Test that search results are split per source."""
+        titles = [s.title for s in result_sections(SEARCH_RESULT)]
+        assert titles == ["Summary", "Acme raises Series B", "Acme hires a new CFO"]
+
+    def test_fetch_section(self):
+        """Test that a section can be fetched by title or number."""
+        store = ToolResultStore()
+        handle = store.put(SEARCH_RESULT)
+        assert "Jane Doe" in store.fetch(handle, "cfo")
+        assert "Series B" in store.fetch(handle, "2")
+        assert store.fetch(handle, "pricing").startswith("Error: no section")
+        assert store.fetch("res_ffffffffffff").startswith("Error")
+
+    def test_digest(self):
+        """Test that a digest names the handle and lists the sections."""
+        store = ToolResultStore()
+        digest = store.digest(SEARCH_RESULT, "web_search")
+        handle = digest.split("stored as ")[1].split()[0]
+        assert store.get(handle) == SEARCH_RESULT
+        assert "2. Acme raises Series B" in digest
+
+
+class FakeMessages:
+    """Searches on every call until three results are in, recording the input size."""
+
+    def __init__(self):
+        self.input_tokens = []
+        self.tools = []
+
+    def create(self, **params):
+        self.input_tokens.append(estimate_tokens(json.dumps(params["messages"], default=str)))
+        self.tools = [tool["name"] for tool in params.get("tools", [])]
+        results = sum(
+            1
+            for m in params["messages"]
+            if isinstance(m["content"], list) and m["content"][0]["type"] == "tool_result"
+        )
+        if results < 3:
+            block = SimpleNamespace(
+                type="tool_use", id=f"call-{results}", name="web_search", input={"query": "x"}
+            )
+            return SimpleNamespace(content=[block], stop_reason="tool_use")
+        return SimpleNamespace(
+            content=[SimpleNamespace(type="text", text="Done")], stop_reason="end_turn"
+        )
+
+
+class TestDigestedHistory:
+    """Tests for ClaudeClient moving read tool results into the store."""
+
+    def run(self, claude):
+        fake = FakeMessages()
+        claude.client = SimpleNamespace(messages=fake)
+        response = claude.chat("Research Acme", "system")
+        i = 0
+        while response.tool_calls:
+            results = [{"tool_use_id": c.id, "content": big_result(i)} for c in response.tool_calls]
+            response = claude.continue_with_tool_results(results, "system")
+            i += 1
+        return fake
+
+    def test_input_stays_flat(self, tmp_path):
+        """Test that only the newest tool result is sent in full."""
+        store = ToolResultStore()
+        fake = self.run(client(tmp_path, store))
+
+        # Each later call carries one full result plus small digests
+        growth = fake.input_tokens[3] - fake.input_tokens[1]
+        assert growth < estimate_tokens(big_result(0)) / 2
+        assert "fetch_result" in fake.tools
+        assert len(store) == 2
+
+    def test_digests_point_at_full_results(self):
+        """Test that a digested result can be fetched back in full."""
+        store = ToolResultStore()
+        claude = ClaudeClient(api_key="test", result_store=store)
+        self.run(claude)
+        claude.chat("Next question", "system", tools_enabled=False)
+
+        first = claude.messages[2]["content"][0]["content"]
+        handle = first.split("stored as ")[1].split()[0]
+        assert store.fetch(handle, max_tokens=10_000) == big_result(0)
+
+    def test_each_result_digested_once(self):
+        """Test that older messages are never modified and full results are kept."""
+        store = ToolResultStore()
+        claude = ClaudeClient(api_key="test", result_store=store)
+        self.run(claude)
+        before = list(claude.messages)
+        contents = [json.dumps(m["content"], default=str) for m in before]
+
+        claude.chat("Next question", "system", tools_enabled=False)
+        # Only the last tool result message was replaced, by a new message
+        changed = [i for i, m in enumerate(before) if claude.messages[i] is not m]
+        assert changed == [len(before) - 2]
+        assert [json.dumps(m["content"], default=str) for m in before] == contents
+
+        results = [
+            m["content"][0]["content"]
+            for m in claude.full_messages()
+            if isinstance(m["content"], list) and m["content"][0].get("type") == "tool_result"
+        ]
+        assert results == [big_result(i) for i in range(3)]
+
+    def test_without_store_history_is_unchanged(self, tmp_path):
+        """Test that results stay in full when no store is configured."""
+        fake = self.run(client(tmp_path))
+        assert fake.input_tokens[3] - fake.input_tokens[1] > 1000
+        assert "fetch_result" not in fake.tools
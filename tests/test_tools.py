@@ -0,0 +1,235 @@
+"""Tests for the declarative tool registry."""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from sdr_agent.agent import SDRAgent
+from sdr_agent.config import Settings
+from sdr_agent.metrics import TOOL_CALLS
+from sdr_agent.skills.executor import SkillExecutor
+from sdr_agent.skills.loader import SkillLoader
+from sdr_agent.tools import Tool, ToolPolicy, ToolRegistry
+
+SCHEMA = {"type": "object", "properties": {}}
+
+
+def call(name, **tool_input):
+    return SimpleNamespace(id=f"call-{name}", name=name, input=tool_input)
+
+
+def make_tool(name, handler, **policy):
+    return Tool(
+        name=name,
+        description=f"The {name} tool",
+        input_schema=SCHEMA,
+        handler=handler,
+        policy=ToolPolicy(**policy),
+    )
+
+
+class TestToolRegistry:
+    """Tests for ToolRegistry."""
+
+    def test_definitions_and_prompt(self):
+        """Test that the API definitions and prompt lines come from the registered tools."""
+        registry = ToolRegistry()
+        registry.register(make_tool("lookup", lambda _: "ok"))
+        send = make_tool("send", lambda _: "sent")
+        send.summary = "Send"
+        registry.register(send)
+
+        assert [d["name"] for d in registry.definitions()] == ["lookup", "send"]
+        assert registry.prompt_lines() == "- **lookup**: The lookup tool\n- **send**: Send"
+        with pytest.raises(ValueError):
+            registry.register(make_tool("lookup", lambda _: "again"))
+
+    def test_cached_results(self):
+        """Test that identical calls of a cacheable tool run once and errors are not cached."""
+        calls = []
+
+        def handler(tool_input):
+            calls.append(tool_input)
+            return "Error: try again" if tool_input.get("fail") else f"result {len(calls)}"
+
+        registry = ToolRegistry()
+        registry.register(make_tool("search", handler, cache_ttl=60))
+        before = TOOL_CALLS.value(tool="search", outcome="cached")
+
+        assert registry.execute("search", {"q": "acme", "n": 1}) == "result 1"
+        assert registry.execute("search", {"n": 1, "q": "acme"}) == "result 1"
+        assert registry.execute("search", {"q": "other"}) == "result 2"
+        registry.execute("search", {"fail": True})
+        registry.execute("search", {"fail": True})
+        assert len(calls) == 4
+        assert TOOL_CALLS.value(tool="search", outcome="cached") == before + 1
+
+    def test_side_effects_are_never_cached(self):
+        """Test that a non-idempotent tool runs on every call despite a TTL."""
+        sent = []
+        registry = ToolRegistry()
+        send = make_tool("send", lambda x: sent.append(x) or "sent", cache_ttl=60, idempotent=False)
+        registry.register(send)
+        registry.execute("send", {"to": "a"})
+        registry.execute("send", {"to": "a"})
+        assert len(sent) == 2
+
+    def test_timeout(self):
+        """Test that a slow call is reported to the model as timed out."""
+        registry = ToolRegistry()
+        registry.register(make_tool("slow", lambda _: time.sleep(1) or "late", timeout=0.05))
+        assert registry.execute("slow", {}) == "Error: slow timed out after 0.05s"
+
+    def test_failures_become_results(self):
+        """Test that unknown tools and exceptions are returned as error text."""
+        registry = ToolRegistry()
+        registry.register(make_tool("broken", lambda _: 1 / 0))
+        assert registry.execute("missing", {}) == "Unknown tool: missing"
+        assert registry.execute("broken", {}).startswith("Error: broken failed:")
+
+    def test_async_handler(self):
+        """Test that coroutine handlers are awaited."""
+
+        async def handler(tool_input):
+            await asyncio.sleep(0)
+            return f"hello {tool_input['name']}"
+
+        registry = ToolRegistry()
+        registry.register(make_tool("greet", handler, timeout=5))
+        assert registry.execute("greet", {"name": "acme"}) == "hello acme"
+
+    def test_parallel_calls_keep_order(self):
+        """Test that idempotent calls of one turn overlap and results stay in call order."""
+        barrier = threading.Barrier(3, timeout=5)
+
+        def handler(tool_input):
+            barrier.wait()
+            return tool_input["q"]
+
+        registry = ToolRegistry(max_parallel=4)
+        registry.register(make_tool("search", handler))
+        results = registry.run([call("search", q=q) for q in ("a", "b", "c")])
+        assert results == ["a", "b", "c"]
+
+    def test_side_effects_run_in_order(self):
+        """Test that non-idempotent calls run one at a time in call order."""
+        order = []
+        registry = ToolRegistry()
+        send = make_tool("send", lambda x: order.append(x["n"]) or "sent", idempotent=False)
+        registry.register(send)
+        registry.run([call("send", n=n) for n in range(5)])
+        assert order == list(range(5))
+
+    def test_concurrency_limit(self):
+        """Test that no more calls of a tool run at once than its limit allows."""
+        running, peak = [0], [0]
+        lock = threading.Lock()
+
+        def handler(_):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+            return "done"
+
+        registry = ToolRegistry(max_parallel=4)
+        registry.register(make_tool("limited_tool", handler, max_concurrency=2))
+        registry.run([call("limited_tool", n=n) for n in range(6)])
+        assert peak[0] == 2
+
+    def test_custom_execute(self):
+        """Test that a caller can intercept calls while keeping the registry's scheduling."""
+        registry = ToolRegistry()
+        registry.register(make_tool("search", lambda _: "searched"))
+
+        def execute(name, tool_input):
+            if tool_input.get("intercept"):
+                raise RuntimeError("refused")
+            return registry.execute(name, tool_input)
+
+        results = registry.run([call("search", intercept=True), call("search")], execute)
+        assert results == ["Error: search failed: refused", "searched"]
+
+
+class TestSkillTools:
+    """Tests for tools declared by skills."""
+
+    @pytest.fixture
+    def skills_dir(self, tmp_path):
+        skill_path = tmp_path / "enrichment"
+        (skill_path / "scripts").mkdir(parents=True)
+        (skill_path / "SKILL.md").write_text("""---
+name: enrichment
+description: Enrich accounts
+tools:
+  - name: enrich_company
+    description: Look up firmographics for a company
+    script: enrich.py
+    idempotent: true
+    cache_ttl: 60
+    input_schema:
+      type: object
+      properties:
+        company: {type: string}
+  - name: web_search
+    description: Shadows a built-in tool
+    script: enrich.py
+  - description: Missing a name
+    script: enrich.py
+---
+
+Instructions.
+""")
+        (skill_path / "scripts" / "enrich.py").write_text(
+            "import json, sys\n"
+            "print('employees of', json.loads(sys.argv[1])['company'], end='')\n"
+        )
+        return tmp_path
+
+    def test_skill_script_tool(self, skills_dir):
+        """Test that a skill's tool runs its script and built-in names are kept."""
+        loader = SkillLoader(skills_dir)
+        loader.discover_skills()
+        executor = SkillExecutor(loader, script_workers=0)
+
+        tool = executor.tools.get("enrich_company")
+        assert tool.policy.cache_ttl == 60 and tool.policy.idempotent
+        assert executor.tools.get("web_search").description.startswith("Search the web")
+        assert executor.execute_tool("enrich_company", {"company": "Acme"}) == (
+            "employees of Acme"
+        )
+
+    def test_skill_tools_not_idempotent_by_default(self, skills_dir):
+        """Test that a skill tool has side effects unless it opts in."""
+        skill_md = skills_dir / "enrichment" / "SKILL.md"
+        skill_md.write_text(skill_md.read_text().replace("    idempotent: true\n", ""))
+        loader = SkillLoader(skills_dir)
+        loader.discover_skills()
+        executor = SkillExecutor(loader, script_workers=0)
+        assert not executor.tools.get("enrich_company").policy.idempotent
+
+
+class TestAgentTools:
+    """Tests for the agent's use of the registry."""
+
+    @pytest.fixture
+    def agent(self, tmp_path):
+        return SDRAgent(Settings(anthropic_api_key="test", skills_dir=tmp_path))
+
+    def test_prompt_lists_registered_tools(self, agent):
+        """Test that the system prompt lists every tool offered to the model."""
+        prompt = agent._build_system_prompt()
+        for name in agent.tools.names():
+            assert f"- **{name}**:" in prompt
+        assert [t["name"] for t in agent.claude._build_tools()] == agent.tools.names()
+
+    def test_tasks_skip_side_effects(self, agent):
+        """Test that self-contained tasks refuse tools with side effects."""
+        result = agent._execute_task_tool("send_email", {"to_email": "x@example.com"})
+        assert result.startswith("Error: send_email is not available")
+        assert agent.execute_tool("send_email", {}).startswith("Error: Email is not configured")
@@ -0,0 +1,191 @@
+"""Tests for per-session turn serialization."""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from sdr_agent.turns import QueuePolicy, TurnQueue, TurnStatus
+from web.routes import research
+from web.routes.chat import turn_stream
+
+
+class TestTurnQueue:
+    """Tests for TurnQueue."""
+
+    def test_one_turn_per_session(self):
+        """Test that a second turn for a busy session waits in FIFO order."""
+        queue = TurnQueue()
+        first = queue.submit("s1", "hello")
+        second = queue.submit("s1", "again")
+        third = queue.submit("s1", "and again")
+
+        assert first.status == TurnStatus.RUNNING
+        assert second.status == TurnStatus.QUEUED
+        assert (queue.position(second), queue.position(third)) == (1, 2)
+
+        queue.finish(first)
+        assert second.status == TurnStatus.RUNNING
+        assert queue.position(third) == 1
+
+    def test_sessions_are_independent(self):
+        """Test that other sessions run while one session is busy."""
+        queue = TurnQueue()
+        queue.submit("s1", "hello")
+        assert queue.submit("s2", "hello").status == TurnStatus.RUNNING
+
+    def test_bounded_queue(self):
+        """Test that requests beyond the queue bound are rejected."""
+        queue = TurnQueue(max_queued=1)
+        queue.submit("s1", "a")
+        queue.submit("s1", "b")
+        rejected = queue.submit("s1", "c")
+        assert rejected.status == TurnStatus.REJECTED
+        assert "max 1" in rejected.reason
+
+    def test_reject_policy(self):
+        """Test that the reject policy refuses requests for a busy session."""
+        queue = TurnQueue(policy=QueuePolicy.REJECT)
+        queue.submit("s1", "a")
+        assert queue.submit("s1", "b").status == TurnStatus.REJECTED
+
+    def test_coalesce_policy(self):
+        """Test that coalesced messages join the waiting turn and duplicates are dropped."""
+        queue = TurnQueue(policy=QueuePolicy.COALESCE)
+        running = queue.submit("s1", "a")
+        duplicate = queue.submit("s1", "a")
+        waiting = queue.submit("s1", "b")
+        joined = queue.submit("s1", "c")
+
+        assert duplicate.status == TurnStatus.COALESCED
+        assert duplicate.joined == running.id
+        assert waiting.status == TurnStatus.QUEUED
+        assert joined.joined == waiting.id
+        assert waiting.message == "b\n\nc"
+
+    def test_coalesce_without_merge_only_drops_duplicates(self):
+        """Test that unmergeable requests are only coalesced with identical ones."""
+        queue = TurnQueue(policy=QueuePolicy.COALESCE)
+        queue.submit("s1", "research acme")
+        waiting = queue.submit("s1", "research globex", merge=False)
+        duplicate = queue.submit("s1", "research globex", merge=False)
+        other = queue.submit("s1", "research initech", merge=False)
+
+        assert waiting.status == TurnStatus.QUEUED
+        assert duplicate.joined == waiting.id
+        assert other.status == TurnStatus.QUEUED
+
+    def test_withdrawn_turn_leaves_queue(self):
+        """Test that finishing a queued turn (client gone) removes it from the queue."""
+        queue = TurnQueue()
+        first = queue.submit("s1", "a")
+        gone = queue.submit("s1", "b")
+        last = queue.submit("s1", "c")
+
+        queue.finish(gone)
+        assert queue.position(last) == 1
+        queue.finish(first)
+        assert last.status == TurnStatus.RUNNING
+        queue.finish(last)
+        assert queue.stats() == {}
+
+    def test_turns_never_overlap(self):
+        """Test that concurrent requests for one session run one at a time, in order."""
+        queue = TurnQueue(max_queued=10)
+        active = 0
+        max_active = 0
+        order = []
+        lock = threading.Lock()
+
+        def request(i):
+            nonlocal active, max_active
+            turn = queue.submit("s1", f"message {i}")
+            while not queue.wait(turn, timeout=1.0):
+                pass
+            with lock:
+                active += 1
+                max_active = max(max_active, active)
+                order.append(turn.id)
+            time.sleep(0.01)
+            with lock:
+                active -= 1
+            queue.finish(turn)
+
+        threads = []
+        for i in range(5):
+            thread = threading.Thread(target=request, args=(i,))
+            thread.start()
+            threads.append(thread)
+            time.sleep(0.002)
+        for thread in threads:
+            thread.join()
+
+        assert max_active == 1
+        assert order == sorted(order)
+
+
+class FakeAgent:
+    """Records session saves and exchanges added to its conversation."""
+
+    def __init__(self):
+        self.saves = 0
+        self.exchanges = []
+        self.claude = SimpleNamespace(
+            record_exchange=lambda *exchange: self.exchanges.append(exchange)
+        )
+
+    def sync_session(self):
+        pass
+
+    def save_session(self):
+        self.saves += 1
+
+
+class TestTurnStream:
+    """Tests for running a turn's event stream."""
+
+    def test_only_completed_runs_are_saved(self):
+        """Test that a failed or abandoned run is not saved to the session."""
+        queue = TurnQueue()
+        agent = FakeAgent()
+
+        def run(message):
+            yield "event"
+            raise RuntimeError("overloaded")
+
+        with pytest.raises(RuntimeError):
+            list(turn_stream(queue, queue.submit("s1", "hi"), run, agent))
+        stream = turn_stream(queue, queue.submit("s1", "hi"), lambda _: iter(["a", "b"]), agent)
+        next(stream)
+        stream.close()
+        assert agent.saves == 0
+
+        list(turn_stream(queue, queue.submit("s1", "hi"), lambda _: iter(["a"]), agent))
+        assert agent.saves == 1
+
+    def test_abandoned_research_holds_turn(self, monkeypatch):
+        """Test that a disconnected research stream waits for its shared run, then saves it."""
+        release = threading.Event()
+
+        def events(agent, company, prospect):
+            yield ("thinking", {"status": "researching"})
+            release.wait(5)
+            yield ("content", {"text": "Acme makes anvils"})
+
+        monkeypatch.setattr(research, "_research_events", events)
+        queue = TurnQueue()
+        agent = FakeAgent()
+        turn = queue.submit("s1", "research")
+
+        def run(_):
+            return research.research_stream(agent, company="Turn Test Co", session_id="s1")
+
+        stream = turn_stream(queue, turn, run, agent)
+        next(stream)
+        threading.Timer(0.1, release.set).start()
+        stream.close()
+
+        assert release.is_set() and turn.status == TurnStatus.FINISHED
+        assert agent.exchanges[0][1] == "Acme makes anvils"
+        assert agent.saves == 1
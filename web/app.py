@@ -8,10 +8,17 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 sys.path.insert(0, str(project_root / "src"))
 
-from flask import Flask  # noqa: E402
+import time  # noqa: E402
+
+from flask import Flask, Response, g, request  # noqa: E402
 from flask_cors import CORS  # noqa: E402
 
 from sdr_agent.config import get_settings  # noqa: E402
+from sdr_agent.llm.cache import all_response_cache_stats  # noqa: E402
+from sdr_agent.llm.routing import get_model_usage  # noqa: E402
+from sdr_agent.metrics import HTTP_LATENCY, HTTP_REQUESTS, get_metrics  # noqa: E402
+from sdr_agent.scheduler import all_scheduler_stats  # noqa: E402
+from sdr_agent.turns import get_turn_queue  # noqa: E402
 
 
 def create_app():
@@ -36,14 +43,83 @@ def create_app():
     app.register_blueprint(chat_bp, url_prefix="/api")
     app.register_blueprint(research_bp, url_prefix="/api")
 
+    register_metrics()
+
+    @app.before_request
+    def start_timer():
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        HTTP_REQUESTS.inc(endpoint=endpoint, status=str(response.status_code))
+        if "request_start" in g:
+            HTTP_LATENCY.observe(time.perf_counter() - g.request_start, endpoint=endpoint)
+        return response
+
     # Health check endpoint
     @app.route("/api/health")
     def health():
         return {"status": "ok"}
 
+    # API scheduling stats: throttling, retries, queue depth and wait times
+    @app.route("/api/scheduler")
+    def scheduler_stats():
+        return {"schedulers": all_scheduler_stats()}
+
+    # Per-model calls, tokens and latency, plus fast-model escalations
+    @app.route("/api/models")
+    def model_stats():
+        return get_model_usage().stats()
+
+    # Response cache hit ratios (empty unless RESPONSE_CACHE is enabled)
+    @app.route("/api/cache")
+    def cache_stats():
+        return {"caches": all_response_cache_stats()}
+
+    # Web sessions with a running turn and how many requests wait behind it
+    @app.route("/api/sessions/queue")
+    def session_queue_stats():
+        return {"sessions": get_turn_queue().stats()}
+
+    # Prometheus scrape target: latency histograms, token and tool counters, queue depths
+    @app.route("/api/metrics")
+    def metrics():
+        return Response(get_metrics().render(), mimetype="text/plain; version=0.0.4")
+
     return app
 
 
+def register_metrics():
+    """Gauges read from the web service's live state whenever metrics are scraped."""
+    from web.routes.chat import active_sessions
+
+    metrics = get_metrics()
+    metrics.gauge(
+        "sdr_active_sessions", "Web sessions with an agent in this worker"
+    ).set_function(active_sessions)
+    metrics.gauge(
+        "sdr_session_turns", "Session turns by state", ("state",)
+    ).set_function(lambda: {
+        (state,): sum(counts[state] for counts in get_turn_queue().stats().values())
+        for state in ("running", "queued")
+    })
+    metrics.gauge(
+        "sdr_scheduler_in_flight", "API requests in flight per scheduler", ("scheduler",)
+    ).set_function(lambda: {
+        (stats["name"],): stats["in_flight"] for stats in all_scheduler_stats()
+    })
+    metrics.gauge(
+        "sdr_scheduler_queue_depth",
+        "API requests waiting for a slot per scheduler and priority",
+        ("scheduler", "priority"),
+    ).set_function(lambda: {
+        (stats["name"], priority): depth["queue_depth"]
+        for stats in all_scheduler_stats()
+        for priority, depth in stats["dispatch"]["classes"].items()
+    })
+
+
 def main():
     """Run the Flask development server."""
     app = create_app()
@@ -1,17 +1,38 @@
 """Chat API routes with SSE streaming."""
 
+import contextvars
 import json
-from typing import Generator
+import threading
+import uuid
+from contextlib import nullcontext
+from queue import SimpleQueue
+from typing import Callable, Generator, Iterator, Optional, TypeVar
 
-from flask import Blueprint, Response, current_app, request
+from flask import Blueprint, Response, current_app, jsonify, request
 
 from sdr_agent.agent import SDRAgent
+from sdr_agent.dispatch import Priority, request_context
+from sdr_agent.history import HistoryPage, parse_message_id
+from sdr_agent.llm.cache import bypass_response_cache
+from sdr_agent.metrics import SSE_STREAMS
+from sdr_agent.sessions import ARCHIVE_PREFIX, SessionState, get_session_backend
+from sdr_agent.tools import tool_failed
+from sdr_agent.turns import QueuePolicy, Turn, TurnQueue, TurnStatus, get_turn_queue
 
 chat_bp = Blueprint("chat", __name__)
 
+T = TypeVar("T")
+
 # Store agent instances per session (simple in-memory storage)
 _agents: dict[str, SDRAgent] = {}
 
+# Seconds between queue position checks while a request waits for its session
+QUEUE_POLL_SECONDS = 1.0
+
+# Messages per /chat/history page: default and maximum
+HISTORY_PAGE_SIZE = 100
+MAX_HISTORY_PAGE_SIZE = 500
+
 
 def get_agent(session_id: str) -> SDRAgent:
     """Get or create an agent for a session."""
@@ -19,71 +40,267 @@ def get_agent(session_id: str) -> SDRAgent:
         settings = current_app.config.get("settings")
         if not settings:
             raise ValueError("Settings not configured")
-        _agents[session_id] = SDRAgent(settings)
+        agent = SDRAgent(settings)
+        if settings.session_backend:
+            # The conversation may have been started by another worker
+            backend = get_session_backend(
+                settings.session_backend,
+                settings.session_store_path,
+                compress=settings.session_journal_compress,
+                snapshot_every=settings.session_journal_snapshot_every,
+            )
+            agent.attach_session(backend, session_id)
+        _agents[session_id] = agent
     return _agents[session_id]
 
 
+def active_sessions() -> int:
+    """Sessions with an agent in this worker."""
+    return len(_agents)
+
+
+def has_session(session_id: str) -> bool:
+    """Whether a session may have a conversation (in this worker or a shared store)."""
+    settings = current_app.config.get("settings")
+    return session_id in _agents or bool(settings and settings.session_backend)
+
+
+def valid_session_id(session_id: object) -> bool:
+    """Whether a client may name a session ``session_id`` (archived logs are internal)."""
+    return (
+        isinstance(session_id, str)
+        and bool(session_id.strip())
+        and not session_id.startswith(ARCHIVE_PREFIX)
+    )
+
+
+def session_id_error(session_id: object) -> Optional[tuple[dict, int]]:
+    """A 400 response if a client may not name a session ``session_id``, else None."""
+    if valid_session_id(session_id):
+        return None
+    return {"error": f"Invalid session ID: {session_id}"}, 400
+
+
 def sse_event(event_type: str, data: dict) -> str:
     """Format a Server-Sent Event."""
     return f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
 
 
-def chat_stream(agent: SDRAgent, message: str) -> Generator[str, None, None]:
+def stream_text(call: Callable[[Callable[[str], None]], T]) -> Generator[tuple[str, dict], None, T]:
+    """Run a model call, yielding its text as ``content_delta`` events while it streams.
+
+    ``call`` gets the callback for text deltas and runs in a thread; this
+    generator returns its result. Deltas that arrive while the client is
+    being written to are sent together as one event.
+    """
+    deltas: SimpleQueue = SimpleQueue()
+    outcome: dict = {}
+
+    def run() -> None:
+        try:
+            outcome["result"] = call(deltas.put)
+        except BaseException as e:
+            outcome["error"] = e
+        finally:
+            deltas.put(None)
+
+    thread = threading.Thread(target=contextvars.copy_context().run, args=(run,), daemon=True)
+    thread.start()
+    try:
+        finished = False
+        while not finished:
+            parts = [deltas.get()]
+            while parts[-1] is not None and not deltas.empty():
+                parts.append(deltas.get())
+            if parts[-1] is None:
+                finished = True
+                parts.pop()
+            if parts:
+                yield ("content_delta", {"text": "".join(parts)})
+    finally:
+        # Also when the client disconnects: the conversation must not change mid-turn
+        thread.join()
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+def get_session_turns() -> TurnQueue:
+    """The process-wide queue that runs one turn per session at a time."""
+    settings = current_app.config.get("settings")
+    if not settings:
+        return get_turn_queue()
+    return get_turn_queue(settings.session_queue_size, settings.session_queue_policy)
+
+
+def submit_turn(
+    session_id: str,
+    message: str,
+    policy: Optional[str] = None,
+    merge: bool = True,
+) -> Turn:
+    """Register a request with its session's turn queue.
+
+    Raises:
+        ValueError: If the policy name is unknown
+    """
+    return get_session_turns().submit(
+        session_id, message, QueuePolicy(policy) if policy else None, merge=merge
+    )
+
+
+def turn_stream(
+    queue: TurnQueue,
+    turn: Turn,
+    run: Callable[[str], Iterator[str]],
+    agent: Optional[SDRAgent] = None,
+) -> Generator[str, None, None]:
+    """Wait for a turn's session, reporting the queue position, then stream its run.
+
+    With a shared session backend, the agent's conversation is brought up
+    to date before the run and, if the run completes, its new messages are
+    saved after it. A failed or abandoned run is not saved (it may end
+    between a tool call and its result); the next turn reloads the log.
+    """
+    SSE_STREAMS.inc()
+    try:
+        if turn.status == TurnStatus.COALESCED:
+            yield sse_event("coalesced", {"status": "coalesced", "turn_id": turn.joined})
+            yield sse_event("done", {"status": "coalesced"})
+            return
+
+        position = 0
+        while turn.status == TurnStatus.QUEUED:
+            current = queue.position(turn)
+            if current and current != position:
+                position = current
+                yield sse_event("queued", {
+                    "status": "queued",
+                    "position": position,
+                    "turn_id": turn.id,
+                })
+            queue.wait(turn, QUEUE_POLL_SECONDS)
+
+        if agent:
+            agent.sync_session()
+        # Read the message only now: coalesced requests may have joined it
+        yield from run(turn.message)
+        if agent:
+            agent.save_session()
+    finally:
+        # Also runs when the client disconnects, so the next turn is not stuck
+        queue.finish(turn)
+        SSE_STREAMS.dec()
+
+
+def turn_response(
+    turn: Turn,
+    run: Callable[[str], Iterator[str]],
+    agent: Optional[SDRAgent] = None,
+) -> Response:
+    """SSE response that runs ``run`` in ``agent``'s session once it is free."""
+    queue = get_session_turns()
+    response = Response(
+        turn_stream(queue, turn, run, agent),
+        mimetype="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
+    # A stream closed before it started never reaches turn_stream's cleanup
+    response.call_on_close(lambda: queue.finish(turn))
+    return response
+
+
+def rejected(turn: Turn) -> tuple[dict, int]:
+    """Error response for a request its session's queue refused."""
+    return {"error": turn.reason, "status": turn.status.value}, 429
+
+
+def between_turns(session_id: str, action: Callable[[], None]) -> Optional[tuple[dict, int]]:
+    """Run ``action`` while no turn of the session runs; the error response if rejected."""
+    queue = get_session_turns()
+    turn = queue.submit(session_id, "", QueuePolicy.QUEUE, merge=False)
+    if turn.status == TurnStatus.REJECTED:
+        return rejected(turn)
+    try:
+        while not queue.wait(turn, QUEUE_POLL_SECONDS):
+            pass
+        action()
+    finally:
+        queue.finish(turn)
+    return None
+
+
+def chat_stream(
+    agent: SDRAgent,
+    message: str,
+    session_id: str = "default",
+    model: Optional[str] = None,
+    no_cache: bool = False,
+) -> Generator[str, None, None]:
     """Stream chat response with SSE events."""
+    # Interactive priority, with fair sharing of API capacity between sessions
+    with request_context(Priority.INTERACTIVE, tenant=session_id):
+        with bypass_response_cache() if no_cache else nullcontext():
+            for event_type, data in _chat_events(agent, message, model):
+                yield sse_event(event_type, data)
+
+
+def _chat_events(
+    agent: SDRAgent,
+    message: str,
+    model: Optional[str] = None,
+) -> Generator[tuple[str, dict], None, None]:
+    """Run one chat turn, yielding (event type, data) pairs."""
     # Emit thinking event
-    yield sse_event("thinking", {"status": "processing"})
+    yield ("thinking", {"status": "processing"})
 
     # Get system prompt
     system_prompt = agent._build_system_prompt()
 
-    # Get initial response from Claude
-    response = agent.claude.chat(message, system_prompt)
+    # Inline routed skill instructions so the model can skip read_skill
+    message, skill = agent.route_message(message)
+    if skill:
+        yield ("skill", {"name": skill, "preloaded": True})
+
+    # Get initial response from Claude, streaming its text
+    response = yield from stream_text(
+        lambda on_text: agent.claude.chat(message, system_prompt, model=model, on_text=on_text)
+    )
 
     # Handle tool calls in a loop
     while response.tool_calls:
         for tool_call in response.tool_calls:
             # Emit tool execution event
-            yield sse_event("tool", {
+            yield ("tool", {
                 "name": tool_call.name,
                 "input": tool_call.input,
             })
 
-            # Execute tool
-            if tool_call.name == "send_email":
-                result = agent._handle_send_email(tool_call.input)
-            else:
-                result = agent.skill_executor.execute_tool(
-                    tool_call.name, tool_call.input
-                )
-
+        # Execute tools (independent calls in parallel) and build results
+        tool_results = agent.run_tools(response.tool_calls)
+        for tool_call, tool_result in zip(response.tool_calls, tool_results):
             # Emit tool result
-            yield sse_event("tool_result", {
+            yield ("tool_result", {
                 "name": tool_call.name,
-                "success": not result.startswith("Error"),
-            })
-
-        # Build tool results
-        tool_results = []
-        for tool_call in response.tool_calls:
-            if tool_call.name == "send_email":
-                result = agent._handle_send_email(tool_call.input)
-            else:
-                result = agent.skill_executor.execute_tool(
-                    tool_call.name, tool_call.input
-                )
-            tool_results.append({
-                "tool_use_id": tool_call.id,
-                "content": result,
+                "success": not tool_failed(tool_result["content"]),
             })
 
         # Continue conversation
-        response = agent.claude.continue_with_tool_results(tool_results, system_prompt)
+        response = yield from stream_text(
+            lambda on_text: agent.claude.continue_with_tool_results(
+                tool_results, system_prompt, model=model, on_text=on_text
+            )
+        )
 
     # Emit content event with final response
-    yield sse_event("content", {"text": response.content})
+    yield ("content", {"text": response.content})
 
     # Emit done event
-    yield sse_event("done", {"status": "complete"})
+    yield ("done", {"status": "complete"})
 
 
 @chat_bp.route("/chat", methods=["POST"])
@@ -92,24 +309,40 @@ def chat():
     data = request.get_json()
     message = data.get("message", "")
     session_id = data.get("session_id", "default")
+    # Optional per-turn model, overriding the routing rules
+    model = data.get("model") or None
+    # Skip the response cache for this turn (e.g. to regenerate an answer)
+    no_cache = bool(data.get("no_cache"))
 
     if not message:
         return {"error": "Message is required"}, 400
+    invalid = session_id_error(session_id)
+    if invalid is not None:
+        return invalid
+
+    # Only configured models, which also keeps per-model metrics bounded;
+    # checked first so a rejected request does not create a session
+    settings = current_app.config.get("settings")
+    if model and settings and model not in settings.chat_models:
+        return {"error": f"Unknown model: {model}"}, 400
 
     try:
         agent = get_agent(session_id)
     except ValueError as e:
         return {"error": str(e)}, 500
 
-    return Response(
-        chat_stream(agent, message),
-        mimetype="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        },
-    )
+    # One turn per session at a time; queue_policy overrides the configured policy
+    try:
+        turn = submit_turn(session_id, message, data.get("queue_policy"))
+    except ValueError as e:
+        return {"error": f"Invalid queue_policy: {e}"}, 400
+    if turn.status == TurnStatus.REJECTED:
+        return rejected(turn)
+
+    def run(turn_message: str) -> Iterator[str]:
+        return chat_stream(agent, turn_message, session_id, model, no_cache)
+
+    return turn_response(turn, run, agent)
 
 
 @chat_bp.route("/chat/clear", methods=["POST"])
@@ -117,38 +350,109 @@ def clear_chat():
     """Clear conversation history for a session."""
     data = request.get_json() or {}
     session_id = data.get("session_id", "default")
+    invalid = session_id_error(session_id)
+    if invalid is not None:
+        return invalid
 
-    if session_id in _agents:
-        _agents[session_id].claude.clear_conversation()
+    if has_session(session_id):
+        try:
+            agent = get_agent(session_id)
+        except ValueError as e:
+            return {"error": str(e)}, 500
+
+        # Wait for any running turn rather than clearing its conversation mid-turn
+        outcome = between_turns(session_id, agent.clear_conversation)
+        if outcome is not None:
+            return outcome
 
     return {"status": "cleared"}
 
 
+@chat_bp.route("/chat/fork", methods=["POST"])
+def fork_chat():
+    """Fork a session's conversation into a new session.
+
+    The fork shares the conversation so far as an immutable prefix and
+    continues on its own. Pass ``fork_id`` to name the new session;
+    otherwise an ID is generated.
+    """
+    data = request.get_json() or {}
+    session_id = data.get("session_id", "default")
+    fork_id = data.get("fork_id") or uuid.uuid4().hex
+
+    for value in (session_id, fork_id):
+        invalid = session_id_error(value)
+        if invalid is not None:
+            return invalid
+    if fork_id == session_id:
+        return {"error": "A session cannot be forked into itself"}, 400
+    if not has_session(session_id):
+        return {"error": f"Unknown session: {session_id}"}, 404
+    try:
+        agent = get_agent(session_id)
+    except ValueError as e:
+        return {"error": str(e)}, 500
+    if fork_id in _agents or (
+        agent.session and agent.session.backend.state(fork_id) != SessionState()
+    ):
+        return {"error": f"Session {fork_id} already exists"}, 409
+
+    def fork() -> None:
+        _agents[fork_id] = agent.fork(fork_id)
+
+    # Fork between turns, so the prefix is a finished conversation
+    outcome = between_turns(session_id, fork)
+    if outcome is not None:
+        return outcome
+
+    return {
+        "session_id": fork_id,
+        "parent_id": session_id,
+        "shared_messages": _agents[fork_id].claude.cache_prefix,
+    }
+
+
 @chat_bp.route("/chat/history", methods=["GET"])
 def get_history():
-    """Get conversation history for a session."""
+    """Get a page of conversation history for a session.
+
+    Query parameters: ``session_id``, ``after`` (the last message ID the
+    client has) and ``limit``. Polling with the previous page's
+    ``next_cursor`` returns only new messages, and a request whose
+    ``If-None-Match`` matches the conversation's ETag gets a 304.
+    """
     session_id = request.args.get("session_id", "default")
+    invalid = session_id_error(session_id)
+    if invalid is not None:
+        return invalid
+    after = request.args.get("after") or None
+    try:
+        limit = int(request.args.get("limit", HISTORY_PAGE_SIZE))
+    except ValueError:
+        return {"error": "limit must be an integer"}, 400
+    limit = max(1, min(limit, MAX_HISTORY_PAGE_SIZE))
+    if after:
+        try:
+            parse_message_id(after)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+    if not has_session(session_id):
+        return HistoryPage(reset=bool(after)).model_dump()
 
-    if session_id not in _agents:
-        return {"messages": []}
-
-    agent = _agents[session_id]
-    messages = []
-
-    for msg in agent.claude.messages:
-        role = msg.get("role", "")
-        content = msg.get("content", "")
-
-        # Handle different content formats
-        if isinstance(content, str):
-            messages.append({"role": role, "content": content})
-        elif isinstance(content, list):
-            # Extract text from content blocks
-            text_parts = []
-            for block in content:
-                if isinstance(block, dict) and block.get("type") == "text":
-                    text_parts.append(block.get("text", ""))
-            if text_parts:
-                messages.append({"role": role, "content": "".join(text_parts)})
-
-    return {"messages": messages}
+    try:
+        agent = get_agent(session_id)
+    except ValueError as e:
+        return {"error": str(e)}, 500
+
+    # The log's epoch and length identify its content, so checking the ETag
+    # reads no messages
+    state = agent.history_state()
+    etag = f"{state.epoch}.{state.length}-{after or 'start'}-{limit}"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify(agent.history_page(after, limit, state).model_dump())
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
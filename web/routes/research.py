@@ -1,11 +1,23 @@
 """Research API routes with SSE streaming."""
 
-from typing import Generator, Optional
-
-from flask import Blueprint, Response, request
-
-from sdr_agent.agent import SDRAgent
-from web.routes.chat import get_agent, sse_event
+from typing import Generator, Iterator, Optional
+
+from flask import Blueprint, current_app, request
+
+from sdr_agent.accounts import get_research_store
+from sdr_agent.agent import SDRAgent, research_key, research_streams, research_summary
+from sdr_agent.dispatch import Priority, request_context
+from sdr_agent.tools import tool_failed
+from sdr_agent.turns import TurnStatus
+from web.routes.chat import (
+    get_agent,
+    rejected,
+    session_id_error,
+    sse_event,
+    stream_text,
+    submit_turn,
+    turn_response,
+)
 
 research_bp = Blueprint("research", __name__)
 
@@ -14,81 +26,135 @@ def research_stream(
     agent: SDRAgent,
     company: Optional[str] = None,
     prospect: Optional[str] = None,
+    session_id: str = "default",
 ) -> Generator[str, None, None]:
-    """Stream research response with SSE events."""
+    """Stream research response with SSE events.
+
+    Concurrent requests for the same target share a single run: later
+    requests attach to it and receive its full event stream and result. The
+    run uses a fresh conversation, and every subscriber records the report
+    in its own session. If the run fails, an ``error`` event ends the stream.
+
+    If the client disconnects, closing this stream waits for the shared run
+    to finish, so the session's turn is held until then, and saves the
+    report to the session.
+    """
+
+    def run() -> Generator[tuple[str, dict], None, None]:
+        # Interactive priority, with fair sharing of API capacity between sessions
+        with request_context(Priority.INTERACTIVE, tenant=session_id):
+            yield from _research_events(agent, company, prospect)
+
+    events, shared = research_streams.stream(research_key(company, prospect), run)
+    if shared:
+        yield sse_event("shared", {"status": "attached"})
+
+    def record(event_type: str, data: dict) -> None:
+        if event_type == "content":
+            # Keep this session's conversation coherent for follow-up questions
+            agent.claude.record_exchange(research_summary(company, prospect), data["text"])
+
+    try:
+        for event_type, data in events:
+            record(event_type, data)
+            yield sse_event(event_type, data)
+    except GeneratorExit:
+        # The run goes on without this client; wait for it before the turn ends
+        try:
+            for event_type, data in events:
+                record(event_type, data)
+        except Exception:
+            return
+        agent.save_session()
+        raise
+    except Exception as e:
+        yield sse_event("error", {"error": str(e)})
+
+
+def _research_events(
+    agent: SDRAgent,
+    company: Optional[str] = None,
+    prospect: Optional[str] = None,
+) -> Generator[tuple[str, dict], None, None]:
+    """Run one research request in a fresh conversation, yielding (event type, data) pairs."""
     # Emit thinking event
-    yield sse_event("thinking", {"status": "researching"})
-
-    # Build research prompt
-    if prospect:
-        company_context = f" at {company}" if company else ""
-        prompt = f"""Research the prospect "{prospect}"{company_context} thoroughly.
-
-Please find and summarize:
-1. Current role and responsibilities
-2. Professional background and experience
-3. Education and certifications
-4. Recent public activity (posts, articles, speaking)
-5. Professional interests and focus areas
-6. Any personal details that could help personalize outreach
-
-Provide a comprehensive prospect profile that would help craft a personalized outreach message."""
-    else:
-        prompt = f"""Research the company "{company}" thoroughly.
-
-Please find and summarize:
-1. Company overview (what they do, industry, size)
-2. Recent news and developments
-3. Key products or services
-4. Technology stack (if detectable)
-5. Key decision makers (C-suite, VP-level)
-6. Any recent funding or financial news
-
-Provide a comprehensive research report that would help an SDR prepare for outreach."""
+    yield ("thinking", {"status": "researching"})
+
+    # Build research prompt (company research prefetches the standard queries)
+    if not prospect and agent.settings.research_prefetch:
+        yield ("prefetch", {"status": "searching", "company": company})
+    prompt = agent.build_research_prompt(company=company, prospect=prospect)
 
     # Get system prompt
     system_prompt = agent._build_system_prompt()
 
-    # Get initial response from Claude
-    response = agent.claude.chat(prompt, system_prompt)
+    # Inline the matching research skill so the model can start searching immediately
+    prompt, skill = agent.task_prompt(
+        prompt, "prospect-research" if prospect else "company-research"
+    )
+    if skill:
+        yield ("skill", {"name": skill, "preloaded": True})
+
+    # Get initial response from Claude, streaming its text
+    claude = agent.new_claude_client()
+    response = yield from stream_text(
+        lambda on_text: claude.chat(prompt, system_prompt, on_text=on_text)
+    )
 
     # Handle tool calls in a loop
     while response.tool_calls:
         for tool_call in response.tool_calls:
             # Emit tool execution event
-            yield sse_event("tool", {
+            yield ("tool", {
                 "name": tool_call.name,
                 "input": tool_call.input,
             })
 
-        # Execute tools and build results
-        tool_results = []
-        for tool_call in response.tool_calls:
-            if tool_call.name == "send_email":
-                result = agent._handle_send_email(tool_call.input)
-            else:
-                result = agent.skill_executor.execute_tool(
-                    tool_call.name, tool_call.input
-                )
-            tool_results.append({
-                "tool_use_id": tool_call.id,
-                "content": result,
-            })
-
+        # Execute tools (independent calls in parallel) and build results
+        tool_results = agent.run_task_tools(response.tool_calls)
+        for tool_call, tool_result in zip(response.tool_calls, tool_results):
             # Emit tool result
-            yield sse_event("tool_result", {
+            yield ("tool_result", {
                 "name": tool_call.name,
-                "success": not result.startswith("Error"),
+                "success": not tool_failed(tool_result["content"]),
             })
 
         # Continue conversation
-        response = agent.claude.continue_with_tool_results(tool_results, system_prompt)
+        response = yield from stream_text(
+            lambda on_text: claude.continue_with_tool_results(
+                tool_results, system_prompt, on_text=on_text
+            )
+        )
+
+    agent.store_research(company, prospect, response.content)
 
     # Emit content event with final response
-    yield sse_event("content", {"text": response.content})
+    yield ("content", {"text": response.content})
 
     # Emit done event
-    yield sse_event("done", {"status": "complete"})
+    yield ("done", {"status": "complete"})
+
+
+def queued_research(
+    agent: SDRAgent,
+    company: Optional[str],
+    prospect: Optional[str],
+    session_id: str,
+    policy: Optional[str] = None,
+):
+    """Stream research once the session is free; it adds to the session's conversation."""
+    try:
+        # Only an identical research request is ever coalesced with this one
+        turn = submit_turn(session_id, research_summary(company, prospect), policy, merge=False)
+    except ValueError as e:
+        return {"error": f"Invalid queue_policy: {e}"}, 400
+    if turn.status == TurnStatus.REJECTED:
+        return rejected(turn)
+
+    def run(_: str) -> Iterator[str]:
+        return research_stream(agent, company=company, prospect=prospect, session_id=session_id)
+
+    return turn_response(turn, run, agent)
 
 
 @research_bp.route("/research/company", methods=["POST"])
@@ -100,21 +166,44 @@ def research_company():
 
     if not company:
         return {"error": "Company name is required"}, 400
+    invalid = session_id_error(session_id)
+    if invalid is not None:
+        return invalid
 
     try:
         agent = get_agent(session_id)
     except ValueError as e:
         return {"error": str(e)}, 500
 
-    return Response(
-        research_stream(agent, company=company),
-        mimetype="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        },
-    )
+    return queued_research(agent, company, None, session_id, data.get("queue_policy"))
+
+
+@research_bp.route("/research/lookalikes", methods=["GET"])
+def research_lookalikes():
+    """Find stored accounts most similar to a researched company or a description."""
+    company = request.args.get("company")
+    description = request.args.get("description")
+    top_k = request.args.get("top_k", 5, type=int)
+
+    if not company and not description:
+        return {"error": "company or description is required"}, 400
+
+    settings = current_app.config.get("settings")
+    if settings is None:
+        return {"error": "Settings not configured"}, 500
+    if not settings.research_store:
+        return {"error": "Research store is disabled"}, 404
+
+    store = get_research_store(settings.data_dir)
+    try:
+        lookalikes = store.find_lookalikes(company, description, top_k)
+    except KeyError as e:
+        return {"error": str(e.args[0])}, 404
+
+    return {
+        "company": company,
+        "accounts": [account.model_dump() for account in lookalikes],
+    }
 
 
 @research_bp.route("/research/prospect", methods=["POST"])
@@ -127,18 +216,13 @@ def research_prospect():
 
     if not prospect:
         return {"error": "Prospect name is required"}, 400
+    invalid = session_id_error(session_id)
+    if invalid is not None:
+        return invalid
 
     try:
         agent = get_agent(session_id)
     except ValueError as e:
         return {"error": str(e)}, 500
 
-    return Response(
-        research_stream(agent, prospect=prospect, company=company),
-        mimetype="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        },
-    )
+    return queued_research(agent, company, prospect, session_id, data.get("queue_policy"))